@@ -0,0 +1,36 @@
+"""add GiST daterange index on worker_vacations
+
+Revision ID: a1c2e3f4b5d6
+Revises: d8e7f6a5b4c3
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from alembic import op
+
+
+revision = 'a1c2e3f4b5d6'
+down_revision = 'd8e7f6a5b4c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # Índice parcial sobre las vacaciones que ocupan calendario (aprobadas y pendientes).
+    # Sirve las consultas de solapamiento `daterange(start_date, end_date, '[]') && ...`
+    op.execute(
+        """
+        CREATE INDEX IF NOT EXISTS ix_worker_vacations_active_daterange
+        ON worker_vacations
+        USING gist (daterange(start_date, end_date, '[]'))
+        WHERE status IN ('PENDING', 'APPROVED')
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX IF EXISTS ix_worker_vacations_active_daterange")
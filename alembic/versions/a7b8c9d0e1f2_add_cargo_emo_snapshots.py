@@ -0,0 +1,32 @@
+"""add cargo emo periodicity snapshots
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6b7c8d9e0a1
+Create Date: 2026-10-18 00:00:06.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f6b7c8d9e0a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'cargo_emo_snapshots',
+        sa.Column('cargo_id', sa.Integer(), sa.ForeignKey('cargos.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('total_trabajadores_activos', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('periodicidad_sugerida', sa.Integer(), nullable=False),
+        sa.Column('datos', sa.JSON(), nullable=False),
+        sa.Column('fecha_corte', sa.Date(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cargo_emo_snapshots')
@@ -0,0 +1,27 @@
+"""add filas_procesadas to matriz_legal_importaciones
+
+Revision ID: b2d3e4f5a6c7
+Revises: a1c2e3f4b5d6
+Create Date: 2026-10-18 00:00:01.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b2d3e4f5a6c7'
+down_revision = 'a1c2e3f4b5d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'matriz_legal_importaciones',
+        sa.Column('filas_procesadas', sa.Integer(), nullable=True, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('matriz_legal_importaciones', 'filas_procesadas')
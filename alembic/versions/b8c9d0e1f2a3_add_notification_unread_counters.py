@@ -0,0 +1,50 @@
+"""add notification unread counters
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-18 00:00:07.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_unread_counters',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    # Notificaciones sin leer de un usuario (marcar todas como leídas, recuentos)
+    op.create_index(
+        'idx_notifications_user_unread',
+        'notifications',
+        ['user_id'],
+        postgresql_where=sa.text('read_at IS NULL'),
+    )
+
+    # Un contador por usuario, también en cero: así los decrementos nunca
+    # encuentran la fila ausente
+    op.execute(
+        """
+        INSERT INTO notification_unread_counters (user_id, unread_count, updated_at)
+        SELECT u.id, count(n.id), now()
+        FROM users u
+        LEFT JOIN notifications n ON n.user_id = u.id AND n.read_at IS NULL
+        GROUP BY u.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_notifications_user_unread', table_name='notifications')
+    op.drop_table('notification_unread_counters')
@@ -0,0 +1,67 @@
+"""add aplicabilidad_mask to matriz_legal_normas
+
+Revision ID: c3e4f5a6b7d8
+Revises: b2d3e4f5a6c7
+Create Date: 2026-10-18 00:00:02.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c3e4f5a6b7d8'
+down_revision = 'b2d3e4f5a6c7'
+branch_labels = None
+depends_on = None
+
+
+# Mismo orden que APLICABILIDAD_BITS en app/models/matriz_legal.py
+APLICA_COLUMNS = [
+    'aplica_trabajadores_independientes',
+    'aplica_teletrabajo',
+    'aplica_trabajo_alturas',
+    'aplica_espacios_confinados',
+    'aplica_trabajo_caliente',
+    'aplica_sustancias_quimicas',
+    'aplica_radiaciones',
+    'aplica_trabajo_nocturno',
+    'aplica_menores_edad',
+    'aplica_mujeres_embarazadas',
+    'aplica_conductores',
+    'aplica_manipulacion_alimentos',
+    'aplica_maquinaria_pesada',
+    'aplica_riesgo_electrico',
+    'aplica_riesgo_biologico',
+    'aplica_trabajo_excavaciones',
+    'aplica_trabajo_administrativo',
+]
+
+
+def upgrade() -> None:
+    op.add_column(
+        'matriz_legal_normas',
+        sa.Column('aplicabilidad_mask', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Backfill: las normas generales quedan en 0, las específicas con sus bits
+    bits = ' + '.join(
+        f"(CASE WHEN {column} THEN {1 << bit} ELSE 0 END)"
+        for bit, column in enumerate(APLICA_COLUMNS)
+    )
+    op.execute(
+        f"UPDATE matriz_legal_normas "
+        f"SET aplicabilidad_mask = CASE WHEN aplica_general THEN 0 ELSE {bits} END"
+    )
+
+    op.create_index(
+        'ix_matriz_legal_normas_vigentes_mask',
+        'matriz_legal_normas',
+        ['aplicabilidad_mask', 'sector_economico_id'],
+        postgresql_where=sa.text("activo AND estado = 'vigente'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_matriz_legal_normas_vigentes_mask', table_name='matriz_legal_normas')
+    op.drop_column('matriz_legal_normas', 'aplicabilidad_mask')
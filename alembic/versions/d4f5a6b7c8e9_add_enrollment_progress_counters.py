@@ -0,0 +1,57 @@
+"""add progress counters to enrollments
+
+Revision ID: d4f5a6b7c8e9
+Revises: c3e4f5a6b7d8
+Create Date: 2026-10-18 00:00:03.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd4f5a6b7c8e9'
+down_revision = 'c3e4f5a6b7d8'
+branch_labels = None
+depends_on = None
+
+
+COUNTER_COLUMNS = (
+    'modules_total',
+    'modules_completed',
+    'required_surveys_completed',
+    'evaluations_passed',
+)
+
+
+def upgrade() -> None:
+    for column in COUNTER_COLUMNS:
+        op.add_column(
+            'enrollments',
+            sa.Column(column, sa.Integer(), nullable=False, server_default='0'),
+        )
+
+    # Los contadores de módulos se reconstruyen desde user_module_progress.
+    # Los de encuestas y evaluaciones se recalculan al primer chequeo de
+    # finalización (app.services.course_progress.requirements_met).
+    op.execute(
+        """
+        UPDATE enrollments
+        SET modules_total = (
+                SELECT COUNT(*) FROM course_modules cm
+                WHERE cm.course_id = enrollments.course_id
+            ),
+            modules_completed = (
+                SELECT COUNT(*) FROM user_module_progress ump
+                JOIN course_modules cm ON cm.id = ump.module_id
+                WHERE cm.course_id = enrollments.course_id
+                  AND ump.user_id = enrollments.user_id
+                  AND ump.status = 'completed'
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    for column in reversed(COUNTER_COLUMNS):
+        op.drop_column('enrollments', column)
@@ -0,0 +1,61 @@
+"""add trigram people search to workers and users
+
+Revision ID: e5a6b7c8d9f0
+Revises: d4f5a6b7c8e9
+Create Date: 2026-10-18 00:00:04.000000
+
+"""
+
+from alembic import op
+
+
+revision = 'e5a6b7c8d9f0'
+down_revision = 'd4f5a6b7c8e9'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_TEXT_SQL = (
+    "f_unaccent(lower(first_name || ' ' || last_name || ' ' || document_number || ' ' || email))"
+)
+TABLES = ('workers', 'users')
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # unaccent() es STABLE (depende del diccionario por defecto), así que no
+    # puede usarse en columnas generadas ni índices; fijando el diccionario
+    # el resultado es determinista y se puede declarar IMMUTABLE.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+
+    for table in TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_text text "
+            f"GENERATED ALWAYS AS ({SEARCH_TEXT_SQL}) STORED"
+        )
+        # Subcadenas de nombres, correo y documento (LIKE '%term%')
+        op.execute(
+            f"CREATE INDEX ix_{table}_search_text_trgm ON {table} "
+            f"USING gin (search_text gin_trgm_ops)"
+        )
+        # Prefijos de documento (LIKE '1020%') con independencia de la collation
+        op.execute(
+            f"CREATE INDEX ix_{table}_document_number_prefix ON {table} "
+            f"(document_number text_pattern_ops)"
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_document_number_prefix")
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_text_trgm")
+        op.drop_column(table, 'search_text')
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
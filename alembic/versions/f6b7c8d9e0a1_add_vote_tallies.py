@@ -0,0 +1,101 @@
+"""add vote ballots and tally counters
+
+Revision ID: f6b7c8d9e0a1
+Revises: e5a6b7c8d9f0
+Create Date: 2026-10-18 00:00:05.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'f6b7c8d9e0a1'
+down_revision = 'e5a6b7c8d9f0'
+branch_labels = None
+depends_on = None
+
+
+# Debe coincidir con app/services/vote_ingestion.py: los cambios de voto de
+# comité restan en la fila `member_id % TALLY_SHARDS`.
+TALLY_SHARDS = 8
+
+
+def upgrade() -> None:
+    op.create_table(
+        'candidate_voting_ballots',
+        sa.Column('voting_id', sa.Integer(), sa.ForeignKey('candidate_votings.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('voter_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('votes_cast', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('voting_id', 'voter_id'),
+    )
+    op.create_table(
+        'candidate_vote_tallies',
+        sa.Column(
+            'candidate_id', sa.Integer(),
+            sa.ForeignKey('candidate_voting_candidates.id', ondelete='CASCADE'), nullable=False,
+        ),
+        sa.Column('shard', sa.SmallInteger(), nullable=False),
+        sa.Column('voting_id', sa.Integer(), sa.ForeignKey('candidate_votings.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('votes', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('candidate_id', 'shard'),
+    )
+    op.create_index('idx_candidate_vote_tallies_voting', 'candidate_vote_tallies', ['voting_id'])
+    op.create_table(
+        'committee_vote_tallies',
+        sa.Column('voting_id', sa.Integer(), sa.ForeignKey('committee_votings.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('vote_value', sa.String(length=20), nullable=False),
+        sa.Column('shard', sa.SmallInteger(), nullable=False),
+        sa.Column('votes', sa.Integer(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('voting_id', 'vote_value', 'shard'),
+    )
+
+    # Un voto por miembro: se conserva el más reciente de los duplicados que
+    # hayan entrado por la comprobación previa (SELECT y luego INSERT)
+    op.execute(
+        """
+        DELETE FROM committee_votes v
+        USING committee_votes newer
+        WHERE newer.voting_id = v.voting_id
+          AND newer.member_id = v.member_id
+          AND newer.id > v.id
+        """
+    )
+    op.drop_index('idx_voting_member_vote', table_name='committee_votes')
+    op.create_index('idx_voting_member_vote', 'committee_votes', ['voting_id', 'member_id'], unique=True)
+
+    # Contadores y papeletas a partir de los votos existentes
+    op.execute(
+        """
+        INSERT INTO candidate_voting_ballots (voting_id, voter_id, votes_cast, updated_at)
+        SELECT voting_id, voter_id, count(*), coalesce(max(vote_date), now())
+        FROM candidate_votes
+        GROUP BY voting_id, voter_id
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO candidate_vote_tallies (candidate_id, shard, voting_id, votes)
+        SELECT candidate_id, voter_id % {TALLY_SHARDS}, voting_id, count(*)
+        FROM candidate_votes
+        GROUP BY candidate_id, voter_id % {TALLY_SHARDS}, voting_id
+        """
+    )
+    op.execute(
+        f"""
+        INSERT INTO committee_vote_tallies (voting_id, vote_value, shard, votes)
+        SELECT voting_id, vote_value, member_id % {TALLY_SHARDS}, count(*)
+        FROM committee_votes
+        GROUP BY voting_id, vote_value, member_id % {TALLY_SHARDS}
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_voting_member_vote', table_name='committee_votes')
+    op.create_index('idx_voting_member_vote', 'committee_votes', ['voting_id', 'member_id'], unique=False)
+    op.drop_table('committee_vote_tallies')
+    op.drop_index('idx_candidate_vote_tallies_voting', table_name='candidate_vote_tallies')
+    op.drop_table('candidate_vote_tallies')
+    op.drop_table('candidate_voting_ballots')
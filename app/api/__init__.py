@@ -51,6 +51,7 @@ from .estandares_minimos import router as estandares_minimos_router
 from .master_documents import router as master_documents_router
 from .programa_inspecciones import router as programa_inspecciones_router
 from .ergonomic_plans import router as ergonomic_plans_router
+from .admin_system import router as admin_system_router
 
 
 api_router = APIRouter()
@@ -73,6 +74,7 @@ api_router.include_router(enrollments_router, prefix="/enrollments", tags=["enro
 api_router.include_router(user_progress_router, prefix="/user-progress", tags=["user-progress"])
 api_router.include_router(admin_config_router, prefix="/admin/config", tags=["admin"])
 api_router.include_router(admin_attendance_router, prefix="/admin/attendance", tags=["admin", "attendance"])
+api_router.include_router(admin_system_router, prefix="/admin/system", tags=["admin"])
 api_router.include_router(reinduction_router, prefix="/reinduction", tags=["reinduction"])
 api_router.include_router(seguimientos_router, prefix="/seguimientos", tags=["seguimientos"])
 api_router.include_router(seguimiento_actividades_router, prefix="/seguimiento-actividades", tags=["seguimiento-actividades"])
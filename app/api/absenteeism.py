@@ -2,9 +2,9 @@ from datetime import date
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func, extract, text
+from sqlalchemy import extract, text
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import get_current_user
 from app.models import Absenteeism, Worker, User
 from app.schemas.absenteeism import (
@@ -16,6 +16,7 @@ from app.schemas.absenteeism import (
     AbsenteeismStats,
 )
 from app.models.absenteeism import EventMonth, EventType
+from app.services.people_search import find_workers, search_condition
 
 router = APIRouter(tags=["absenteeism"])
 
@@ -113,15 +114,7 @@ def get_absenteeism_list(
         query = query.filter(Absenteeism.start_date <= start_date_to)
 
     if search:
-        query = query.join(Worker).filter(
-            or_(
-                func.concat(Worker.first_name, " ", Worker.last_name).ilike(
-                    f"%{search}%"
-                ),
-                Worker.document_number.ilike(f"%{search}%"),
-                Worker.cedula.ilike(f"%{search}%"),
-            )
-        )
+        query = query.join(Worker).filter(search_condition(Worker, search))
 
     # Contar total de registros y aplicar paginación con manejo robusto de enums
     try:
@@ -540,7 +533,7 @@ def delete_absenteeism(
 def get_absenteeism_stats(
     year: Optional[int] = Query(None, description="Filtrar por año"),
     worker_id: Optional[int] = Query(None, description="Filtrar por trabajador"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Obtener estadísticas de ausentismo"""
@@ -630,24 +623,7 @@ def search_workers(
 ):
     """Buscar trabajadores para selección en formularios"""
 
-    workers = (
-        db.query(Worker)
-        .filter(
-            and_(
-                Worker.is_active == True,
-                or_(
-                    func.concat(Worker.first_name, " ", Worker.last_name).ilike(
-                        f"%{q}%"
-                    ),
-                    Worker.document_number.ilike(f"%{q}%"),
-                    Worker.cedula.ilike(f"%{q}%"),
-                    Worker.email.ilike(f"%{q}%"),
-                ),
-            )
-        )
-        .limit(limit)
-        .all()
-    )
+    workers = find_workers(db, q, limit=limit)
 
     return [
         {
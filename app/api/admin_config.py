@@ -1,9 +1,9 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.admin_config import AdminConfig, Programas, Ocupacion
 from app.models.cargo import Cargo
 from app.models.seguridad_social import SeguridadSocial
@@ -31,18 +31,22 @@ from app.models.course import CourseMaterial, CourseModule
 from app.models.certificate import Certificate
 from app.models.committee import CommitteeDocument, Committee, CommitteeMember, CommitteeMeeting, CommitteeActivity
 from app.utils.storage import storage_manager
+from app.utils.catalog_cache import catalog_cache
 from app.services.s3_storage import s3_service, contabo_service
 import httpx
 from app.config import settings
 import logging
 from datetime import datetime
-import pandas as pd
 import io
 from fastapi.responses import StreamingResponse
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Los cargos también se modifican fuera de este router (p. ej. la periodicidad
+# de EMO al guardar un profesiograma): se invalida tras cualquier commit.
+catalog_cache.track_model(Cargo, "cargos")
+
 
 @router.get("/categories{trailing_slash:path}", response_model=List[str])
 async def get_categories(
@@ -225,6 +229,7 @@ async def delete_config(
 # Endpoints para Seguridad Social
 @router.get("/seguridad-social{trailing_slash:path}", response_model=List[SeguridadSocialSchema])
 def get_seguridad_social(
+    request: Request,
     trailing_slash: str = "",
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -235,44 +240,57 @@ def get_seguridad_social(
     current_user: User = Depends(get_current_active_user)
 ):
     """Obtener lista de entidades de seguridad social"""
-    query = db.query(SeguridadSocial)
-    
-    if is_active is not None:
-        query = query.filter(SeguridadSocial.is_active == is_active)
-    
-    if tipo:
-        query = query.filter(SeguridadSocial.tipo == tipo)
-    
-    if search:
-        query = query.filter(SeguridadSocial.nombre.ilike(f"%{search}%"))
-    
-    return query.offset(skip).limit(limit).all()
+    def load():
+        query = db.query(SeguridadSocial)
+
+        if is_active is not None:
+            query = query.filter(SeguridadSocial.is_active == is_active)
+
+        if tipo:
+            query = query.filter(SeguridadSocial.tipo == tipo)
+
+        if search:
+            query = query.filter(SeguridadSocial.nombre.ilike(f"%{search}%"))
+
+        return query.offset(skip).limit(limit).all()
+
+    return catalog_cache.respond(request, "seguridad_social", List[SeguridadSocialSchema], load)
 
 
 @router.get("/seguridad-social/active{trailing_slash:path}", response_model=List[SeguridadSocialSchema])
 def get_active_seguridad_social(
+    request: Request,
     trailing_slash: str = "",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Obtener entidades de seguridad social activas"""
-    return db.query(SeguridadSocial).filter(SeguridadSocial.is_active == True).all()
+    return catalog_cache.respond(
+        request,
+        "seguridad_social",
+        List[SeguridadSocialSchema],
+        lambda: db.query(SeguridadSocial).filter(SeguridadSocial.is_active == True).all(),
+    )
 
 
 @router.get("/seguridad-social/tipo/{tipo}{trailing_slash:path}", response_model=List[SeguridadSocialSchema])
 def get_seguridad_social_by_tipo(
+    request: Request,
     tipo: str,
     trailing_slash: str = "",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Obtener entidades de seguridad social activas por tipo (eps, afp, arl)"""
-    return db.query(SeguridadSocial).filter(
-        and_(
-            SeguridadSocial.tipo == tipo,
-            SeguridadSocial.is_active == True
-        )
-    ).all()
+    def load():
+        return db.query(SeguridadSocial).filter(
+            and_(
+                SeguridadSocial.tipo == tipo,
+                SeguridadSocial.is_active == True
+            )
+        ).all()
+
+    return catalog_cache.respond(request, "seguridad_social", List[SeguridadSocialSchema], load)
 
 
 @router.get("/seguridad-social/{seguridad_social_id}{trailing_slash:path}", response_model=SeguridadSocialSchema)
@@ -317,6 +335,7 @@ def create_seguridad_social(
     seguridad_social = SeguridadSocial(**seguridad_social_data.dict())
     db.add(seguridad_social)
     db.commit()
+    catalog_cache.invalidate("seguridad_social")
     db.refresh(seguridad_social)
     return seguridad_social
 
@@ -359,6 +378,7 @@ def update_seguridad_social(
         setattr(seguridad_social, field, value)
     
     db.commit()
+    catalog_cache.invalidate("seguridad_social")
     db.refresh(seguridad_social)
     return seguridad_social
 
@@ -380,6 +400,7 @@ def delete_seguridad_social(
     
     db.delete(seguridad_social)
     db.commit()
+    catalog_cache.invalidate("seguridad_social")
     return None
 
 
@@ -388,7 +409,7 @@ def delete_seguridad_social(
 @router.get("/cargos/export/excel")
 def export_cargos_excel(
     activo: Optional[bool] = Query(None, description="Filtrar por estado activo"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_admin)
 ):
     """Exportar lista de cargos a archivo Excel"""
@@ -465,6 +486,7 @@ def export_cargos_excel(
 
 @router.get("/cargos{trailing_slash:path}", response_model=List[CargoSchema])
 def get_cargos(
+    request: Request,
     trailing_slash: str = "",
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -474,32 +496,35 @@ def get_cargos(
     current_user: User = Depends(get_current_active_user)
 ):
     """Obtener lista de cargos"""
-    query = db.query(Cargo)
-    
-    # Filtros
-    if activo is not None:
-        query = query.filter(Cargo.activo == activo)
-    
-    if search:
-        query = query.filter(Cargo.nombre_cargo.ilike(f"%{search}%"))
-    
-    # Ordenar por nombre
-    query = query.order_by(Cargo.nombre_cargo)
-    
-    # Paginación
-    cargos = query.offset(skip).limit(limit).all()
-    
-    return cargos
+    def load():
+        query = db.query(Cargo)
+
+        # Filtros
+        if activo is not None:
+            query = query.filter(Cargo.activo == activo)
+
+        if search:
+            query = query.filter(Cargo.nombre_cargo.ilike(f"%{search}%"))
+
+        # Ordenar por nombre y paginar
+        return query.order_by(Cargo.nombre_cargo).offset(skip).limit(limit).all()
+
+    return catalog_cache.respond(request, "cargos", List[CargoSchema], load)
 
 
 @router.get("/cargos/active", response_model=List[CargoSchema])
 def get_active_cargos(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Obtener solo cargos activos"""
-    cargos = db.query(Cargo).filter(Cargo.activo == True).order_by(Cargo.nombre_cargo).all()
-    return cargos
+    return catalog_cache.respond(
+        request,
+        "cargos",
+        List[CargoSchema],
+        lambda: db.query(Cargo).filter(Cargo.activo == True).order_by(Cargo.nombre_cargo).all(),
+    )
 
 
 @router.get("/cargos/{cargo_id}", response_model=CargoSchema)
@@ -538,6 +563,7 @@ def create_cargo(
     cargo = Cargo(**cargo_data.model_dump())
     db.add(cargo)
     db.commit()
+    catalog_cache.invalidate("cargos")
     db.refresh(cargo)
     
     return cargo
@@ -581,6 +607,7 @@ def update_cargo(
         setattr(cargo, field, value)
     
     db.commit()
+    catalog_cache.invalidate("cargos")
     db.refresh(cargo)
 
     if cargo_data.nombre_cargo and cargo_data.nombre_cargo != old_nombre_cargo:
@@ -620,6 +647,7 @@ def delete_cargo(
 
     db.delete(cargo)
     db.commit()
+    catalog_cache.invalidate("cargos")
 
     return None
 
@@ -690,6 +718,7 @@ async def seed_initial_data(
 # Programas endpoints
 @router.get("/programas{trailing_slash:path}", response_model=List[ProgramasSchema])
 async def get_all_programas(
+    request: Request,
     trailing_slash: str = "",
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
@@ -699,27 +728,32 @@ async def get_all_programas(
     db: Session = Depends(get_db)
 ):
     """Get all programs with optional filters"""
-    query = db.query(Programas)
+    def load():
+        query = db.query(Programas)
 
-    if activo is not None:
-        query = query.filter(Programas.activo == activo)
+        if activo is not None:
+            query = query.filter(Programas.activo == activo)
 
-    if search:
-        query = query.filter(Programas.nombre_programa.ilike(f"%{search}%"))
+        if search:
+            query = query.filter(Programas.nombre_programa.ilike(f"%{search}%"))
 
-    programas = query.order_by(Programas.nombre_programa).offset(skip).limit(limit).all()
-    return programas
+        return query.order_by(Programas.nombre_programa).offset(skip).limit(limit).all()
+
+    return catalog_cache.respond(request, "programas", List[ProgramasSchema], load)
 
 
 @router.get("/programas/active", response_model=List[ProgramasSchema])
 async def get_active_programas(
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """Get all active programs (public endpoint)"""
-    programas = db.query(Programas).filter(
-        Programas.activo == True
-    ).order_by(Programas.nombre_programa).all()
-    return programas
+    def load():
+        return db.query(Programas).filter(
+            Programas.activo == True
+        ).order_by(Programas.nombre_programa).all()
+
+    return catalog_cache.respond(request, "programas", List[ProgramasSchema], load)
 
 
 @router.get("/programas/{programa_id}", response_model=ProgramasSchema)
@@ -760,6 +794,7 @@ async def create_programa(
     db_programa = Programas(**programa.dict())
     db.add(db_programa)
     db.commit()
+    catalog_cache.invalidate("programas")
     db.refresh(db_programa)
     
     return db_programa
@@ -803,6 +838,7 @@ async def update_programa(
         setattr(db_programa, field, value)
     
     db.commit()
+    catalog_cache.invalidate("programas")
     db.refresh(db_programa)
     
     return db_programa
@@ -826,6 +862,7 @@ async def delete_programa(
     
     db.delete(db_programa)
     db.commit()
+    catalog_cache.invalidate("programas")
     
     return None
 
@@ -0,0 +1,38 @@
+from typing import Any, Dict, List
+
+from fastapi import APIRouter, Depends
+
+from app.database import async_pool_monitor, pool_monitor, replica_lag_monitor, replica_pool_monitor
+from app.dependencies import require_admin
+from app.models.user import User
+from app.utils.metrics import metrics as request_metrics
+
+router = APIRouter()
+
+
+@router.get("/db-pool", response_model=Dict[str, Any])
+def get_db_pool_metrics(current_user: User = Depends(require_admin)) -> Any:
+    """
+    Database connection pool metrics: checked-out connections, overflow, wait
+    time per checkout, pool timeouts and connections held longer than
+    DB_POOL_LONG_HELD_SECONDS (with the stack that acquired them).
+
+    `async_pool` reports the separate asyncpg pool used by the async read
+    endpoints; `replica_pool` and `replica` (lag and routing counters) are
+    present when DATABASE_REPLICA_URL is configured.
+    """
+    metrics = {**pool_monitor.snapshot(), "async_pool": async_pool_monitor.snapshot()}
+    if replica_pool_monitor is not None:
+        metrics["replica_pool"] = replica_pool_monitor.snapshot()
+        metrics["replica"] = replica_lag_monitor.status()
+    return metrics
+
+
+@router.get("/slow-queries", response_model=List[Dict[str, Any]])
+def get_slow_queries(current_user: User = Depends(require_admin)) -> Any:
+    """
+    Most recent SQL statements slower than SLOW_QUERY_MS (newest first), with
+    the route that issued them and the shape of their bound parameters (names,
+    types and list lengths; never the values).
+    """
+    return request_metrics.slow_statements()
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -8,12 +8,14 @@ from app.models.area import Area
 from app.schemas.area import AreaCreate, AreaUpdate, Area as AreaSchema, AreaList
 from app.api.auth import get_current_user
 from app.models.user import User
+from app.utils.catalog_cache import catalog_cache
 
 router = APIRouter()
 
 
 @router.get("/", response_model=AreaList)
 def get_areas(
+    request: Request,
     skip: int = Query(0, ge=0, description="Número de registros a omitir"),
     limit: int = Query(10, ge=1, le=100, description="Número de registros a devolver"),
     search: Optional[str] = Query(None, description="Buscar por nombre"),
@@ -24,32 +26,35 @@ def get_areas(
     """
     Obtener lista paginada de áreas
     """
-    query = db.query(Area)
-    
-    # Aplicar filtros
-    if search:
-        query = query.filter(Area.name.ilike(f"%{search}%"))
-    
-    if is_active is not None:
-        query = query.filter(Area.is_active == is_active)
-    
-    # Obtener total de registros
-    total = query.count()
-    
-    # Aplicar paginación
-    areas = query.offset(skip).limit(limit).all()
-    
-    # Calcular información de paginación
-    page = skip // limit + 1
-    pages = (total + limit - 1) // limit
-    
-    return AreaList(
-        items=areas,
-        total=total,
-        page=page,
-        size=limit,
-        pages=pages
-    )
+    def load():
+        query = db.query(Area)
+
+        # Aplicar filtros
+        if search:
+            query = query.filter(Area.name.ilike(f"%{search}%"))
+
+        if is_active is not None:
+            query = query.filter(Area.is_active == is_active)
+
+        # Obtener total de registros
+        total = query.count()
+
+        # Aplicar paginación
+        areas = query.offset(skip).limit(limit).all()
+
+        # Calcular información de paginación
+        page = skip // limit + 1
+        pages = (total + limit - 1) // limit
+
+        return AreaList(
+            items=areas,
+            total=total,
+            page=page,
+            size=limit,
+            pages=pages
+        )
+
+    return catalog_cache.respond(request, "areas", AreaList, load)
 
 
 @router.get("/{area_id}", response_model=AreaSchema)
@@ -84,6 +89,7 @@ def create_area(
     db_area = Area(**area.model_dump())
     db.add(db_area)
     db.commit()
+    catalog_cache.invalidate("areas")
     db.refresh(db_area)
     return db_area
 
@@ -114,6 +120,7 @@ def update_area(
         setattr(db_area, field, value)
     
     db.commit()
+    catalog_cache.invalidate("areas")
     db.refresh(db_area)
     return db_area
 
@@ -142,16 +149,22 @@ def delete_area(
     
     db.delete(db_area)
     db.commit()
+    catalog_cache.invalidate("areas")
     return {"message": "Área eliminada exitosamente"}
 
 
 @router.get("/active/list", response_model=List[AreaSchema])
 def get_active_areas(
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Obtener lista de áreas activas (para selects/dropdowns)
     """
-    areas = db.query(Area).filter(Area.is_active == True).order_by(Area.name).all()
-    return areas
\ No newline at end of file
+    return catalog_cache.respond(
+        request,
+        "areas",
+        List[AreaSchema],
+        lambda: db.query(Area).filter(Area.is_active == True).order_by(Area.name).all(),
+    )
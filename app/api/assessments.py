@@ -2,7 +2,7 @@ import os
 from app.services.email_service import EmailService
 from app.services.auth import auth_service
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File, Form
 import base64
 from app.utils.storage import storage_manager
 import re
@@ -23,8 +23,16 @@ from app.schemas.assessment import (
     ErgonomicSelfInspection as ErgonomicSelfInspectionSchema,
     ErgonomicSelfInspectionCreate,
 )
-from app.services.html_to_pdf import HTMLToPDFConverter
-from fastapi.responses import StreamingResponse
+from app.services.html_to_pdf import get_html_to_pdf_converter
+from app.services.image_derivatives import (
+    DEFAULT_SIZE,
+    DERIVATIVE_SIZES,
+    PDF_SIZE,
+    etag_matches,
+    image_derivatives,
+    negotiate_format,
+)
+from fastapi.responses import Response, StreamingResponse
 from io import BytesIO
 
 router = APIRouter()
@@ -63,7 +71,9 @@ async def upload_assessment_photo(
 
         # Subir archivo
         result = await storage_manager.upload_file(file, folder=folder, keep_original_name=True)
-        
+        # Mismo nombre de archivo: la URL apunta ahora a otro contenido
+        image_derivatives.forget(result["url"])
+
         return {
             "url": result["url"],
             "filename": result["filename"],
@@ -537,11 +547,9 @@ async def generate_dashboard_pdf(
     }
 
     today = date_cls.today()
-    converter = HTMLToPDFConverter()
-    logo_b64 = converter._load_logo_base64()
-
+    converter = get_html_to_pdf_converter()
     context = {
-        "logo_base64": logo_b64,
+        "logo_url": converter.logo_url(),
         "stats": stats,
         "response_rate": response_rate,
         "recommendations": recommendations,
@@ -571,10 +579,10 @@ async def generate_assessment_pdf(
 
     worker = assessment.worker
 
-    converter = HTMLToPDFConverter()
+    converter = get_html_to_pdf_converter()
 
-    # Cargar logo en base64
-    logo_base64 = converter._load_logo_base64()
+    # Logo servido desde la caché compartida del convertidor
+    logo_url = converter.logo_url()
 
     # Procesar fotos: convertir URLs a base64 si existen
     photos_base64 = {}
@@ -603,7 +611,7 @@ async def generate_assessment_pdf(
 
     # Preparar datos para la plantilla
     data = {
-        "logo_base64": logo_base64,
+        "logo_url": logo_url,
         "worker": {
             "full_name": worker.full_name,
             "document_number": worker.document_number,
@@ -735,7 +743,9 @@ async def delete_homework_assessment(
 
 @router.get("/homework/proxy-image")
 async def get_assessment_image(
+    request: Request,
     url: str = Query(..., description="URL de la imagen"),
+    size: str = Query(DEFAULT_SIZE, description="Tamaño: thumb (320 px), small (800 px), large (1600 px) u original"),
     token: Optional[str] = Query(None, description="Token JWT para autenticación vía query param"),
     db: Session = Depends(get_db),
     # Quitamos la dependencia estricta de get_current_user aquí para manejar manualmente el token opcional
@@ -744,6 +754,9 @@ async def get_assessment_image(
     Proxy para descargar imágenes desde el almacenamiento (Contabo) y servirlas.
     Esto evita problemas de CORS y acceso a buckets privados.
     Permite autenticación por Header (Bearer) o Query Param (token).
+
+    Sirve un derivado redimensionado (WebP si el navegador lo acepta) desde la
+    caché de app/services/image_derivatives.py, con ETag para revalidar.
     """
     # Autenticación manual
     user = None
@@ -761,42 +774,39 @@ async def get_assessment_image(
     # Validar acceso básico (cualquier usuario autenticado puede ver imágenes por ahora,
     # idealmente validar si la imagen le pertenece, pero es complejo solo con la URL)
 
-    try:
-        # Descargar archivo como bytes
-        file_content = await storage_manager.download_file(url)
-
-        if not file_content:
-            raise HTTPException(status_code=404, detail="Imagen no encontrada")
+    if size not in DERIVATIVE_SIZES:
+        raise HTTPException(status_code=400, detail="Tamaño de imagen no válido")
 
-        # Determinar content type
-        content_type = "image/jpeg"
-        if url.lower().endswith(".png"):
-            content_type = "image/png"
-        elif url.lower().endswith(".gif"):
-            content_type = "image/gif"
+    image_format = negotiate_format(request.headers.get("accept"))
+    if_none_match = request.headers.get("if-none-match")
+    # La URL puede volver a subirse con otro contenido: el navegador revalida con el ETag.
+    headers = {
+        "Cache-Control": f"private, max-age={int(image_derivatives.source_ttl)}",
+        "Vary": "Accept",
+    }
 
-        return StreamingResponse(BytesIO(file_content), media_type=content_type)
+    etag = image_derivatives.cached_etag(url, size, image_format)
+    if etag and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={**headers, "ETag": etag})
 
+    try:
+        derivative = await image_derivatives.get(url, size, image_format)
     except Exception as e:
         print(f"Error proxying image: {e}")
         raise HTTPException(status_code=500, detail="Error al recuperar la imagen")
 
+    if derivative is None:
+        raise HTTPException(status_code=404, detail="Imagen no encontrada")
+
+    headers["ETag"] = derivative.etag
+    if etag_matches(if_none_match, derivative.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=derivative.data, media_type=derivative.content_type, headers=headers)
+
 
 async def _download_image_as_data_uri(url: Optional[str]) -> Optional[str]:
-    if not url:
-        return None
-    try:
-        image_bytes = await storage_manager.download_file(url)
-        if not image_bytes:
-            return None
-        image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-        if url.lower().endswith(".png"):
-            return f"data:image/png;base64,{image_base64}"
-        if url.lower().endswith(".gif"):
-            return f"data:image/gif;base64,{image_base64}"
-        return f"data:image/jpeg;base64,{image_base64}"
-    except Exception:
-        return None
+    # Los PDF incrustan el derivado pequeño, no el original a resolución completa.
+    return await image_derivatives.data_uri(url, PDF_SIZE)
 
 
 @router.post("/ergonomic", response_model=ErgonomicSelfInspectionSchema)
@@ -1188,11 +1198,9 @@ async def generate_ergonomic_dashboard_pdf(
     }
 
     today = date_cls.today()
-    converter = HTMLToPDFConverter()
-    logo_b64 = converter._load_logo_base64()
-
+    converter = get_html_to_pdf_converter()
     context = {
-        "logo_base64": logo_b64,
+        "logo_url": converter.logo_url(),
         "stats": stats,
         "response_rate": response_rate,
         "recommendations": recommendations,
@@ -1226,7 +1234,7 @@ async def generate_ergonomic_self_inspection_pdf(
         raise HTTPException(status_code=404, detail="Autoinspección no encontrada")
 
     worker = inspection.worker
-    converter = HTMLToPDFConverter()
+    converter = get_html_to_pdf_converter()
 
     checks = [
         inspection.chair_height_check,
@@ -11,11 +11,10 @@ from sqlalchemy import and_, func
 import os
 import tempfile
 import io
-import pandas as pd
 from starlette.background import BackgroundTask
 
 from app.dependencies import get_current_active_user, has_role_or_custom
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User
 from app.models.worker import Worker
 from app.models.attendance import Attendance, AttendanceStatus, AttendanceType, VirtualSession
@@ -23,7 +22,8 @@ from app.models.course import Course
 from app.models.session import Session as SessionModel
 from app.models.certificate import Certificate, CertificateStatus
 from app.services.certificate_generator import CertificateGenerator
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.people_search import search_condition
+from app.services.html_to_pdf import get_html_to_pdf_converter
 from app.schemas.attendance import (
     AttendanceUpdate,
     AttendanceResponse,
@@ -46,6 +46,7 @@ from app.schemas.session import (
     SessionListResponse,
 )
 from app.schemas.common import MessageResponse, PaginatedResponse
+from app.utils.pagination import COUNT_DESCRIPTION, CURSOR_DESCRIPTION, CountMode, SortKey, paginate
 from app.models.notification import Notification, NotificationType, NotificationPriority
 from app.models.enrollment import Enrollment
 from pydantic import BaseModel
@@ -337,11 +338,12 @@ async def export_attendance_data(
     course_name: str = None,
     status: AttendanceStatus = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> Any:
     """
     Export attendance data to Excel format
     """
+    import pandas as pd
     
     # Check permissions
     if not has_role_or_custom(current_user, ["admin", "trainer"]):
@@ -416,6 +418,8 @@ async def get_attendance_records(
     session_date: date = None,
     status: AttendanceStatus = None,
     search: str = None,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[CountMode] = Query(None, description=COUNT_DESCRIPTION),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ) -> Any:
@@ -427,7 +431,7 @@ async def get_attendance_records(
     # Apply search filter by user name
     if search:
         query = query.join(User, Attendance.user_id == User.id).filter(
-            User.full_name.ilike(f"%{search}%")
+            search_condition(User, search)
         )
 
     # Apply filters
@@ -451,15 +455,14 @@ async def get_attendance_records(
     if status:
         query = query.filter(Attendance.status == status)
 
-    # Get total count
-    total = query.count()
-
     # Apply pagination and get attendance records
-    attendance_records = query.offset(skip).limit(limit).all()
+    result_page = paginate(
+        query, sort=[SortKey(Attendance.id)], size=limit, offset=skip, cursor=cursor, count=count
+    )
 
     # Manually construct response data with user and course information
     attendance_data = []
-    for record in attendance_records:
+    for record in result_page.items:
         user = db.query(User).filter(User.id == record.user_id).first()
         record_data = {
             "id": record.id,
@@ -491,21 +494,7 @@ async def get_attendance_records(
         }
         attendance_data.append(record_data)
 
-    # Calculate pagination info
-    page = (skip // limit) + 1 if limit > 0 else 1
-    pages = (total + limit - 1) // limit if limit > 0 else 1
-    has_next = skip + limit < total
-    has_prev = skip > 0
-
-    return PaginatedResponse(
-        items=attendance_data,
-        total=total,
-        page=page,
-        size=limit,
-        pages=pages,
-        has_next=has_next,
-        has_prev=has_prev,
-    )
+    return PaginatedResponse(items=attendance_data, **result_page.meta())
 
 
 @router.post("/", response_model=AttendanceResponse)
@@ -848,7 +837,7 @@ async def generate_attendance_list_pdf(
         template_data = {"session": session_data, "attendees": attendees}
 
         # Usar servicio optimizado de PDF
-        pdf_service = HTMLToPDFConverter()
+        pdf_service = get_html_to_pdf_converter()
         
         # Generar PDF optimizado en memoria primero
         pdf_bytes = pdf_service.generate_attendance_list_pdf(template_data)
@@ -1943,7 +1932,7 @@ async def generate_attendance_list_pdf(
         # Preparar datos para el servicio de PDF
         template_data = {"session": session_data, "attendees": attendees}
 
-        pdf_service = HTMLToPDFConverter()
+        pdf_service = get_html_to_pdf_converter()
         # Guardar PDF en archivo temporal
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
             pdf_path = tmp_file.name
@@ -2058,7 +2047,7 @@ async def generate_attendance_certificate(
         }
 
         # Generar PDF usando el servicio
-        pdf_service = HTMLToPDFConverter()
+        pdf_service = get_html_to_pdf_converter()
         
         # Guardar PDF en archivo temporal
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
@@ -2194,7 +2183,7 @@ async def generate_participants_list_pdf(
         # Preparar datos para el servicio de PDF
         template_data = {"session": session_data, "attendees": attendees}
 
-        pdf_service = HTMLToPDFConverter()
+        pdf_service = get_html_to_pdf_converter()
         # Guardar PDF en archivo temporal
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
             pdf_path = tmp_file.name
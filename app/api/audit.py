@@ -1,17 +1,24 @@
-from typing import Any, List, Optional
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload, contains_eager
 from sqlalchemy import desc, and_, or_
 
 from app.dependencies import get_current_active_user, require_supervisor_or_admin
-from app.database import get_db
+from app.database import get_read_db
 from app.models.user import User
 from app.models.audit import AuditLog, AuditAction
 from app.schemas.audit import AuditLogResponse, AuditLogListResponse
 from app.schemas.common import MessageResponse
+from app.utils.ndjson import ndjson_response
+from app.utils.pagination import COUNT_DESCRIPTION, CURSOR_DESCRIPTION, CountMode, SortKey, paginate
 
 router = APIRouter()
 
+# Más recientes primero; el id desempata registros del mismo instante
+AUDIT_LOG_SORT = [SortKey(AuditLog.created_at, descending=True), SortKey(AuditLog.id, descending=True)]
+
 
 def format_audit_log(log: AuditLog) -> AuditLogResponse:
     """Helper to format audit log with user info"""
@@ -45,23 +52,37 @@ def format_audit_log(log: AuditLog) -> AuditLogResponse:
     return AuditLogResponse(**log_dict)
 
 
-@router.get("/", response_model=AuditLogListResponse)
-async def get_audit_logs(
-    page: int = Query(1, ge=1, description="Page number"),
-    limit: int = Query(20, ge=1, le=100, description="Items per page"),
-    action: Optional[AuditAction] = Query(None, description="Filter by action type"),
-    resource_type: Optional[str] = Query(None, description="Filter by resource type"),
-    user_id: Optional[int] = Query(None, description="Filter by user ID"),
-    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
-    search: Optional[str] = Query(None, description="Search in resource name, details, IP or user info"),
-    current_user: User = Depends(require_supervisor_or_admin),
-    db: Session = Depends(get_db)
-) -> Any:
-    """
-    Get audit logs with pagination and filtering.
-    Only accessible by supervisors and admins.
-    """
+def _parse_date_range(start_date: Optional[str], end_date: Optional[str]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Convierte las fechas YYYY-MM-DD del filtro; `end_dt` es exclusivo (día siguiente)."""
+    start_dt = end_dt = None
+    if start_date:
+        try:
+            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Formato de fecha de inicio inválido. Use YYYY-MM-DD"
+            )
+    if end_date:
+        try:
+            end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Formato de fecha de fin inválido. Use YYYY-MM-DD"
+            )
+    return start_dt, end_dt
+
+
+def _audit_logs_query(
+    db: Session,
+    action: Optional[AuditAction],
+    resource_type: Optional[str],
+    user_id: Optional[int],
+    start_dt: Optional[datetime],
+    end_dt: Optional[datetime],
+    search: Optional[str],
+):
     # Build query with user information
     # Use outerjoin + contains_eager to allow filtering by user fields while keeping logs without users
     query = db.query(AuditLog).outerjoin(AuditLog.user).options(
@@ -78,27 +99,11 @@ async def get_audit_logs(
     if user_id:
         query = query.filter(AuditLog.user_id == user_id)
     
-    if start_date:
-        from datetime import datetime
-        try:
-            start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-            query = query.filter(AuditLog.created_at >= start_dt)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Formato de fecha de inicio inválido. Use YYYY-MM-DD"
-            )
+    if start_dt:
+        query = query.filter(AuditLog.created_at >= start_dt)
     
-    if end_date:
-        from datetime import datetime, timedelta
-        try:
-            end_dt = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
-            query = query.filter(AuditLog.created_at < end_dt)
-        except ValueError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Formato de fecha de fin inválido. Use YYYY-MM-DD"
-            )
+    if end_dt:
+        query = query.filter(AuditLog.created_at < end_dt)
     
     if search:
         search_term = f"%{search}%"
@@ -114,28 +119,67 @@ async def get_audit_logs(
             )
         )
     
-    # Order by created_at descending (newest first)
-    query = query.order_by(desc(AuditLog.created_at))
-    
-    # Get total count
-    total = query.count()
-    
-    # Apply pagination
-    offset = (page - 1) * limit
-    audit_logs = query.offset(offset).limit(limit).all()
+    return query
+
+
+@router.get("/", response_model=AuditLogListResponse)
+async def get_audit_logs(
+    page: int = Query(1, ge=1, description="Page number"),
+    limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    action: Optional[AuditAction] = Query(None, description="Filter by action type"),
+    resource_type: Optional[str] = Query(None, description="Filter by resource type"),
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    search: Optional[str] = Query(None, description="Search in resource name, details, IP or user info"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[CountMode] = Query(None, description=COUNT_DESCRIPTION),
+    current_user: User = Depends(require_supervisor_or_admin),
+    db: Session = Depends(get_read_db)
+) -> Any:
+    """
+    Get audit logs with pagination and filtering.
+    Only accessible by supervisors and admins.
+    """
+    start_dt, end_dt = _parse_date_range(start_date, end_date)
+    query = _audit_logs_query(db, action, resource_type, user_id, start_dt, end_dt, search)
     
-    # Calculate total pages
-    total_pages = (total + limit - 1) // limit
+    result_page = paginate(query, sort=AUDIT_LOG_SORT, page=page, size=limit, cursor=cursor, count=count)
     
     # Format response with user information
-    items = [format_audit_log(log) for log in audit_logs]
+    items = [format_audit_log(log) for log in result_page.items]
     
     return AuditLogListResponse(
         items=items,
-        total=total,
-        page=page,
+        total=result_page.total,
+        page=result_page.page,
         limit=limit,
-        total_pages=total_pages
+        total_pages=result_page.pages,
+        has_next=result_page.has_next,
+        next_cursor=result_page.next_cursor,
+    )
+
+
+@router.get("/stream")
+async def stream_audit_logs(
+    action: Optional[AuditAction] = Query(None, description="Filter by action type"),
+    resource_type: Optional[str] = Query(None, description="Filter by resource type"),
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    search: Optional[str] = Query(None, description="Search in resource name, details, IP or user info"),
+    current_user: User = Depends(require_supervisor_or_admin),
+) -> StreamingResponse:
+    """
+    All audit logs matching the filters, newest first, streamed as NDJSON
+    (one log per line). Only accessible by supervisors and admins.
+    """
+    start_dt, end_dt = _parse_date_range(start_date, end_date)
+    return ndjson_response(
+        lambda db: _audit_logs_query(db, action, resource_type, user_id, start_dt, end_dt, search).order_by(
+            desc(AuditLog.created_at)
+        ),
+        format_audit_log,
     )
 
 
@@ -143,7 +187,7 @@ async def get_audit_logs(
 async def get_audit_log(
     audit_id: int,
     current_user: User = Depends(require_supervisor_or_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get a specific audit log by ID.
@@ -177,7 +221,7 @@ async def get_audit_actions(
 @router.get("/resources/list")
 async def get_audit_resource_types(
     current_user: User = Depends(require_supervisor_or_admin),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get list of available resource types for filtering.
@@ -58,7 +58,12 @@ async def login(
     User login with email and password, get an access token for future requests
     """
     try:
-        user = auth_service.authenticate_user(db, user_credentials.email, user_credentials.password)
+        user = await auth_service.authenticate_user(
+            db,
+            user_credentials.email,
+            user_credentials.password,
+            ip_address=auth_service.client_ip(request),
+        )
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -98,7 +103,7 @@ async def login(
         resource_type="auth",
         resource_id=user.id,
         resource_name=user.email,
-        ip_address=request.client.host if request.client else None,
+        ip_address=auth_service.client_ip(request),
         user_agent=request.headers.get("user-agent"),
         details=f"Inicio de sesión exitoso para {user.email}"
     )
@@ -150,7 +155,7 @@ async def register(
         # If user exists but is not verified (created by admin without password)
         if not existing_user.is_verified:
             # Update the existing user with registration data and password
-            hashed_password = auth_service.get_password_hash(user_data.password)
+            hashed_password = await auth_service.get_password_hash_async(user_data.password)
             existing_user.hashed_password = hashed_password
             existing_user.first_name = user_data.first_name
             existing_user.last_name = user_data.last_name
@@ -173,7 +178,7 @@ async def register(
         )
     else:
         # Create new user
-        hashed_password = auth_service.get_password_hash(user_data.password)
+        hashed_password = await auth_service.get_password_hash_async(user_data.password)
         user = User(
             email=user_data.email,
             hashed_password=hashed_password,
@@ -223,7 +228,7 @@ async def register(
         resource_type="user",
         resource_id=user.id,
         resource_name=user.full_name,
-        ip_address=request.client.host if request.client else None,
+        ip_address=auth_service.client_ip(request),
         user_agent=request.headers.get("user-agent"),
         details=f"Usuario registrado exitosamente: {user.email}"
     )
@@ -280,7 +285,7 @@ async def logout(
         resource_type="auth",
         resource_id=current_user.id,
         resource_name=current_user.email,
-        ip_address=request.client.host if request.client else None,
+        ip_address=auth_service.client_ip(request),
         user_agent=request.headers.get("user-agent"),
         details=f"Cierre de sesión para {current_user.email}"
     )
@@ -357,7 +362,7 @@ async def reset_password(
         )
     
     # Update password and unlock account
-    user.hashed_password = auth_service.get_password_hash(password_reset_confirm.new_password)
+    user.hashed_password = await auth_service.get_password_hash_async(password_reset_confirm.new_password)
     user.password_reset_token = None
     user.password_reset_expires = None
     
@@ -381,14 +386,14 @@ async def change_password(
     Change password for authenticated user
     """
     # Verify current password
-    if not auth_service.verify_password(password_change.current_password, current_user.hashed_password):
+    if not await auth_service.verify_password_async(password_change.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Contraseña actual incorrecta"
         )
     
     # Update password
-    current_user.hashed_password = auth_service.get_password_hash(password_change.new_password)
+    current_user.hashed_password = await auth_service.get_password_hash_async(password_change.new_password)
     
     db.commit()
     
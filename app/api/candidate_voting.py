@@ -4,7 +4,8 @@ Endpoints para votaciones de candidatos
 from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session, joinedload
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import and_, func, desc
 
 from app.database import get_db
@@ -13,7 +14,7 @@ from app.models import (
     User, Worker, CandidateVoting, CandidateVotingCandidate, 
     CandidateVote, CandidateVotingStatus
 )
-from app.models.candidate_voting import CandidateVotingResult as CandidateVotingResultModel
+from app.models.candidate_voting import CandidateVotingResult as CandidateVotingResultModel, CandidateVoteTally
 from app.schemas.candidate_voting import (
     CandidateVoting as CandidateVotingSchema,
     CandidateVotingCreate,
@@ -26,6 +27,13 @@ from app.schemas.candidate_voting import (
     CandidateVotingResult,
     VotingStats
 )
+from app.services.vote_ingestion import (
+    VoteOutcome,
+    candidate_tallies,
+    candidate_tally_snapshot,
+    cast_candidate_vote,
+    tally_events,
+)
 
 router = APIRouter()
 
@@ -54,7 +62,7 @@ def get_voting_stats(
     completed_votings = db.query(CandidateVoting).filter(
         CandidateVoting.status == CandidateVotingStatus.CLOSED.value
     ).count()
-    total_votes_cast = db.query(CandidateVote).count()
+    total_votes_cast = db.query(func.coalesce(func.sum(CandidateVoteTally.votes), 0)).scalar()
     total_candidates = db.query(CandidateVotingCandidate).count()
     
     return VotingStats(
@@ -90,15 +98,25 @@ def get_votings(
     # Obtener total de trabajadores activos para calcular participación
     total_workers = db.query(Worker).filter(Worker.is_active == True).count()
     
-    # Agregar conteos
+    # Agregar conteos (una consulta agrupada para todas las votaciones)
+    voting_ids = [voting.id for voting in votings]
+    candidate_counts = dict(
+        db.query(CandidateVotingCandidate.voting_id, func.count(CandidateVotingCandidate.id))
+        .filter(CandidateVotingCandidate.voting_id.in_(voting_ids))
+        .group_by(CandidateVotingCandidate.voting_id)
+        .all()
+    )
+    vote_totals = dict(
+        db.query(CandidateVoteTally.voting_id, func.sum(CandidateVoteTally.votes))
+        .filter(CandidateVoteTally.voting_id.in_(voting_ids))
+        .group_by(CandidateVoteTally.voting_id)
+        .all()
+    )
+    
     result = []
     for voting in votings:
-        candidate_count = db.query(CandidateVotingCandidate).filter(
-            CandidateVotingCandidate.voting_id == voting.id
-        ).count()
-        total_votes = db.query(CandidateVote).filter(
-            CandidateVote.voting_id == voting.id
-        ).count()
+        candidate_count = candidate_counts.get(voting.id, 0)
+        total_votes = int(vote_totals.get(voting.id) or 0)
         
         # Calcular tasa de participación
         participation_rate = (total_votes / total_workers * 100) if total_workers > 0 else 0
@@ -163,6 +181,7 @@ def get_voting(
     
     voting = db.query(CandidateVoting).options(
         joinedload(CandidateVoting.candidates).joinedload(CandidateVotingCandidate.worker),
+        selectinload(CandidateVoting.candidates).selectinload(CandidateVotingCandidate.tallies),
         joinedload(CandidateVoting.votes)
     ).filter(CandidateVoting.id == voting_id).first()
     
@@ -335,23 +354,17 @@ def close_voting(
             detail="Solo se pueden cerrar votaciones activas"
         )
     
-    # Calcular resultados
+    # Calcular resultados desde los contadores por candidato
     candidates = db.query(CandidateVotingCandidate).filter(
         CandidateVotingCandidate.voting_id == voting_id
     ).all()
     
-    total_votes = db.query(CandidateVote).filter(
-        CandidateVote.voting_id == voting_id
-    ).count()
+    tallies = candidate_tallies(db, voting_id)
+    total_votes = sum(tallies.values())
     
     results = []
     for candidate in candidates:
-        candidate_votes = db.query(CandidateVote).filter(
-            and_(
-                CandidateVote.voting_id == voting_id,
-                CandidateVote.candidate_id == candidate.id
-            )
-        ).count()
+        candidate_votes = tallies.get(candidate.id, 0)
         
         percentage = (candidate_votes / total_votes * 100) if total_votes > 0 else 0
         
@@ -395,8 +408,27 @@ def cast_vote(
     current_user: User = Depends(get_current_user)
 ):
     """Permite a un empleado votar por un candidato"""
+    result = cast_candidate_vote(
+        db,
+        voting_id=voting_id,
+        candidate_id=vote_data.candidate_id,
+        voter_id=current_user.id,
+        comments=vote_data.comments,
+        active_status=CandidateVotingStatus.ACTIVE.value,
+    )
     
-    # Verificar que la votación existe y está activa
+    if result.outcome == VoteOutcome.ACCEPTED:
+        return {
+            "id": result.vote_id,
+            "voting_id": voting_id,
+            "candidate_id": vote_data.candidate_id,
+            "voter_id": current_user.id,
+            "comments": vote_data.comments,
+            "vote_date": result.voted_at,
+            "created_at": result.voted_at,
+        }
+    
+    # Voto rechazado: consultas adicionales solo para explicar el motivo
     voting = db.query(CandidateVoting).filter(CandidateVoting.id == voting_id).first()
     if not voting:
         raise HTTPException(
@@ -404,76 +436,35 @@ def cast_vote(
             detail="Votación no encontrada"
         )
     
-    now = datetime.utcnow()
-    if voting.status != CandidateVotingStatus.ACTIVE.value:
+    if result.outcome == VoteOutcome.LIMIT_REACHED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La votación no está activa"
+            detail=f"Ya has alcanzado el límite de {voting.max_votes_per_user} votos"
         )
     
-    if now < voting.start_date or now > voting.end_date:
+    if result.outcome == VoteOutcome.DUPLICATE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="La votación no está en el período de votación"
-        )
-    
-    # Verificar que el candidato existe
-    candidate = db.query(CandidateVotingCandidate).filter(
-        and_(
-            CandidateVotingCandidate.id == vote_data.candidate_id,
-            CandidateVotingCandidate.voting_id == voting_id,
-            CandidateVotingCandidate.is_active == True
-        )
-    ).first()
-    
-    if not candidate:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Candidato no encontrado o inactivo"
-        )
-    
-    # Verificar límites de votos
-    existing_votes = db.query(CandidateVote).filter(
-        and_(
-            CandidateVote.voting_id == voting_id,
-            CandidateVote.voter_id == current_user.id
+            detail="Ya has votado por este candidato"
         )
-    ).count()
     
-    if existing_votes >= voting.max_votes_per_user:
+    now = datetime.utcnow()
+    if voting.status != CandidateVotingStatus.ACTIVE.value:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Ya has alcanzado el límite de {voting.max_votes_per_user} votos"
-        )
-    
-    # Verificar si ya votó por este candidato
-    existing_vote = db.query(CandidateVote).filter(
-        and_(
-            CandidateVote.voting_id == voting_id,
-            CandidateVote.candidate_id == vote_data.candidate_id,
-            CandidateVote.voter_id == current_user.id
+            detail="La votación no está activa"
         )
-    ).first()
     
-    if existing_vote:
+    if now < voting.start_date or now > voting.end_date:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Ya has votado por este candidato"
+            detail="La votación no está en el período de votación"
         )
     
-    # Crear el voto
-    vote = CandidateVote(
-        voting_id=voting_id,
-        candidate_id=vote_data.candidate_id,
-        voter_id=current_user.id,
-        comments=vote_data.comments
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Candidato no encontrado o inactivo"
     )
-    
-    db.add(vote)
-    db.commit()
-    db.refresh(vote)
-    
-    return vote
 
 
 @router.delete("/{voting_id}")
@@ -559,4 +550,44 @@ def get_voting_results(
         CandidateVotingResultModel.voting_id == voting_id
     ).order_by(CandidateVotingResultModel.position).all()
     
-    return results
\ No newline at end of file
+    return results
+
+
+@router.get("/{voting_id}/tally")
+def get_voting_tally(
+    voting_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recuento en vivo de una votación, desde los contadores por candidato"""
+    check_admin_permissions(current_user)
+    
+    if not db.query(CandidateVoting.id).filter(CandidateVoting.id == voting_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Votación no encontrada"
+        )
+    
+    return candidate_tally_snapshot(db, voting_id)
+
+
+@router.get("/{voting_id}/tally/stream")
+def stream_voting_tally(
+    voting_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Recuento en vivo como server-sent events (evento `tally` en cada cambio)"""
+    check_admin_permissions(current_user)
+    
+    if not db.query(CandidateVoting.id).filter(CandidateVoting.id == voting_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Votación no encontrada"
+        )
+    
+    return StreamingResponse(
+        tally_events(candidate_tally_snapshot, voting_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
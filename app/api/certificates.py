@@ -1,16 +1,17 @@
 from typing import Any, List
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Request, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Response, Request, Query
 from fastapi.responses import FileResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, select
 import os
 import tempfile
 import requests
 from contextlib import contextmanager
 
 from app.dependencies import get_current_active_user, has_role_or_custom
-from app.database import get_db
+from app.database import get_async_db, get_db, session_scope
 from app.models.user import User
 from app.models.certificate import Certificate, CertificateStatus
 from app.models.course import Course
@@ -18,9 +19,11 @@ from app.schemas.certificate import (
     CertificateUpdate, CertificateResponse,
     CertificateListResponse, CertificateVerification,
     CertificateVerificationResponse, CertificateGeneration,
-    CertificatePDFGeneration
+    CertificatePDFGeneration, CertificateBatchRequest,
+    CertificateBatchStatus
 )
 from app.schemas.common import MessageResponse, PaginatedResponse
+from app.services import certificate_batch
 from app.services.certificate_generator import CertificateGenerator
 from app.utils.storage import StorageManager
 
@@ -123,36 +126,38 @@ async def get_my_certificates(
     limit: int = 100,
     status: str = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get current user's certificates
     """
-    query = db.query(Certificate).options(
-        joinedload(Certificate.user),
-        joinedload(Certificate.course)
-    ).filter(Certificate.user_id == current_user.id)
+    query = select(Certificate).where(Certificate.user_id == current_user.id)
     
     if status:
         # Convert string status to enum
         try:
             status_enum = CertificateStatus(status)
-            query = query.filter(Certificate.status == status_enum)
+            query = query.where(Certificate.status == status_enum)
         except ValueError:
             # If invalid status, ignore filter
             pass
     else:
         # Only show issued certificates by default
-        query = query.filter(Certificate.status == CertificateStatus.ISSUED)
-    
-    # Order by issue date descending (newest first)
-    query = query.order_by(Certificate.issue_date.desc())
+        query = query.where(Certificate.status == CertificateStatus.ISSUED)
     
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
     
-    # Apply pagination
-    certificates = query.offset(skip).limit(limit).all()
+    # Order by issue date descending (newest first) and apply pagination.
+    # User and course are eager-loaded: an AsyncSession cannot lazy-load them during serialization.
+    certificates = (
+        await db.scalars(
+            query.options(joinedload(Certificate.user), joinedload(Certificate.course))
+            .order_by(Certificate.issue_date.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+    ).all()
     
     # Calculate pagination info
     page = (skip // limit) + 1
@@ -365,6 +370,116 @@ async def generate_certificate(
     return certificate
 
 
+async def _run_certificate_batch_in_background(batch_id: str, certificate_ids: List[int]) -> None:
+    progress = certificate_batch.get_batch(batch_id)
+    if progress is None:
+        return
+    with session_scope() as db:
+        await certificate_batch.run_certificate_batch(db, certificate_ids, progress)
+
+
+@router.post(
+    "/bulk-generate",
+    response_model=CertificateBatchStatus,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def bulk_generate_certificate_pdfs(
+    batch_request: CertificateBatchRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Generate the PDFs of a whole course cohort or attendance session in the background
+    (admin and capacitador roles only). Poll the returned batch for progress.
+    """
+    if not has_role_or_custom(current_user, ["admin", "trainer"]):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permisos insuficientes"
+        )
+
+    if not (batch_request.course_id or batch_request.session_id or batch_request.certificate_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Debe indicar course_id, session_id o certificate_ids"
+        )
+
+    certificate_ids = certificate_batch.select_certificate_ids(
+        db,
+        course_id=batch_request.course_id,
+        session_id=batch_request.session_id,
+        certificate_ids=batch_request.certificate_ids,
+        only_missing=batch_request.only_missing,
+    )
+    if not certificate_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No se encontraron certificados para generar"
+        )
+
+    progress = certificate_batch.create_batch(len(certificate_ids), output=batch_request.output)
+    background_tasks.add_task(_run_certificate_batch_in_background, progress.batch_id, certificate_ids)
+    return progress.as_dict()
+
+
+@router.get("/bulk-generate/{batch_id}", response_model=CertificateBatchStatus)
+async def get_bulk_generation_status(
+    batch_id: str,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Progress of a bulk certificate generation batch
+    """
+    if not has_role_or_custom(current_user, ["admin", "trainer"]):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permisos insuficientes"
+        )
+
+    progress = certificate_batch.get_batch(batch_id)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Lote no encontrado"
+        )
+    return progress.as_dict()
+
+
+@router.get("/bulk-generate/{batch_id}/archive", response_class=FileResponse)
+async def download_bulk_generation_archive(
+    batch_id: str,
+    current_user: User = Depends(get_current_active_user),
+) -> Any:
+    """
+    Download the ZIP or merged PDF produced by a bulk generation batch
+    """
+    if not has_role_or_custom(current_user, ["admin", "trainer"]):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permisos insuficientes"
+        )
+
+    progress = certificate_batch.get_batch(batch_id)
+    if progress is None or not progress.archive_path or not os.path.exists(progress.archive_path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="El lote no tiene un archivo disponible"
+        )
+
+    if progress.output == "zip":
+        return FileResponse(
+            progress.archive_path,
+            media_type="application/zip",
+            filename=f"certificados_{batch_id}.zip",
+        )
+    return FileResponse(
+        progress.archive_path,
+        media_type="application/pdf",
+        filename=f"certificados_{batch_id}.pdf",
+    )
+
+
 @router.post("/verify", response_model=CertificateVerificationResponse)
 async def verify_certificate(
     verification_data: CertificateVerification,
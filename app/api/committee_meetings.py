@@ -16,7 +16,7 @@ from app.models.committee import (
     Committee, CommitteeMeeting, MeetingAttendance, CommitteeMember, CommitteeActivity
 )
 from app.models.user import User
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.html_to_pdf import get_html_to_pdf_converter
 
 logger = logging.getLogger(__name__)
 from app.schemas.committee import (
@@ -727,7 +727,7 @@ async def generate_meeting_minutes_pdf(
 
     # Generar PDF
     try:
-        converter = HTMLToPDFConverter()
+        converter = get_html_to_pdf_converter()
         pdf_content = converter.generate_meeting_minutes_pdf(template_data)
 
         if isinstance(pdf_content, str):
@@ -3,8 +3,9 @@ API endpoints for Committee Votings Management
 """
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, desc, asc, func
+from sqlalchemy import and_, or_, desc, asc
 from datetime import datetime, date
 
 from app.database import get_db
@@ -23,6 +24,14 @@ from app.schemas.committee import (
     VotingStatusEnum,
     VoteChoiceEnum
 )
+from app.services.vote_ingestion import (
+    VoteOutcome,
+    cast_committee_vote,
+    committee_tallies,
+    committee_tally_snapshot,
+    move_committee_tally,
+    tally_events,
+)
 
 router = APIRouter()
 
@@ -79,7 +88,7 @@ async def create_committee_voting(
         )
     
     # Verificar fechas
-    if voting.start_date < date.today():
+    if voting.start_date and voting.start_date.date() < date.today():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="La fecha de inicio no puede ser en el pasado"
@@ -137,7 +146,7 @@ async def update_committee_voting(
         )
     
     # Verificar que no se pueda modificar una votación completada
-    if voting.status == VotingStatusEnum.completed:
+    if voting.status == VotingStatusEnum.CLOSED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No se puede modificar una votación completada"
@@ -187,7 +196,7 @@ async def delete_committee_voting(
         )
     
     # Verificar que no se pueda eliminar una votación completada
-    if voting.status == VotingStatusEnum.completed:
+    if voting.status == VotingStatusEnum.CLOSED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No se puede eliminar una votación completada"
@@ -216,19 +225,19 @@ async def start_voting(
             detail="Votación no encontrada"
         )
     
-    if voting.status != VotingStatusEnum.draft:
+    if voting.status != VotingStatusEnum.DRAFT:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Solo se pueden iniciar votaciones en borrador"
         )
     
-    if voting.start_date > date.today():
+    if voting.start_date and voting.start_date.date() > date.today():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No se puede iniciar una votación antes de su fecha programada"
         )
     
-    voting.status = VotingStatusEnum.active
+    voting.status = VotingStatusEnum.ACTIVE
     
     db.commit()
     db.refresh(voting)
@@ -250,13 +259,13 @@ async def complete_voting(
             detail="Votación no encontrada"
         )
     
-    if voting.status != VotingStatusEnum.active:
+    if voting.status != VotingStatusEnum.ACTIVE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Solo se pueden completar votaciones activas"
         )
     
-    voting.status = VotingStatusEnum.completed
+    voting.status = VotingStatusEnum.CLOSED
     
     db.commit()
     db.refresh(voting)
@@ -278,13 +287,13 @@ async def cancel_voting(
             detail="Votación no encontrada"
         )
     
-    if voting.status == VotingStatusEnum.completed:
+    if voting.status == VotingStatusEnum.CLOSED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No se puede cancelar una votación completada"
         )
     
-    voting.status = VotingStatusEnum.cancelled
+    voting.status = VotingStatusEnum.CANCELLED
     
     db.commit()
     db.refresh(voting)
@@ -313,9 +322,9 @@ async def get_voting_votes(
     )
     
     if choice:
-        query = query.filter(CommitteeVote.choice == choice)
+        query = query.filter(CommitteeVote.vote_value == choice.value)
     
-    votes = query.order_by(CommitteeVote.voted_at).all()
+    votes = query.order_by(CommitteeVote.vote_date).all()
     
     return votes
 
@@ -327,7 +336,27 @@ async def cast_vote(
     current_user: User = Depends(get_current_user)
 ):
     """Emitir un voto en una votación"""
-    # Verificar que la votación existe
+    result = cast_committee_vote(
+        db,
+        voting_id=voting_id,
+        member_id=vote.member_id,
+        vote_value=vote.vote_choice.value,
+        comments=vote.comments,
+        is_proxy_vote=vote.is_proxy_vote,
+        proxy_member_id=vote.proxy_member_id,
+        active_status=VotingStatusEnum.ACTIVE.value,
+    )
+    
+    if result.outcome == VoteOutcome.ACCEPTED:
+        return db.query(CommitteeVote).filter(CommitteeVote.id == result.vote_id).first()
+    
+    if result.outcome == VoteOutcome.DUPLICATE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El usuario ya ha emitido su voto en esta votación"
+        )
+    
+    # Voto rechazado: consultas adicionales solo para explicar el motivo
     voting = db.query(CommitteeVoting).filter(CommitteeVoting.id == voting_id).first()
     if not voting:
         raise HTTPException(
@@ -335,65 +364,28 @@ async def cast_vote(
             detail="Votación no encontrada"
         )
     
-    # Verificar que la votación está activa
-    if voting.status != VotingStatusEnum.active:
+    if voting.status != VotingStatusEnum.ACTIVE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Solo se puede votar en votaciones activas"
         )
     
-    # Verificar que estamos dentro del período de votación
-    today = date.today()
-    if today < voting.start_date or today > voting.end_date:
+    now = datetime.now()
+    if (voting.start_date and now < voting.start_date) or (voting.end_date and now > voting.end_date):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="La votación no está en período activo"
         )
     
-    # Verificar que el usuario es miembro del comité
-    member = db.query(CommitteeMember).filter(
-        and_(
-            CommitteeMember.committee_id == voting.committee_id,
-            CommitteeMember.user_id == vote.user_id,
-            CommitteeMember.is_active == True
-        )
-    ).first()
-    
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El usuario no es miembro activo del comité"
-        )
-    
-    # Verificar que el usuario no ha votado ya
-    existing_vote = db.query(CommitteeVote).filter(
-        and_(
-            CommitteeVote.voting_id == voting_id,
-            CommitteeVote.user_id == vote.user_id
-        )
-    ).first()
-    
-    if existing_vote:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="El usuario ya ha emitido su voto en esta votación"
-        )
-    
-    vote_data = vote.model_dump()
-    vote_data["voting_id"] = voting_id
-    vote_data["voted_at"] = datetime.now()
-    
-    db_vote = CommitteeVote(**vote_data)
-    db.add(db_vote)
-    db.commit()
-    db.refresh(db_vote)
-    
-    return db_vote
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="El usuario no es miembro activo del comité"
+    )
 
-@router.put("/{voting_id}/votes/{user_id}", response_model=CommitteeVoteSchema)
+@router.put("/{voting_id}/votes/{member_id}", response_model=CommitteeVoteSchema)
 async def update_vote(
     voting_id: int,
-    user_id: int,
+    member_id: int,
     vote_update: CommitteeVoteUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
@@ -415,7 +407,7 @@ async def update_vote(
         )
     
     # Verificar que la votación está activa
-    if voting.status != VotingStatusEnum.active:
+    if voting.status != VotingStatusEnum.ACTIVE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Solo se puede cambiar el voto en votaciones activas"
@@ -424,9 +416,9 @@ async def update_vote(
     vote = db.query(CommitteeVote).filter(
         and_(
             CommitteeVote.voting_id == voting_id,
-            CommitteeVote.user_id == user_id
+            CommitteeVote.member_id == member_id
         )
-    ).first()
+    ).with_for_update().first()
     
     if not vote:
         raise HTTPException(
@@ -435,10 +427,15 @@ async def update_vote(
         )
     
     update_data = vote_update.model_dump(exclude_unset=True)
+    new_choice = update_data.pop("vote_choice", None)
+    if new_choice is not None:
+        # El contador se mueve en la misma transacción que el voto
+        move_committee_tally(db, voting_id, member_id, vote.vote_value, new_choice.value)
+        vote.vote_value = new_choice.value
     for field, value in update_data.items():
         setattr(vote, field, value)
     
-    vote.voted_at = datetime.now()  # Actualizar timestamp
+    vote.vote_date = datetime.now()  # Actualizar timestamp
     
     db.commit()
     db.refresh(vote)
@@ -475,7 +472,7 @@ async def get_votings_by_committee(
         today = date.today()
         query = query.filter(
             and_(
-                CommitteeVoting.status == VotingStatusEnum.active,
+                CommitteeVoting.status == VotingStatusEnum.ACTIVE,
                 CommitteeVoting.start_date <= today,
                 CommitteeVoting.end_date >= today
             )
@@ -502,13 +499,8 @@ async def get_voting_results(
             detail="Votación no encontrada"
         )
     
-    # Contar votos por opción
-    vote_counts = db.query(
-        CommitteeVote.choice,
-        func.count(CommitteeVote.id).label('count')
-    ).filter(
-        CommitteeVote.voting_id == voting_id
-    ).group_by(CommitteeVote.choice).all()
+    # Votos por opción, desde los contadores
+    votes_by_choice = committee_tallies(db, voting_id)
     
     # Total de miembros elegibles para votar
     total_eligible = db.query(CommitteeMember).filter(
@@ -519,23 +511,21 @@ async def get_voting_results(
     ).count()
     
     # Total de votos emitidos
-    total_votes = db.query(CommitteeVote).filter(
-        CommitteeVote.voting_id == voting_id
-    ).count()
+    total_votes = sum(votes_by_choice.values())
     
     results = {
         "voting_id": voting_id,
         "title": voting.title,
-        "status": voting.status.value,
+        "status": voting.status,
         "total_eligible_voters": total_eligible,
         "total_votes_cast": total_votes,
         "participation_rate": round((total_votes / total_eligible * 100), 2) if total_eligible > 0 else 0,
-        "votes_by_choice": {vote.choice.value: vote.count for vote in vote_counts},
-        "is_quorum_met": total_votes >= voting.quorum_required if voting.quorum_required else True
+        "votes_by_choice": votes_by_choice,
+        "is_quorum_met": total_votes >= voting.minimum_votes_required if voting.minimum_votes_required else True
     }
     
     # Determinar resultado si la votación está completada
-    if voting.status == VotingStatusEnum.completed:
+    if voting.status == VotingStatusEnum.CLOSED:
         vote_counts_dict = results["votes_by_choice"]
         max_votes = max(vote_counts_dict.values()) if vote_counts_dict else 0
         winning_choices = [choice for choice, count in vote_counts_dict.items() if count == max_votes]
@@ -548,6 +538,26 @@ async def get_voting_results(
     
     return results
 
+@router.get("/{voting_id}/results/stream")
+async def stream_voting_results(
+    voting_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Resultados en vivo como server-sent events (evento `tally` en cada cambio)"""
+    voting = db.query(CommitteeVoting).filter(CommitteeVoting.id == voting_id).first()
+    if not voting:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Votación no encontrada"
+        )
+    
+    return StreamingResponse(
+        tally_events(committee_tally_snapshot, voting_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @router.get("/user/{user_id}/votes", response_model=List[CommitteeVoteSchema])
 async def get_user_votes(
     user_id: int,
@@ -557,7 +567,9 @@ async def get_user_votes(
     current_user: User = Depends(get_current_user)
 ):
     """Obtener todos los votos de un usuario específico"""
-    query = db.query(CommitteeVote).filter(CommitteeVote.user_id == user_id)
+    query = db.query(CommitteeVote).join(
+        CommitteeMember, CommitteeVote.member_id == CommitteeMember.id
+    ).filter(CommitteeMember.user_id == user_id)
     
     if voting_id:
         query = query.filter(CommitteeVote.voting_id == voting_id)
@@ -567,6 +579,6 @@ async def get_user_votes(
             CommitteeVoting.committee_id == committee_id
         )
     
-    votes = query.order_by(desc(CommitteeVote.voted_at)).all()
+    votes = query.order_by(desc(CommitteeVote.vote_date)).all()
     
     return votes
\ No newline at end of file
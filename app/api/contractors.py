@@ -4,8 +4,6 @@ from fastapi.responses import StreamingResponse, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from io import BytesIO
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
 from datetime import datetime, date, timedelta
 import os
 import uuid
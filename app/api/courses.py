@@ -11,6 +11,7 @@ from app.database import get_db
 from app.dependencies import get_current_active_user, has_role_or_custom
 from app.models.user import User
 from app.models.audit import AuditLog, AuditAction
+from app.services import course_progress
 
 
 def check_and_complete_course(db: Session, user_id: int, course_id: int):
@@ -28,81 +29,11 @@ def check_and_complete_course(db: Session, user_id: int, course_id: int):
         .first()
     )
 
-    if not enrollment or enrollment.progress < 95:
+    if not enrollment or enrollment.progress < course_progress.COMPLETION_THRESHOLD:
         return False
 
-    from app.models.survey import Survey, UserSurvey, SurveyStatus, UserSurveyStatus
-    from app.models.evaluation import Evaluation, UserEvaluation, UserEvaluationStatus
-    from app.schemas.evaluation import EvaluationStatus
-
-    # Check required surveys
-    required_surveys = (
-        db.query(Survey)
-        .filter(
-            and_(
-                Survey.course_id == course_id,
-                Survey.required_for_completion == True,
-                Survey.status == SurveyStatus.PUBLISHED,
-            )
-        )
-        .all()
-    )
-
-    surveys_completed = True
-    for survey in required_surveys:
-        user_submission = (
-            db.query(UserSurvey)
-            .filter(
-                and_(
-                    UserSurvey.user_id == user_id,
-                    UserSurvey.survey_id == survey.id,
-                    UserSurvey.status == UserSurveyStatus.COMPLETED,
-                )
-            )
-            .first()
-        )
-        if not user_submission:
-            surveys_completed = False
-            break
-
-    # Check evaluation if surveys are completed
-    evaluation_completed = True
-    best_passed_evaluation = None
-    if surveys_completed:
-        course_evaluations = (
-            db.query(Evaluation)
-            .filter(
-                and_(
-                    Evaluation.course_id == course_id,
-                    Evaluation.status == EvaluationStatus.PUBLISHED,
-                )
-            )
-            .all()
-        )
-
-        if course_evaluations:  # If there are evaluations, check if completed and passed
-            evaluation_completed = False
-            best_passed_evaluation = None
-            for evaluation in course_evaluations:
-                completed_evaluation = (
-                    db.query(UserEvaluation)
-                    .filter(
-                        and_(
-                            UserEvaluation.user_id == user_id,
-                            UserEvaluation.evaluation_id == evaluation.id,
-                            UserEvaluation.status == UserEvaluationStatus.COMPLETED,
-                            UserEvaluation.passed == True,
-                        )
-                    )
-                    .first()
-                )
-                if completed_evaluation:
-                    evaluation_completed = True
-                    best_passed_evaluation = completed_evaluation
-                    break
-
-    # Complete enrollment if all requirements are met
-    if surveys_completed and evaluation_completed:
+    # Complete enrollment if all requirements are met (decided from the enrollment counters)
+    if course_progress.requirements_met(db, enrollment):
         enrollment.complete_enrollment()
         db.commit()
 
@@ -115,6 +46,7 @@ def check_and_complete_course(db: Session, user_id: int, course_id: int):
             course = db.query(CourseModel).filter(CourseModel.id == course_id).first()
 
             if user and user.email and course:
+                best_passed_evaluation = course_progress.best_passed_evaluation(db, user_id, course_id)
                 score = best_passed_evaluation.percentage if best_passed_evaluation and best_passed_evaluation.percentage is not None else 0.0
                 passing_score = course.passing_score if course.passing_score is not None else 70.0
                 full_name = f"{user.first_name} {user.last_name}".strip()
@@ -131,6 +63,8 @@ def check_and_complete_course(db: Session, user_id: int, course_id: int):
 
         return True
 
+    # Persist the counters refreshed by the check even if the course is not complete yet
+    db.commit()
     return False
 
 
@@ -944,6 +878,12 @@ async def get_module_materials(
         .all()
     )
 
+    # Una sola ronda de firmas para todo el módulo en lugar de una por material
+    signed_urls = storage_manager.get_presigned_urls(
+        (material.file_url for material in materials if material.material_type.value != "link"),
+        expiration=3600,
+    )
+
     # Para usuarios no administradores, añadir información de progreso
     if not has_role_or_custom(current_user, ["admin", "trainer"]):
         result = []
@@ -964,8 +904,7 @@ async def get_module_materials(
             if material.material_type.value == "link":
                 file_url = material.file_url
             else:
-                presigned_url = storage_manager.get_presigned_url(material.file_url, expiration=3600)
-                file_url = presigned_url if presigned_url else material.file_url
+                file_url = signed_urls.get(material.file_url) or material.file_url
 
             # Crear objeto de respuesta manualmente
             material_response = CourseMaterialWithProgressResponse(
@@ -997,8 +936,7 @@ async def get_module_materials(
         if material.material_type.value == "link":
             file_url = material.file_url
         else:
-            presigned_url = storage_manager.get_presigned_url(material.file_url, expiration=3600)
-            file_url = presigned_url if presigned_url else material.file_url
+            file_url = signed_urls.get(material.file_url) or material.file_url
 
         material_response = CourseMaterialResponse(
             id=material.id,
@@ -1448,7 +1386,7 @@ async def get_course_attendance_report(
     if format == "pdf":
         try:
             # Import HTML to PDF converter
-            from app.services.html_to_pdf import HTMLToPDFConverter
+            from app.services.html_to_pdf import get_html_to_pdf_converter
 
             # Create attendance_lists directory if it doesn't exist
             attendance_dir = "attendance_lists"
@@ -1461,7 +1399,7 @@ async def get_course_attendance_report(
             local_filepath = os.path.join(attendance_dir, filename)
 
             # Initialize HTML to PDF converter
-            converter = HTMLToPDFConverter()
+            converter = get_html_to_pdf_converter()
 
             # Prepare attendees data for the template
             attendees_data = []
@@ -2,7 +2,6 @@ import io
 from datetime import datetime
 from typing import List
 
-import weasyprint
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
@@ -27,6 +26,8 @@ from app.schemas.cronograma_pyp import (
     CronogramaPypSeguimientoUpdate,
     CronogramaPypSeguimientoResponse,
 )
+from app.services.pdf_artifact_cache import data_stamp, pdf_artifact_cache
+from app.services.template_instantiation import instantiate, monthly_rows
 
 
 router = APIRouter()
@@ -183,11 +184,10 @@ def crear_actividad_pyp(
         orden=payload.orden,
     )
     db.add(actividad)
-    db.commit()
-    db.refresh(actividad)
+    db.flush()
 
-    for mes in range(1, 13):
-        db.add(CronogramaPypSeguimiento(actividad_id=actividad.id, mes=mes))
+    # Actividad y sus 12 seguimientos en una sola transacción
+    instantiate(db, monthly_rows(CronogramaPypSeguimiento, "actividad_id"), parent_id=actividad.id)
     db.commit()
     db.refresh(actividad)
     return actividad
@@ -303,9 +303,33 @@ def exportar_cronograma_pyp_pdf(
 ):
     cronograma = _get_cronograma_or_404(db, plan_id)
 
+    filename = f"cronograma_pyp_{cronograma.año}.pdf"
+    actividades_filter = CronogramaPypActividad.cronograma_id == cronograma.id
+    cache_key, pdf_bytes = pdf_artifact_cache.lookup(
+        "cronograma_pyp_pdf",
+        {
+            "cronograma": data_stamp(db, CronogramaPyp, CronogramaPyp.id == cronograma.id),
+            "actividades": data_stamp(db, CronogramaPypActividad, actividades_filter),
+            "seguimientos": data_stamp(
+                db,
+                CronogramaPypSeguimiento,
+                CronogramaPypSeguimiento.actividad_id.in_(
+                    db.query(CronogramaPypActividad.id).filter(actividades_filter)
+                ),
+            ),
+        },
+        template_version=pdf_artifact_cache.template_version(__file__),
+    )
+    if pdf_bytes is not None:
+        return StreamingResponse(
+            io.BytesIO(pdf_bytes),
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
     actividades = (
         db.query(CronogramaPypActividad)
-        .filter(CronogramaPypActividad.cronograma_id == cronograma.id)
+        .filter(actividades_filter)
         .order_by(CronogramaPypActividad.orden)
         .all()
     )
@@ -433,6 +457,8 @@ def exportar_cronograma_pyp_pdf(
 </body>
 </html>"""
 
+    import weasyprint
+
     pdf_bytes = weasyprint.HTML(string=html).write_pdf(
         metadata={
             "title": f"Cronograma PYP {cronograma.año}",
@@ -441,8 +467,8 @@ def exportar_cronograma_pyp_pdf(
         pdf_version=(1, 7),
         compress=True,
     )
+    pdf_artifact_cache.store(cache_key, pdf_bytes)
 
-    filename = f"cronograma_pyp_{cronograma.año}.pdf"
     return StreamingResponse(
         io.BytesIO(pdf_bytes),
         media_type="application/pdf",
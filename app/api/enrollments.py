@@ -5,9 +5,10 @@ import string
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import and_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, func, select
 
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.dependencies import get_current_active_user, has_role_or_custom
 from app.models.user import User, UserRole
 from app.models.course import Course, CourseStatus, CourseType
@@ -25,6 +26,7 @@ from app.schemas.enrollment import (
     BulkEnrollmentResponse,
 )
 from app.schemas.common import MessageResponse
+from app.utils.pagination import COUNT_DESCRIPTION, CURSOR_DESCRIPTION, CountMode, SortKey, paginate
 from app.api.auth_worker_update import update_worker_after_registration
 from app.services.auth import auth_service
 
@@ -427,7 +429,7 @@ async def bulk_assign_courses_to_workers(
                     )
 
                     # Hash the password
-                    hashed_password = auth_service.get_password_hash(temp_password)
+                    hashed_password = await auth_service.get_password_hash_async(temp_password)
 
                     # Create the user
                     new_user = User(
@@ -1067,6 +1069,8 @@ async def remove_worker_from_course(
 async def get_enrollments(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[CountMode] = Query(None, description=COUNT_DESCRIPTION),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ) -> Any:
@@ -1079,25 +1083,19 @@ async def get_enrollments(
             status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions"
         )
 
-    # Get total count (excluding cancelled enrollments)
-    total = (
-        db.query(Enrollment)
-        .filter(Enrollment.status != EnrollmentStatus.CANCELLED)
-        .count()
-    )
-
     # Get enrollments with pagination (excluding cancelled enrollments)
-    enrollments = (
-        db.query(Enrollment)
-        .filter(Enrollment.status != EnrollmentStatus.CANCELLED)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    result_page = paginate(
+        db.query(Enrollment).filter(Enrollment.status != EnrollmentStatus.CANCELLED),
+        sort=[SortKey(Enrollment.id)],
+        size=limit,
+        offset=skip,
+        cursor=cursor,
+        count=count,
     )
 
     # Build response with enrollment details
     enrollment_details = []
-    for enrollment in enrollments:
+    for enrollment in result_page.items:
         user = db.query(User).filter(User.id == enrollment.user_id).first()
         course = db.query(Course).filter(Course.id == enrollment.course_id).first()
 
@@ -1151,9 +1149,11 @@ async def get_enrollments(
 
     return {
         "items": enrollment_details,  # Changed from "enrollments" to "items" to match frontend expectation
-        "total": total,
+        "total": result_page.total,
         "skip": skip,
         "limit": limit,
+        "has_next": result_page.has_next,
+        "next_cursor": result_page.next_cursor,
     }
 
 
@@ -1312,25 +1312,27 @@ async def get_my_enrollments(
         None, description="Filter enrollments by course ID"
     ),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Any:
     """
     Get enrollments for the current user, with optional filtering by course_id
     """
-    # Build the query for current user's enrollments
-    query = db.query(Enrollment).filter(Enrollment.user_id == current_user.id)
+    # Enrollments and their courses in a single query
+    query = (
+        select(Enrollment, Course)
+        .outerjoin(Course, Course.id == Enrollment.course_id)
+        .where(Enrollment.user_id == current_user.id)
+    )
 
     # Apply course_id filter if provided
     if course_id is not None:
-        query = query.filter(Enrollment.course_id == course_id)
+        query = query.where(Enrollment.course_id == course_id)
 
     # Execute the query
-    enrollments = query.all()
+    rows = (await db.execute(query)).all()
 
     enrollment_details = []
-    for enrollment in enrollments:
-        course = db.query(Course).filter(Course.id == enrollment.course_id).first()
-
+    for enrollment, course in rows:
         enrollment_details.append(
             {
                 "id": enrollment.id,
@@ -1,12 +1,14 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, func, select
 
 from app.dependencies import get_current_active_user, has_role_or_custom
 from app.database import get_db
+from app.utils.ndjson import ndjson_response
+from app.utils.pagination import COUNT_DESCRIPTION, CURSOR_DESCRIPTION, CountMode, SortKey, paginate
 from app.models.user import User
 from app.models.course import Course
 from app.models.evaluation import (
@@ -756,6 +758,8 @@ async def submit_evaluation(
     # Check if course can be completed now that evaluation is passed
     if passed and evaluation.course_id:
         from app.api.courses import check_and_complete_course
+        from app.services import course_progress
+        course_progress.record_evaluation_result(db, current_user.id, evaluation.course_id)
         check_and_complete_course(db, current_user.id, evaluation.course_id)
     
     # Generate certificate only for evaluations associated with a course
@@ -968,13 +972,15 @@ async def get_all_evaluation_results(
     user_id: int = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[CountMode] = Query(None, description=COUNT_DESCRIPTION),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Get all evaluation results for admin view with user information
     """
-    from fastapi.responses import JSONResponse
+    from fastapi.responses import ORJSONResponse
     
     # Only admin and capacitador can access this endpoint
     if not has_role_or_custom(current_user, ["admin", "trainer"]):
@@ -984,112 +990,40 @@ async def get_all_evaluation_results(
         )
     
     try:
-        # Keep only the latest attempt per (usuario, evaluación) for admin grid
-        latest_attempts_subquery = db.query(
-            UserEvaluation.user_id.label("user_id"),
-            UserEvaluation.evaluation_id.label("evaluation_id"),
-            func.max(UserEvaluation.attempt_number).label("max_attempt_number"),
-        ).filter(
-            UserEvaluation.started_at.isnot(None)
-        ).group_by(
-            UserEvaluation.user_id,
-            UserEvaluation.evaluation_id,
-        ).subquery()
-
-        attempts_count_subquery = db.query(
-            UserEvaluation.user_id.label("user_id"),
-            UserEvaluation.evaluation_id.label("evaluation_id"),
-            func.count(UserEvaluation.id).label("attempts_count"),
-        ).filter(
-            UserEvaluation.started_at.isnot(None)
-        ).group_by(
-            UserEvaluation.user_id,
-            UserEvaluation.evaluation_id,
-        ).subquery()
+        query = _all_results_query(db, evaluation_id, user_id)
 
-        # Build query with joins to get user, evaluation and course information
-        query = db.query(
-            UserEvaluation,
-            User.email,
-            User.first_name,
-            User.last_name,
-            User.email.label('user_email'),
-            Evaluation.title.label('evaluation_title'),
-            func.coalesce(Course.title, "Sin curso").label('course_title'),
-            attempts_count_subquery.c.attempts_count.label("attempts_count"),
-        ).join(
-            latest_attempts_subquery,
-            and_(
-                UserEvaluation.user_id == latest_attempts_subquery.c.user_id,
-                UserEvaluation.evaluation_id == latest_attempts_subquery.c.evaluation_id,
-                UserEvaluation.attempt_number == latest_attempts_subquery.c.max_attempt_number,
-            )
-        ).join(
-            attempts_count_subquery,
-            and_(
-                UserEvaluation.user_id == attempts_count_subquery.c.user_id,
-                UserEvaluation.evaluation_id == attempts_count_subquery.c.evaluation_id,
-            )
-        ).join(
-            User, UserEvaluation.user_id == User.id
-        ).join(
-            Evaluation, UserEvaluation.evaluation_id == Evaluation.id
-        ).outerjoin(
-            Course, Evaluation.course_id == Course.id
-        )
-        
-        # Apply filters
-        if evaluation_id:
-            query = query.filter(UserEvaluation.evaluation_id == evaluation_id)
-        
-        if user_id:
-            query = query.filter(UserEvaluation.user_id == user_id)
-        
-        # Get total count
-        total = query.count()
-        
         # Apply pagination and ordering (use started_at for all evaluations)
-        results = query.order_by(UserEvaluation.started_at.desc()).offset(skip).limit(limit).all()
-        
-        # Build response data
-        evaluation_results = []
-        for result in results:
-            user_eval, email, first_name, last_name, user_email, evaluation_title, course_title, attempts_count = result
-            
-            evaluation_results.append({
-                "id": int(user_eval.id),
-                "user_id": int(user_eval.user_id),
-                "email": email,
-                "full_name": f"{first_name} {last_name}",
-                "user_email": user_email,
-                "evaluation_id": int(user_eval.evaluation_id),
-                "evaluation_title": evaluation_title,
-                "course_title": course_title,
-                "attempt_number": int(user_eval.attempt_number),
-                "status": user_eval.status.value if user_eval.status else None,
-                "score": float(user_eval.score) if user_eval.score is not None else None,
-                "total_points": float(user_eval.total_points) if user_eval.total_points is not None else None,
-                "max_points": float(user_eval.max_points) if user_eval.max_points is not None else None,
-                "percentage": float(user_eval.percentage) if user_eval.percentage is not None else None,
-                "time_spent_minutes": int(user_eval.time_spent_minutes) if user_eval.time_spent_minutes is not None else None,
-                "passed": bool(user_eval.passed),
-                "started_at": user_eval.started_at.isoformat() if user_eval.started_at else None,
-                "completed_at": user_eval.completed_at.isoformat() if user_eval.completed_at else None,
-                "created_at": user_eval.created_at.isoformat() if user_eval.created_at else None
-            })
+        result_page = paginate(
+            query,
+            sort=[
+                SortKey(UserEvaluation.started_at, descending=True),
+                SortKey(UserEvaluation.id, descending=True),
+            ],
+            size=limit,
+            offset=skip,
+            cursor=cursor,
+            count=count,
+            cursor_values=lambda row: (row[0].started_at, row[0].id),
+        )
         
-        return JSONResponse(
+        evaluation_results = [_evaluation_result_row(result) for result in result_page.items]
+
+        return ORJSONResponse(
             content={
                 "success": True,
                 "data": evaluation_results,
-                "total": total,
+                "total": result_page.total,
                 "skip": skip,
-                "limit": limit
+                "limit": limit,
+                "has_next": result_page.has_next,
+                "next_cursor": result_page.next_cursor,
             }
         )
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting all evaluation results: {str(e)}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "success": False,
@@ -1099,6 +1033,121 @@ async def get_all_evaluation_results(
         )
 
 
+@router.get("/admin/all-results/stream")
+async def stream_all_evaluation_results(
+    evaluation_id: int = None,
+    user_id: int = None,
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Same rows as /admin/all-results, without pagination, streamed as NDJSON
+    (one result per line)
+    """
+    if not has_role_or_custom(current_user, ["admin", "trainer"]):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Permisos insuficientes"
+        )
+
+    return ndjson_response(
+        lambda db: _all_results_query(db, evaluation_id, user_id).order_by(
+            UserEvaluation.started_at.desc(), UserEvaluation.id.desc()
+        ),
+        _evaluation_result_row,
+    )
+
+
+def _all_results_query(db: Session, evaluation_id: Optional[int], user_id: Optional[int]):
+    """Último intento de cada (usuario, evaluación), con usuario, evaluación y curso."""
+    # Keep only the latest attempt per (usuario, evaluación) for admin grid
+    latest_attempts_subquery = db.query(
+        UserEvaluation.user_id.label("user_id"),
+        UserEvaluation.evaluation_id.label("evaluation_id"),
+        func.max(UserEvaluation.attempt_number).label("max_attempt_number"),
+    ).filter(
+        UserEvaluation.started_at.isnot(None)
+    ).group_by(
+        UserEvaluation.user_id,
+        UserEvaluation.evaluation_id,
+    ).subquery()
+
+    attempts_count_subquery = db.query(
+        UserEvaluation.user_id.label("user_id"),
+        UserEvaluation.evaluation_id.label("evaluation_id"),
+        func.count(UserEvaluation.id).label("attempts_count"),
+    ).filter(
+        UserEvaluation.started_at.isnot(None)
+    ).group_by(
+        UserEvaluation.user_id,
+        UserEvaluation.evaluation_id,
+    ).subquery()
+
+    # Build query with joins to get user, evaluation and course information
+    query = db.query(
+        UserEvaluation,
+        User.email,
+        User.first_name,
+        User.last_name,
+        User.email.label('user_email'),
+        Evaluation.title.label('evaluation_title'),
+        func.coalesce(Course.title, "Sin curso").label('course_title'),
+        attempts_count_subquery.c.attempts_count.label("attempts_count"),
+    ).join(
+        latest_attempts_subquery,
+        and_(
+            UserEvaluation.user_id == latest_attempts_subquery.c.user_id,
+            UserEvaluation.evaluation_id == latest_attempts_subquery.c.evaluation_id,
+            UserEvaluation.attempt_number == latest_attempts_subquery.c.max_attempt_number,
+        )
+    ).join(
+        attempts_count_subquery,
+        and_(
+            UserEvaluation.user_id == attempts_count_subquery.c.user_id,
+            UserEvaluation.evaluation_id == attempts_count_subquery.c.evaluation_id,
+        )
+    ).join(
+        User, UserEvaluation.user_id == User.id
+    ).join(
+        Evaluation, UserEvaluation.evaluation_id == Evaluation.id
+    ).outerjoin(
+        Course, Evaluation.course_id == Course.id
+    )
+
+    # Apply filters
+    if evaluation_id:
+        query = query.filter(UserEvaluation.evaluation_id == evaluation_id)
+
+    if user_id:
+        query = query.filter(UserEvaluation.user_id == user_id)
+    return query
+
+
+def _evaluation_result_row(result) -> dict:
+    user_eval, email, first_name, last_name, user_email, evaluation_title, course_title, attempts_count = result
+
+    return {
+        "id": int(user_eval.id),
+        "user_id": int(user_eval.user_id),
+        "email": email,
+        "full_name": f"{first_name} {last_name}",
+        "user_email": user_email,
+        "evaluation_id": int(user_eval.evaluation_id),
+        "evaluation_title": evaluation_title,
+        "course_title": course_title,
+        "attempt_number": int(user_eval.attempt_number),
+        "status": user_eval.status.value if user_eval.status else None,
+        "score": float(user_eval.score) if user_eval.score is not None else None,
+        "total_points": float(user_eval.total_points) if user_eval.total_points is not None else None,
+        "max_points": float(user_eval.max_points) if user_eval.max_points is not None else None,
+        "percentage": float(user_eval.percentage) if user_eval.percentage is not None else None,
+        "time_spent_minutes": int(user_eval.time_spent_minutes) if user_eval.time_spent_minutes is not None else None,
+        "passed": bool(user_eval.passed),
+        "started_at": user_eval.started_at.isoformat() if user_eval.started_at else None,
+        "completed_at": user_eval.completed_at.isoformat() if user_eval.completed_at else None,
+        "created_at": user_eval.created_at.isoformat() if user_eval.created_at else None
+    }
+
+
 @router.get("/admin/attempt-history")
 async def get_admin_attempt_history(
     evaluation_id: int,
@@ -2,7 +2,6 @@ import os
 import uuid
 import logging
 from typing import Any, List
-from PIL import Image
 from io import BytesIO
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
@@ -117,6 +116,8 @@ async def upload_profile_picture(
     db: Session = Depends(get_db)
 ) -> Any:
     
+    from PIL import Image
+
     # Validate file type
     allowed_types = ["image/jpeg", "image/jpg", "image/png", "image/gif"]
     if file.content_type not in allowed_types:
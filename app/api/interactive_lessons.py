@@ -1,19 +1,22 @@
 """
 API para Lecciones Interactivas
 """
+import json
 from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, func
+from starlette.concurrency import run_in_threadpool
 
-from app.database import get_db
+from app.database import get_db, session_scope
 from app.dependencies import get_current_user
 from app.models.user import User, UserRole
 from app.models.enrollment import Enrollment, EnrollmentStatus
-from app.models.course import CourseModule, CourseMaterial
-from app.models.user_progress import UserMaterialProgress, UserModuleProgress, MaterialProgressStatus
+from app.models.course import CourseModule
+from app.services import course_progress
 from app.models.interactive_lesson import (
     InteractiveLesson,
     LessonSlide,
@@ -128,89 +131,15 @@ def get_user_enrollment_for_lesson(
 def update_module_progress_after_lesson(
     db: Session, lesson: InteractiveLesson, user_id: int, enrollment_id: int
 ) -> None:
-    """Updates the module progress after completing an interactive lesson"""
-    module_id = lesson.module_id
-
-    # Count materials in the module
-    module_materials = db.query(CourseMaterial).filter(
-        CourseMaterial.module_id == module_id
-    ).all()
-    completed_materials = db.query(UserMaterialProgress).filter(
-        and_(
-            UserMaterialProgress.user_id == user_id,
-            UserMaterialProgress.material_id.in_([m.id for m in module_materials]),
-            UserMaterialProgress.status == MaterialProgressStatus.COMPLETED
-        )
-    ).count() if module_materials else 0
-
-    # Count interactive lessons in the module (only published ones)
-    module_lessons = db.query(InteractiveLesson).filter(
-        and_(
-            InteractiveLesson.module_id == module_id,
-            InteractiveLesson.status == LessonStatus.PUBLISHED
-        )
-    ).all()
-    completed_lessons = db.query(UserLessonProgress).filter(
-        and_(
-            UserLessonProgress.user_id == user_id,
-            UserLessonProgress.lesson_id.in_([l.id for l in module_lessons]),
-            UserLessonProgress.enrollment_id == enrollment_id,
-            UserLessonProgress.status == LessonProgressStatus.COMPLETED.value
-        )
-    ).count() if module_lessons else 0
-
-    # Calculate totals
-    total_items = len(module_materials) + len(module_lessons)
-    completed_items = completed_materials + completed_lessons
-
-    # Update or create module progress
-    module_progress = db.query(UserModuleProgress).filter(
-        and_(
-            UserModuleProgress.user_id == user_id,
-            UserModuleProgress.module_id == module_id
-        )
-    ).first()
-
-    if not module_progress:
-        module_progress = UserModuleProgress(
-            user_id=user_id,
-            module_id=module_id,
-            enrollment_id=enrollment_id
-        )
-        db.add(module_progress)
-
-    module_progress.materials_completed = completed_items
-    module_progress.total_materials = total_items
-    module_progress.calculate_progress()
-
-    # Update course progress
-    module = db.query(CourseModule).filter(CourseModule.id == module_id).first()
-    course_modules = db.query(CourseModule).filter(
-        CourseModule.course_id == module.course_id
-    ).all()
-
-    # Calculate course progress as average of all module progress percentages
-    total_progress = 0
-    for course_module in course_modules:
-        module_prog = db.query(UserModuleProgress).filter(
-            and_(
-                UserModuleProgress.user_id == user_id,
-                UserModuleProgress.module_id == course_module.id
-            )
-        ).first()
-        if module_prog:
-            total_progress += module_prog.progress_percentage
-
-    course_progress_percentage = total_progress / len(course_modules) if course_modules else 0
-
-    # Update enrollment progress
-    from app.models.enrollment import Enrollment
+    """Updates the module and course counters after completing an interactive lesson"""
     enrollment = db.query(Enrollment).filter(
         Enrollment.id == enrollment_id
     ).first()
 
     if enrollment:
-        enrollment.update_progress(course_progress_percentage)
+        course_progress.record_module_activity(db, enrollment, lesson.module_id)
+    else:
+        course_progress.refresh_module_progress(db, user_id, enrollment_id, lesson.module_id)
 
     db.commit()
 
@@ -1396,9 +1325,8 @@ async def complete_lesson(
             )
 
     lesson_progress.complete_lesson()
-    db.commit()
 
-    # Update module progress after completing the lesson
+    # Update module and course counters in the same transaction as the lesson completion
     update_module_progress_after_lesson(db, lesson, current_user.id, enrollment.id)
 
     db.refresh(lesson_progress)
@@ -1472,6 +1400,101 @@ class GenerateContentResponse(BaseModel):
     activities_created: int
 
 
+def _save_generated_content(
+    db: Session, lesson_id: int, request: GenerateContentRequest, result: dict
+) -> GenerateContentResponse:
+    """Crea los slides, quizzes y la actividad generados por IA y confirma."""
+    slides_created = 0
+    quizzes_created = 0
+    activities_created = 0
+
+    # Crear slides generados
+    for slide_data in result.get("slides", []):
+        slide_type_str = slide_data.get("slide_type", "text")
+        try:
+            slide_type = SlideContentType(slide_type_str)
+        except ValueError:
+            slide_type = SlideContentType.TEXT
+
+        new_slide = LessonSlide(
+            lesson_id=lesson_id,
+            title=slide_data.get("title", f"Slide {slide_data.get('order_index', 0) + 1}"),
+            order_index=slide_data.get("order_index", slides_created),
+            slide_type=slide_type,
+            content=slide_data.get("content", {}),
+        )
+        db.add(new_slide)
+        db.flush()  # Para obtener el ID
+        slides_created += 1
+
+        # Si es un slide de quiz, crear el quiz
+        if slide_type == SlideContentType.QUIZ and "quiz" in slide_data:
+            quiz_data = slide_data["quiz"]
+            question_type_str = quiz_data.get("question_type", "multiple_choice")
+            try:
+                question_type = QuestionType(question_type_str)
+            except ValueError:
+                question_type = QuestionType.MULTIPLE_CHOICE
+
+            new_quiz = InlineQuiz(
+                slide_id=new_slide.id,
+                question_text=quiz_data.get("question_text", ""),
+                question_type=question_type,
+                points=quiz_data.get("points", 1),
+                explanation=quiz_data.get("explanation", ""),
+                required_to_continue=False,
+                show_feedback_immediately=True,
+            )
+            db.add(new_quiz)
+            db.flush()
+
+            # Crear opciones del quiz
+            for idx, option in enumerate(quiz_data.get("options", [])):
+                new_answer = InlineQuizAnswer(
+                    quiz_id=new_quiz.id,
+                    answer_text=option.get("text", ""),
+                    is_correct=option.get("is_correct", False),
+                    order_index=idx,
+                )
+                db.add(new_answer)
+
+            quizzes_created += 1
+
+    # Crear actividad interactiva si existe
+    activity_data = result.get("activity")
+    if activity_data and request.incluir_actividad:
+        activity_type_str = activity_data.get("activity_type", "matching")
+        try:
+            activity_type = ActivityType(activity_type_str)
+        except ValueError:
+            activity_type = ActivityType.MATCHING
+
+        new_activity = InteractiveActivity(
+            lesson_id=lesson_id,
+            title=activity_data.get("title", "Actividad práctica"),
+            instructions=activity_data.get("instructions", ""),
+            activity_type=activity_type,
+            order_index=0,
+            config=activity_data.get("config", {}),
+            points=activity_data.get("points", 5),
+            max_attempts=3,
+            show_feedback=True,
+        )
+        db.add(new_activity)
+        activities_created += 1
+
+    db.commit()
+
+    return GenerateContentResponse(
+        success=True,
+        message=f"Contenido generado exitosamente: {slides_created} slides, {quizzes_created} quizzes, {activities_created} actividades",
+        lesson_id=lesson_id,
+        slides_created=slides_created,
+        quizzes_created=quizzes_created,
+        activities_created=activities_created,
+    )
+
+
 @router.post("/{lesson_id}/generate-content", response_model=GenerateContentResponse)
 async def generate_lesson_content(
     lesson_id: int,
@@ -1512,100 +1535,79 @@ async def generate_lesson_content(
             incluir_quiz=request.incluir_quiz,
             incluir_actividad=request.incluir_actividad,
         )
+        return _save_generated_content(db, lesson_id, request, result)
 
-        slides_created = 0
-        quizzes_created = 0
-        activities_created = 0
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al generar contenido: {str(e)}"
+        )
 
-        # Crear slides generados
-        for slide_data in result.get("slides", []):
-            slide_type_str = slide_data.get("slide_type", "text")
-            try:
-                slide_type = SlideContentType(slide_type_str)
-            except ValueError:
-                slide_type = SlideContentType.TEXT
-
-            new_slide = LessonSlide(
-                lesson_id=lesson_id,
-                title=slide_data.get("title", f"Slide {slide_data.get('order_index', 0) + 1}"),
-                order_index=slide_data.get("order_index", slides_created),
-                slide_type=slide_type,
-                content=slide_data.get("content", {}),
-            )
-            db.add(new_slide)
-            db.flush()  # Para obtener el ID
-            slides_created += 1
-
-            # Si es un slide de quiz, crear el quiz
-            if slide_type == SlideContentType.QUIZ and "quiz" in slide_data:
-                quiz_data = slide_data["quiz"]
-                question_type_str = quiz_data.get("question_type", "multiple_choice")
-                try:
-                    question_type = QuestionType(question_type_str)
-                except ValueError:
-                    question_type = QuestionType.MULTIPLE_CHOICE
-
-                new_quiz = InlineQuiz(
-                    slide_id=new_slide.id,
-                    question_text=quiz_data.get("question_text", ""),
-                    question_type=question_type,
-                    points=quiz_data.get("points", 1),
-                    explanation=quiz_data.get("explanation", ""),
-                    required_to_continue=False,
-                    show_feedback_immediately=True,
-                )
-                db.add(new_quiz)
-                db.flush()
-
-                # Crear opciones del quiz
-                for idx, option in enumerate(quiz_data.get("options", [])):
-                    new_answer = InlineQuizAnswer(
-                        quiz_id=new_quiz.id,
-                        answer_text=option.get("text", ""),
-                        is_correct=option.get("is_correct", False),
-                        order_index=idx,
-                    )
-                    db.add(new_answer)
 
-                quizzes_created += 1
+def _save_generated_content_in_session(
+    lesson_id: int, request: GenerateContentRequest, result: dict
+) -> GenerateContentResponse:
+    # La sesión del endpoint ya se cerró cuando termina el stream
+    with session_scope() as db:
+        return _save_generated_content(db, lesson_id, request, result)
 
-        # Crear actividad interactiva si existe
-        activity_data = result.get("activity")
-        if activity_data and request.incluir_actividad:
-            activity_type_str = activity_data.get("activity_type", "matching")
-            try:
-                activity_type = ActivityType(activity_type_str)
-            except ValueError:
-                activity_type = ActivityType.MATCHING
-
-            new_activity = InteractiveActivity(
-                lesson_id=lesson_id,
-                title=activity_data.get("title", "Actividad práctica"),
-                instructions=activity_data.get("instructions", ""),
-                activity_type=activity_type,
-                order_index=0,
-                config=activity_data.get("config", {}),
-                points=activity_data.get("points", 5),
-                max_attempts=3,
-                show_feedback=True,
-            )
-            db.add(new_activity)
-            activities_created += 1
 
-        db.commit()
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}\n\n"
 
-        return GenerateContentResponse(
-            success=True,
-            message=f"Contenido generado exitosamente: {slides_created} slides, {quizzes_created} quizzes, {activities_created} actividades",
-            lesson_id=lesson_id,
-            slides_created=slides_created,
-            quizzes_created=quizzes_created,
-            activities_created=activities_created,
+
+@router.post("/{lesson_id}/generate-content/stream")
+async def stream_lesson_content(
+    lesson_id: int,
+    request: GenerateContentRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Igual que `generate-content`, pero como server-sent events: un evento
+    `delta` por cada fragmento de texto que genera la IA, y al final `done`
+    con el resumen de lo creado (o `error`).
+    """
+    from app.services.ai_service import ai_service
+
+    if not is_admin_or_trainer(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="No tiene permisos para generar contenido"
         )
 
-    except Exception as e:
-        db.rollback()
+    lesson = get_lesson_or_404(db, lesson_id)
+
+    if not ai_service.is_configured():
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al generar contenido: {str(e)}"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servicio de IA no configurado. Configure CLAUDE_API_KEY en las variables de entorno."
         )
+
+    titulo = lesson.title
+
+    async def events():
+        chunks = []
+        try:
+            async for chunk in ai_service.stream_interactive_lesson_content(
+                titulo=titulo,
+                tema=request.tema,
+                descripcion=request.descripcion,
+                num_slides=request.num_slides,
+                incluir_quiz=request.incluir_quiz,
+                incluir_actividad=request.incluir_actividad,
+            ):
+                chunks.append(chunk)
+                yield _sse("delta", {"text": chunk})
+            result = ai_service.parse_lesson_content("".join(chunks))
+            response = await run_in_threadpool(_save_generated_content_in_session, lesson_id, request, result)
+            yield _sse("done", response.model_dump())
+        except Exception as e:
+            yield _sse("error", {"detail": f"Error al generar contenido: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
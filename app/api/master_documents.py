@@ -12,7 +12,7 @@ from app.dependencies import get_current_user, require_supervisor_or_admin
 from app.models.master_document import MasterDocument
 from app.models.empresa import Empresa
 from app.models.user import User
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.html_to_pdf import get_html_to_pdf_converter
 from app.schemas.master_document import (
     MasterDocumentCreate,
     MasterDocumentResponse,
@@ -113,7 +113,7 @@ async def generar_pdf_master_documents(
     }
 
     # Generar PDF
-    converter = HTMLToPDFConverter()
+    converter = get_html_to_pdf_converter()
     pdf_content = await converter.generate_pdf_from_template(
         "master_documents_list.html", context
     )
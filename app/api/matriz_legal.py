@@ -14,14 +14,13 @@ from datetime import datetime
 from io import BytesIO
 from typing import List, Optional
 
-import openpyxl
-from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, or_, and_, distinct
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import get_current_active_user, require_admin, require_supervisor_or_admin
 from app.models.empresa import Empresa
 from app.models.sector_economico import SectorEconomico
@@ -54,6 +53,7 @@ from app.schemas.matriz_legal import (
 )
 from app.schemas.common import MessageResponse
 from app.services.matriz_legal_service import MatrizLegalService
+from app.utils.ndjson import ndjson_response
 
 logger = logging.getLogger(__name__)
 
@@ -123,7 +123,10 @@ async def importar_excel_arl(
 
     service = MatrizLegalService(db)
     try:
-        importacion = service.import_excel(
+        # La importación es síncrona y puede tardar: se ejecuta fuera del event loop
+        # para que `GET /importaciones/{id}` pueda consultar su progreso mientras tanto
+        importacion = await run_in_threadpool(
+            service.import_excel,
             file_content,
             file.filename,
             current_user.id,
@@ -166,23 +169,36 @@ def list_importaciones(
     )
 
 
+@router.get("/importaciones/{importacion_id}", response_model=MatrizLegalImportacionResult)
+def get_importacion(
+    importacion_id: int,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    """Estado y progreso (`filas_procesadas` / `total_filas`) de una importación."""
+    importacion = db.query(MatrizLegalImportacion).filter(
+        MatrizLegalImportacion.id == importacion_id
+    ).first()
+    if not importacion:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Importación no encontrada"
+        )
+    return importacion
+
+
 # ==================== NORMAS ====================
 
-@router.get("/normas", response_model=PaginatedMatrizLegalNormas)
-def list_normas(
-    page: int = Query(1, ge=1),
-    size: int = Query(20, ge=1, le=100),
-    q: Optional[str] = Query(None, description="Búsqueda en descripción, tema, tipo norma"),
-    sector_economico_id: Optional[int] = Query(None),
-    clasificacion: Optional[str] = Query(None),
-    tema_general: Optional[str] = Query(None),
-    anio: Optional[int] = Query(None),
-    estado: Optional[str] = Query(None),
-    activo: bool = Query(True),
-    current_user: User = Depends(require_supervisor_or_admin),
-    db: Session = Depends(get_db),
+def _normas_query(
+    db: Session,
+    q: Optional[str],
+    sector_economico_id: Optional[int],
+    clasificacion: Optional[str],
+    tema_general: Optional[str],
+    anio: Optional[int],
+    estado: Optional[str],
+    activo: Optional[bool],
 ):
-    """Lista todas las normas con filtros y paginación."""
     query = db.query(MatrizLegalNorma).options(
         joinedload(MatrizLegalNorma.sector_economico)
     )
@@ -217,6 +233,26 @@ def list_normas(
     if estado:
         query = query.filter(MatrizLegalNorma.estado == estado)
 
+    return query
+
+
+@router.get("/normas", response_model=PaginatedMatrizLegalNormas)
+def list_normas(
+    page: int = Query(1, ge=1),
+    size: int = Query(20, ge=1, le=100),
+    q: Optional[str] = Query(None, description="Búsqueda en descripción, tema, tipo norma"),
+    sector_economico_id: Optional[int] = Query(None),
+    clasificacion: Optional[str] = Query(None),
+    tema_general: Optional[str] = Query(None),
+    anio: Optional[int] = Query(None),
+    estado: Optional[str] = Query(None),
+    activo: bool = Query(True),
+    current_user: User = Depends(require_supervisor_or_admin),
+    db: Session = Depends(get_db),
+):
+    """Lista todas las normas con filtros y paginación."""
+    query = _normas_query(db, q, sector_economico_id, clasificacion, tema_general, anio, estado, activo)
+
     total = query.count()
     skip = (page - 1) * size
     items = query.order_by(
@@ -243,6 +279,31 @@ def list_normas(
     )
 
 
+@router.get("/normas/stream")
+def stream_normas(
+    q: Optional[str] = Query(None, description="Búsqueda en descripción, tema, tipo norma"),
+    sector_economico_id: Optional[int] = Query(None),
+    clasificacion: Optional[str] = Query(None),
+    tema_general: Optional[str] = Query(None),
+    anio: Optional[int] = Query(None),
+    estado: Optional[str] = Query(None),
+    activo: bool = Query(True),
+    current_user: User = Depends(require_supervisor_or_admin),
+):
+    """Todas las normas que cumplen los filtros, en NDJSON (una norma por línea)."""
+
+    def serialize(norma: MatrizLegalNorma):
+        norma.sector_economico_nombre = norma.sector_economico.nombre if norma.sector_economico else None
+        return MatrizLegalNormaSchema.model_validate(norma).model_dump(mode="json")
+
+    return ndjson_response(
+        lambda db: _normas_query(
+            db, q, sector_economico_id, clasificacion, tema_general, anio, estado, activo
+        ).order_by(MatrizLegalNorma.anio.desc(), MatrizLegalNorma.tipo_norma, MatrizLegalNorma.numero_norma),
+        serialize,
+    )
+
+
 @router.get("/normas/{norma_id}", response_model=MatrizLegalNormaSchema)
 def get_norma(
     norma_id: int,
@@ -288,6 +349,7 @@ def update_norma(
     for key, value in update_data.items():
         setattr(norma, key, value)
 
+    norma.actualizar_aplicabilidad_mask()
     norma.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(norma)
@@ -818,9 +880,12 @@ def export_matriz_empresa(
     empresa_id: int,
     incluir_no_aplicables: bool = Query(False),
     current_user: User = Depends(require_supervisor_or_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Exporta la matriz legal de una empresa a Excel."""
+    import openpyxl
+    from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
+
     empresa = db.query(Empresa).filter(Empresa.id == empresa_id).first()
     if not empresa:
         raise HTTPException(
@@ -936,9 +1001,12 @@ def export_todas_normas(
     clasificacion: Optional[str] = Query(None),
     sector_economico_id: Optional[int] = Query(None),
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """Exporta el catálogo completo de normas a Excel."""
+    import openpyxl
+    from openpyxl.styles import Font, PatternFill
+
     query = db.query(MatrizLegalNorma).filter(MatrizLegalNorma.activo == True)
 
     if clasificacion:
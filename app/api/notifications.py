@@ -2,11 +2,13 @@ from typing import Any, List
 from datetime import datetime, date
 import json
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, select
 
 from app.dependencies import get_current_active_user, has_role_or_custom
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models.user import User
 from app.models.worker import Worker
 from app.models.occupational_exam import OccupationalExam
@@ -18,6 +20,12 @@ from app.schemas.notification import (
 )
 from app.schemas.common import MessageResponse, PaginatedResponse
 from app.config import settings
+from app.services.notification_delivery import (
+    fan_out,
+    mark_all_read,
+    notification_events,
+    unread_count_statement,
+)
 
 router = APIRouter()
 
@@ -31,38 +39,36 @@ async def get_notifications(
     priority: NotificationPriority = None,
     unread_only: bool = False,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get notifications for current user (or all notifications if admin)
     """
     # Admin users can see all notifications, regular users only see their own
-    if current_user.role == "admin":
-        query = db.query(Notification)
-    else:
-        query = db.query(Notification).filter(Notification.user_id == current_user.id)
+    query = select(Notification)
+    if current_user.role != "admin":
+        query = query.where(Notification.user_id == current_user.id)
     
     # Apply filters
     if notification_type:
-        query = query.filter(Notification.notification_type == notification_type)
+        query = query.where(Notification.notification_type == notification_type)
     
     if status:
-        query = query.filter(Notification.status == status)
+        query = query.where(Notification.status == status)
     
     if priority:
-        query = query.filter(Notification.priority == priority)
+        query = query.where(Notification.priority == priority)
     
     if unread_only:
-        query = query.filter(Notification.read_at.is_(None))
-    
-    # Order by creation date (newest first)
-    query = query.order_by(Notification.created_at.desc())
+        query = query.where(Notification.read_at.is_(None))
     
     # Get total count
-    total = query.count()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
     
-    # Apply pagination
-    notifications = query.offset(skip).limit(limit).all()
+    # Order by creation date (newest first) and apply pagination
+    notifications = (
+        await db.scalars(query.order_by(Notification.created_at.desc()).offset(skip).limit(limit))
+    ).all()
     
     # Calculate pagination info
     page = (skip // limit) + 1 if limit > 0 else 1
@@ -144,6 +150,22 @@ async def create_notification(
     return notification
 
 
+@router.get("/stream")
+async def stream_notifications(
+    current_user: User = Depends(get_current_active_user)
+) -> Any:
+    """
+    Notificaciones en tiempo real como server-sent events: `unread` con el
+    contador de no leídas al conectar y en cada cambio, y `notification` por
+    cada notificación nueva. Reemplaza el sondeo de /unread/count.
+    """
+    return StreamingResponse(
+        notification_events(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{notification_id}", response_model=NotificationResponse)
 async def get_notification(
     notification_id: int,
@@ -448,19 +470,10 @@ async def mark_all_notifications_read(
     """
     Mark all notifications as read for current user
     """
-    notifications = db.query(Notification).filter(
-        and_(
-            Notification.user_id == current_user.id,
-            Notification.read_at.is_(None)
-        )
-    ).all()
-
-    for notification in notifications:
-        notification.read_at = datetime.now()
-
+    marked = mark_all_read(db, current_user.id)
     db.commit()
 
-    return MessageResponse(message=f"Se marcaron {len(notifications)} notificaciones como leídas")
+    return MessageResponse(message=f"Se marcaron {marked} notificaciones como leídas")
 
 
 @router.post("/{notification_id}/send", response_model=MessageResponse)
@@ -536,19 +549,15 @@ async def send_notification(
 @router.get("/unread/count")
 async def get_unread_count(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
-    Get count of unread notifications for current user
+    Get count of unread notifications for current user (maintained counter;
+    connected clients receive it through /stream instead of polling)
     """
-    count = db.query(Notification).filter(
-        and_(
-            Notification.user_id == current_user.id,
-            Notification.read_at.is_(None)
-        )
-    ).count()
+    count = await db.scalar(unread_count_statement(current_user.id))
     
-    return {"unread_count": count}
+    return {"unread_count": count or 0}
 
 
 # Bulk notifications
@@ -586,7 +595,15 @@ async def create_bulk_notifications(
                 detail=f"Usuarios no encontrados: {list(missing_ids)}"
             )
         
-        target_user_ids = bulk_data.user_ids
+        created = fan_out(
+            db,
+            title=bulk_data.title,
+            message=bulk_data.message,
+            notification_type=bulk_data.notification_type,
+            priority=bulk_data.priority,
+            user_ids=bulk_data.user_ids,
+            active_only=False,
+        )
     elif bulk_data.user_roles:
         # Send to users with specific roles
         from app.models.user import UserRole
@@ -602,78 +619,80 @@ async def create_bulk_notifications(
             )
         
         # Get users with specified roles
-        users_by_role = db.query(User.id).filter(User.role.in_(bulk_data.user_roles)).all()
-        target_user_ids = [user.id for user in users_by_role]
+        created = fan_out(
+            db,
+            title=bulk_data.title,
+            message=bulk_data.message,
+            notification_type=bulk_data.notification_type,
+            priority=bulk_data.priority,
+            roles=bulk_data.user_roles,
+            active_only=False,
+        )
         
-        if not target_user_ids:
+        if not created:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"No se encontraron usuarios con los roles: {bulk_data.user_roles}"
             )
     else:
         # Send to all users
-        all_users = db.query(User.id).all()
-        target_user_ids = [user.id for user in all_users]
-    
-    # Create notifications for all target users
-    notifications = []
-    for user_id in target_user_ids:
-        notification = Notification(
-            user_id=user_id,
+        created = fan_out(
+            db,
             title=bulk_data.title,
             message=bulk_data.message,
             notification_type=bulk_data.notification_type,
-            priority=bulk_data.priority
+            priority=bulk_data.priority,
+            active_only=False,
         )
-        notifications.append(notification)
     
-    db.add_all(notifications)
     db.commit()
     
     # If notification type is EMAIL, send emails automatically
     if bulk_data.notification_type == NotificationType.EMAIL:
         from app.utils.email import send_email
         
+        notification_by_user = {user_id: notification_id for notification_id, user_id in created}
+        
         # Get users with emails for sending
         users_with_emails = db.query(User).filter(
             and_(
-                User.id.in_(target_user_ids),
+                User.id.in_(notification_by_user),
                 User.email.isnot(None),
                 User.email != ""
             )
         ).all()
         
-        # Send emails and update notification status
+        created_at = datetime.now().strftime('%d/%m/%Y %H:%M')
         for user in users_with_emails:
-            # Find the corresponding notification
-            notification = next((n for n in notifications if n.user_id == user.id), None)
-            if notification:
-                background_tasks.add_task(
-                    send_email,
-                    recipient=user.email,
-                    subject=bulk_data.title,
-                    body=bulk_data.message,
-                    template="notification",
-                    context={
-                        "user_name": f"{user.first_name} {user.last_name}",
-                        "title": bulk_data.title,
-                        "message": bulk_data.message,
-                        "notification_type": bulk_data.notification_type.value,
-                        "priority": bulk_data.priority.value,
-                        "created_at": notification.created_at.strftime('%d/%m/%Y %H:%M'),
-                        "system_url": settings.react_app_api_url
-                    }
-                )
-                
-                # Update notification status to SENT
-                notification.status = NotificationStatus.SENT
-                notification.sent_at = datetime.now()
+            background_tasks.add_task(
+                send_email,
+                recipient=user.email,
+                subject=bulk_data.title,
+                body=bulk_data.message,
+                template="notification",
+                context={
+                    "user_name": f"{user.first_name} {user.last_name}",
+                    "title": bulk_data.title,
+                    "message": bulk_data.message,
+                    "notification_type": bulk_data.notification_type.value,
+                    "priority": bulk_data.priority.value,
+                    "created_at": created_at,
+                    "system_url": settings.react_app_api_url
+                }
+            )
         
+        # Update notification status to SENT
+        sent_ids = [notification_by_user[user.id] for user in users_with_emails]
+        if sent_ids:
+            db.query(Notification).filter(Notification.id.in_(sent_ids)).update(
+                {Notification.status: NotificationStatus.SENT, Notification.sent_at: datetime.now()},
+                synchronize_session=False
+            )
         db.commit()
         
-        return MessageResponse(message=f"Se crearon {len(notifications)} notificaciones, {len(users_with_emails)} correos enviados")
+        return MessageResponse(message=f"Se crearon {len(created)} notificaciones, {len(users_with_emails)} correos enviados")
     
-    return MessageResponse(message=f"Se crearon {len(notifications)} notificaciones")
+    return MessageResponse(message=f"Se crearon {len(created)} notificaciones")
 
 
 @router.post("/send-by-role", response_model=MessageResponse)
@@ -709,32 +728,26 @@ async def send_notifications_by_role(
             detail=f"Roles inválidos: {invalid_roles}. Los roles válidos son: {valid_roles}"
         )
     
-    # Get users with specified roles
-    users_by_role = db.query(User).filter(User.role.in_(roles), User.is_active == True).all()
+    # One INSERT ... SELECT for every active user with those roles
+    created = fan_out(
+        db,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        priority=priority,
+        roles=roles,
+    )
     
-    if not users_by_role:
+    if not created:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"No se encontraron usuarios activos con los roles: {roles}"
         )
     
-    # Create notifications for all target users
-    notifications = []
-    for user in users_by_role:
-        notification = Notification(
-            user_id=user.id,
-            title=title,
-            message=message,
-            notification_type=notification_type,
-            priority=priority
-        )
-        notifications.append(notification)
-    
-    db.add_all(notifications)
     db.commit()
     
     return MessageResponse(
-        message=f"Se enviaron {len(notifications)} notificaciones a usuarios con roles: {', '.join(roles)}"
+        message=f"Se enviaron {len(created)} notificaciones a usuarios con roles: {', '.join(roles)}"
     )
 
 
@@ -756,42 +769,25 @@ async def send_notifications_to_all(
             detail="Permisos insuficientes"
         )
     
-    # Get total count of active users first
-    total_users = db.query(User).filter(User.is_active == True).count()
+    # One INSERT ... SELECT over the active users instead of batches of ORM objects
+    created = fan_out(
+        db,
+        title=title,
+        message=message,
+        notification_type=notification_type,
+        priority=priority,
+    )
     
-    if total_users == 0:
+    if not created:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No se encontraron usuarios activos"
         )
     
-    # Process users in batches to avoid memory issues
-    batch_size = 100
-    total_notifications = 0
-    
-    for offset in range(0, total_users, batch_size):
-        # Get users in batches
-        users_batch = db.query(User.id).filter(User.is_active == True).offset(offset).limit(batch_size).all()
-        
-        # Create notifications for this batch
-        notifications = []
-        for user in users_batch:
-            notification = Notification(
-                user_id=user.id,
-                title=title,
-                message=message,
-                notification_type=notification_type,
-                priority=priority
-            )
-            notifications.append(notification)
-        
-        # Insert batch
-        db.add_all(notifications)
-        db.commit()
-        total_notifications += len(notifications)
+    db.commit()
     
     return MessageResponse(
-        message=f"Se enviaron {total_notifications} notificaciones a todos los usuarios activos"
+        message=f"Se enviaron {len(created)} notificaciones a todos los usuarios activos"
     )
 
 
@@ -9,7 +9,7 @@ from app.database import get_db
 from app.dependencies import require_admin, require_supervisor_or_admin
 from app.models.user import User
 from app.services.occupational_exam_notifications import OccupationalExamNotificationService
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.html_to_pdf import get_html_to_pdf_converter
 from app.scheduler.occupational_exam_scheduler import (
     get_occupational_exam_scheduler_status,
     run_manual_occupational_exam_check,
@@ -20,7 +20,6 @@ from app.schemas.common import MessageResponse
 
 import logging
 import os
-import base64
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -373,7 +372,7 @@ async def generate_occupational_exam_report(
         # Si el formato es PDF, generar PDF con WeasyPrint
         if format.lower() == "pdf":
             # Inicializar el convertidor HTML a PDF
-            converter = HTMLToPDFConverter()
+            converter = get_html_to_pdf_converter()
             
             # Preparar datos para la plantilla
             template_data = {
@@ -385,14 +384,8 @@ async def generate_occupational_exam_report(
                 "generated_at": datetime.now().strftime("%d/%m/%Y %H:%M:%S")
             }
             
-            # Cargar logo si existe
-            try:
-                logo_path = os.path.join(converter.template_dir, 'logo_3.png')
-                with open(logo_path, 'rb') as image_file:
-                    template_data["logo_base64"] = base64.b64encode(image_file.read()).decode('utf-8')
-            except Exception as e:
-                logger.error(f"Error al cargar el logo: {str(e)}")
-                template_data["logo_base64"] = ""
+            # Logo servido desde la caché compartida del convertidor
+            template_data["logo_url"] = converter.logo_url()
             
             # Renderizar la plantilla HTML
             html_content = converter.render_template('occupational_exam_report.html', template_data)
@@ -11,7 +11,7 @@ from fastapi import (
 )
 from fastapi.responses import RedirectResponse, FileResponse, StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, func
 from datetime import date, timedelta, datetime
 import os
 import uuid
@@ -22,8 +22,10 @@ import httpx
 import tempfile
 
 from app.database import get_db
+from app.services.people_search import search_condition
 from app.services.s3_storage import s3_service
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.html_to_pdf import get_html_to_pdf_converter
+from app.services.pdf_artifact_cache import pdf_artifact_cache
 from app.dependencies import (
     get_current_user,
     require_admin,
@@ -42,6 +44,7 @@ from app.schemas.occupational_exam import (
     OccupationalExamListResponse,
 )
 from app.schemas.common import MessageResponse, PaginatedResponse
+from app.utils.pagination import COUNT_DESCRIPTION, CURSOR_DESCRIPTION, CountMode, SortKey, paginate
 from app.models.seguimiento import Seguimiento, EstadoSeguimiento, ValoracionRiesgo
 from app.models.profesiograma import Profesiograma, ProfesiogramaFactor, ProfesiogramaEstado
 
@@ -140,15 +143,14 @@ async def get_occupational_exams(
     search: Optional[str] = Query(None),
     next_exam_status: Optional[str] = Query(None, description="Filtro por próximo examen: 'proximos' (próximos 30 días), 'vencidos' (ya vencidos)"),
     next_exam_year: Optional[int] = Query(None, description="Filtro por año del próximo examen (ej: 2026)"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[CountMode] = Query(None, description=COUNT_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_supervisor_or_admin),
 ) -> Any:
     """
     Obtener lista paginada de exámenes ocupacionales con filtros
     """
-    # Calculate offset
-    skip = (page - 1) * limit
-
     # Base query
     query = db.query(OccupationalExam)
     
@@ -178,18 +180,10 @@ async def get_occupational_exams(
     if search:
         # Solo unir Worker si hay búsqueda
         query = query.join(Worker, OccupationalExam.worker_id == Worker.id).filter(
-            or_(
-                Worker.first_name.ilike(f"%{search}%"),
-                Worker.last_name.ilike(f"%{search}%"),
-                Worker.document_number.ilike(f"%{search}%"),
-            )
+            search_condition(Worker, search)
         )
         count_query = count_query.join(Worker, OccupationalExam.worker_id == Worker.id).filter(
-            or_(
-                Worker.first_name.ilike(f"%{search}%"),
-                Worker.last_name.ilike(f"%{search}%"),
-                Worker.document_number.ilike(f"%{search}%"),
-            )
+            search_condition(Worker, search)
         )
 
     # Filtro por estado del próximo examen y/o por año (calculado con SQL)
@@ -228,21 +222,25 @@ async def get_occupational_exams(
             query = query.filter(extract("year", next_exam_expr) == next_exam_year)
             count_query = count_query.filter(extract("year", next_exam_expr) == next_exam_year)
 
-    # Get total count
-    total = count_query.scalar()
-
     # 2. Carga ansiosa para el query principal
     query = query.options(
         joinedload(OccupationalExam.worker).joinedload(Worker.cargo_obj)
     )
 
-    # Apply pagination and ordering
-    results = (
-        query.order_by(OccupationalExam.exam_date.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # Apply pagination and ordering (el id desempata exámenes del mismo día)
+    result_page = paginate(
+        query,
+        sort=[
+            SortKey(OccupationalExam.exam_date, descending=True),
+            SortKey(OccupationalExam.id, descending=True),
+        ],
+        page=page,
+        size=limit,
+        cursor=cursor,
+        count=count,
+        count_query=count_query,
     )
+    results = result_page.items
 
     # 3. Optimización N+1: Pre-cargar Profesiogramas y Factores en bloque
     # Identificar qué cargos necesitan factores de riesgo (aquellos que no los tienen en BD)
@@ -396,20 +394,7 @@ async def get_occupational_exams(
         }
         enriched_exams.append(exam_dict)
 
-    # Calculate pagination info
-    pages = (total + limit - 1) // limit
-    has_next = page < pages
-    has_prev = page > 1
-
-    return {
-        "items": enriched_exams,
-        "total": total,
-        "page": page,
-        "size": limit,
-        "pages": pages,
-        "has_next": has_next,
-        "has_prev": has_prev,
-    }
+    return {"items": enriched_exams, **result_page.meta()}
 
 
 @router.get("/calculate-next-exam-date/{worker_id}")
@@ -875,10 +860,12 @@ async def generate_occupational_exam_report_pdf(
             "logo_base64": None,  # Se puede agregar el logo más tarde
         }
 
-        # Generar PDF usando HTMLToPDFConverter
-        converter = HTMLToPDFConverter()
-        pdf_content = await converter.generate_pdf_from_template(
-            "occupational_exam_report.html", context
+        # Generar PDF usando el convertidor compartido (o reutilizarlo si los datos no cambiaron)
+        converter = get_html_to_pdf_converter()
+        pdf_content = await pdf_artifact_cache.get_or_render_async(
+            "occupational_exam_report.html",
+            context,
+            lambda: converter.generate_pdf_from_template("occupational_exam_report.html", context),
         )
 
         # Crear nombre del archivo
@@ -1,17 +1,15 @@
 import io
 from datetime import datetime
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-import weasyprint
+if TYPE_CHECKING:
+    from openpyxl.styles import Border, PatternFill
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import get_current_user, require_supervisor_or_admin
 from app.models.user import User
 from app.models.plan_trabajo_anual import (
@@ -25,7 +23,9 @@ from app.schemas.plan_trabajo_anual import (
     PlanTrabajoSeguimientoUpdate, PlanTrabajoSeguimientoResponse,
     DashboardIndicadores, MesIndicador
 )
-from app.services.plan_trabajo_template import get_plantilla_actividades
+from app.services.plan_trabajo_template import get_plantilla_filas
+from app.services.template_instantiation import instantiate
+from app.services.pdf_artifact_cache import data_stamp, pdf_artifact_cache
 
 router = APIRouter()
 
@@ -113,37 +113,8 @@ def crear_plan_desde_plantilla(
     db.add(plan)
     db.flush()
 
-    # Crear las actividades desde la plantilla
-    plantilla = get_plantilla_actividades(año)
-    for act_data in plantilla:
-        meses_programados = act_data.pop("meses_programados", [])
-        costo = act_data.pop("costo", None)
-
-        actividad = PlanTrabajoActividad(
-            plan_id=plan.id,
-            ciclo=CicloPhva(act_data["ciclo"]),
-            categoria=CategoriaActividad(act_data["categoria"]),
-            estandar=act_data.get("estandar"),
-            descripcion=act_data["descripcion"],
-            frecuencia=act_data.get("frecuencia"),
-            responsable=act_data.get("responsable"),
-            recurso_financiero=act_data.get("recurso_financiero", False),
-            recurso_tecnico=act_data.get("recurso_tecnico", False),
-            costo=costo,
-            orden=act_data.get("orden", 0),
-        )
-        db.add(actividad)
-        db.flush()
-
-        # Crear seguimientos mensuales (12 meses)
-        for mes in range(1, 13):
-            seguimiento = PlanTrabajoSeguimiento(
-                actividad_id=actividad.id,
-                mes=mes,
-                programada=(mes in meses_programados),
-                ejecutada=False,
-            )
-            db.add(seguimiento)
+    # Actividades y seguimientos mensuales de la plantilla: un INSERT por nivel
+    instantiate(db, get_plantilla_filas(año), parent_id=plan.id)
 
     db.commit()
     db.refresh(plan)
@@ -398,11 +369,15 @@ _CATS_BY_CICLO = {
 }
 
 
-def _make_fill(hex_color: str) -> PatternFill:
+def _make_fill(hex_color: str) -> "PatternFill":
+    from openpyxl.styles import PatternFill
+
     return PatternFill(start_color=hex_color, end_color=hex_color, fill_type='solid')
 
 
-def _thin_border() -> Border:
+def _thin_border() -> "Border":
+    from openpyxl.styles import Border, Side
+
     s = Side(style='thin', color='BDBDBD')
     return Border(left=s, right=s, top=s, bottom=s)
 
@@ -424,7 +399,7 @@ def _enum_val(v) -> str:
 @router.get("/{plan_id}/exportar/excel")
 def exportar_plan_excel(
     plan_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Exporta el Plan de Trabajo Anual a Excel (.xlsx)."""
@@ -455,6 +430,10 @@ def exportar_plan_excel(
     def p_col(m): return 3 + 2 * m   # P column for month m
     def e_col(m): return 4 + 2 * m   # E column for month m
 
+    import openpyxl
+    from openpyxl.styles import Font, Alignment
+    from openpyxl.utils import get_column_letter
+
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = f"Plan {plan.año}"
@@ -601,7 +580,7 @@ def exportar_plan_excel(
 @router.get("/{plan_id}/exportar/pdf")
 def exportar_plan_pdf(
     plan_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Exporta el Plan de Trabajo Anual a PDF (A4 apaisado)."""
@@ -609,9 +588,33 @@ def exportar_plan_pdf(
     if not plan:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan no encontrado")
 
+    filename = f"plan_trabajo_anual_{plan.año}.pdf"
+    actividades_filter = PlanTrabajoActividad.plan_id == plan_id
+    cache_key, pdf_bytes = pdf_artifact_cache.lookup(
+        "plan_trabajo_anual_pdf",
+        {
+            "plan": data_stamp(db, PlanTrabajoAnual, PlanTrabajoAnual.id == plan_id),
+            "actividades": data_stamp(db, PlanTrabajoActividad, actividades_filter),
+            "seguimientos": data_stamp(
+                db,
+                PlanTrabajoSeguimiento,
+                PlanTrabajoSeguimiento.actividad_id.in_(
+                    db.query(PlanTrabajoActividad.id).filter(actividades_filter)
+                ),
+            ),
+        },
+        template_version=pdf_artifact_cache.template_version(__file__),
+    )
+    if pdf_bytes is not None:
+        return StreamingResponse(
+            io.BytesIO(pdf_bytes),
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
     actividades = (
         db.query(PlanTrabajoActividad)
-        .filter(PlanTrabajoActividad.plan_id == plan_id)
+        .filter(actividades_filter)
         .order_by(PlanTrabajoActividad.orden)
         .all()
     )
@@ -755,6 +758,8 @@ def exportar_plan_pdf(
 </body>
 </html>"""
 
+    import weasyprint
+
     pdf_bytes = weasyprint.HTML(string=html).write_pdf(
         metadata={
             "title": f"Plan de Trabajo Anual SG-SST {plan.año}",
@@ -763,8 +768,8 @@ def exportar_plan_pdf(
         pdf_version=(1, 7),
         compress=True,
     )
+    pdf_artifact_cache.store(cache_key, pdf_bytes)
 
-    filename = f"plan_trabajo_anual_{plan.año}.pdf"
     return StreamingResponse(
         io.BytesIO(pdf_bytes),
         media_type="application/pdf",
@@ -1,18 +1,16 @@
 import io
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-import weasyprint
+if TYPE_CHECKING:
+    from openpyxl.styles import Border, PatternFill
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import get_current_user, require_supervisor_or_admin
 from app.models.user import User
 from app.models.presupuesto_sst import (
@@ -33,10 +31,11 @@ from app.schemas.presupuesto_sst import (
     PresupuestoMensualResponse,
 )
 from app.services.presupuesto_template import (
-    CATEGORIAS_ORDER,
     CATEGORIA_LABELS,
-    get_default_items,
+    get_plantilla_filas,
 )
+from app.services.template_instantiation import instantiate
+from app.services.pdf_artifact_cache import data_stamp, pdf_artifact_cache
 
 router = APIRouter()
 
@@ -70,11 +69,15 @@ CAT_LIGHT_COLORS = {
 # Helpers Excel
 # ─────────────────────────────────────────────
 
-def _make_fill(hex_color: str) -> PatternFill:
+def _make_fill(hex_color: str) -> "PatternFill":
+    from openpyxl.styles import PatternFill
+
     return PatternFill("solid", fgColor=hex_color)
 
 
-def _thin_border() -> Border:
+def _thin_border() -> "Border":
+    from openpyxl.styles import Border, Side
+
     thin = Side(style="thin", color="CCCCCC")
     return Border(left=thin, right=thin, top=thin, bottom=thin)
 
@@ -149,32 +152,8 @@ def crear_desde_plantilla(
     db.add(presupuesto)
     db.flush()
 
-    for orden_cat, cat_str in enumerate(CATEGORIAS_ORDER):
-        categoria = PresupuestoCategoria(
-            presupuesto_id=presupuesto.id,
-            categoria=cat_str,
-            orden=orden_cat,
-        )
-        db.add(categoria)
-        db.flush()
-
-        for orden_item, nombre in enumerate(get_default_items(cat_str)):
-            item = PresupuestoItem(
-                categoria_id=categoria.id,
-                actividad=nombre,
-                es_default=True,
-                orden=orden_item,
-            )
-            db.add(item)
-            db.flush()
-
-            for mes in range(1, 13):
-                db.add(PresupuestoMensual(
-                    item_id=item.id,
-                    mes=mes,
-                    proyectado=Decimal("0"),
-                    ejecutado=Decimal("0"),
-                ))
+    # Categorías, ítems y montos mensuales: un INSERT por nivel
+    instantiate(db, get_plantilla_filas(), parent_id=presupuesto.id)
 
     db.commit()
     db.refresh(presupuesto)
@@ -344,7 +323,7 @@ def actualizar_mensual(
 @router.get("/{presupuesto_id}/exportar/excel")
 def exportar_excel(
     presupuesto_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Exporta el Presupuesto SST a Excel (.xlsx)."""
@@ -389,6 +368,10 @@ def exportar_excel(
     def proy_col(m): return 5 + 2 * m   # m=1 → 7 (G)
     def ejec_col(m): return 6 + 2 * m   # m=1 → 8 (H)
 
+    import openpyxl
+    from openpyxl.styles import Font, Alignment
+    from openpyxl.utils import get_column_letter
+
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = f"Presupuesto {p.año}"
@@ -643,7 +626,7 @@ def exportar_excel(
 @router.get("/{presupuesto_id}/exportar/pdf")
 def exportar_pdf(
     presupuesto_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Exporta el Presupuesto SST a PDF."""
@@ -651,9 +634,33 @@ def exportar_pdf(
     if not p:
         raise HTTPException(status_code=404, detail="Presupuesto no encontrado")
 
+    filename = f"presupuesto_sst_{p.año}.pdf"
+    categorias_filter = PresupuestoCategoria.presupuesto_id == presupuesto_id
+    item_ids_query = (
+        db.query(PresupuestoItem.id)
+        .join(PresupuestoCategoria, PresupuestoItem.categoria_id == PresupuestoCategoria.id)
+        .filter(categorias_filter)
+    )
+    cache_key, pdf_bytes = pdf_artifact_cache.lookup(
+        "presupuesto_sst_pdf",
+        {
+            "presupuesto": data_stamp(db, PresupuestoSST, PresupuestoSST.id == presupuesto_id),
+            "categorias": data_stamp(db, PresupuestoCategoria, categorias_filter),
+            "items": data_stamp(db, PresupuestoItem, PresupuestoItem.id.in_(item_ids_query)),
+            "montos": data_stamp(db, PresupuestoMensual, PresupuestoMensual.item_id.in_(item_ids_query)),
+        },
+        template_version=pdf_artifact_cache.template_version(__file__),
+    )
+    if pdf_bytes is not None:
+        return StreamingResponse(
+            io.BytesIO(pdf_bytes),
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
     categorias = (
         db.query(PresupuestoCategoria)
-        .filter(PresupuestoCategoria.presupuesto_id == presupuesto_id)
+        .filter(categorias_filter)
         .order_by(PresupuestoCategoria.orden)
         .all()
     )
@@ -814,8 +821,10 @@ def exportar_pdf(
 </body>
 </html>"""
 
+    import weasyprint
+
     pdf_bytes = weasyprint.HTML(string=html).write_pdf()
-    filename = f"presupuesto_sst_{p.año}.pdf"
+    pdf_artifact_cache.store(cache_key, pdf_bytes)
     return StreamingResponse(
         io.BytesIO(pdf_bytes),
         media_type="application/pdf",
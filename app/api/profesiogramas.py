@@ -1,15 +1,13 @@
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text
 from datetime import datetime
 from io import BytesIO
-import openpyxl
-from openpyxl.styles import Alignment, Font, PatternFill
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import get_current_active_user, require_admin, require_supervisor_or_admin
 from app.models.cargo import Cargo
 from app.models.criterio_exclusion import CriterioExclusion
@@ -27,6 +25,8 @@ from app.models.inmunizacion import Inmunizacion
 from app.models.tipo_examen import TipoExamen
 from app.models.user import User
 from app.models.worker import Worker
+from app.utils.catalog_cache import catalog_cache
+from app.utils.pagination import COUNT_DESCRIPTION, CURSOR_DESCRIPTION, CountMode, SortKey, paginate
 from app.schemas.criterio_exclusion import (
     CriterioExclusion as CriterioExclusionSchema,
     CriterioExclusionCreate,
@@ -54,12 +54,17 @@ from app.schemas.tipo_examen import TipoExamen as TipoExamenSchema, TipoExamenCr
 from app.schemas.inmunizacion import Inmunizacion as InmunizacionSchema, InmunizacionCreate, InmunizacionUpdate
 from app.schemas.common import MessageResponse, PaginatedResponse
 from app.services.emo_periodicidad import (
+    cargo_emo_inputs,
+    compute_cargo_emo_inputs,
     compute_stats_for_cargo,
     compute_matrix_risk_summary_from_inputs,
+    discard_emo_snapshot,
     generate_justificacion_periodicidad_emo_from_db,
     generate_justificacion_periodicidad_emo,
+    refresh_emo_snapshots,
+    snapshot_worker_counts,
     suggest_periodicidad_emo_meses,
-    suggest_periodicidad_emo_meses_from_db,
+    suggest_periodicidad_from_inputs,
 )
 from app.services.profesiograma_pdf import generate_profesiograma_report_pdf
 
@@ -69,18 +74,22 @@ router = APIRouter()
 
 @router.get("/catalogos/factores-riesgo", response_model=List[FactorRiesgoSchema])
 def list_factores_riesgo(
+    request: Request,
     activo: Optional[bool] = Query(None),
     q: Optional[str] = Query(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    query = db.query(FactorRiesgo)
-    if activo is not None:
-        query = query.filter(FactorRiesgo.activo == activo)
-    if q:
-        like = f"%{q}%"
-        query = query.filter((FactorRiesgo.nombre.ilike(like)) | (FactorRiesgo.codigo.ilike(like)))
-    return query.order_by(FactorRiesgo.nombre.asc()).all()
+    def load():
+        query = db.query(FactorRiesgo)
+        if activo is not None:
+            query = query.filter(FactorRiesgo.activo == activo)
+        if q:
+            like = f"%{q}%"
+            query = query.filter((FactorRiesgo.nombre.ilike(like)) | (FactorRiesgo.codigo.ilike(like)))
+        return query.order_by(FactorRiesgo.nombre.asc()).all()
+
+    return catalog_cache.respond(request, "factores_riesgo", List[FactorRiesgoSchema], load)
 
 
 @router.get(
@@ -135,6 +144,7 @@ def create_factor_riesgo(
     factor = FactorRiesgo(**payload.model_dump())
     db.add(factor)
     db.commit()
+    catalog_cache.invalidate("factores_riesgo")
     db.refresh(factor)
     return factor
 
@@ -161,6 +171,7 @@ def update_factor_riesgo(
     for k, v in data.items():
         setattr(factor, k, v)
     db.commit()
+    catalog_cache.invalidate("factores_riesgo")
     db.refresh(factor)
     return factor
 
@@ -177,6 +188,7 @@ def delete_factor_riesgo(
     try:
         db.delete(factor)
         db.commit()
+        catalog_cache.invalidate("factores_riesgo")
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"No se puede eliminar el factor de riesgo: {str(e)}")
@@ -185,18 +197,22 @@ def delete_factor_riesgo(
 
 @router.get("/catalogos/tipos-examen", response_model=List[TipoExamenSchema])
 def list_tipos_examen(
+    request: Request,
     activo: Optional[bool] = Query(None),
     q: Optional[str] = Query(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    query = db.query(TipoExamen)
-    if activo is not None:
-        query = query.filter(TipoExamen.activo == activo)
-    if q:
-        like = f"%{q}%"
-        query = query.filter(TipoExamen.nombre.ilike(like))
-    return query.order_by(TipoExamen.nombre.asc()).all()
+    def load():
+        query = db.query(TipoExamen)
+        if activo is not None:
+            query = query.filter(TipoExamen.activo == activo)
+        if q:
+            like = f"%{q}%"
+            query = query.filter(TipoExamen.nombre.ilike(like))
+        return query.order_by(TipoExamen.nombre.asc()).all()
+
+    return catalog_cache.respond(request, "tipos_examen", List[TipoExamenSchema], load)
 
 
 @router.get(
@@ -248,6 +264,7 @@ def create_tipo_examen(
     tipo = TipoExamen(**payload.model_dump())
     db.add(tipo)
     db.commit()
+    catalog_cache.invalidate("tipos_examen")
     db.refresh(tipo)
     return tipo
 
@@ -267,6 +284,7 @@ def delete_tipo_examen(
     try:
         db.delete(tipo)
         db.commit()
+        catalog_cache.invalidate("tipos_examen")
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"No se puede eliminar el tipo de examen: {str(e)}")
@@ -296,21 +314,26 @@ def update_tipo_examen(
     for k, v in data.items():
         setattr(tipo, k, v)
     db.commit()
+    catalog_cache.invalidate("tipos_examen")
     db.refresh(tipo)
     return tipo
 
 
 @router.get("/catalogos/criterios-exclusion", response_model=List[CriterioExclusionSchema])
 def list_criterios_exclusion(
+    request: Request,
     q: Optional[str] = Query(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    query = db.query(CriterioExclusion)
-    if q:
-        like = f"%{q}%"
-        query = query.filter(CriterioExclusion.nombre.ilike(like))
-    return query.order_by(CriterioExclusion.nombre.asc()).all()
+    def load():
+        query = db.query(CriterioExclusion)
+        if q:
+            like = f"%{q}%"
+            query = query.filter(CriterioExclusion.nombre.ilike(like))
+        return query.order_by(CriterioExclusion.nombre.asc()).all()
+
+    return catalog_cache.respond(request, "criterios_exclusion", List[CriterioExclusionSchema], load)
 
 
 @router.get(
@@ -359,6 +382,7 @@ def create_criterio_exclusion(
     criterio = CriterioExclusion(**payload.model_dump())
     db.add(criterio)
     db.commit()
+    catalog_cache.invalidate("criterios_exclusion")
     db.refresh(criterio)
     return criterio
 
@@ -385,6 +409,7 @@ def update_criterio_exclusion(
     for k, v in data.items():
         setattr(criterio, k, v)
     db.commit()
+    catalog_cache.invalidate("criterios_exclusion")
     db.refresh(criterio)
     return criterio
 
@@ -401,6 +426,7 @@ def delete_criterio_exclusion(
     try:
         db.delete(criterio)
         db.commit()
+        catalog_cache.invalidate("criterios_exclusion")
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"No se puede eliminar el criterio de exclusión: {str(e)}")
@@ -409,18 +435,22 @@ def delete_criterio_exclusion(
 
 @router.get("/catalogos/inmunizaciones", response_model=List[InmunizacionSchema])
 def list_inmunizaciones(
+    request: Request,
     activo: Optional[bool] = Query(None),
     q: Optional[str] = Query(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    query = db.query(Inmunizacion)
-    if activo is not None:
-        query = query.filter(Inmunizacion.activo == activo)
-    if q:
-        like = f"%{q}%"
-        query = query.filter(Inmunizacion.nombre.ilike(like))
-    return query.order_by(Inmunizacion.nombre.asc()).all()
+    def load():
+        query = db.query(Inmunizacion)
+        if activo is not None:
+            query = query.filter(Inmunizacion.activo == activo)
+        if q:
+            like = f"%{q}%"
+            query = query.filter(Inmunizacion.nombre.ilike(like))
+        return query.order_by(Inmunizacion.nombre.asc()).all()
+
+    return catalog_cache.respond(request, "inmunizaciones", List[InmunizacionSchema], load)
 
 
 @router.get(
@@ -472,6 +502,7 @@ def create_inmunizacion(
     inmun = Inmunizacion(**payload.model_dump())
     db.add(inmun)
     db.commit()
+    catalog_cache.invalidate("inmunizaciones")
     db.refresh(inmun)
     return inmun
 
@@ -498,6 +529,7 @@ def update_inmunizacion(
     for k, v in data.items():
         setattr(inmun, k, v)
     db.commit()
+    catalog_cache.invalidate("inmunizaciones")
     db.refresh(inmun)
     return inmun
 
@@ -515,6 +547,7 @@ def delete_inmunizacion(
     try:
         db.delete(inmun)
         db.commit()
+        catalog_cache.invalidate("inmunizaciones")
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=f"No se puede eliminar la inmunización: {str(e)}")
@@ -589,8 +622,10 @@ def suggest_emo_periodicidad_for_cargo(
     if not cargo:
         raise HTTPException(status_code=404, detail="Cargo no encontrado")
 
-    stats = compute_stats_for_cargo(db, cargo_id)
-    recomendada = suggest_periodicidad_emo_meses_from_db(db, cargo_id)
+    # Snapshot del recálculo por lotes si está vigente; si no, cálculo al momento
+    inputs = cargo_emo_inputs(db, cargo_id)
+    stats = inputs.stats
+    recomendada = suggest_periodicidad_from_inputs(inputs)
     periodicidad_para_borrador = periodicidad_emo_meses or recomendada
     if periodicidad_para_borrador not in (6, 12, 24, 36):
         raise HTTPException(status_code=400, detail="periodicidad_emo_meses debe ser 6, 12, 24 o 36")
@@ -599,6 +634,7 @@ def suggest_emo_periodicidad_for_cargo(
         cargo_id,
         periodicidad_para_borrador,
         formato=formato,
+        inputs=inputs,
     )
     return ProfesiogramaEmoSuggestion(
         cargo_id=cargo_id,
@@ -609,6 +645,7 @@ def suggest_emo_periodicidad_for_cargo(
         antiguedad_menor_2_anios=stats.antiguedad_menor_2_anios,
         sin_fecha_ingreso=stats.sin_fecha_ingreso,
         justificacion_periodicidad_emo_borrador=borrador,
+        indicadores_calculados_en=inputs.computed_at,
     )
 
 
@@ -625,10 +662,11 @@ def build_emo_justificacion_for_cargo(
     if payload.periodicidad_emo_meses not in (6, 12, 24, 36):
         raise HTTPException(status_code=400, detail="periodicidad_emo_meses debe ser 6, 12, 24 o 36")
 
-    stats = compute_stats_for_cargo(db, cargo_id)
+    inputs = cargo_emo_inputs(db, cargo_id)
+    stats = inputs.stats
     factores = [(f.factor_riesgo_id, f.nd, f.ne, f.nc) for f in (payload.factores or [])]
     matrix_override = compute_matrix_risk_summary_from_inputs(db, factores)
-    recomendada = suggest_periodicidad_emo_meses_from_db(db, cargo_id, matrix_override=matrix_override)
+    recomendada = suggest_periodicidad_from_inputs(inputs, matrix_override=matrix_override)
     borrador = generate_justificacion_periodicidad_emo_from_db(
         db,
         cargo_id,
@@ -636,6 +674,7 @@ def build_emo_justificacion_for_cargo(
         matrix_override=matrix_override,
         matrix_label="configuración actual",
         formato=payload.formato,
+        inputs=inputs,
     )
     return ProfesiogramaEmoSuggestion(
         cargo_id=cargo_id,
@@ -646,6 +685,7 @@ def build_emo_justificacion_for_cargo(
         antiguedad_menor_2_anios=stats.antiguedad_menor_2_anios,
         sin_fecha_ingreso=stats.sin_fecha_ingreso,
         justificacion_periodicidad_emo_borrador=borrador,
+        indicadores_calculados_en=inputs.computed_at,
     )
 
 
@@ -917,6 +957,8 @@ def list_profesiogramas_admin(
     estado: Optional[str] = Query(None, description="Filtrar por estado: activo, inactivo, borrador"),
     cargo_id: Optional[int] = Query(None, description="Filtrar por cargo"),
     search: Optional[str] = Query(None, description="Buscar por nombre de cargo"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[CountMode] = Query(None, description=COUNT_DESCRIPTION),
     current_user: User = Depends(require_admin),
     db: Session = Depends(get_db),
 ):
@@ -940,24 +982,27 @@ def list_profesiogramas_admin(
     if search:
         query = query.filter(Cargo.nombre_cargo.ilike(f"%{search}%"))
 
-    # Conteo total
-    total = query.count()
-
-    # Paginación
-    offset = (page - 1) * size
-    profesiogramas = query.order_by(
-        Cargo.nombre_cargo.asc(),
-        Profesiograma.version.desc()
-    ).offset(offset).limit(size).all()
+    # Paginación (el id desempata y hace el orden total para el cursor)
+    result_page = paginate(
+        query,
+        sort=[
+            SortKey(Cargo.nombre_cargo),
+            SortKey(Profesiograma.version, descending=True),
+            SortKey(Profesiograma.id),
+        ],
+        page=page,
+        size=size,
+        cursor=cursor,
+        count=count,
+        cursor_values=lambda p: (p.cargo.nombre_cargo, p.version, p.id),
+    )
 
-    # Construir respuesta con conteos
+    # Construir respuesta con conteos (trabajadores del snapshot EMO, un
+    # solo conteo agrupado para los cargos que no estén en él)
+    trabajadores_por_cargo = snapshot_worker_counts(db, (p.cargo_id for p in result_page.items))
     items = []
-    for p in profesiogramas:
-        # Contar trabajadores del cargo
-        trabajadores_count = db.query(func.count(Worker.id)).filter(
-            Worker.cargo_id == p.cargo_id,
-            Worker.is_active == True
-        ).scalar() or 0
+    for p in result_page.items:
+        trabajadores_count = trabajadores_por_cargo.get(p.cargo_id, 0)
 
         # Contar factores
         factores_count = len(p.profesiograma_factores) if p.profesiograma_factores else 0
@@ -975,17 +1020,7 @@ def list_profesiogramas_admin(
             factores_count=factores_count,
         ))
 
-    pages = (total + size - 1) // size
-
-    return PaginatedResponse(
-        items=items,
-        total=total,
-        page=page,
-        size=size,
-        pages=pages,
-        has_next=page < pages,
-        has_prev=page > 1,
-    )
+    return PaginatedResponse(items=items, **result_page.meta())
 
 
 @router.patch("/admin/{profesiograma_id}/status", response_model=MessageResponse)
@@ -1150,11 +1185,14 @@ def export_profesiogramas_admin(
     estado: Optional[str] = Query(None),
     cargo_id: Optional[int] = Query(None),
     current_user: User = Depends(require_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> StreamingResponse:
     """
     Exporta la lista de profesiogramas a Excel.
     """
+    import openpyxl
+    from openpyxl.styles import Alignment, Font, PatternFill
+
     query = db.query(Profesiograma).join(Cargo)
 
     if estado:
@@ -1269,6 +1307,23 @@ def get_profesiogramas_stats(
     }
 
 
+@router.post("/admin/emo/recalcular", response_model=MessageResponse)
+def recalcular_emo_snapshots(
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db),
+):
+    """
+    Recalcula los indicadores de periodicidad EMO de todos los cargos en una
+    sola pasada y actualiza el snapshot que usan la sugerencia, la
+    justificación y el listado de administración.
+    """
+    total = refresh_emo_snapshots(db)
+    return MessageResponse(
+        message=f"Indicadores EMO recalculados para {total} cargos",
+        data={"cargos": total},
+    )
+
+
 # ==================== END ADMIN PANEL ENDPOINTS ====================
 
 
@@ -1311,11 +1366,14 @@ def create_profesiograma(
     )
     justificacion_periodicidad_emo = payload.justificacion_periodicidad_emo
     if payload.periodicidad_emo_meses > 12 and not (justificacion_periodicidad_emo and justificacion_periodicidad_emo.strip()):
+        # La justificación se guarda: siempre con los insumos al momento, no
+        # con el snapshot (que solo sirve para los borradores de solo lectura)
         justificacion_periodicidad_emo = generate_justificacion_periodicidad_emo_from_db(
             db,
             cargo_id,
             payload.periodicidad_emo_meses,
             formato="breve",
+            inputs=compute_cargo_emo_inputs(db, cargo_id),
         )
 
     p = Profesiograma(
@@ -1463,6 +1521,8 @@ def create_profesiograma(
             raise HTTPException(status_code=400, detail="Uno o más criterios_exclusion_ids no existen")
         p.criterios_exclusion = criterios
 
+    # Los indicadores de la matriz del cargo cambiaron: el snapshot ya no vale
+    discard_emo_snapshot(db, p.cargo_id)
     db.commit()
     db.refresh(p)
     return _serialize_profesiograma(p)
@@ -1490,6 +1550,7 @@ def update_profesiograma(
                 p.cargo_id,
                 periodicidad_emo,
                 formato="breve",
+                inputs=compute_cargo_emo_inputs(db, p.cargo_id),
             )
             
     # Actualizar la periodicidad del cargo si cambia en el profesiograma
@@ -1655,6 +1716,8 @@ def update_profesiograma(
                 raise HTTPException(status_code=400, detail="Uno o más criterios_exclusion_ids no existen")
         p.criterios_exclusion = criterios
 
+    # Los indicadores de la matriz del cargo cambiaron: el snapshot ya no vale
+    discard_emo_snapshot(db, p.cargo_id)
     db.commit()
     db.refresh(p)
     return _serialize_profesiograma(p)
@@ -1665,7 +1728,7 @@ def export_profesiograma_pdf_by_cargo(
     cargo_id: int,
     download: bool = Query(True),
     current_user: User = Depends(require_supervisor_or_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> StreamingResponse:
     cargo = db.query(Cargo).filter(Cargo.id == cargo_id).first()
     if not cargo:
@@ -1703,8 +1766,11 @@ def export_profesiograma_pdf_by_cargo(
 def export_profesiograma_matriz_excel(
     profesiograma_id: int,
     current_user: User = Depends(require_supervisor_or_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> StreamingResponse:
+    import openpyxl
+    from openpyxl.styles import Alignment, Font, PatternFill
+
     p = db.query(Profesiograma).filter(Profesiograma.id == profesiograma_id).first()
     if not p:
         raise HTTPException(status_code=404, detail="Profesiograma no encontrado")
@@ -2241,7 +2307,7 @@ def _render_matriz_gtc45_markdown(p: Profesiograma) -> str:
 def export_profesiograma_matriz_markdown(
     profesiograma_id: int,
     current_user: User = Depends(require_supervisor_or_admin),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> StreamingResponse:
     p = db.query(Profesiograma).filter(Profesiograma.id == profesiograma_id).first()
     if not p:
@@ -1,17 +1,15 @@
 import io
 from datetime import datetime
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-import weasyprint
+if TYPE_CHECKING:
+    from openpyxl.styles import Border, PatternFill
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import get_current_user, require_supervisor_or_admin
 from app.models.user import User
 from app.models.programa_capacitaciones import (
@@ -37,11 +35,12 @@ from app.schemas.programa_capacitaciones import (
     KpiMesData,
 )
 from app.services.capacitacion_template import (
-    get_plantilla_actividades,
+    get_plantilla_filas,
     INDICADOR_INFO,
     CICLO_LABELS,
     NOMBRE_MESES,
 )
+from app.services.template_instantiation import TemplateRow, instantiate
 
 router = APIRouter()
 
@@ -84,11 +83,15 @@ TIPO_ORDER = ['CUMPLIMIENTO', 'COBERTURA', 'EFICACIA']
 # HELPERS
 # =====================================================================
 
-def _make_fill(hex_color: str) -> PatternFill:
+def _make_fill(hex_color: str) -> "PatternFill":
+    from openpyxl.styles import PatternFill
+
     return PatternFill(start_color=hex_color, end_color=hex_color, fill_type='solid')
 
 
-def _thin_border() -> Border:
+def _thin_border() -> "Border":
+    from openpyxl.styles import Border, Side
+
     s = Side(style='thin', color='BDBDBD')
     return Border(left=s, right=s, top=s, bottom=s)
 
@@ -248,37 +251,26 @@ def crear_desde_plantilla(
     db.add(programa)
     db.flush()
 
-    # Crear actividades con 12 seguimientos cada una
-    for act_data in get_plantilla_actividades(año):
-        meses_programados = act_data.pop("meses_programados", [])
-        actividad = CapacitacionActividad(programa_id=programa.id, **act_data)
-        db.add(actividad)
-        db.flush()
-        for mes in range(1, 13):
-            db.add(CapacitacionSeguimiento(
-                actividad_id=actividad.id,
-                mes=mes,
-                programada=(mes in meses_programados),
-                ejecutada=False,
-            ))
-
-    # Inicializar 36 filas de indicadores: 3 tipos × 12 meses
+    # Actividades con 12 seguimientos cada una y 36 filas de indicadores
+    # (3 tipos × 12 meses), insertadas por lotes
     metas = {
         'CUMPLIMIENTO': programa.meta_cumplimiento,
         'COBERTURA': programa.meta_cobertura,
         'EFICACIA': programa.meta_eficacia,
     }
-    for tipo in TIPO_ORDER:
-        for mes in range(1, 13):
-            db.add(CapacitacionIndicadorMensual(
-                programa_id=programa.id,
-                tipo_indicador=tipo,
-                mes=mes,
-                numerador=0.0,
-                denominador=0.0,
-                valor_porcentaje=0.0,
-                meta=metas[tipo],
-            ))
+    indicadores = [
+        TemplateRow(CapacitacionIndicadorMensual, {
+            "tipo_indicador": tipo,
+            "mes": mes,
+            "numerador": 0.0,
+            "denominador": 0.0,
+            "valor_porcentaje": 0.0,
+            "meta": metas[tipo],
+        }, "programa_id")
+        for tipo in TIPO_ORDER
+        for mes in range(1, 13)
+    ]
+    instantiate(db, get_plantilla_filas(año) + indicadores, parent_id=programa.id)
 
     db.commit()
     db.refresh(programa)
@@ -529,7 +521,7 @@ def obtener_dashboard(
 @router.get("/{programa_id}/exportar/excel")
 def exportar_excel(
     programa_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Exporta el Programa de Capacitaciones a Excel (.xlsx)."""
@@ -560,6 +552,10 @@ def exportar_excel(
     COL_TOT_E = FIXED + 24 + 2
     COL_PCT = FIXED + 24 + 3
 
+    import openpyxl
+    from openpyxl.styles import Font, Alignment
+    from openpyxl.utils import get_column_letter
+
     wb = openpyxl.Workbook()
 
     # ── Hoja 1: Cronograma ────────────────────────────────────────
@@ -771,7 +767,7 @@ def exportar_excel(
 @router.get("/{programa_id}/exportar/pdf")
 def exportar_pdf(
     programa_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user),
 ):
     """Exporta el Programa de Capacitaciones a PDF (cronograma + fichas de indicadores)."""
@@ -1093,6 +1089,8 @@ def exportar_pdf(
 </body>
 </html>"""
 
+    import weasyprint
+
     pdf_bytes = weasyprint.HTML(string=html).write_pdf(
         metadata={
             "title": f"Programa de Capacitaciones {programa.año}",
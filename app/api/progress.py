@@ -3,9 +3,10 @@ from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
 
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.dependencies import get_current_active_user, require_admin
 from app.models.user import User
 from app.models.course import Course, CourseModule, CourseMaterial
@@ -14,115 +15,11 @@ from app.models.user_progress import UserMaterialProgress, UserModuleProgress, M
 from app.models.interactive_lesson import InteractiveLesson, LessonStatus
 from app.models.interactive_progress import UserLessonProgress, LessonProgressStatus
 from app.schemas.common import MessageResponse
+from app.services import course_progress
 
 router = APIRouter()
 
 
-def _calculate_module_progress_with_lessons(
-    db: Session, user_id: int, module_id: int, enrollment_id: int
-) -> tuple:
-    """
-    Calculate module progress including both materials and interactive lessons.
-    Returns (completed_items, total_items, progress_percentage)
-    """
-    # Count materials
-    module_materials = db.query(CourseMaterial).filter(
-        CourseMaterial.module_id == module_id
-    ).all()
-    completed_materials = db.query(UserMaterialProgress).filter(
-        and_(
-            UserMaterialProgress.user_id == user_id,
-            UserMaterialProgress.material_id.in_([m.id for m in module_materials]),
-            UserMaterialProgress.status == MaterialProgressStatus.COMPLETED
-        )
-    ).count() if module_materials else 0
-
-    # Count interactive lessons (only published ones)
-    module_lessons = db.query(InteractiveLesson).filter(
-        and_(
-            InteractiveLesson.module_id == module_id,
-            InteractiveLesson.status == LessonStatus.PUBLISHED
-        )
-    ).all()
-    completed_lessons = db.query(UserLessonProgress).filter(
-        and_(
-            UserLessonProgress.user_id == user_id,
-            UserLessonProgress.lesson_id.in_([l.id for l in module_lessons]),
-            UserLessonProgress.enrollment_id == enrollment_id,
-            UserLessonProgress.status == LessonProgressStatus.COMPLETED.value
-        )
-    ).count() if module_lessons else 0
-
-    # Calculate totals
-    total_items = len(module_materials) + len(module_lessons)
-    completed_items = completed_materials + completed_lessons
-
-    progress_percentage = (completed_items / total_items * 100) if total_items > 0 else 0
-
-    return completed_items, total_items, progress_percentage
-
-
-def _check_pending_requirements(db: Session, user_id: int, course_id: int):
-    """
-    Check if there are any pending surveys or evaluations for the course.
-    Returns (pending_surveys, pending_evaluations) lists.
-    """
-    from app.models.survey import Survey, UserSurvey, SurveyStatus, UserSurveyStatus
-    from app.models.evaluation import Evaluation, UserEvaluation, UserEvaluationStatus, EvaluationStatus
-
-    # Check required surveys
-    required_surveys = db.query(Survey).filter(
-        and_(
-            Survey.course_id == course_id,
-            Survey.required_for_completion == True,
-            Survey.status == SurveyStatus.PUBLISHED
-        )
-    ).all()
-    
-    pending_surveys = []
-    for survey in required_surveys:
-        user_submission = db.query(UserSurvey).filter(
-            and_(
-                UserSurvey.user_id == user_id,
-                UserSurvey.survey_id == survey.id,
-                UserSurvey.status == UserSurveyStatus.COMPLETED
-            )
-        ).first()
-        
-        if not user_submission:
-            pending_surveys.append({
-                "id": survey.id,
-                "title": survey.title
-            })
-            
-    # Check published evaluations (all are required for 100% completion)
-    course_evaluations = db.query(Evaluation).filter(
-        and_(
-            Evaluation.course_id == course_id,
-            Evaluation.status == EvaluationStatus.PUBLISHED
-        )
-    ).all()
-    
-    pending_evaluations = []
-    for evaluation in course_evaluations:
-        # Check if passed
-        passed_evaluation = db.query(UserEvaluation).filter(
-            and_(
-                UserEvaluation.user_id == user_id,
-                UserEvaluation.evaluation_id == evaluation.id,
-                UserEvaluation.passed == True
-            )
-        ).first()
-        
-        if not passed_evaluation:
-            pending_evaluations.append({
-                "id": evaluation.id,
-                "title": evaluation.title
-            })
-            
-    return pending_surveys, pending_evaluations
-
-
 @router.post("/material/{material_id}/start")
 async def start_material(
     material_id: int,
@@ -224,61 +121,13 @@ async def complete_material(
             detail="Progreso del material no encontrado. Inicie el material primero."
         )
     
-    # Complete the material
+    # Complete the material and update module/course counters in the same transaction
     progress.complete_material()
-    db.commit()
-    db.refresh(progress)
-    
-    # Update module progress
     material = db.query(CourseMaterial).filter(CourseMaterial.id == material_id).first()
-    module_id = material.module_id
-
-    # Calculate module progress including materials and interactive lessons
-    completed_items, total_items, module_progress_percentage = _calculate_module_progress_with_lessons(
-        db, current_user.id, module_id, progress.enrollment_id
-    )
-
-    # Update or create module progress
-    module_progress = db.query(UserModuleProgress).filter(
-        and_(
-            UserModuleProgress.user_id == current_user.id,
-            UserModuleProgress.module_id == module_id
-        )
-    ).first()
-
-    if not module_progress:
-        module_progress = UserModuleProgress(
-            user_id=current_user.id,
-            module_id=module_id,
-            enrollment_id=progress.enrollment_id
-        )
-        db.add(module_progress)
-
-    module_progress.materials_completed = completed_items
-    module_progress.total_materials = total_items
-    module_progress.calculate_progress()
-    
-    # Update overall course progress
-    module = db.query(CourseModule).filter(CourseModule.id == module_id).first()
-    course_modules = db.query(CourseModule).filter(CourseModule.course_id == module.course_id).all()
-    
-    # Calculate course progress as average of all module progress percentages
-    total_progress = 0
-    for course_module in course_modules:
-        module_prog = db.query(UserModuleProgress).filter(
-            and_(
-                UserModuleProgress.user_id == current_user.id,
-                UserModuleProgress.module_id == course_module.id
-            )
-        ).first()
-        if module_prog:
-            total_progress += module_prog.progress_percentage
-    
-    course_progress_percentage = total_progress / len(course_modules) if course_modules else 0
-    
-    # Update enrollment progress
     enrollment = db.query(Enrollment).filter(Enrollment.id == progress.enrollment_id).first()
-    enrollment.update_progress(course_progress_percentage)
+    module_progress, course_progress_percentage = course_progress.record_module_activity(
+        db, enrollment, material.module_id
+    )
     
     # Note: Enrollment completion is now handled by the course completion logic
     # that considers materials, surveys, and evaluations together
@@ -291,7 +140,7 @@ async def complete_material(
         "material_progress": progress.progress_percentage,
         "module_progress": module_progress.progress_percentage,
         "course_progress": course_progress_percentage,
-        "course_completed": course_progress_percentage >= 95  # Course considered complete at 95%
+        "course_completed": course_progress_percentage >= course_progress.COMPLETION_THRESHOLD
     }
 
 
@@ -343,16 +192,20 @@ async def update_material_progress(
 async def get_course_progress(
     course_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> Any:
     """
     Get detailed progress for a course
     """
     # Check enrollment (admins can view any course progress)
-    enrollment = db.query(Enrollment).filter(
-        and_(
-            Enrollment.user_id == current_user.id,
-            Enrollment.course_id == course_id
+    enrollment = (
+        await db.scalars(
+            select(Enrollment).where(
+                and_(
+                    Enrollment.user_id == current_user.id,
+                    Enrollment.course_id == course_id
+                )
+            ).limit(1)
         )
     ).first()
     
@@ -367,21 +220,25 @@ async def get_course_progress(
         from app.models.enrollment import EnrollmentStatus
         
         # Get all enrollments for this course to show aggregated data
-        all_enrollments = db.query(Enrollment).filter(Enrollment.course_id == course_id).all()
+        has_enrollments = (
+            await db.scalar(select(Enrollment.id).where(Enrollment.course_id == course_id).limit(1))
+        ) is not None
         
         class MockEnrollment:
             def __init__(self):
                 self.id = 0
-                self.progress = 100 if all_enrollments else 0  # Show 100% to enable admin features
+                self.progress = 100 if has_enrollments else 0  # Show 100% to enable admin features
                 self.status = EnrollmentStatus.ACTIVE.value
         enrollment = MockEnrollment()
     
     # Get course modules with materials in a single query
-    modules = db.query(CourseModule).filter(CourseModule.course_id == course_id).all()
+    modules = (await db.scalars(select(CourseModule).where(CourseModule.course_id == course_id))).all()
     module_ids = [module.id for module in modules]
     
     # Get all materials for all modules in one query
-    all_materials = db.query(CourseMaterial).filter(CourseMaterial.module_id.in_(module_ids)).all()
+    all_materials = (
+        await db.scalars(select(CourseMaterial).where(CourseMaterial.module_id.in_(module_ids)))
+    ).all()
     materials_by_module = {}
     for material in all_materials:
         if material.module_id not in materials_by_module:
@@ -389,10 +246,14 @@ async def get_course_progress(
         materials_by_module[material.module_id].append(material)
 
     # Get all interactive lessons for all modules (only published)
-    all_lessons = db.query(InteractiveLesson).filter(
-        and_(
-            InteractiveLesson.module_id.in_(module_ids),
-            InteractiveLesson.status == LessonStatus.PUBLISHED
+    all_lessons = (
+        await db.scalars(
+            select(InteractiveLesson).where(
+                and_(
+                    InteractiveLesson.module_id.in_(module_ids),
+                    InteractiveLesson.status == LessonStatus.PUBLISHED
+                )
+            )
         )
     ).all()
     lessons_by_module = {}
@@ -404,19 +265,27 @@ async def get_course_progress(
     # Get all module progress in one query
     if current_user.role == "admin" and not enrollment.id:
         # For admins, get any completed modules
-        module_progress_data = db.query(UserModuleProgress).filter(
-            and_(
-                UserModuleProgress.module_id.in_(module_ids),
-                UserModuleProgress.status == MaterialProgressStatus.COMPLETED
+        module_progress_data = (
+            await db.scalars(
+                select(UserModuleProgress).where(
+                    and_(
+                        UserModuleProgress.module_id.in_(module_ids),
+                        UserModuleProgress.status == MaterialProgressStatus.COMPLETED
+                    )
+                )
             )
         ).all()
         module_progress_dict = {mp.module_id: mp for mp in module_progress_data}
     else:
         # For regular users, get their specific progress
-        module_progress_data = db.query(UserModuleProgress).filter(
-            and_(
-                UserModuleProgress.user_id == current_user.id,
-                UserModuleProgress.module_id.in_(module_ids)
+        module_progress_data = (
+            await db.scalars(
+                select(UserModuleProgress).where(
+                    and_(
+                        UserModuleProgress.user_id == current_user.id,
+                        UserModuleProgress.module_id.in_(module_ids)
+                    )
+                )
             )
         ).all()
         module_progress_dict = {mp.module_id: mp for mp in module_progress_data}
@@ -425,19 +294,27 @@ async def get_course_progress(
     material_ids = [material.id for material in all_materials]
     if current_user.role == "admin" and not enrollment.id:
         # For admins, get any completed materials
-        material_progress_data = db.query(UserMaterialProgress).filter(
-            and_(
-                UserMaterialProgress.material_id.in_(material_ids),
-                UserMaterialProgress.status == MaterialProgressStatus.COMPLETED
+        material_progress_data = (
+            await db.scalars(
+                select(UserMaterialProgress).where(
+                    and_(
+                        UserMaterialProgress.material_id.in_(material_ids),
+                        UserMaterialProgress.status == MaterialProgressStatus.COMPLETED
+                    )
+                )
             )
         ).all()
         material_progress_dict = {mp.material_id: mp for mp in material_progress_data}
     else:
         # For regular users, get their specific progress
-        material_progress_data = db.query(UserMaterialProgress).filter(
-            and_(
-                UserMaterialProgress.user_id == current_user.id,
-                UserMaterialProgress.material_id.in_(material_ids)
+        material_progress_data = (
+            await db.scalars(
+                select(UserMaterialProgress).where(
+                    and_(
+                        UserMaterialProgress.user_id == current_user.id,
+                        UserMaterialProgress.material_id.in_(material_ids)
+                    )
+                )
             )
         ).all()
         material_progress_dict = {mp.material_id: mp for mp in material_progress_data}
@@ -446,19 +323,27 @@ async def get_course_progress(
     lesson_ids = [lesson.id for lesson in all_lessons]
     if current_user.role == "admin" and not enrollment.id:
         # For admins, get any completed lessons
-        lesson_progress_data = db.query(UserLessonProgress).filter(
-            and_(
-                UserLessonProgress.lesson_id.in_(lesson_ids),
-                UserLessonProgress.status == LessonProgressStatus.COMPLETED.value
+        lesson_progress_data = (
+            await db.scalars(
+                select(UserLessonProgress).where(
+                    and_(
+                        UserLessonProgress.lesson_id.in_(lesson_ids),
+                        UserLessonProgress.status == LessonProgressStatus.COMPLETED.value
+                    )
+                )
             )
         ).all() if lesson_ids else []
         lesson_progress_dict = {lp.lesson_id: lp for lp in lesson_progress_data}
     else:
         # For regular users, get their specific progress
-        lesson_progress_data = db.query(UserLessonProgress).filter(
-            and_(
-                UserLessonProgress.user_id == current_user.id,
-                UserLessonProgress.lesson_id.in_(lesson_ids)
+        lesson_progress_data = (
+            await db.scalars(
+                select(UserLessonProgress).where(
+                    and_(
+                        UserLessonProgress.user_id == current_user.id,
+                        UserLessonProgress.lesson_id.in_(lesson_ids)
+                    )
+                )
             )
         ).all() if lesson_ids else []
         lesson_progress_dict = {lp.lesson_id: lp for lp in lesson_progress_data}
@@ -519,107 +404,50 @@ async def get_course_progress(
     else:
         course_progress_percentage = 0
 
+    # Surveys, evaluations and the user's answers to them, loaded in batch
+    requirements = await course_progress.load_requirement_status_async(db, current_user.id, course_id)
+
     # Check for pending required surveys if course is completed
     pending_surveys = []
     if course_progress_percentage >= 90:
-        from app.models.survey import Survey, UserSurvey, SurveyStatus, UserSurveyStatus
-        
-        # Get required surveys for this course
-        required_surveys = db.query(Survey).filter(
-            and_(
-                Survey.course_id == course_id,
-                Survey.required_for_completion == True,
-                Survey.status == SurveyStatus.PUBLISHED
-            )
-        ).all()
-        
-        # Check which surveys are still pending
-        for survey in required_surveys:
-            user_submission = db.query(UserSurvey).filter(
-                and_(
-                    UserSurvey.user_id == current_user.id,
-                    UserSurvey.survey_id == survey.id,
-                    UserSurvey.status == UserSurveyStatus.COMPLETED
-                )
-            ).first()
-            
-            if not user_submission:
-                pending_surveys.append({
-                    "id": survey.id,
-                    "title": survey.title,
-                    "description": survey.description
-                })
+        pending_surveys = [
+            {
+                "id": survey.id,
+                "title": survey.title,
+                "description": survey.description
+            }
+            for survey in requirements.pending_required_surveys
+        ]
     
     # Check if user has already completed the evaluation for this course
     evaluation_completed = False
     evaluation_score = None
     evaluation_status = "not_started"
     if enrollment.progress >= 100 and len(pending_surveys) == 0:
-        from app.models.evaluation import Evaluation, UserEvaluation, UserEvaluationStatus
-        from app.schemas.evaluation import EvaluationStatus
-        
-        # Get evaluations for this course
-        course_evaluations = db.query(Evaluation).filter(
-            and_(
-                Evaluation.course_id == course_id,
-                Evaluation.status == EvaluationStatus.PUBLISHED
+        from app.models.evaluation import UserEvaluationStatus
+
+        for evaluation in requirements.evaluations:
+            attempts = requirements.user_evaluations.get(evaluation.id, [])
+            completed_evaluation = next(
+                (attempt for attempt in attempts if attempt.status == UserEvaluationStatus.COMPLETED),
+                None
             )
-        ).all()
-        
-        # Check if user has completed any evaluation for this course
-        for evaluation in course_evaluations:
-            completed_evaluation = db.query(UserEvaluation).filter(
-                and_(
-                    UserEvaluation.user_id == current_user.id,
-                    UserEvaluation.evaluation_id == evaluation.id,
-                    UserEvaluation.status == UserEvaluationStatus.COMPLETED
-                )
-            ).first()
-            
             if completed_evaluation:
                 evaluation_completed = True
                 evaluation_score = completed_evaluation.percentage
                 evaluation_status = "completed"
                 break
-            else:
-                # Check if user has started but not completed
-                started_evaluation = db.query(UserEvaluation).filter(
-                    and_(
-                        UserEvaluation.user_id == current_user.id,
-                        UserEvaluation.evaluation_id == evaluation.id
-                    )
-                ).first()
-                if started_evaluation:
-                    evaluation_status = "in_progress"
+            elif attempts:
+                # User has started but not completed
+                evaluation_status = "in_progress"
     
     # Check survey completion status
     survey_status = "not_started"
     completed_surveys_count = 0
     total_surveys_count = 0
     if course_progress_percentage >= 90:
-        from app.models.survey import Survey, UserSurvey, SurveyStatus, UserSurveyStatus
-        
-        # Get all surveys for this course (not just required ones)
-        all_surveys = db.query(Survey).filter(
-            and_(
-                Survey.course_id == course_id,
-                Survey.status == SurveyStatus.PUBLISHED
-            )
-        ).all()
-        
-        total_surveys_count = len(all_surveys)
-        
-        for survey in all_surveys:
-            user_submission = db.query(UserSurvey).filter(
-                and_(
-                    UserSurvey.user_id == current_user.id,
-                    UserSurvey.survey_id == survey.id,
-                    UserSurvey.status == UserSurveyStatus.COMPLETED
-                )
-            ).first()
-            
-            if user_submission:
-                completed_surveys_count += 1
+        total_surveys_count = len(requirements.surveys)
+        completed_surveys_count = requirements.completed_surveys_count
         
         if completed_surveys_count == total_surveys_count and total_surveys_count > 0:
             survey_status = "completed"
@@ -629,30 +457,37 @@ async def get_course_progress(
             survey_status = "available"
     
     # Get course information for passing_score
-    course = db.query(Course).filter(Course.id == course_id).first()
+    course = await db.get(Course, course_id)
     
-    # Note: course_progress_percentage is already calculated above
-        
-    # Check pending requirements (Surveys and Evaluations)
-    # Use the helper to get fresh status
-    # Note: pending_surveys variable above might be incomplete/old logic, so we check again for gating
-    pending_surveys_check, pending_evaluations_check = _check_pending_requirements(db, current_user.id, course_id)
+    # Check pending requirements (Surveys and Evaluations) for gating
+    pending_surveys_check = requirements.pending_required_surveys
+    pending_evaluations_check = requirements.pending_evaluations
     
     # Cap progress if requirements are not met
     if course_progress_percentage >= 100:
         if pending_surveys_check or pending_evaluations_check:
             course_progress_percentage = 99.0  # Cap at 99% if pending items
 
-    # Update enrollment progress if it's different
-    if enrollment and abs(enrollment.progress - course_progress_percentage) > 0.01:
-        enrollment.progress = course_progress_percentage
-        
-        # Auto-complete enrollment if 100%
-        if course_progress_percentage >= 100 and not enrollment.completed_at:
-            enrollment.complete_enrollment()
+    # Keep the enrollment progress and counters in sync with what was just loaded
+    if isinstance(enrollment, Enrollment):
+        changed = False
+        if enrollment.required_surveys_completed != requirements.required_surveys_completed:
+            enrollment.required_surveys_completed = requirements.required_surveys_completed
+            changed = True
+        if enrollment.evaluations_passed != requirements.evaluations_passed:
+            enrollment.evaluations_passed = requirements.evaluations_passed
+            changed = True
+        if abs(enrollment.progress - course_progress_percentage) > 0.01:
+            enrollment.progress = course_progress_percentage
+            changed = True
             
-        db.commit()
-        db.refresh(enrollment)
+            # Auto-complete enrollment if 100% (run_sync: complete_enrollment() lazy-loads the course)
+            if course_progress_percentage >= 100 and not enrollment.completed_at:
+                await db.run_sync(lambda _session: enrollment.complete_enrollment())
+        
+        if changed:
+            await db.commit()
+            await db.refresh(enrollment)
     
     return {
         "course_id": course_id,
@@ -660,10 +495,10 @@ async def get_course_progress(
         "overall_progress": course_progress_percentage,
         "status": enrollment.status,
         "modules": modules_progress,
-        "can_take_survey": course_progress_percentage >= 95,  # Allow surveys when progress is 95% or higher
-        "can_take_evaluation": course_progress_percentage >= 95 and len(pending_surveys) == 0 and not evaluation_completed,  # Can only take evaluation after completing required surveys and if not already completed
+        "can_take_survey": course_progress_percentage >= course_progress.COMPLETION_THRESHOLD,  # Allow surveys when progress is 95% or higher
+        "can_take_evaluation": course_progress_percentage >= course_progress.COMPLETION_THRESHOLD and len(pending_surveys) == 0 and not evaluation_completed,  # Can only take evaluation after completing required surveys and if not already completed
         "pending_surveys": pending_surveys,
-        "course_completed": course_progress_percentage >= 95 and len(pending_surveys) == 0,  # Course considered complete at 95% with all surveys done
+        "course_completed": course_progress_percentage >= course_progress.COMPLETION_THRESHOLD and len(pending_surveys) == 0,  # Course considered complete at 95% with all surveys done
         "evaluation_completed": evaluation_completed,
         "evaluation_score": evaluation_score,
         "evaluation_status": evaluation_status,
@@ -835,69 +670,9 @@ async def reset_material_progress(
         print(f"WARNING: material_id was None for progress ID {progress.id}, setting to {material_id}")
         progress.material_id = material_id
     
-    db.commit()
-    db.refresh(progress)
-    
-    # Recalculate module progress
+    # Recalculate module and course counters for the user's enrollment
     module_id = material.module_id
-    module_materials = db.query(CourseMaterial).filter(CourseMaterial.module_id == module_id).all()
-    completed_materials = db.query(UserMaterialProgress).filter(
-        and_(
-            UserMaterialProgress.user_id == user_id,
-            UserMaterialProgress.material_id.in_([m.id for m in module_materials]),
-            UserMaterialProgress.status == MaterialProgressStatus.COMPLETED
-        )
-    ).count()
-    
-    # Update module progress
-    module_progress = db.query(UserModuleProgress).filter(
-        and_(
-            UserModuleProgress.user_id == user_id,
-            UserModuleProgress.module_id == module_id
-        )
-    ).first()
-    
-    if module_progress:
-        # Ensure module_id is not null
-        if module_progress.module_id is None:
-            print(f"WARNING: module_id was None for module progress, setting to {module_id}")
-            module_progress.module_id = module_id
-            
-        module_progress.materials_completed = completed_materials
-        module_progress.total_materials = len(module_materials)
-        module_progress.calculate_progress()
-        
-        # Log for debugging
-        print(f"Updated module progress: module_id={module_progress.module_id}, status={module_progress.status}, progress={module_progress.progress_percentage}%")
-        
-        # If no materials are completed, reset module status
-        if completed_materials == 0:
-            module_progress.status = MaterialProgressStatus.NOT_STARTED
-            module_progress.started_at = None
-            module_progress.completed_at = None
-        
-        # Log for debugging
-        print(f"Updated module progress: module_id={module_progress.module_id}, status={module_progress.status}, progress={module_progress.progress_percentage}%")
-    
-    # Recalculate course progress
     module = db.query(CourseModule).filter(CourseModule.id == module_id).first()
-    course_modules = db.query(CourseModule).filter(CourseModule.course_id == module.course_id).all()
-    
-    # Calculate course progress as average of all module progress percentages
-    total_progress = 0
-    for course_module in course_modules:
-        module_prog = db.query(UserModuleProgress).filter(
-            and_(
-                UserModuleProgress.user_id == user_id,
-                UserModuleProgress.module_id == course_module.id
-            )
-        ).first()
-        if module_prog:
-            total_progress += module_prog.progress_percentage
-    
-    course_progress_percentage = total_progress / len(course_modules) if course_modules else 0
-    
-    # Update enrollment progress
     enrollment = db.query(Enrollment).filter(
         and_(
             Enrollment.user_id == user_id,
@@ -905,8 +680,21 @@ async def reset_material_progress(
         )
     ).first()
     
+    module_progress = None
+    course_progress_percentage = 0
     if enrollment:
-        enrollment.update_progress(course_progress_percentage)
+        module_progress = course_progress.refresh_module_progress(db, user_id, enrollment.id, module_id)
+        
+        # If no items are completed, reset module status
+        if module_progress.materials_completed == 0:
+            module_progress.status = MaterialProgressStatus.NOT_STARTED
+            module_progress.started_at = None
+            module_progress.completed_at = None
+        elif module_progress.progress_percentage < 100:
+            module_progress.status = MaterialProgressStatus.IN_PROGRESS
+            module_progress.completed_at = None
+        
+        course_progress_percentage = course_progress.refresh_enrollment_progress(db, enrollment)
         
         # If course progress drops below 100%, reset completion status
         if course_progress_percentage < 100 and enrollment.completed_at:
@@ -7,7 +7,7 @@ from sqlalchemy import and_, or_, func, extract
 import os
 
 from app.dependencies import get_current_active_user, has_role_or_custom
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.user import User, UserRole
 from app.models.course import Course
 from app.models.enrollment import Enrollment
@@ -32,7 +32,7 @@ router = APIRouter()
 async def get_dashboard_stats(
     trailing_slash: str = "",
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get dashboard statistics
@@ -111,7 +111,7 @@ async def get_course_reports(
     start_date: date = None,
     end_date: date = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get course reports
@@ -227,7 +227,7 @@ async def get_user_reports(
     start_date: date = None,
     end_date: date = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get user reports
@@ -340,7 +340,7 @@ async def get_attendance_reports(
     start_date: date = None,
     end_date: date = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get attendance reports
@@ -430,7 +430,7 @@ async def get_evaluation_reports(
     start_date: date = None,
     end_date: date = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get evaluation reports
@@ -538,7 +538,7 @@ async def get_certificate_reports(
     start_date: date = None,
     end_date: date = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get certificate reports
@@ -625,7 +625,7 @@ async def export_report(
     format: ExportFormat = Query(ExportFormat.CSV, description="Export format"),
     filters: ReportFilters = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Export report data
@@ -650,7 +650,7 @@ async def get_analytics_trends(
     start_date: date = None,
     end_date: date = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get analytics trends
@@ -713,7 +713,7 @@ async def get_performance_analytics(
     course_id: int = None,
     user_id: int = None,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get performance analytics
@@ -809,7 +809,7 @@ async def get_evaluation_ranking(
     limit: int = Query(10, description="Number of top performers to return"),
     course_id: int = Query(None, description="Filter by specific course"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Get ranking of employees by evaluation performance
@@ -1083,7 +1083,7 @@ async def generate_occupational_exam_report_pdf(
     overdue_only: bool = False,
     download: bool = Query(True, description="Si se debe descargar el archivo"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     Generate PDF report for occupational exams
@@ -1096,7 +1096,7 @@ async def generate_occupational_exam_report_pdf(
     
     try:
         # Import HTML to PDF converter and storage manager
-        from app.services.html_to_pdf import HTMLToPDFConverter
+        from app.services.html_to_pdf import get_html_to_pdf_converter
         from app.utils.storage import storage_manager
         from app.config import settings
         
@@ -1194,7 +1194,7 @@ async def generate_occupational_exam_report_pdf(
         local_filepath = os.path.join(reports_dir, filename)
         
         # Initialize HTML to PDF converter
-        converter = HTMLToPDFConverter()
+        converter = get_html_to_pdf_converter()
         
         # Generate PDF content
         pdf_content = converter.generate_occupational_exam_report_pdf(template_data)
@@ -3,7 +3,7 @@ API endpoints para Sectores Económicos.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -11,6 +11,7 @@ from app.database import get_db
 from app.dependencies import get_current_active_user, require_admin
 from app.models.sector_economico import SectorEconomico
 from app.models.user import User
+from app.utils.catalog_cache import catalog_cache
 from app.schemas.sector_economico import (
     SectorEconomico as SectorEconomicoSchema,
     SectorEconomicoCreate,
@@ -23,36 +24,44 @@ router = APIRouter()
 
 @router.get("/", response_model=List[SectorEconomicoSchema])
 def list_sectores_economicos(
+    request: Request,
     activo: Optional[bool] = Query(None, description="Filtrar por estado activo"),
     q: Optional[str] = Query(None, description="Buscar por nombre o código"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """Lista todos los sectores económicos."""
-    query = db.query(SectorEconomico)
+    def load():
+        query = db.query(SectorEconomico)
 
-    if activo is not None:
-        query = query.filter(SectorEconomico.activo == activo)
+        if activo is not None:
+            query = query.filter(SectorEconomico.activo == activo)
 
-    if q:
-        search = f"%{q}%"
-        query = query.filter(
-            (SectorEconomico.nombre.ilike(search)) |
-            (SectorEconomico.codigo.ilike(search))
-        )
+        if q:
+            search = f"%{q}%"
+            query = query.filter(
+                (SectorEconomico.nombre.ilike(search)) |
+                (SectorEconomico.codigo.ilike(search))
+            )
 
-    return query.order_by(SectorEconomico.nombre).all()
+        return query.order_by(SectorEconomico.nombre).all()
+
+    return catalog_cache.respond(request, "sectores_economicos", List[SectorEconomicoSchema], load)
 
 
 @router.get("/activos", response_model=List[SectorEconomicoSimple])
 def list_sectores_activos(
+    request: Request,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """Lista solo los sectores económicos activos (para selectores)."""
-    return db.query(SectorEconomico).filter(
-        SectorEconomico.activo == True
-    ).order_by(SectorEconomico.nombre).all()
+    def load():
+        return db.query(SectorEconomico).filter(
+            SectorEconomico.activo == True
+        ).order_by(SectorEconomico.nombre).all()
+
+    return catalog_cache.respond(request, "sectores_economicos", List[SectorEconomicoSimple], load)
 
 
 @router.get("/{sector_id}", response_model=SectorEconomicoSchema)
@@ -107,6 +116,7 @@ def create_sector_economico(
     sector = SectorEconomico(**payload.model_dump())
     db.add(sector)
     db.commit()
+    catalog_cache.invalidate("sectores_economicos")
     db.refresh(sector)
 
     return sector
@@ -166,6 +176,7 @@ def update_sector_economico(
         setattr(sector, key, value)
 
     db.commit()
+    catalog_cache.invalidate("sectores_economicos")
     db.refresh(sector)
 
     return sector
@@ -211,5 +222,6 @@ def delete_sector_economico(
 
     db.delete(sector)
     db.commit()
+    catalog_cache.invalidate("sectores_economicos")
 
     return None
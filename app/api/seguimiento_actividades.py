@@ -23,7 +23,7 @@ from app.schemas.seguimiento_actividad import (
 from app.schemas.common import MessageResponse
 from app.dependencies import get_current_user, require_supervisor_or_admin, require_manager_access
 from app.utils.storage import storage_manager
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.html_to_pdf import get_html_to_pdf_converter
 
 router = APIRouter()
 
@@ -323,7 +323,7 @@ async def generate_actividad_pdf(
         "worker_document": worker.document_number if worker else seguimiento.cedula,
     }
 
-    pdf_service = HTMLToPDFConverter()
+    pdf_service = get_html_to_pdf_converter()
 
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 
-from app.database import get_db
+from app.database import get_read_db
 from app.models.user import User
 from app.models.worker import Worker
 from app.models.course import Course
@@ -21,7 +21,7 @@ router = APIRouter()
 
 @router.get("/dashboard", response_model=SupervisorDashboardResponse)
 def get_supervisor_dashboard(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(PermissionChecker("dashboard", "view"))
 ):
     """
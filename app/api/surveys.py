@@ -1,14 +1,15 @@
 from typing import Any, List, Optional, Tuple
 from datetime import datetime, date
 import time
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from fastapi.responses import Response
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, func, select
 
 from app.dependencies import get_current_active_user, get_current_user, has_role_or_custom
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models.user import User, UserRole
 from app.models.survey import (
     Survey,
@@ -31,7 +32,9 @@ from app.schemas.survey import (
 )
 from pydantic import BaseModel
 from app.schemas.common import MessageResponse, PaginatedResponse
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.html_to_pdf import get_html_to_pdf_converter
+from app.services.pdf_artifact_cache import pdf_artifact_cache
+from app.utils.pagination import COUNT_DESCRIPTION, CURSOR_DESCRIPTION, CountMode, SortKey, paginate
 
 # Schema for assigning general surveys
 class SurveyAssignment(BaseModel):
@@ -358,6 +361,8 @@ async def get_surveys(
     search: str = None,
     course_id: int = None,
     status: SurveyStatus = None,
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[CountMode] = Query(None, description=COUNT_DESCRIPTION),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ) -> Any:
@@ -393,15 +398,14 @@ async def get_surveys(
         if not has_role_or_custom(current_user, ["admin", "trainer"]):
             query = query.filter(Survey.status == SurveyStatus.PUBLISHED)
     
-    # Get total count
-    total = query.count()
-    
     # Apply pagination
-    surveys = query.offset(skip).limit(limit).all()
+    result_page = paginate(
+        query, sort=[SortKey(Survey.id)], size=limit, offset=skip, cursor=cursor, count=count
+    )
     
     # Transform surveys to include course information
     survey_items = []
-    for survey in surveys:
+    for survey in result_page.items:
         course_ids, courses = _extract_course_info(survey)
         survey_dict = {
             "id": survey.id,
@@ -421,21 +425,7 @@ async def get_surveys(
         }
         survey_items.append(survey_dict)
     
-    # Calculate pagination info
-    page = (skip // limit) + 1
-    pages = (total + limit - 1) // limit  # Ceiling division
-    has_next = skip + limit < total
-    has_prev = skip > 0
-    
-    return PaginatedResponse(
-        items=survey_items,
-        total=total,
-        page=page,
-        size=limit,
-        pages=pages,
-        has_next=has_next,
-        has_prev=has_prev
-    )
+    return PaginatedResponse(items=survey_items, **result_page.meta())
 
 
 @router.post("/", response_model=SurveyResponse)
@@ -788,7 +778,7 @@ async def assign_general_survey(
 @router.get("/my-surveys", response_class=JSONResponse)
 async def get_my_surveys(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user's surveys with status (completed and pending)
@@ -797,33 +787,35 @@ async def get_my_surveys(
     from app.models.enrollment import Enrollment
     
     try:
-        # Get user's enrollments
-        user_enrollments = db.query(Enrollment).filter(
-            Enrollment.user_id == current_user.id
+        # Get course IDs from the user's enrollments
+        course_ids = (
+            await db.scalars(
+                select(Enrollment.course_id).where(Enrollment.user_id == current_user.id)
+            )
         ).all()
 
-        # Get course IDs from enrollments
-        course_ids = [enrollment.course_id for enrollment in user_enrollments]
-
         # Get published and closed surveys for these courses
         course_surveys = []
         if course_ids:
-            course_surveys = (
-                db.query(Survey)
-                .options(joinedload(Survey.course))
-                .filter(
-                    Survey.status.in_([SurveyStatus.PUBLISHED, SurveyStatus.CLOSED]),
-                    or_(
-                        Survey.course_id.in_(course_ids),
-                        Survey.survey_courses.any(SurveyCourse.course_id.in_(course_ids)),
-                    ),
-                )
-                .all()
+            course_surveys = list(
+                (
+                    await db.scalars(
+                        select(Survey)
+                        .options(joinedload(Survey.course))
+                        .where(
+                            Survey.status.in_([SurveyStatus.PUBLISHED, SurveyStatus.CLOSED]),
+                            or_(
+                                Survey.course_id.in_(course_ids),
+                                Survey.survey_courses.any(SurveyCourse.course_id.in_(course_ids)),
+                            ),
+                        )
+                    )
+                ).all()
             )
 
         # Get user's survey submissions to find assigned general surveys
-        user_surveys = db.query(UserSurvey).filter(
-            UserSurvey.user_id == current_user.id
+        user_surveys = (
+            await db.scalars(select(UserSurvey).where(UserSurvey.user_id == current_user.id))
         ).all()
 
         # Get general surveys that are directly assigned to this user
@@ -835,10 +827,16 @@ async def get_my_surveys(
 
         general_surveys = []
         if assigned_general_survey_ids:
-            general_surveys = db.query(Survey).options(joinedload(Survey.course)).filter(
-                Survey.id.in_(assigned_general_survey_ids),
-                Survey.status.in_([SurveyStatus.PUBLISHED, SurveyStatus.CLOSED])
-            ).all()
+            general_surveys = list(
+                (
+                    await db.scalars(
+                        select(Survey).options(joinedload(Survey.course)).where(
+                            Survey.id.in_(assigned_general_survey_ids),
+                            Survey.status.in_([SurveyStatus.PUBLISHED, SurveyStatus.CLOSED])
+                        )
+                    )
+                ).all()
+            )
         
         # Combine course surveys and general surveys
         available_surveys = course_surveys + general_surveys
@@ -1093,7 +1091,7 @@ async def export_nordic_pdf(
                 row[f"pct{label[1:]}"] = round((yes_count / total * 100) if total > 0 else 0, 1)
         region_data.append(row)
 
-    from app.services.html_to_pdf import HTMLToPDFConverter
+    from app.services.html_to_pdf import get_html_to_pdf_converter
     from datetime import datetime as dt
     template_data = {
         "survey_title": survey.title,
@@ -1102,7 +1100,11 @@ async def export_nordic_pdf(
         "regions": region_data,
         "generated_at": dt.now().strftime("%d/%m/%Y %H:%M"),
     }
-    pdf_bytes = HTMLToPDFConverter().generate_nordic_report_pdf(template_data)
+    pdf_bytes = pdf_artifact_cache.get_or_render(
+        "nordic_report.html",
+        template_data,
+        lambda: get_html_to_pdf_converter().generate_nordic_report_pdf(template_data),
+    )
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
@@ -1178,7 +1180,7 @@ async def export_burnout_pdf(
 
     dim_averages = {dim: round(dim_totals[dim] / total, 2) if total > 0 else 0 for dim in dim_totals}
 
-    from app.services.html_to_pdf import HTMLToPDFConverter
+    from app.services.html_to_pdf import get_html_to_pdf_converter
     from datetime import datetime as dt
     template_data = {
         "survey_title": survey.title,
@@ -1191,7 +1193,11 @@ async def export_burnout_pdf(
         "employee_rows": employee_rows,
         "generated_at": dt.now().strftime("%d/%m/%Y %H:%M"),
     }
-    pdf_bytes = HTMLToPDFConverter().generate_burnout_report_pdf(template_data)
+    pdf_bytes = pdf_artifact_cache.get_or_render(
+        "burnout_report.html",
+        template_data,
+        lambda: get_html_to_pdf_converter().generate_burnout_report_pdf(template_data),
+    )
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
@@ -2016,7 +2022,9 @@ async def submit_survey(
     # Check if course can be completed now that survey is submitted
     if related_course_ids and survey.required_for_completion:
         from app.api.courses import check_and_complete_course
+        from app.services import course_progress
         for related_course_id in related_course_ids:
+            course_progress.record_survey_completion(db, current_user.id, related_course_id)
             check_and_complete_course(db, current_user.id, related_course_id)
     
     return user_survey
@@ -2491,19 +2499,22 @@ async def get_survey_year_pdf_report(
     total_responses = completed_responses
     completion_rate = 1.0 if total_responses > 0 else 0
 
-    converter = HTMLToPDFConverter()
-    pdf_content = converter.generate_survey_year_report_pdf(
-        {
-            "survey_id": survey.id,
-            "survey_title": survey.title,
-            "survey_description": survey.description,
-            "course_title": survey.course.title if survey.course else None,
-            "year": year,
-            "total_responses": total_responses,
-            "completed_responses": completed_responses,
-            "completion_rate": completion_rate,
-            "question_statistics": question_stats,
-        }
+    template_data = {
+        "survey_id": survey.id,
+        "survey_title": survey.title,
+        "survey_description": survey.description,
+        "course_title": survey.course.title if survey.course else None,
+        "year": year,
+        "total_responses": total_responses,
+        "completed_responses": completed_responses,
+        "completion_rate": completion_rate,
+        "question_statistics": question_stats,
+    }
+    converter = get_html_to_pdf_converter()
+    pdf_content = pdf_artifact_cache.get_or_render(
+        "survey_year_report.html",
+        template_data,
+        lambda: converter.generate_survey_year_report_pdf(template_data),
     )
 
     filename = f"reporte_encuesta_{survey_id}_{year}.pdf"
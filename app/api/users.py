@@ -3,7 +3,6 @@ from typing import Any, List
 import json
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy import or_
 from sqlalchemy.exc import IntegrityError
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session, joinedload
@@ -15,6 +14,7 @@ from app.models.audit import AuditLog, AuditAction
 from app.schemas.user import UserResponse, UserRegister, UserUpdate, UserProfile, PasswordChange, UserCreate, UserCreateByAdmin
 from app.schemas.common import MessageResponse, PaginatedResponse
 from app.services.auth import AuthService
+from app.services.people_search import search_condition
 from app.config import settings
 
 security = HTTPBearer()
@@ -115,14 +115,14 @@ async def change_password(
     auth_service = AuthService()
     
     # Verify current password
-    if not auth_service.verify_password(password_change.current_password, current_user.hashed_password):
+    if not await auth_service.verify_password_async(password_change.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="La contraseña actual es incorrecta"
         )
     
     # Update password
-    current_user.hashed_password = auth_service.get_password_hash(password_change.new_password)
+    current_user.hashed_password = await auth_service.get_password_hash_async(password_change.new_password)
     db.commit()
     
     return MessageResponse(message="Contraseña cambiada exitosamente")
@@ -150,15 +150,7 @@ async def get_users(
     
     # Apply search filter if provided
     if search:
-        search_filter = f"%{search}%"
-        query = query.filter(
-            or_(
-                User.first_name.ilike(search_filter),
-                User.last_name.ilike(search_filter),
-                User.email.ilike(search_filter),
-                User.document_number.ilike(search_filter)
-            )
-        )
+        query = query.filter(search_condition(User, search))
     
     # Get total count
     total = query.count()
@@ -242,11 +234,11 @@ async def create_user(
     
     # Hash password only if provided
     if user_data.password:
-        hashed_password = auth_service.get_password_hash(user_data.password)
+        hashed_password = await auth_service.get_password_hash_async(user_data.password)
         is_verified = True
     else:
         # Set a temporary password that will be changed during registration
-        hashed_password = auth_service.get_password_hash('temp_password_123!')
+        hashed_password = await auth_service.get_password_hash_async('temp_password_123!')
         is_verified = False
     
     user = User(
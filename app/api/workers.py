@@ -4,19 +4,20 @@ from fastapi.responses import StreamingResponse, Response
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import or_, func
 from io import BytesIO
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill
 from datetime import datetime, date, timedelta
 import os
 import uuid
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.dependencies import get_current_user, get_current_active_user, require_admin, require_supervisor_or_admin, has_permission, has_role_or_custom
 from app.models.user import User, UserRole
 from app.models.worker import Worker, WorkerContract
 from app.models.worker_document import WorkerDocument, DocumentCategory
 from app.models.worker_novedad import WorkerNovedad, NovedadType, NovedadStatus
+from app.services.people_search import search_condition
 from app.services.s3_storage import s3_service
+from app.utils.ndjson import ndjson_response
+from app.utils.pagination import COUNT_DESCRIPTION, CURSOR_DESCRIPTION, CountMode, SortKey, paginate
 from app.utils.storage import storage_manager
 from app.config import settings
 from app.models.occupational_exam import OccupationalExam
@@ -79,6 +80,17 @@ def _apply_worker_active_filter_for_search(query, search: str | None, is_active:
     return query
 
 
+def _workers_query(db: Session, search: str | None, is_active: bool | None):
+    query = db.query(Worker)
+
+    # Filtro de búsqueda
+    if search:
+        query = query.filter(search_condition(Worker, search))
+
+    # En búsquedas, excluir inactivos por defecto
+    return _apply_worker_active_filter_for_search(query, search, is_active)
+
+
 def _resolve_cargo_id_and_position(db: Session, cargo_id: int | None, position: str | None):
     if cargo_id is not None:
         cargo = db.query(Cargo).filter(Cargo.id == cargo_id).first()
@@ -172,56 +184,73 @@ def get_worker_profile(
 @router.get("/", response_model=List[WorkerList])
 @router.get("", response_model=List[WorkerList])
 async def get_workers(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     search: str = Query(None, description="Buscar por nombre, documento o email"),
     is_active: bool = Query(None, description="Filtrar por estado activo"),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Optional[CountMode] = Query(None, description=COUNT_DESCRIPTION),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_supervisor_or_admin)
 ) -> Any:
     """
-    Obtener lista de trabajadores con filtros opcionales
+    Obtener lista de trabajadores con filtros opcionales.
+
+    La respuesta sigue siendo una lista; el total (solo si se pide `count`) y
+    el cursor de la página siguiente van en las cabeceras `X-Total-Count` y
+    `X-Next-Cursor`.
     """
-    query = db.query(Worker)
-    
-    # Filtro de búsqueda
-    if search:
-        search_filter = or_(
-            Worker.first_name.ilike(f"%{search}%"),
-            Worker.last_name.ilike(f"%{search}%"),
-            Worker.document_number.ilike(f"%{search}%"),
-            Worker.email.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
-    
-    # En búsquedas, excluir inactivos por defecto
-    query = _apply_worker_active_filter_for_search(query, search, is_active)
-    
-    workers = query.offset(skip).limit(limit).all()
-    return workers
+    result_page = paginate(
+        _workers_query(db, search, is_active),
+        sort=[SortKey(Worker.id)],
+        size=limit,
+        offset=skip,
+        cursor=cursor,
+        # Este listado nunca ha devuelto total: no contar salvo que se pida
+        count=count or CountMode.NONE,
+    )
+    if result_page.total is not None:
+        response.headers["X-Total-Count"] = str(result_page.total)
+    if result_page.next_cursor:
+        response.headers["X-Next-Cursor"] = result_page.next_cursor
+    return result_page.items
+
+
+@router.get("/stream")
+async def stream_workers(
+    search: str = Query(None, description="Buscar por nombre, documento o email"),
+    is_active: bool = Query(None, description="Filtrar por estado activo"),
+    current_user: User = Depends(require_supervisor_or_admin)
+) -> StreamingResponse:
+    """
+    Lista completa de trabajadores en NDJSON (un `WorkerList` por línea), sin
+    paginación ni límite de filas; se genera a medida que se envía.
+    """
+    return ndjson_response(
+        lambda db: _workers_query(db, search, is_active).order_by(Worker.id),
+        lambda worker: WorkerList.model_validate(worker).model_dump(mode="json"),
+    )
 
 
 @router.get("/export/excel")
 async def export_workers_excel(
     search: str = Query(None, description="Buscar por nombre, documento o email"),
     is_active: bool = Query(None, description="Filtrar por estado activo"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_supervisor_or_admin)
 ) -> StreamingResponse:
     """
     Exportar lista de trabajadores a Excel con filtros opcionales
     """
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, PatternFill
+
     query = db.query(Worker).options(joinedload(Worker.area_obj))
     
     # Filtro de búsqueda
     if search:
-        search_filter = or_(
-            Worker.first_name.ilike(f"%{search}%"),
-            Worker.last_name.ilike(f"%{search}%"),
-            Worker.document_number.ilike(f"%{search}%"),
-            Worker.email.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+        query = query.filter(search_condition(Worker, search))
     
     # En búsquedas, excluir inactivos por defecto
     query = _apply_worker_active_filter_for_search(query, search, is_active)
@@ -363,13 +392,7 @@ async def get_workers_basic(
     
     # Filtro de búsqueda
     if search:
-        search_filter = or_(
-            Worker.first_name.ilike(f"%{search}%"),
-            Worker.last_name.ilike(f"%{search}%"),
-            Worker.document_number.ilike(f"%{search}%"),
-            Worker.email.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+        query = query.filter(search_condition(Worker, search))
     
     # En búsquedas, excluir inactivos por defecto
     query = _apply_worker_active_filter_for_search(query, search, is_active)
@@ -1199,24 +1222,21 @@ async def delete_occupational_exam(
 async def export_workers_to_excel(
     search: str = Query(None, description="Buscar por nombre, documento o email"),
     is_active: bool = Query(None, description="Filtrar por estado activo"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_supervisor_or_admin)
 ) -> StreamingResponse:
     """
     Exportar trabajadores a Excel
     """
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, PatternFill
+
     # Obtener trabajadores con los mismos filtros que el endpoint principal
     query = db.query(Worker)
     
     # Filtro de búsqueda
     if search:
-        search_filter = or_(
-            Worker.first_name.ilike(f"%{search}%"),
-            Worker.last_name.ilike(f"%{search}%"),
-            Worker.document_number.ilike(f"%{search}%"),
-            Worker.email.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+        query = query.filter(search_condition(Worker, search))
     
     # En búsquedas, excluir inactivos por defecto
     query = _apply_worker_active_filter_for_search(query, search, is_active)
@@ -2363,13 +2383,7 @@ async def get_all_novedades(
     if status:
         query = query.filter(WorkerNovedad.status == status)
     if search:
-        query = query.filter(
-            or_(
-                Worker.first_name.ilike(f"%{search}%"),
-                Worker.last_name.ilike(f"%{search}%"),
-                Worker.document_number.ilike(f"%{search}%")
-            )
-        )
+        query = query.filter(search_condition(Worker, search))
     
     # Ordenar por fecha de creación descendente
     query = query.order_by(WorkerNovedad.created_at.desc())
@@ -2630,12 +2644,15 @@ async def export_worker_novedades_to_excel(
     status: NovedadStatus = Query(None, description="Filtrar por estado"),
     start_date: Optional[str] = Query(None, description="Fecha de inicio (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Fecha de fin (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_supervisor_or_admin)
 ) -> Any:
     """
     Exportar las novedades de un trabajador a Excel con filtros de fecha
     """
+    import openpyxl
+    from openpyxl.styles import Font, Alignment, PatternFill
+
     # Verificar que el trabajador existe
     worker = db.query(Worker).filter(Worker.id == worker_id).first()
     if not worker:
@@ -2813,6 +2830,11 @@ async def get_occupied_dates(
     start_date: str = Query(..., description="Fecha de inicio en formato YYYY-MM-DD"),
     end_date: str = Query(..., description="Fecha de fin en formato YYYY-MM-DD"),
     worker_id: int | None = Query(None, description="Opcional: filtra por el área del trabajador indicado"),
+    format: str = Query(
+        "days",
+        pattern="^(days|ranges|bitmap)$",
+        description="days: una entrada por día (compatibilidad); ranges: rangos fusionados con ocupación; bitmap: un carácter por día",
+    ),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ) -> Any:
@@ -2822,11 +2844,14 @@ async def get_occupied_dates(
     - Si se envía `worker_id`, se usan las vacaciones de trabajadores en la misma `area_id`.
     - Si no se envía, se infiere el trabajador a partir de `current_user` y se usa su `area_id`.
     - Si no se puede determinar el `area_id`, se retorna lista vacía para evitar falsos positivos.
+
+    Formatos de respuesta:
+    - `days`: lista expandida día a día (formato original).
+    - `ranges`: rangos fusionados con el número de personas ausentes y las vacaciones que los componen.
+    - `bitmap`: cadena con un carácter por día del rango consultado ('0'-'9', '9' = 9 o más).
     """
-    from app.models.worker_vacation import WorkerVacation, VacationStatus
-    from datetime import datetime, timedelta
-    from sqlalchemy.orm import joinedload
-    
+    from app.services.vacation_occupancy import load_area_occupancy
+
     # Validar formato de fechas
     try:
         start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
@@ -2854,63 +2879,85 @@ async def get_occupied_dates(
         if getattr(target_worker, "department", None):
             target_department = target_worker.department
 
+    query_range = {
+        "start_date": start_date,
+        "end_date": end_date
+    }
+
     # Si no hay área ni departamento definida, no mostrar ocupados (respeta el requerimiento por área)
     if target_area_id is None and not target_department:
+        if format == "ranges":
+            return {"ranges": [], "vacations": [], "max_headcount": 0, "query_range": query_range}
+        if format == "bitmap":
+            return {"bitmap": "0" * ((end_dt - start_dt).days + 1), "query_range": query_range}
         return {
             "occupied_dates": [],
             "total_occupied_days": 0,
-            "query_range": {
-                "start_date": start_date,
-                "end_date": end_date
-            }
+            "query_range": query_range
         }
 
-    # Buscar vacaciones aprobadas y pendientes en la misma área/departamento que se solapen con el rango
-    conflict_filters = [
-        WorkerVacation.status.in_([VacationStatus.APPROVED, VacationStatus.PENDING]),
-        WorkerVacation.start_date <= end_dt,
-        WorkerVacation.end_date >= start_dt,
-        Worker.is_active == True,
-    ]
+    # Vacaciones aprobadas y pendientes del área/departamento que se solapan con el rango
+    occupancy = load_area_occupancy(
+        db,
+        start_dt,
+        end_dt,
+        area_id=target_area_id,
+        department=target_department,
+    )
 
-    if target_area_id is not None:
-        conflict_filters.append(Worker.area_id == target_area_id)
-    elif target_department:
-        conflict_filters.append(Worker.department == target_department)
+    if format == "bitmap":
+        return {
+            "bitmap": occupancy.day_map(start_dt, end_dt),
+            "query_range": query_range
+        }
 
-    occupied_vacations = (
-        db.query(WorkerVacation)
-        .join(Worker, WorkerVacation.worker_id == Worker.id)
-        .options(joinedload(WorkerVacation.worker))
-        .filter(*conflict_filters)
-        .all()
-    )
+    vacations = occupancy.overlapping(start_dt, end_dt)
 
-    # Generar lista de fechas ocupadas
-    occupied_dates = []
-    for vacation in occupied_vacations:
-        worker = vacation.worker or db.query(Worker).filter(Worker.id == vacation.worker_id).first()
-        worker_name = f"{worker.first_name} {worker.last_name}" if worker else "Trabajador desconocido"
+    if format == "ranges":
+        return {
+            "ranges": [
+                {
+                    "start_date": r.start_date.isoformat(),
+                    "end_date": r.end_date.isoformat(),
+                    "headcount": r.headcount,
+                }
+                for r in occupancy.ranges(start_dt, end_dt)
+            ],
+            "vacations": [
+                {
+                    "vacation_id": v.vacation_id,
+                    "worker_id": v.worker_id,
+                    "worker_name": v.worker_name,
+                    "start_date": v.start_date.isoformat(),
+                    "end_date": v.end_date.isoformat(),
+                    "status": v.status.value,
+                }
+                for v in vacations
+            ],
+            "max_headcount": occupancy.max_headcount(start_dt, end_dt),
+            "query_range": query_range
+        }
 
-        # Generar todas las fechas del período de vacaciones
+    # Formato original: una entrada por cada día de cada vacación
+    occupied_dates = []
+    for vacation in vacations:
+        vacation_start = vacation.start_date.isoformat()
+        vacation_end = vacation.end_date.isoformat()
         current_date = vacation.start_date
         while current_date <= vacation.end_date:
             occupied_dates.append({
-                "date": current_date.strftime('%Y-%m-%d'),
-                "worker_name": worker_name,
-                "vacation_id": vacation.id,
-                "start_date": vacation.start_date.strftime('%Y-%m-%d'),
-                "end_date": vacation.end_date.strftime('%Y-%m-%d')
+                "date": current_date.isoformat(),
+                "worker_name": vacation.worker_name,
+                "vacation_id": vacation.vacation_id,
+                "start_date": vacation_start,
+                "end_date": vacation_end
             })
             current_date += timedelta(days=1)
 
     return {
         "occupied_dates": occupied_dates,
         "total_occupied_days": len(occupied_dates),
-        "query_range": {
-            "start_date": start_date,
-            "end_date": end_date
-        }
+        "query_range": query_range
     }
 
 
@@ -3026,17 +3073,13 @@ async def check_vacation_availability(
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Verificar disponibilidad de fechas para vacaciones"""
-    from app.models.worker_vacation import WorkerVacation, VacationStatus, VacationBalance
+    from app.models.worker_vacation import VacationStatus, VacationBalance
     from app.schemas.worker_vacation import VacationAvailability, VacationConflict
-    
+    from app.services.vacation_occupancy import business_days_between, load_area_occupancy
+
     # Calcular días solicitados (solo días laborales)
-    requested_days = 0
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date.weekday() < 5:  # Lunes a Viernes
-            requested_days += 1
-        current_date = current_date + timedelta(days=1)
-    
+    requested_days = business_days_between(start_date, end_date)
+
     # Buscar conflictos con vacaciones aprobadas en el rango
     # Si se especifica worker_id, limitar a trabajadores de la misma área
     if worker_id is not None:
@@ -3044,15 +3087,14 @@ async def check_vacation_availability(
     else:
         worker = None
 
-    from sqlalchemy.orm import joinedload
-    conflict_query = db.query(WorkerVacation)
+    area_id = None
+    department = None
     if worker is not None:
-        conflict_query = conflict_query.join(Worker, WorkerVacation.worker_id == Worker.id)
         # Filtrar por misma área o mismo departamento (fallback)
         if worker.area_id is not None:
-            conflict_query = conflict_query.filter(Worker.area_id == worker.area_id)
+            area_id = worker.area_id
         elif getattr(worker, "department", None):
-            conflict_query = conflict_query.filter(Worker.department == worker.department)
+            department = worker.department
         else:
             # Si el trabajador no tiene área ni departamento, no reportar conflictos
             return VacationAvailability(
@@ -3063,36 +3105,31 @@ async def check_vacation_availability(
                 requested_days=requested_days,
                 available_days=None
             )
-        conflict_query = conflict_query.filter(WorkerVacation.worker_id != worker_id)
 
-    conflicts = conflict_query.filter(
-        WorkerVacation.status == VacationStatus.APPROVED,
-        WorkerVacation.start_date <= end_date,
-        WorkerVacation.end_date >= start_date
-    ).all()
-    
-    conflict_list = []
-    for conflict in conflicts:
-        worker = db.query(Worker).filter(Worker.id == conflict.worker_id).first()
-        if worker:
-            # Calcular días de solapamiento
-            overlap_start = max(start_date, conflict.start_date)
-            overlap_end = min(end_date, conflict.end_date)
-            
-            overlapping_days = 0
-            current_date = overlap_start
-            while current_date <= overlap_end:
-                if current_date.weekday() < 5:  # Solo días laborales
-                    overlapping_days += 1
-                current_date = current_date + timedelta(days=1)
-            
-            conflict_list.append(VacationConflict(
-                worker_name=f"{worker.first_name} {worker.last_name}",
-                start_date=conflict.start_date,
-                end_date=conflict.end_date,
-                overlapping_days=overlapping_days
-            ))
-    
+    occupancy = load_area_occupancy(
+        db,
+        start_date,
+        end_date,
+        area_id=area_id,
+        department=department,
+        statuses=(VacationStatus.APPROVED,),
+    )
+
+    conflict_list = [
+        VacationConflict(
+            worker_id=conflict.worker_id,
+            worker_name=conflict.worker_name,
+            start_date=conflict.start_date,
+            end_date=conflict.end_date,
+            status=conflict.status,
+            overlapping_days=business_days_between(
+                max(start_date, conflict.start_date),
+                min(end_date, conflict.end_date),
+            ),
+        )
+        for conflict in occupancy.overlapping(start_date, end_date, exclude_worker_id=worker_id)
+    ]
+
     # Verificar días disponibles si se especifica worker_id
     available_days = None
     if worker_id:
@@ -3169,8 +3206,9 @@ async def check_worker_vacation_availability(
     current_user: User = Depends(get_current_user)
 ) -> Any:
     """Verificar disponibilidad de fechas para vacaciones de un trabajador específico"""
-    from app.models.worker_vacation import WorkerVacation, VacationStatus, VacationBalance
+    from app.models.worker_vacation import VacationStatus, VacationBalance
     from app.schemas.worker_vacation import VacationAvailability, VacationConflict
+    from app.services.vacation_occupancy import business_days_between, load_area_occupancy
     
     # Verificar que el trabajador existe
     worker = db.query(Worker).filter(Worker.id == worker_id).first()
@@ -3178,37 +3216,13 @@ async def check_worker_vacation_availability(
         raise HTTPException(status_code=404, detail="Trabajador no encontrado")
     
     # Calcular días solicitados (solo días laborales)
-    requested_days = 0
-    current_date = start_date
-    while current_date <= end_date:
-        if current_date.weekday() < 5:  # Lunes a Viernes
-            requested_days += 1
-        current_date = current_date + timedelta(days=1)
+    requested_days = business_days_between(start_date, end_date)
     
     # Buscar conflictos con vacaciones aprobadas de trabajadores de la misma área
     # (excluyendo al trabajador actual)
     # Conflictos por misma área o mismo departamento (fallback)
-    conflict_filters = [
-        WorkerVacation.worker_id != worker_id,
-        WorkerVacation.status == VacationStatus.APPROVED,
-        WorkerVacation.start_date <= end_date,
-        WorkerVacation.end_date >= start_date,
-    ]
-    if worker.area_id is not None:
-        conflict_filters.append(Worker.area_id == worker.area_id)
-    elif getattr(worker, "department", None):
-        conflict_filters.append(Worker.department == worker.department)
-    else:
+    if worker.area_id is None and not getattr(worker, "department", None):
         # Sin área ni departamento, asumimos sin conflictos
-        conflicts = []
-        conflict_list = []
-        requested_days = 0
-        current_date = start_date
-        while current_date <= end_date:
-            if current_date.weekday() < 5:
-                requested_days += 1
-            current_date = current_date + timedelta(days=1)
-        # Balance
         vacation_balance = db.query(VacationBalance).filter(
             VacationBalance.worker_id == worker_id,
             VacationBalance.year == start_date.year
@@ -3219,32 +3233,35 @@ async def check_worker_vacation_availability(
             start_date=start_date,
             end_date=end_date,
             is_available=is_available,
-            conflicts=conflict_list,
+            conflicts=[],
             requested_days=requested_days,
             available_days=available_days
         )
 
-    conflicts = db.query(WorkerVacation).join(Worker, WorkerVacation.worker_id == Worker.id).filter(
-        *conflict_filters
-    ).all()
-    
+    occupancy = load_area_occupancy(
+        db,
+        start_date,
+        end_date,
+        area_id=worker.area_id,
+        department=None if worker.area_id is not None else worker.department,
+        statuses=(VacationStatus.APPROVED,),
+    )
+
     conflict_list = []
-    for conflict in conflicts:
-        conflict_worker = db.query(Worker).filter(Worker.id == conflict.worker_id).first()
-        if conflict_worker:
-            # Calcular días de solapamiento
-            overlap_start = max(start_date, conflict.start_date)
-            overlap_end = min(end_date, conflict.end_date)
-            overlapping_days = (overlap_end - overlap_start).days + 1
-            
-            conflict_list.append(VacationConflict(
-                worker_id=conflict.worker_id,
-                worker_name=f"{conflict_worker.first_name} {conflict_worker.last_name}",
-                start_date=conflict.start_date,
-                end_date=conflict.end_date,
-                status=conflict.status,
-                overlapping_days=overlapping_days
-            ))
+    for conflict in occupancy.overlapping(start_date, end_date, exclude_worker_id=worker_id):
+        # Calcular días de solapamiento
+        overlap_start = max(start_date, conflict.start_date)
+        overlap_end = min(end_date, conflict.end_date)
+        overlapping_days = (overlap_end - overlap_start).days + 1
+
+        conflict_list.append(VacationConflict(
+            worker_id=conflict.worker_id,
+            worker_name=conflict.worker_name,
+            start_date=conflict.start_date,
+            end_date=conflict.end_date,
+            status=conflict.status,
+            overlapping_days=overlapping_days
+        ))
     
     # Verificar días disponibles del trabajador
     vacation_balance = db.query(VacationBalance).filter(
@@ -3796,7 +3813,7 @@ async def export_vacations_to_excel(
     start_date: str = Query(None, description="Fecha de inicio (YYYY-MM-DD)"),
     end_date: str = Query(None, description="Fecha de fin (YYYY-MM-DD)"),
     status: str = Query(None, description="Estado de la solicitud"),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(require_supervisor_or_admin)
 ) -> StreamingResponse:
     """
@@ -11,6 +11,16 @@ env_file = '.env.production' if os.path.exists('.env.production') else '.env'
 # load_dotenv no sobrescribe variables ya existentes en el sistema
 load_dotenv(env_file, override=False)
 
+def _async_database_url(database_url: str):
+    """postgresql[+psycopg2]://... -> postgresql+asyncpg://...; None para otros motores."""
+    scheme, sep, rest = database_url.partition("://")
+    if not sep or scheme.split("+")[0] not in ("postgres", "postgresql"):
+        return None
+    # asyncpg no reconoce `sslmode` (libpq); su equivalente es `ssl`.
+    rest = rest.replace("sslmode=", "ssl=")
+    return f"postgresql+asyncpg://{rest}"
+
+
 class Settings:
     def __init__(self):
         # Configuración de la aplicación
@@ -22,10 +32,49 @@ class Settings:
         self.database_url = os.getenv("DATABASE_URL")
         if not self.database_url:
             raise ValueError("DATABASE_URL environment variable is required")
+
+        # Motor asíncrono (asyncpg) para los endpoints de lectura de alto tráfico.
+        # Por defecto se deriva de DATABASE_URL cambiando el driver.
+        self.async_database_url = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(self.database_url)
+        self.async_db_pool_size = int(os.getenv("ASYNC_DB_POOL_SIZE", 10))
+        self.async_db_max_overflow = int(os.getenv("ASYNC_DB_MAX_OVERFLOW", 10))
+
+        # Réplica de lectura opcional para reportes, dashboards y exportaciones
+        # (ver app/utils/db_replica.py). Si la réplica se atrasa más de
+        # DB_REPLICA_MAX_LAG_SECONDS o no responde, se lee del primario.
+        self.database_replica_url = os.getenv("DATABASE_REPLICA_URL") or None
+        self.db_replica_max_lag_seconds = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", 30))
+        self.db_replica_check_interval = float(os.getenv("DB_REPLICA_CHECK_INTERVAL", 10))
+
+        # Instrumentación del pool de conexiones (ver app/utils/db_pool_monitor.py)
+        self.db_pool_long_held_seconds = float(os.getenv("DB_POOL_LONG_HELD_SECONDS", 30))
+        self.db_pool_capture_stacks = os.getenv("DB_POOL_CAPTURE_STACKS", "True").lower() == "true"
+
+        # Métricas por endpoint y sentencias lentas (ver app/utils/metrics.py).
+        # Con METRICS_TOKEN, /metrics exige "Authorization: Bearer <token>";
+        # sin él, en producción exige el token JWT de un administrador.
+        # SLOW_QUERY_LOG_FILE escribe cada sentencia lenta como una línea JSON.
+        self.metrics_enabled = os.getenv("METRICS_ENABLED", "True").lower() == "true"
+        self.metrics_token = os.getenv("METRICS_TOKEN") or None
+        self.slow_query_ms = float(os.getenv("SLOW_QUERY_MS", 500))
+        self.slow_query_log_file = os.getenv("SLOW_QUERY_LOG_FILE") or None
         
         # Configuración de debug
         self.debug = os.getenv("DEBUG", "false").lower() == "true"
         
+        # Conteo por defecto de los listados paginados: exact, estimated o none
+        # (ver app/utils/pagination.py)
+        self.pagination_count_mode = os.getenv("PAGINATION_COUNT_MODE", "exact")
+
+        # Compresión de respuestas (ver app/utils/compression.py)
+        self.compression_minimum_size = int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1024))
+        self.compression_brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+        self.compression_gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+
+        # Indicadores de periodicidad de EMO precalculados por cargo: se usan
+        # mientras tengan menos de estas horas (ver app/services/emo_periodicidad.py)
+        self.emo_snapshot_max_age_hours = float(os.getenv("EMO_SNAPSHOT_MAX_AGE_HOURS", 24))
+
         # Configuración de CORS
         self.allowed_origins = os.getenv("ALLOWED_ORIGINS", os.getenv("REACT_APP_API_URL")).split(",")
         
@@ -47,6 +96,23 @@ class Settings:
         self.algorithm = os.getenv("ALGORITHM", "HS256")
         self.access_token_expire_minutes = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 120))
         self.refresh_token_expire_days = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 30))
+
+        # Hash de contraseñas (ver app/utils/password.py). Al cambiar
+        # BCRYPT_ROUNDS, cada usuario se migra al nuevo costo en su próximo login.
+        self.bcrypt_rounds = int(os.getenv("BCRYPT_ROUNDS", 12))
+        self.password_hash_workers = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+        self.password_hash_max_pending = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+
+        # Límite de intentos de login por cuenta y por IP (ver app/utils/rate_limit.py):
+        # ráfaga permitida y recarga por minuto de cada token bucket
+        self.login_rate_account_burst = int(os.getenv("LOGIN_RATE_ACCOUNT_BURST", 5))
+        self.login_rate_account_per_minute = float(os.getenv("LOGIN_RATE_ACCOUNT_PER_MINUTE", 5))
+        self.login_rate_ip_burst = int(os.getenv("LOGIN_RATE_IP_BURST", 20))
+        self.login_rate_ip_per_minute = float(os.getenv("LOGIN_RATE_IP_PER_MINUTE", 30))
+        # Proxies de confianza (IPs o redes separadas por comas, p. ej. la red
+        # de Traefik): solo de ellos se acepta X-Forwarded-For para obtener la
+        # IP del cliente. Vacío: se usa la dirección de la conexión.
+        self.trusted_proxies = [p.strip() for p in os.getenv("TRUSTED_PROXIES", "").split(",") if p.strip()]
         
         # Configuración de email
         self.smtp_host = os.getenv("SMTP_HOST")
@@ -82,6 +148,25 @@ class Settings:
         self.contabo_public_base_url = public_base_url
         self.contabo_make_public = os.getenv("CONTABO_MAKE_PUBLIC", "True").lower() == "true"
 
+        # URLs firmadas de Contabo (PresignedURLCache en app/services/s3_storage.py)
+        self.presigned_url_reuse_seconds = int(os.getenv("PRESIGNED_URL_REUSE_SECONDS", 900))
+        self.presigned_url_cache_size = int(os.getenv("PRESIGNED_URL_CACHE_SIZE", 10000))
+
+        # Caché de PDFs generados (reportes y exportaciones)
+        self.pdf_cache_enabled = os.getenv("PDF_CACHE_ENABLED", "True").lower() == "true"
+        self.pdf_cache_dir = os.getenv("PDF_CACHE_DIR", "pdf_cache")
+        self.pdf_cache_max_bytes = int(os.getenv("PDF_CACHE_MAX_MB", 512)) * 1024 * 1024
+        self.pdf_cache_remote = (
+            os.getenv("PDF_CACHE_REMOTE", str(self.use_contabo_storage)).lower() == "true"
+        )
+
+        # Caché de derivados de imágenes (app/services/image_derivatives.py)
+        self.image_cache_enabled = os.getenv("IMAGE_CACHE_ENABLED", "True").lower() == "true"
+        self.image_cache_dir = os.getenv("IMAGE_CACHE_DIR", "image_cache")
+        self.image_cache_max_bytes = int(os.getenv("IMAGE_CACHE_MAX_MB", 256)) * 1024 * 1024
+        self.image_cache_source_ttl = int(os.getenv("IMAGE_CACHE_SOURCE_TTL", 300))
+        self.image_derivative_workers = int(os.getenv("IMAGE_DERIVATIVE_WORKERS", 2))
+
         # Configuración de Perplexity AI
         # Modelos disponibles: sonar, sonar-pro, sonar-reasoning
         self.perplexity_api_key = os.getenv("PERPLEXITY_API_KEY")
@@ -92,4 +177,17 @@ class Settings:
         self.claude_api_key = os.getenv("CLAUDE_API_KEY")
         self.claude_model = os.getenv("CLAUDE_MODEL", "claude-sonnet-4-6")
 
+        # Cliente de IA (ver app/services/ai_service.py): "claude" o "stub"
+        # (backend local sin red, para desarrollo y benchmarks)
+        self.ai_backend = os.getenv("AI_BACKEND", "claude").lower()
+        self.ai_max_connections = int(os.getenv("AI_MAX_CONNECTIONS", 10))
+        self.ai_max_concurrency = int(os.getenv("AI_MAX_CONCURRENCY", 8))
+        self.ai_cache_max_entries = int(os.getenv("AI_CACHE_MAX_ENTRIES", 512))
+        self.ai_cache_ttl_seconds = float(os.getenv("AI_CACHE_TTL_SECONDS", 86400))
+        self.ai_stub_latency_ms = float(os.getenv("AI_STUB_LATENCY_MS", 800))
+
+        # Entrega en tiempo real de notificaciones (ver app/services/notification_delivery.py):
+        # "memory" (un solo proceso) o "postgres" (LISTEN/NOTIFY entre workers)
+        self.notifications_broker = os.getenv("NOTIFICATIONS_BROKER", "memory").lower()
+
 settings = Settings()
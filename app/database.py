@@ -1,9 +1,17 @@
-from sqlalchemy import create_engine
+import threading
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 
 from app.config import settings
+from app.utils.db_pool_monitor import InstrumentedQueuePool, PoolMonitor
+from app.utils.db_replica import ReplicaLagMonitor
+from app.utils.metrics import metrics
 
 # Determine if we should echo SQL queries
 # Only echo in development mode and when explicitly enabled
@@ -22,26 +30,165 @@ if "postgresql" in settings.database_url:
         "pool_size": 10,
         "max_overflow": 20,
         "pool_timeout": 30,
+        "poolclass": InstrumentedQueuePool,
     })
 
 engine = create_engine(settings.database_url, **engine_kwargs)
 
+# Conexiones prestadas, espera por conexión y conexiones retenidas demasiado tiempo
+pool_monitor = PoolMonitor(
+    long_held_seconds=settings.db_pool_long_held_seconds,
+    capture_stacks=settings.db_pool_capture_stacks,
+)
+pool_monitor.attach(engine)
+metrics.instrument_engine(engine, "primary", pool_monitor)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Create Base class
 Base = declarative_base()
 
+# Réplica de lectura opcional (DATABASE_REPLICA_URL). Solo la usan los
+# endpoints marcados con `Depends(get_read_db)`; todo lo demás va al primario.
+replica_engine = None
+replica_pool_monitor = None
+replica_lag_monitor = None
+if settings.database_replica_url:
+    replica_engine_kwargs = dict(engine_kwargs)
+    if "postgresql" in settings.database_replica_url:
+        # Una réplica caída no debe bloquear la petición más que unos segundos
+        replica_engine_kwargs["connect_args"] = {"connect_timeout": 3}
+    replica_engine = create_engine(settings.database_replica_url, **replica_engine_kwargs)
+    replica_pool_monitor = PoolMonitor(
+        long_held_seconds=settings.db_pool_long_held_seconds,
+        capture_stacks=settings.db_pool_capture_stacks,
+    )
+    replica_pool_monitor.attach(replica_engine)
+    metrics.instrument_engine(replica_engine, "replica", replica_pool_monitor)
+    replica_lag_monitor = ReplicaLagMonitor(
+        replica_engine,
+        max_lag_seconds=settings.db_replica_max_lag_seconds,
+        check_interval=settings.db_replica_check_interval,
+    )
+
+# Motor asíncrono (asyncpg), separado del síncrono. Se crea en el primer uso:
+# así los procesos que no lo necesitan (scripts, migraciones, tests con SQLite)
+# no requieren asyncpg ni abren un segundo pool.
+_async_engine = None
+_async_sessionmaker = None
+_async_engine_lock = threading.Lock()
+async_pool_monitor = PoolMonitor(
+    long_held_seconds=settings.db_pool_long_held_seconds,
+    capture_stacks=settings.db_pool_capture_stacks,
+)
+
+
+def get_async_engine():
+    """Motor `AsyncEngine` del proceso, o un error si DATABASE_URL no es PostgreSQL."""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                if not settings.async_database_url:
+                    raise RuntimeError("El acceso asíncrono requiere PostgreSQL (ASYNC_DATABASE_URL)")
+                async_engine = create_async_engine(
+                    settings.async_database_url,
+                    echo=echo_sql,
+                    pool_pre_ping=True,
+                    pool_recycle=3600,
+                    pool_size=settings.async_db_pool_size,
+                    max_overflow=settings.async_db_max_overflow,
+                    pool_timeout=30,
+                )
+                async_pool_monitor.attach(async_engine.sync_engine)
+                metrics.instrument_engine(async_engine.sync_engine, "async", async_pool_monitor)
+                # expire_on_commit=False: los objetos se serializan después del
+                # commit y no pueden recargar atributos de forma perezosa.
+                _async_sessionmaker = async_sessionmaker(
+                    async_engine, autoflush=False, expire_on_commit=False
+                )
+                _async_engine = async_engine
+    return _async_engine
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependencia con `AsyncSession` para endpoints `async def` que no deben
+    bloquear el event loop. Las relaciones se cargan de forma explícita
+    (`selectinload`/`joinedload`); el acceso perezoso lanza `MissingGreenlet`.
+    """
+    get_async_engine()
+    async with _async_sessionmaker() as db:
+        yield db
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Sesión para código que no recibe `Depends(get_db)` (schedulers, tareas en
+    segundo plano, endpoints fuera del router). La conexión vuelve al pool al
+    salir del bloque, también si hay una excepción; el commit es explícito.
+
+        with session_scope() as db:
+            ...
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 
 def get_db():
     """Dependency to get database session"""
-    db = SessionLocal()
+    with session_scope() as db:
+        yield db
+
+
+@contextmanager
+def read_session_scope() -> Iterator[Session]:
+    """
+    Sesión de solo lectura: usa la réplica si está configurada y al día, y el
+    primario en caso contrario. Intentar escribir con ella lanza un error.
+    """
+    use_replica = replica_lag_monitor is not None and replica_lag_monitor.is_available()
+    db = SessionLocal(bind=replica_engine if use_replica else engine, info={"read_only": True})
     try:
         yield db
     finally:
         db.close()
 
 
+def get_read_db():
+    """
+    Dependencia para reportes, dashboards y exportaciones: consultas pesadas
+    que no escriben y toleran unos segundos de retraso, fuera del primario
+    para que no compitan con inscripciones y asistencia.
+    """
+    with read_session_scope() as db:
+        yield db
+
+
+@event.listens_for(Session, "before_flush")
+def _reject_writes_in_read_session(session, flush_context, instances):
+    if session.info.get("read_only") and (session.new or session.dirty or session.deleted):
+        raise RuntimeError("Intento de escritura con una sesión de solo lectura (get_read_db)")
+
+
+async def dispose_async_engine() -> None:
+    """Cierra el pool asíncrono (apagado de la aplicación).
+
+    Los globales se reinician bajo el lock y el `dispose()` se espera fuera de
+    él: un uso posterior crea un motor nuevo en lugar de reabrir el cerrado.
+    """
+    global _async_engine, _async_sessionmaker
+    with _async_engine_lock:
+        async_engine, _async_engine, _async_sessionmaker = _async_engine, None, None
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
 def create_tables():
     """Create all tables in the database"""
     Base.metadata.create_all(bind=engine)
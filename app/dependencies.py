@@ -167,19 +167,16 @@ class PermissionChecker:
     
     def _check_custom_role_permission(self, user: User, resource_type: str, action: str) -> bool:
         """Check permission based on custom role"""
-        from sqlalchemy.orm import Session
-        from app.database import get_db
+        from app.database import session_scope
         from app.models.custom_role import role_permissions
         from app.api.permissions import PERMISSIONS_DATA
         
-        # Get database session
-        db = next(get_db())
-        
         try:
-            # Get permission IDs for this custom role
-            permission_ids_result = db.execute(
-                role_permissions.select().where(role_permissions.c.role_id == user.custom_role_id)
-            ).fetchall()
+            # Get permission IDs for this custom role (the session is released right after the query)
+            with session_scope() as db:
+                permission_ids_result = db.execute(
+                    role_permissions.select().where(role_permissions.c.role_id == user.custom_role_id)
+                ).fetchall()
             
             permission_ids = [row.permission_id for row in permission_ids_result]
             
@@ -197,8 +194,6 @@ class PermissionChecker:
         except Exception:
             # If there's any error with custom role checking, fallback to hardcoded roles
             return self._check_hardcoded_role_permission(user, resource_type, action)
-        finally:
-            db.close()
     
     def _check_hardcoded_role_permission(self, user: User, resource_type: str, action: str) -> bool:
         """Check permission based on hardcoded role matrix"""
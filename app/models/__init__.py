@@ -3,7 +3,7 @@ from .custom_role import CustomRole
 from .permission import Permission
 from .committee import (
     CommitteeType, Committee, CommitteeRole, CommitteeMember,
-    CommitteeMeeting, MeetingAttendance, CommitteeVoting, CommitteeVote,
+    CommitteeMeeting, MeetingAttendance, CommitteeVoting, CommitteeVote, CommitteeVoteTally,
     CommitteeActivity, CommitteeDocument, CommitteePermission,
     CommitteeTypeEnum, CommitteeRoleEnum, MeetingStatusEnum,
     AttendanceStatusEnum, VotingStatusEnum, VoteChoiceEnum,
@@ -11,7 +11,7 @@ from .committee import (
 )
 from .candidate_voting import (
     CandidateVoting, CandidateVotingCandidate, CandidateVote, 
-    CandidateVotingResult, CandidateVotingStatus
+    CandidateVotingResult, CandidateVotingStatus, CandidateVotingBallot, CandidateVoteTally
 )
 from .worker import Worker, WorkerContract, Gender, DocumentType, ContractType, RiskLevel, BloodType, EPS, AFP, ARL
 from .worker_document import WorkerDocument
@@ -19,7 +19,7 @@ from .master_document import MasterDocument
 from .contractor import Contractor, ContractorContract, ContractorDocument
 from .worker_novedad import WorkerNovedad, NovedadType, NovedadStatus
 from .worker_vacation import VacationBalance
-from .cargo import Cargo
+from .cargo import Cargo, CargoEmoSnapshot
 from .profesiograma import (
     Profesiograma,
     ProfesiogramaEstado,
@@ -49,7 +49,10 @@ from .reinduction import ReinductionRecord, ReinductionStatus
 from .course import Course, CourseModule, CourseMaterial
 from .evaluation import Evaluation, Question, Answer, UserEvaluation, UserAnswer
 from .survey import Survey, SurveyQuestion, SurveyCourse, UserSurvey, UserSurveyAnswer
-from .notification import Notification, NotificationTemplate, NotificationType, NotificationStatus, NotificationPriority
+from .notification import (
+    Notification, NotificationTemplate, NotificationType, NotificationStatus, NotificationPriority,
+    NotificationUnreadCounter,
+)
 from .certificate import Certificate
 from .attendance import Attendance
 from .session import Session
@@ -178,6 +181,7 @@ __all__ = [
     "NotificationType",
     "NotificationStatus",
     "NotificationPriority",
+    "NotificationUnreadCounter",
     "Certificate",
     "Attendance",
     "Session",
@@ -194,6 +198,7 @@ __all__ = [
     "ReinductionRecord",
     "ReinductionStatus",
     "Cargo",
+    "CargoEmoSnapshot",
     "Profesiograma",
     "ProfesiogramaEstado",
     "NivelRiesgoCargo",
@@ -231,6 +236,7 @@ __all__ = [
     "MeetingAttendance",
     "CommitteeVoting",
     "CommitteeVote",
+    "CommitteeVoteTally",
     "CommitteeActivity",
     "CommitteeDocument",
     "CommitteePermission",
@@ -249,6 +255,8 @@ __all__ = [
     "CandidateVote",
     "CandidateVotingResult",
     "CandidateVotingStatus",
+    "CandidateVotingBallot",
+    "CandidateVoteTally",
     "AdminConfig",
     "Programas",
     "Ocupacion",
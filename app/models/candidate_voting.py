@@ -1,7 +1,7 @@
 """
 Modelos para el sistema de votaciones de candidatos
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Date, CheckConstraint, Index
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Date, CheckConstraint, Index, SmallInteger
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from enum import Enum as PyEnum
@@ -75,11 +75,12 @@ class CandidateVotingCandidate(Base):
     voting = relationship("CandidateVoting", back_populates="candidates")
     worker = relationship("Worker")
     votes = relationship("CandidateVote", back_populates="candidate", cascade="all, delete-orphan")
+    tallies = relationship("CandidateVoteTally", cascade="all, delete-orphan")
     
     @property
     def vote_count(self):
-        """Cuenta total de votos para este candidato"""
-        return len(self.votes)
+        """Cuenta total de votos para este candidato (suma de sus contadores)"""
+        return sum(tally.votes for tally in self.tallies)
 
 
 class CandidateVote(Base):
@@ -107,6 +108,37 @@ class CandidateVote(Base):
     voter = relationship("User")
 
 
+class CandidateVotingBallot(Base):
+    """Votos emitidos por cada votante en una votación.
+
+    La fila se bloquea al votar, así que dos votos simultáneos del mismo
+    usuario no pueden superar `max_votes_per_user`.
+    """
+    __tablename__ = "candidate_voting_ballots"
+    
+    voting_id = Column(Integer, ForeignKey("candidate_votings.id", ondelete="CASCADE"), primary_key=True)
+    voter_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    votes_cast = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class CandidateVoteTally(Base):
+    """Contador de votos por candidato, repartido en varias filas (`shard`)
+    para que los votos simultáneos no esperen todos por el mismo bloqueo."""
+    __tablename__ = "candidate_vote_tallies"
+    
+    candidate_id = Column(
+        Integer, ForeignKey("candidate_voting_candidates.id", ondelete="CASCADE"), primary_key=True
+    )
+    shard = Column(SmallInteger, primary_key=True)
+    voting_id = Column(Integer, ForeignKey("candidate_votings.id", ondelete="CASCADE"), nullable=False)
+    votes = Column(Integer, default=0, nullable=False)
+    
+    __table_args__ = (
+        Index('idx_candidate_vote_tallies_voting', 'voting_id'),
+    )
+
+
 class CandidateVotingResult(Base):
     """Resultados finales de las votaciones"""
     __tablename__ = "candidate_voting_results"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, Date, DateTime, ForeignKey, JSON, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -19,3 +19,20 @@ class Cargo(Base):
 
     def __repr__(self):
         return f"<Cargo(id={self.id}, nombre_cargo='{self.nombre_cargo}', activo={self.activo})>"
+
+
+class CargoEmoSnapshot(Base):
+    """Indicadores de periodicidad de EMO de un cargo, recalculados por lotes
+    para todos los cargos (ver app/services/emo_periodicidad.py)"""
+    __tablename__ = "cargo_emo_snapshots"
+
+    cargo_id = Column(Integer, ForeignKey("cargos.id", ondelete="CASCADE"), primary_key=True)
+    total_trabajadores_activos = Column(Integer, nullable=False, default=0)
+    periodicidad_sugerida = Column(Integer, nullable=False)
+    # Estadísticas, indicadores por ventana (24/36 meses) y resumen de la matriz
+    datos = Column(JSON, nullable=False)
+    fecha_corte = Column(Date, nullable=False)  # "hoy" usado en el cálculo
+    computed_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<CargoEmoSnapshot(cargo_id={self.cargo_id}, computed_at={self.computed_at})>"
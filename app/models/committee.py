@@ -5,9 +5,9 @@ from datetime import datetime, date
 from typing import Optional, List
 from sqlalchemy import (
     Column, Integer, String, Text, Boolean, DateTime, Date, 
-    ForeignKey, Enum, Numeric, CheckConstraint, Index
+    ForeignKey, Enum, Numeric, CheckConstraint, Index, SmallInteger
 )
-from sqlalchemy.orm import relationship, validates
+from sqlalchemy.orm import relationship, synonym, validates
 from sqlalchemy.sql import func
 import enum
 
@@ -295,9 +295,13 @@ class CommitteeVote(Base):
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     
+    # Nombre que usan los esquemas de la API
+    vote_choice = synonym("vote_value")
+    
     # Constraints
     __table_args__ = (
-        Index('idx_voting_member_vote', 'voting_id', 'member_id'),
+        # Un voto por miembro en cada votación
+        Index('idx_voting_member_vote', 'voting_id', 'member_id', unique=True),
     )
     
     # Relationships
@@ -305,6 +309,16 @@ class CommitteeVote(Base):
     member = relationship("CommitteeMember", back_populates="votes", foreign_keys=[member_id])
     proxy_member = relationship("CommitteeMember", foreign_keys=[proxy_member_id])
 
+class CommitteeVoteTally(Base):
+    """Contador de votos por opción (yes/no/abstain) de una votación, repartido
+    en varias filas (`shard`) como CandidateVoteTally"""
+    __tablename__ = "committee_vote_tallies"
+    
+    voting_id = Column(Integer, ForeignKey("committee_votings.id", ondelete="CASCADE"), primary_key=True)
+    vote_value = Column(String(20), primary_key=True)
+    shard = Column(SmallInteger, primary_key=True)
+    votes = Column(Integer, default=0, nullable=False)
+
 class CommitteeActivity(Base):
     """Actividades y seguimiento de comités"""
     __tablename__ = "committee_activities"
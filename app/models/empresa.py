@@ -93,3 +93,10 @@ class Empresa(Base):
             if getattr(self, campo, False):
                 caracteristicas.append(nombre)
         return caracteristicas
+
+    @property
+    def caracteristicas_mask(self) -> int:
+        """Máscara de bits de las características, comparable con MatrizLegalNorma.aplicabilidad_mask."""
+        from app.models.matriz_legal import calcular_mask_empresa
+
+        return calcular_mask_empresa(self)
@@ -26,6 +26,11 @@ class Enrollment(Base):
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     progress = Column(Float, default=0.0, nullable=False)  # Progress percentage (0-100)
+    # Contadores mantenidos por app.services.course_progress en cada evento de avance
+    modules_total = Column(Integer, default=0, nullable=False, server_default="0")
+    modules_completed = Column(Integer, default=0, nullable=False, server_default="0")
+    required_surveys_completed = Column(Integer, default=0, nullable=False, server_default="0")
+    evaluations_passed = Column(Integer, default=0, nullable=False, server_default="0")
     grade = Column(Float, nullable=True)  # Final grade
     notes = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -11,9 +11,10 @@ Este módulo contiene los modelos para:
 
 from datetime import date, datetime
 from enum import Enum
+from typing import Any, Mapping
 from sqlalchemy import (
     Boolean, Column, Date, DateTime,
-    ForeignKey, Integer, String, Text, UniqueConstraint
+    ForeignKey, Index, Integer, String, Text, UniqueConstraint, text
 )
 from sqlalchemy.orm import relationship
 
@@ -54,6 +55,63 @@ class EstadoImportacion(str, Enum):
     PARCIAL = "parcial"
 
 
+# ===================== APLICABILIDAD =====================
+
+# Orden fijo de bits de aplicabilidad: (campo de la norma, campo equivalente en Empresa).
+# El bit i de `MatrizLegalNorma.aplicabilidad_mask` corresponde a la posición i.
+# Solo se pueden agregar elementos al final; reordenar invalida las máscaras guardadas.
+APLICABILIDAD_BITS = (
+    ('aplica_trabajadores_independientes', 'tiene_trabajadores_independientes'),
+    ('aplica_teletrabajo', 'tiene_teletrabajo'),
+    ('aplica_trabajo_alturas', 'tiene_trabajo_alturas'),
+    ('aplica_espacios_confinados', 'tiene_trabajo_espacios_confinados'),
+    ('aplica_trabajo_caliente', 'tiene_trabajo_caliente'),
+    ('aplica_sustancias_quimicas', 'tiene_sustancias_quimicas'),
+    ('aplica_radiaciones', 'tiene_radiaciones'),
+    ('aplica_trabajo_nocturno', 'tiene_trabajo_nocturno'),
+    ('aplica_menores_edad', 'tiene_menores_edad'),
+    ('aplica_mujeres_embarazadas', 'tiene_mujeres_embarazadas'),
+    ('aplica_conductores', 'tiene_conductores'),
+    ('aplica_manipulacion_alimentos', 'tiene_manipulacion_alimentos'),
+    ('aplica_maquinaria_pesada', 'tiene_maquinaria_pesada'),
+    ('aplica_riesgo_electrico', 'tiene_riesgo_electrico'),
+    ('aplica_riesgo_biologico', 'tiene_riesgo_biologico'),
+    ('aplica_trabajo_excavaciones', 'tiene_trabajo_excavaciones'),
+    ('aplica_trabajo_administrativo', 'tiene_trabajo_administrativo'),
+)
+
+APLICABILIDAD_MASK_COMPLETA = (1 << len(APLICABILIDAD_BITS)) - 1
+
+
+def _valor(fuente: Any, campo: str) -> bool:
+    if isinstance(fuente, Mapping):
+        return bool(fuente.get(campo))
+    return bool(getattr(fuente, campo, False))
+
+
+def calcular_mask_norma(fuente: Any) -> int:
+    """
+    Máscara efectiva de aplicabilidad de una norma (objeto o dict de columnas).
+    Las normas generales tienen máscara 0: aplican a cualquier empresa.
+    """
+    if _valor(fuente, 'aplica_general'):
+        return 0
+    mask = 0
+    for bit, (campo_norma, _) in enumerate(APLICABILIDAD_BITS):
+        if _valor(fuente, campo_norma):
+            mask |= 1 << bit
+    return mask
+
+
+def calcular_mask_empresa(empresa: Any) -> int:
+    """Máscara de características de una empresa, alineada con APLICABILIDAD_BITS."""
+    mask = 0
+    for bit, (_, campo_empresa) in enumerate(APLICABILIDAD_BITS):
+        if _valor(empresa, campo_empresa):
+            mask |= 1 << bit
+    return mask
+
+
 # ===================== MODELOS =====================
 
 class MatrizLegalImportacion(Base):
@@ -75,6 +133,7 @@ class MatrizLegalImportacion(Base):
 
     # Estadísticas de la importación
     total_filas = Column(Integer, default=0)
+    filas_procesadas = Column(Integer, default=0)  # Progreso de la importación en curso
     normas_nuevas = Column(Integer, default=0)
     normas_actualizadas = Column(Integer, default=0)
     normas_sin_cambios = Column(Integer, default=0)
@@ -106,6 +165,11 @@ class MatrizLegalNorma(Base):
             'tipo_norma', 'numero_norma', 'articulo',
             name='uq_matriz_legal_norma_tipo_numero_articulo'
         ),
+        Index(
+            'ix_matriz_legal_normas_vigentes_mask',
+            'aplicabilidad_mask', 'sector_economico_id',
+            postgresql_where=text("activo AND estado = 'vigente'"),
+        ),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -166,6 +230,11 @@ class MatrizLegalNorma(Base):
     # independientemente de sus características específicas
     aplica_general = Column(Boolean, default=True, nullable=False)
 
+    # Máscara de bits derivada de los campos aplica_* (ver APLICABILIDAD_BITS).
+    # Una norma aplica a una empresa si (aplicabilidad_mask & ~mask_empresa) == 0.
+    # Se mantiene al importar y al editar la norma (actualizar_aplicabilidad_mask).
+    aplicabilidad_mask = Column(Integer, default=0, server_default='0', nullable=False)
+
     # Versionado y trazabilidad
     version = Column(Integer, default=1, nullable=False)
     importacion_id = Column(Integer, ForeignKey("matriz_legal_importaciones.id"), nullable=True)
@@ -220,6 +289,10 @@ class MatrizLegalNorma(Base):
         ]
         return any(campos)
 
+    def actualizar_aplicabilidad_mask(self) -> None:
+        """Recalcula `aplicabilidad_mask` a partir de los campos aplica_*."""
+        self.aplicabilidad_mask = calcular_mask_norma(self)
+
 
 class MatrizLegalNormaHistorial(Base):
     """
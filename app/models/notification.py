@@ -63,6 +63,20 @@ class Notification(Base):
         return f"<Notification(id={self.id}, type='{self.notification_type}', status='{self.status}')>"
 
 
+class NotificationUnreadCounter(Base):
+    """Notificaciones sin leer por usuario, mantenido con cada escritura
+    (ver app/services/notification_delivery.py) en vez de contarlas en cada consulta."""
+
+    __tablename__ = "notification_unread_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<NotificationUnreadCounter(user_id={self.user_id}, unread_count={self.unread_count})>"
+
+
 class NotificationTemplate(Base):
     __tablename__ = "notification_templates"
 
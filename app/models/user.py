@@ -2,13 +2,20 @@ from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, Enum as SQLEnum, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Computed, DateTime, Enum as SQLEnum, ForeignKey, Integer, String, Text
+from sqlalchemy.orm import deferred, relationship
 
 from app.database import Base
 from app.utils.db_utils import CaseInsensitiveEnumType
 
 
+# Expresión de la columna generada `search_text` de users y workers
+# (f_unaccent es un envoltorio IMMUTABLE de unaccent creado en la migración)
+PEOPLE_SEARCH_TEXT_SQL = (
+    "f_unaccent(lower(first_name || ' ' || last_name || ' ' || document_number || ' ' || email))"
+)
+
+
 class UserRole(str, Enum):
     ADMIN = "admin"
     TRAINER = "trainer"
@@ -28,6 +35,9 @@ class User(Base):
     document_type = Column(String(20), nullable=False)  # CC, CE, TI, etc.
     document_number = Column(String(50), unique=True, nullable=False)
     phone = Column(String(20))
+    # Texto de búsqueda (minúsculas, sin tildes) generado por PostgreSQL e
+    # indexado con pg_trgm; ver app/services/people_search.py
+    search_text = deferred(Column(Text, Computed(PEOPLE_SEARCH_TEXT_SQL, persisted=True)))
     department = Column(String(100))
     position = Column(String(100))
     hire_date = Column(DateTime)
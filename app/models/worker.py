@@ -2,12 +2,12 @@ from datetime import datetime, date
 from enum import Enum
 from typing import Optional, List
 
-from sqlalchemy import Boolean, Column, DateTime, Date, Enum as SQLEnum, Integer, String, Text, Numeric, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Computed, DateTime, Date, Enum as SQLEnum, Integer, String, Text, Numeric, ForeignKey
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from app.database import Base
-from app.models.user import UserRole
+from app.models.user import PEOPLE_SEARCH_TEXT_SQL, UserRole
 from app.utils.db_utils import CaseInsensitiveEnumType
 
 
@@ -116,6 +116,8 @@ class Worker(Base):
     birth_date = Column(Date, nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=False)
     phone = Column(String(20))
+    # Misma columna generada que User.search_text
+    search_text = deferred(Column(Text, Computed(PEOPLE_SEARCH_TEXT_SQL, persisted=True)))
     
     # Información Laboral
     contract_type = Column(SQLEnum(ContractType), nullable=False)
@@ -4,7 +4,7 @@ import logging
 import asyncio
 
 from app.services.course_notifications import CourseNotificationService
-from app.database import get_db
+from app.database import session_scope
 from app.utils.scheduler_settings import is_scheduler_enabled
 from app.models.admin_config import SystemSettings
 
@@ -23,8 +23,7 @@ class CourseReminderScheduler:
             logger.info("Iniciando tarea diaria de recordatorios de cursos")
 
             # Use a fresh DB session
-            db = next(get_db())
-            try:
+            with session_scope() as db:
                 # Verificar si el scheduler está habilitado
                 if not is_scheduler_enabled(db, SystemSettings.COURSE_REMINDER_SCHEDULER_ENABLED):
                     logger.info("Scheduler de recordatorios de cursos deshabilitado por administrador. No se ejecutará.")
@@ -36,8 +35,6 @@ class CourseReminderScheduler:
                 stats = await loop.run_in_executor(None, service.run_daily_course_reminders)
                 logger.info(f"Tarea diaria de recordatorios completada. Estadísticas: {stats}")
                 return stats
-            finally:
-                db.close()
 
         except Exception as e:
             logger.error(f"Error en tarea diaria de recordatorios: {str(e)}")
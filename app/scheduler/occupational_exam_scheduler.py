@@ -30,6 +30,19 @@ class OccupationalExamScheduler:
         except Exception as e:
             logger.error(f"Error en tarea diaria de notificaciones: {str(e)}")
     
+    async def daily_emo_snapshot_task(self):
+        """Tarea diaria para recalcular la periodicidad EMO de todos los cargos"""
+        try:
+            logger.info("Iniciando recálculo diario de indicadores de periodicidad EMO")
+
+            loop = asyncio.get_event_loop()
+            total = await loop.run_in_executor(None, _refresh_emo_snapshots)
+
+            logger.info(f"Recálculo de periodicidad EMO completado para {total} cargos")
+
+        except Exception as e:
+            logger.error(f"Error en recálculo de periodicidad EMO: {str(e)}")
+
     def start(self):
         """Iniciar el programador de tareas"""
         if self.is_running:
@@ -57,6 +70,16 @@ class OccupationalExamScheduler:
                 max_instances=1
             )
             
+            # Snapshot de periodicidad EMO antes de la jornada (6:00 AM)
+            self.scheduler.add_job(
+                self.daily_emo_snapshot_task,
+                trigger=CronTrigger(hour=6, minute=0),
+                id="daily_emo_snapshot",
+                name="Recálculo diario de periodicidad EMO por cargo",
+                replace_existing=True,
+                max_instances=1
+            )
+
             self.scheduler.start()
             self.is_running = True
             logger.info("Programador de exámenes ocupacionales iniciado")
@@ -83,12 +106,11 @@ class OccupationalExamScheduler:
         try:
             logger.info("Iniciando tarea semanal de resumen de exámenes ocupacionales")
             
-            from app.database import get_db
+            from app.database import session_scope
             from app.services.occupational_exam_notifications import OccupationalExamNotificationService
             from app.services.email_service import EmailService
             
-            db = next(get_db())
-            try:
+            with session_scope() as db:
                 service = OccupationalExamNotificationService(db)
                 stats = service.get_exam_statistics()
                 
@@ -111,8 +133,6 @@ class OccupationalExamScheduler:
                 #     message_html=f"<pre>{summary}</pre>"
                 # )
                 
-            finally:
-                db.close()
             
         except Exception as e:
             logger.error(f"Error en tarea semanal de resumen: {str(e)}")
@@ -141,6 +161,14 @@ class OccupationalExamScheduler:
         await self.daily_exam_notification_task()
 
 
+def _refresh_emo_snapshots() -> int:
+    from app.database import session_scope
+    from app.services.emo_periodicidad import refresh_emo_snapshots
+
+    with session_scope() as db:
+        return refresh_emo_snapshots(db)
+
+
 # Instancia global del programador
 occupational_exam_scheduler = OccupationalExamScheduler()
 
@@ -41,10 +41,12 @@ class AuditLogResponse(AuditLogBase):
 
 class AuditLogListResponse(BaseModel):
     items: List[AuditLogResponse]
-    total: int
+    total: Optional[int]
     page: int
     limit: int
-    total_pages: int
+    total_pages: Optional[int]
+    has_next: bool = False
+    next_cursor: Optional[str] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
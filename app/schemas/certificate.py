@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -134,4 +134,27 @@ class CertificatePDFGeneration(BaseModel):
     course_id: Optional[int] = None
     template_name: Optional[str] = "default"
     include_score: bool = True
-    custom_message: Optional[str] = None
\ No newline at end of file
+    custom_message: Optional[str] = None
+
+
+# Bulk Certificate Generation Schemas
+class CertificateBatchRequest(BaseModel):
+    course_id: Optional[int] = None
+    session_id: Optional[int] = None
+    certificate_ids: Optional[List[int]] = None
+    only_missing: bool = False
+    output: Optional[Literal["zip", "merged"]] = None
+
+
+class CertificateBatchStatus(BaseModel):
+    batch_id: str
+    stage: str
+    total: int
+    rendered: int
+    uploaded: int
+    failed: int
+    output: Optional[str] = None
+    archive_available: bool = False
+    error: Optional[str] = None
+    started_at: datetime
+    finished_at: Optional[datetime] = None
@@ -8,12 +8,15 @@ T = TypeVar('T')
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    # None cuando se pide count=none; aproximado con count=estimated
+    total: Optional[int]
     page: int
     size: int
-    pages: int
+    pages: Optional[int]
     has_next: bool
     has_prev: bool
+    # Token para pedir la página siguiente por keyset (?cursor=...)
+    next_cursor: Optional[str] = None
 
 
 class MessageResponse(BaseModel):
@@ -275,6 +275,7 @@ class MatrizLegalImportacionResult(BaseModel):
     fecha_importacion: datetime
     estado: EstadoImportacion
     total_filas: int
+    filas_procesadas: int = 0
     normas_nuevas: int
     normas_actualizadas: int
     normas_sin_cambios: int
@@ -293,6 +294,7 @@ class MatrizLegalImportacionSimple(BaseModel):
     fecha_importacion: datetime
     estado: EstadoImportacion
     total_filas: int
+    filas_procesadas: int = 0
     normas_nuevas: int
     errores: int
 
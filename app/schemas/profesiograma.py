@@ -298,6 +298,8 @@ class ProfesiogramaEmoSuggestion(BaseModel):
     antiguedad_menor_2_anios: int
     sin_fecha_ingreso: int
     justificacion_periodicidad_emo_borrador: str
+    # Momento del recálculo por lotes usado; None si se calculó al momento
+    indicadores_calculados_en: Optional[datetime] = None
 
 
 class ProfesiogramaEmoFactorInput(BaseModel):
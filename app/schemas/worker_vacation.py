@@ -185,7 +185,7 @@ class VacationAvailability(BaseModel):
     is_available: bool
     conflicts: List[VacationConflict] = []
     requested_days: int
-    available_days: int
+    available_days: Optional[int] = None
 
 
 class VacationStats(BaseModel):
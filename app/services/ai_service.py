@@ -3,11 +3,29 @@ Servicio de Inteligencia Artificial para la plataforma SST.
 
 Integración con Claude AI (Anthropic) para generar sugerencias contextuales
 en la Matriz Legal y Cursos Interactivos.
+
+- Un solo cliente HTTP por proceso (`ClaudeBackend`), con pool de conexiones
+  keep-alive y un semáforo que limita las peticiones simultáneas a la API;
+  antes cada llamada abría un `httpx.AsyncClient` y pagaba el handshake TLS.
+- Caché de respuestas direccionada por contenido (`AIResponseCache`): la
+  clave es el SHA-256 del modelo, el prompt de sistema, `max_tokens` y el
+  prompt normalizado. Las peticiones idénticas simultáneas comparten una
+  sola llamada a la API.
+- `stream_interactive_lesson_content` entrega el texto de la lección a
+  medida que el modelo lo genera.
+- `AI_BACKEND=stub` usa `StubBackend`, un backend local sin red con latencia
+  configurable, para desarrollo y para benchmarks/ai_client.py.
 """
 
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Optional
+import re
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
 import httpx
 
 from app.config import settings
@@ -17,16 +35,157 @@ logger = logging.getLogger(__name__)
 CLAUDE_API_URL = "https://api.anthropic.com/v1/messages"
 CLAUDE_API_VERSION = "2023-06-01"
 
+COMPLIANCE_SYSTEM_PROMPT = "Eres un experto en Seguridad y Salud en el Trabajo (SST) en Colombia. Respondes siempre en formato JSON válido."
+LESSON_SYSTEM_PROMPT = "Eres un experto en Seguridad y Salud en el Trabajo (SST) y diseño instruccional. Generas contenido educativo de alta calidad en formato JSON válido."
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Prompt con los espacios y saltos de línea colapsados y sin espacios en los bordes.
+
+    Las mayúsculas se conservan: cambian la respuesta (siglas, nombres propios)
+    y dos prompts que solo difieren en ellas no deben compartir entrada en caché.
+    """
+    return _WHITESPACE.sub(" ", prompt).strip()
+
+
+def prompt_cache_key(model: str, system: str, max_tokens: int, prompt: str) -> str:
+    payload = json.dumps(
+        [model, normalize_prompt(system), max_tokens, normalize_prompt(prompt)],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AIResponseCache:
+    """
+    Caché LRU en memoria de respuestas de texto, con vencimiento.
+
+    Solo guarda respuestas exitosas. Si llega una petición con la misma clave
+    mientras otra está en curso, espera el resultado de la primera en vez de
+    llamar de nuevo a la API.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 86400.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, text = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return text
+
+    def set(self, key: str, text: str) -> None:
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic(), text)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[str]]) -> str:
+        if not self.enabled:
+            self.misses += 1
+            return await create()
+
+        text = self.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                text = await asyncio.shield(pending)
+                self.hits += 1
+                return text
+            except asyncio.CancelledError:
+                # Si se canceló la petición original (cliente desconectado),
+                # esta la repite; si se canceló esta, se propaga
+                if not pending.cancelled():
+                    raise
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await create()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Evita "Future exception was never retrieved" si nadie esperaba
+            future.exception()
+            raise
+        else:
+            self.set(key, text)
+            future.set_result(text)
+            return text
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
 
-class AIService:
-    """Servicio para interactuar con APIs de IA."""
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
 
-    def __init__(self):
-        self.api_key = settings.claude_api_key
-        self.model = settings.claude_model
+
+def _api_error(response: httpx.Response, body: str) -> Exception:
+    error_detail = body
+    try:
+        error_detail = json.loads(body).get("error", {}).get("message", body)
+    except Exception:
+        pass
+    logger.error(f"Error de Claude API: {response.status_code} - {error_detail}")
+    return Exception(f"Error de API ({response.status_code}): {error_detail}")
+
+
+class ClaudeBackend:
+    """Cliente de la API de mensajes de Claude con conexiones reutilizables."""
+
+    name = "claude"
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        max_connections: int = 10,
+        max_concurrency: int = 8,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.api_key = api_key
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
 
     def is_configured(self) -> bool:
-        """Verifica si el servicio de IA está configurado."""
         return bool(self.api_key)
 
     def _get_headers(self) -> dict:
@@ -36,9 +195,157 @@ class AIService:
             "Content-Type": "application/json",
         }
 
-    def _extract_text(self, data: dict) -> str:
-        """Extrae el texto de la respuesta de Claude API."""
-        return data["content"][0]["text"]
+    def _get_client(self) -> httpx.AsyncClient:
+        # Se crea con la primera petición, ya dentro del event loop de la app
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self._get_headers(),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                transport=self._transport,
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def complete(self, payload: dict, timeout: float) -> str:
+        client = self._get_client()
+        try:
+            async with self._semaphore:
+                response = await client.post(CLAUDE_API_URL, json=payload, timeout=timeout)
+        except httpx.TimeoutException:
+            logger.error("Timeout al conectar con Claude API")
+            raise Exception("Tiempo de espera agotado al conectar con el servicio de IA")
+
+        if response.status_code != 200:
+            logger.error(f"Modelo usado: {payload.get('model')}")
+            raise _api_error(response, response.text)
+        return response.json()["content"][0]["text"]
+
+    async def stream(self, payload: dict, timeout: float) -> AsyncIterator[str]:
+        """Fragmentos de texto del mensaje (eventos `content_block_delta`)."""
+        client = self._get_client()
+        try:
+            async with self._semaphore:
+                async with client.stream(
+                    "POST", CLAUDE_API_URL, json={**payload, "stream": True}, timeout=timeout
+                ) as response:
+                    if response.status_code != 200:
+                        body = (await response.aread()).decode("utf-8", errors="replace")
+                        raise _api_error(response, body)
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        event = json.loads(line[5:])
+                        if event.get("type") == "content_block_delta":
+                            text = event.get("delta", {}).get("text")
+                            if text:
+                                yield text
+                        elif event.get("type") == "error":
+                            raise Exception(f"Error de API: {event.get('error', {}).get('message', '')}")
+        except httpx.TimeoutException:
+            logger.error("Timeout al conectar con Claude API")
+            raise Exception("Tiempo de espera agotado al conectar con el servicio de IA")
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class StubBackend:
+    """
+    Backend local sin red: responde JSON válido con la forma que esperan las
+    sugerencias de cumplimiento y las lecciones, tras `latency_ms` (el tiempo
+    hasta el primer fragmento en streaming).
+    """
+
+    name = "stub"
+
+    def __init__(self, latency_ms: float = 800.0, chunk_size: int = 64, chunk_delay_ms: float = 5.0):
+        self.latency_ms = latency_ms
+        self.chunk_size = chunk_size
+        self.chunk_delay_ms = chunk_delay_ms
+        self.calls = 0
+
+    def is_configured(self) -> bool:
+        return True
+
+    def _respond(self, payload: dict) -> str:
+        prompt = payload["messages"][-1]["content"]
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        if '"slides"' not in prompt:
+            return json.dumps({
+                "evidencia": f"Registros y procedimientos documentados ({digest}).",
+                "observaciones": "Revisar la vigencia de los soportes en cada auditoría interna.",
+                "plan_accion": "Designar responsable, actualizar registros y verificar cumplimiento semestralmente.",
+            }, ensure_ascii=False)
+
+        match = re.search(r"con (\d+) slides", prompt)
+        num_slides = int(match.group(1)) if match else 5
+        slides = [
+            {
+                "order_index": i,
+                "slide_type": "text",
+                "title": f"Contenido {i + 1}",
+                "content": {"html": f"<h2>Contenido {i + 1}</h2><p>Texto generado localmente ({digest}).</p>"},
+            }
+            for i in range(num_slides)
+        ]
+        return json.dumps({
+            "slides": slides,
+            "activity": {
+                "title": "Actividad práctica",
+                "activity_type": "matching",
+                "instructions": "Une cada concepto con su definición",
+                "config": {"pairs": [{"left": "Peligro", "right": "Fuente de daño"}, {"left": "Riesgo", "right": "Probabilidad del daño"}]},
+                "points": 5,
+            },
+        }, ensure_ascii=False)
+
+    async def complete(self, payload: dict, timeout: float) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._respond(payload)
+
+    async def stream(self, payload: dict, timeout: float) -> AsyncIterator[str]:
+        self.calls += 1
+        text = self._respond(payload)
+        await asyncio.sleep(self.latency_ms / 1000)
+        for start in range(0, len(text), self.chunk_size):
+            yield text[start:start + self.chunk_size]
+            await asyncio.sleep(self.chunk_delay_ms / 1000)
+
+    async def aclose(self) -> None:
+        return None
+
+
+def _default_backend():
+    if settings.ai_backend == "stub":
+        return StubBackend(latency_ms=settings.ai_stub_latency_ms)
+    return ClaudeBackend(
+        settings.claude_api_key,
+        max_connections=settings.ai_max_connections,
+        max_concurrency=settings.ai_max_concurrency,
+    )
+
+
+class AIService:
+    """Servicio para interactuar con APIs de IA."""
+
+    def __init__(self, backend=None, cache: Optional[AIResponseCache] = None):
+        self.model = settings.claude_model
+        self.backend = backend or _default_backend()
+        self.cache = cache or AIResponseCache(
+            max_entries=settings.ai_cache_max_entries,
+            ttl_seconds=settings.ai_cache_ttl_seconds,
+        )
+
+    def is_configured(self) -> bool:
+        """Verifica si el servicio de IA está configurado."""
+        return self.backend.is_configured()
 
     def _clean_json_content(self, content: str) -> str:
         """Limpia el contenido JSON que puede venir con markdown."""
@@ -51,8 +358,24 @@ class AIService:
             content = content[:-3]
         return content.strip()
 
-    async def generate_compliance_suggestions(
-        self,
+    def _payload(self, system: str, prompt: str, max_tokens: int) -> dict:
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "system": system,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+        }
+
+    async def _complete(self, system: str, prompt: str, max_tokens: int, timeout: float) -> str:
+        """Texto de la respuesta, desde la caché si el mismo prompt ya se respondió."""
+        key = prompt_cache_key(self.model, system, max_tokens, prompt)
+        payload = self._payload(system, prompt, max_tokens)
+        return await self.cache.get_or_create(key, lambda: self.backend.complete(payload, timeout))
+
+    @staticmethod
+    def _compliance_prompt(
         tipo_norma: str,
         numero_norma: str,
         anio: Optional[int],
@@ -61,16 +384,7 @@ class AIService:
         exigencias: Optional[str],
         tema_general: Optional[str],
         clasificacion: Optional[str],
-    ) -> dict:
-        """
-        Genera sugerencias de cumplimiento para una norma legal.
-
-        Returns:
-            dict con keys: evidencia, observaciones, plan_accion
-        """
-        if not self.is_configured():
-            raise ValueError("Claude API key no configurada")
-
+    ) -> str:
         # Construir el contexto de la norma
         norma_info = f"{tipo_norma} {numero_norma}"
         if anio:
@@ -111,85 +425,65 @@ IMPORTANTE:
 - Si la norma establece periodicidades, inclúyelas en el plan de acción
 - Los textos deben ser concisos (máximo 500 caracteres cada uno)
 - Responde SOLO con el JSON, sin explicaciones adicionales"""
+        return prompt
 
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    CLAUDE_API_URL,
-                    headers=self._get_headers(),
-                    json={
-                        "model": self.model,
-                        "max_tokens": 1000,
-                        "system": "Eres un experto en Seguridad y Salud en el Trabajo (SST) en Colombia. Respondes siempre en formato JSON válido.",
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                    }
-                )
-
-                if response.status_code != 200:
-                    error_detail = response.text
-                    try:
-                        error_json = response.json()
-                        error_detail = error_json.get("error", {}).get("message", response.text)
-                    except Exception:
-                        pass
-                    logger.error(f"Error de Claude API: {response.status_code} - {error_detail}")
-                    logger.error(f"Modelo usado: {self.model}")
-                    raise Exception(f"Error de API ({response.status_code}): {error_detail}")
-
-                data = response.json()
-                content = self._clean_json_content(self._extract_text(data))
-
-                try:
-                    result = json.loads(content)
-                    return {
-                        "evidencia": result.get("evidencia", ""),
-                        "observaciones": result.get("observaciones", ""),
-                        "plan_accion": result.get("plan_accion", ""),
-                    }
-                except json.JSONDecodeError:
-                    logger.warning(f"No se pudo parsear JSON de Claude: {content}")
-                    return {
-                        "evidencia": content[:300] if len(content) > 300 else content,
-                        "observaciones": "",
-                        "plan_accion": "",
-                    }
-
-        except httpx.TimeoutException:
-            logger.error("Timeout al conectar con Claude API")
-            raise Exception("Tiempo de espera agotado al conectar con el servicio de IA")
-        except Exception as e:
-            logger.error(f"Error al generar sugerencias: {str(e)}")
-            raise
-
-
-    async def generate_interactive_lesson_content(
+    async def generate_compliance_suggestions(
         self,
-        titulo: str,
-        tema: str,
-        descripcion: Optional[str] = None,
-        num_slides: int = 5,
-        incluir_quiz: bool = True,
-        incluir_actividad: bool = True,
+        tipo_norma: str,
+        numero_norma: str,
+        anio: Optional[int],
+        descripcion_norma: Optional[str],
+        articulo: Optional[str],
+        exigencias: Optional[str],
+        tema_general: Optional[str],
+        clasificacion: Optional[str],
     ) -> dict:
         """
-        Genera contenido para una lección interactiva sobre SST.
-
-        Args:
-            titulo: Título de la lección
-            tema: Tema principal (ej: "Uso de EPP", "Trabajo en alturas")
-            descripcion: Descripción adicional del contenido deseado
-            num_slides: Número de slides a generar (3-10)
-            incluir_quiz: Si debe incluir preguntas de quiz
-            incluir_actividad: Si debe incluir actividad interactiva
+        Genera sugerencias de cumplimiento para una norma legal.
 
         Returns:
-            dict con slides, quizzes y actividades generadas
+            dict con keys: evidencia, observaciones, plan_accion
         """
         if not self.is_configured():
             raise ValueError("Claude API key no configurada")
 
+        prompt = self._compliance_prompt(
+            tipo_norma, numero_norma, anio, descripcion_norma, articulo, exigencias, tema_general, clasificacion
+        )
+
+        try:
+            content = self._clean_json_content(
+                await self._complete(COMPLIANCE_SYSTEM_PROMPT, prompt, max_tokens=1000, timeout=30.0)
+            )
+
+            try:
+                result = json.loads(content)
+                return {
+                    "evidencia": result.get("evidencia", ""),
+                    "observaciones": result.get("observaciones", ""),
+                    "plan_accion": result.get("plan_accion", ""),
+                }
+            except json.JSONDecodeError:
+                logger.warning(f"No se pudo parsear JSON de Claude: {content}")
+                return {
+                    "evidencia": content[:300] if len(content) > 300 else content,
+                    "observaciones": "",
+                    "plan_accion": "",
+                }
+
+        except Exception as e:
+            logger.error(f"Error al generar sugerencias: {str(e)}")
+            raise
+
+    @staticmethod
+    def _lesson_prompt(
+        titulo: str,
+        tema: str,
+        descripcion: Optional[str],
+        num_slides: int,
+        incluir_quiz: bool,
+        incluir_actividad: bool,
+    ) -> str:
         num_slides = max(3, min(10, num_slides))
 
         context = f"""TÍTULO DE LA LECCIÓN: {titulo}
@@ -281,52 +575,129 @@ IMPORTANTE:
 - El contenido HTML debe ser válido y bien formateado
 - Los quizzes deben tener exactamente una respuesta correcta
 - Responde SOLO con el JSON, sin texto adicional"""
+        return prompt
 
+    def parse_lesson_content(self, text: str) -> dict:
+        """Slides y actividad a partir del texto completo generado para una lección."""
+        content = self._clean_json_content(text)
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(
-                    CLAUDE_API_URL,
-                    headers=self._get_headers(),
-                    json={
-                        "model": self.model,
-                        "max_tokens": 4000,
-                        "system": "Eres un experto en Seguridad y Salud en el Trabajo (SST) y diseño instruccional. Generas contenido educativo de alta calidad en formato JSON válido.",
-                        "messages": [
-                            {"role": "user", "content": prompt}
-                        ],
-                    }
-                )
-
-                if response.status_code != 200:
-                    error_detail = response.text
-                    try:
-                        error_json = response.json()
-                        error_detail = error_json.get("error", {}).get("message", response.text)
-                    except Exception:
-                        pass
-                    logger.error(f"Error de Claude API: {response.status_code} - {error_detail}")
-                    raise Exception(f"Error de API ({response.status_code}): {error_detail}")
-
-                data = response.json()
-                content = self._clean_json_content(self._extract_text(data))
-
-                try:
-                    result = json.loads(content)
-                    return {
-                        "slides": result.get("slides", []),
-                        "activity": result.get("activity"),
-                        "success": True
-                    }
-                except json.JSONDecodeError as e:
-                    logger.warning(f"No se pudo parsear JSON de Claude: {content[:500]}")
-                    raise Exception(f"Error al procesar respuesta de IA: {str(e)}")
+            result = json.loads(content)
+        except json.JSONDecodeError as e:
+            logger.warning(f"No se pudo parsear JSON de Claude: {content[:500]}")
+            raise Exception(f"Error al procesar respuesta de IA: {str(e)}")
+        return {
+            "slides": result.get("slides", []),
+            "activity": result.get("activity"),
+            "success": True
+        }
 
-        except httpx.TimeoutException:
-            logger.error("Timeout al conectar con Claude API")
-            raise Exception("Tiempo de espera agotado al conectar con el servicio de IA")
+    async def generate_interactive_lesson_content(
+        self,
+        titulo: str,
+        tema: str,
+        descripcion: Optional[str] = None,
+        num_slides: int = 5,
+        incluir_quiz: bool = True,
+        incluir_actividad: bool = True,
+    ) -> dict:
+        """
+        Genera contenido para una lección interactiva sobre SST.
+
+        Args:
+            titulo: Título de la lección
+            tema: Tema principal (ej: "Uso de EPP", "Trabajo en alturas")
+            descripcion: Descripción adicional del contenido deseado
+            num_slides: Número de slides a generar (3-10)
+            incluir_quiz: Si debe incluir preguntas de quiz
+            incluir_actividad: Si debe incluir actividad interactiva
+
+        Returns:
+            dict con slides, quizzes y actividades generadas
+        """
+        if not self.is_configured():
+            raise ValueError("Claude API key no configurada")
+
+        prompt = self._lesson_prompt(titulo, tema, descripcion, num_slides, incluir_quiz, incluir_actividad)
+
+        try:
+            text = await self._complete(LESSON_SYSTEM_PROMPT, prompt, max_tokens=4000, timeout=60.0)
+            return self.parse_lesson_content(text)
+        except Exception as e:
+            logger.error(f"Error al generar contenido de lección: {str(e)}")
+            raise
+
+    async def stream_interactive_lesson_content(
+        self,
+        titulo: str,
+        tema: str,
+        descripcion: Optional[str] = None,
+        num_slides: int = 5,
+        incluir_quiz: bool = True,
+        incluir_actividad: bool = True,
+    ) -> AsyncIterator[str]:
+        """
+        Igual que `generate_interactive_lesson_content`, pero entrega el texto
+        (JSON) a medida que se genera. Si el prompt ya está en caché, o hay una
+        petición idéntica en curso, entrega su respuesta completa de una vez.
+        Al terminar, el texto completo queda en caché.
+        """
+        if not self.is_configured():
+            raise ValueError("Claude API key no configurada")
+
+        prompt = self._lesson_prompt(titulo, tema, descripcion, num_slides, incluir_quiz, incluir_actividad)
+        key = prompt_cache_key(self.model, LESSON_SYSTEM_PROMPT, 4000, prompt)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.hits += 1
+            yield cached
+            return
+
+        chunks = []
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def produce() -> str:
+            # Se ejecuta dentro de la caché: otras peticiones idénticas esperan
+            # este resultado en vez de volver a llamar a la API.
+            try:
+                async for chunk in self.backend.stream(self._payload(LESSON_SYSTEM_PROMPT, prompt, 4000), 60.0):
+                    chunks.append(chunk)
+                    queue.put_nowait(chunk)
+            finally:
+                queue.put_nowait(None)
+            return "".join(chunks)
+
+        task = asyncio.ensure_future(self.cache.get_or_create(key, produce))
+        produced = False
+        try:
+            while not task.done() or not queue.empty():
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter not in done:
+                    getter.cancel()
+                    continue
+                chunk = getter.result()
+                if chunk is None:
+                    break
+                produced = True
+                yield chunk
+            text = await task
         except Exception as e:
             logger.error(f"Error al generar contenido de lección: {str(e)}")
             raise
+        finally:
+            if not task.done():
+                task.cancel()
+        if not produced:
+            # Respondida por una petición idéntica que estaba en curso
+            yield text
+
+    def cache_stats(self) -> dict:
+        return {"backend": self.backend.name, **self.cache.stats()}
+
+    async def aclose(self) -> None:
+        """Cierra las conexiones del backend (apagado de la aplicación)."""
+        await self.backend.aclose()
 
 
 # Instancia global del servicio
@@ -1,15 +1,22 @@
+import math
 import secrets
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.models.user import User
 from app.schemas.user import TokenData
-from app.utils.password import password_manager
+from app.utils.password import PasswordHashBusy, password_manager
+from app.utils.rate_limit import TokenBucketLimiter, client_ip, parse_networks
+
+# Upper bound for Retry-After; with a per-minute rate of 0 a bucket never refills
+RETRY_AFTER_MAX_SECONDS = 3600
+
+ACCOUNT_LOCKED_DETAIL = "Su cuenta ha sido bloqueada por múltiples intentos de inicio de sesión fallidos. Para desbloquear su cuenta, debe restablecer su contraseña utilizando el enlace 'Olvidé mi contraseña'."
 
 
 class AuthService:
@@ -18,6 +25,13 @@ class AuthService:
         self.algorithm = settings.algorithm
         self.access_token_expire_minutes = settings.access_token_expire_minutes
         self.refresh_token_expire_days = settings.refresh_token_expire_days
+        # Login attempts per account and per client IP, checked before any
+        # database lookup or bcrypt work
+        self.account_limiter = TokenBucketLimiter(
+            settings.login_rate_account_burst, settings.login_rate_account_per_minute / 60
+        )
+        self.ip_limiter = TokenBucketLimiter(settings.login_rate_ip_burst, settings.login_rate_ip_per_minute / 60)
+        self.trusted_proxies = parse_networks(settings.trusted_proxies)
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify a password against its hash"""
@@ -27,8 +41,62 @@ class AuthService:
         """Hash a password"""
         return password_manager.hash_password(password)
 
-    def authenticate_user(self, db: Session, email: str, password: str) -> Optional[User]:
-        """Authenticate a user by email and password with failed login attempt tracking"""
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in the bcrypt pool (for async handlers)"""
+        try:
+            return await password_manager.verify_password_async(plain_password, hashed_password)
+        except PasswordHashBusy:
+            raise self._hash_busy()
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """Hash a password in the bcrypt pool (for async handlers)"""
+        try:
+            return await password_manager.hash_password_async(password)
+        except PasswordHashBusy:
+            raise self._hash_busy()
+
+    @staticmethod
+    def _hash_busy() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="El servicio está recibiendo demasiados inicios de sesión, intente de nuevo en unos segundos",
+            headers={"Retry-After": "1"},
+        )
+
+    @staticmethod
+    def _account_key(email: str) -> str:
+        return email.strip().lower()
+
+    def client_ip(self, request: Request) -> Optional[str]:
+        """Client address, taken from X-Forwarded-For only behind a trusted proxy"""
+        peer = request.client.host if request.client else None
+        return client_ip(peer, request.headers.get("x-forwarded-for"), self.trusted_proxies)
+
+    def check_login_rate(self, email: str, ip_address: Optional[str] = None) -> None:
+        """Reject the attempt with 429 when the IP or the account is out of tokens"""
+        wait = self.ip_limiter.acquire(ip_address) if ip_address else 0.0
+        if not wait:
+            # An IP that is already throttled does not spend the account's tokens
+            wait = self.account_limiter.acquire(self._account_key(email))
+        if wait:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Demasiados intentos de inicio de sesión. Intente de nuevo más tarde.",
+                headers={"Retry-After": str(max(1, math.ceil(min(wait, RETRY_AFTER_MAX_SECONDS))))},
+            )
+
+    async def authenticate_user(
+        self, db: Session, email: str, password: str, ip_address: Optional[str] = None
+    ) -> Optional[User]:
+        """
+        Authenticate a user by email and password with failed login attempt tracking.
+
+        Rate limits are checked before touching the database, bcrypt runs off
+        the event loop, and a hash made with a cost other than BCRYPT_ROUNDS
+        is replaced on a successful login.
+        """
+        self.check_login_rate(email, ip_address)
+
         # Find user by email only
         user = db.query(User).filter(User.email == email).first()
         
@@ -39,10 +107,10 @@ class AuthService:
         if user.is_account_locked():
             raise HTTPException(
                 status_code=status.HTTP_423_LOCKED,
-                detail="Su cuenta ha sido bloqueada por múltiples intentos de inicio de sesión fallidos. Para desbloquear su cuenta, debe restablecer su contraseña utilizando el enlace 'Olvidé mi contraseña'."
+                detail=ACCOUNT_LOCKED_DETAIL
             )
         
-        if not self.verify_password(password, user.hashed_password):
+        if not await self.verify_password_async(password, user.hashed_password):
             # Increment failed login attempts
             user.increment_failed_login_attempts()
             db.commit()
@@ -51,7 +119,7 @@ class AuthService:
             if user.is_account_locked():
                 raise HTTPException(
                     status_code=status.HTTP_423_LOCKED,
-                    detail="Su cuenta ha sido bloqueada por múltiples intentos de inicio de sesión fallidos. Para desbloquear su cuenta, debe restablecer su contraseña utilizando el enlace 'Olvidé mi contraseña'."
+                    detail=ACCOUNT_LOCKED_DETAIL
                 )
             
             return None
@@ -62,6 +130,13 @@ class AuthService:
                 detail="Inactive user"
             )
         
+        # Upgrade the hash to the configured cost while the password is at hand
+        if password_manager.needs_rehash(user.hashed_password):
+            try:
+                user.hashed_password = await password_manager.hash_password_async(password)
+            except PasswordHashBusy:
+                pass  # Retried on the next login
+        
         # Reset failed login attempts on successful login
         user.reset_failed_login_attempts()
         
@@ -69,6 +144,7 @@ class AuthService:
         user.last_login = datetime.utcnow()
         db.commit()
         
+        self.account_limiter.reset(self._account_key(email))
         return user
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -3,6 +3,9 @@ Plantilla estándar del Programa de Capacitaciones PR-SST-01.
 Basado en el documento oficial del SG-SST.
 """
 
+from app.models.programa_capacitaciones import CapacitacionActividad, CapacitacionSeguimiento
+from app.services.template_instantiation import TemplateRow, monthly_rows
+
 TODOS_LOS_MESES = list(range(1, 13))
 
 NOMBRE_MESES = [
@@ -347,3 +350,15 @@ def get_plantilla_actividades(año: int) -> list:
         act["orden"] = idx
 
     return actividades
+
+
+def get_plantilla_filas(año: int) -> list:
+    """Actividades de la plantilla con sus 12 seguimientos, para `instantiate`."""
+    filas = []
+    for act_data in get_plantilla_actividades(año):
+        meses_programados = act_data.pop("meses_programados", [])
+        filas.append(TemplateRow(
+            CapacitacionActividad, act_data, "programa_id",
+            children=monthly_rows(CapacitacionSeguimiento, "actividad_id", meses_programados, ejecutada=False),
+        ))
+    return filas
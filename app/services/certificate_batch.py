@@ -0,0 +1,279 @@
+import asyncio
+import functools
+import io
+import logging
+import os
+import tempfile
+import threading
+import uuid
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.attendance import Attendance
+from app.models.certificate import Certificate, CertificateStatus
+from app.models.course import Course
+from app.models.user import User
+from app.services.certificate_generator import build_certificate_document, certificate_filename
+from app.services.html_to_pdf import get_html_to_pdf_converter, render_many
+from app.services.s3_storage import contabo_service
+
+logger = logging.getLogger(__name__)
+
+CERTIFICATES_FOLDER = "certificates"
+BATCH_ARCHIVE_DIR = os.path.join(tempfile.gettempdir(), "sst-certificate-batches")
+BATCH_OUTPUTS = ("zip", "merged")
+MAX_TRACKED_BATCHES = 100
+DEFAULT_UPLOAD_CONCURRENCY = 8
+
+
+@dataclass
+class CertificateBatchProgress:
+    """Estado de un lote de certificados, consultable mientras se procesa."""
+
+    batch_id: str
+    total: int
+    output: Optional[str] = None
+    stage: str = "pending"
+    rendered: int = 0
+    uploaded: int = 0
+    failed: int = 0
+    archive_path: Optional[str] = None
+    error: Optional[str] = None
+    started_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def mark_rendered(self, _index: int, emergency: bool) -> None:
+        with self._lock:
+            self.rendered += 1
+            if emergency:
+                self.failed += 1
+
+    def mark_uploaded(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.uploaded += 1
+            else:
+                self.failed += 1
+
+    def finish(self, error: Optional[str] = None) -> None:
+        self.stage = "failed" if error else "completed"
+        self.error = error
+        self.finished_at = datetime.utcnow()
+
+    def as_dict(self) -> Dict:
+        return {
+            "batch_id": self.batch_id,
+            "stage": self.stage,
+            "total": self.total,
+            "rendered": self.rendered,
+            "uploaded": self.uploaded,
+            "failed": self.failed,
+            "output": self.output,
+            "archive_available": bool(self.archive_path and os.path.exists(self.archive_path)),
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_batches: "OrderedDict[str, CertificateBatchProgress]" = OrderedDict()
+_batches_lock = threading.Lock()
+
+
+def create_batch(total: int, output: Optional[str] = None) -> CertificateBatchProgress:
+    progress = CertificateBatchProgress(batch_id=uuid.uuid4().hex, total=total, output=output)
+    with _batches_lock:
+        _batches[progress.batch_id] = progress
+        while len(_batches) > MAX_TRACKED_BATCHES:
+            _, old = _batches.popitem(last=False)
+            if old.archive_path and os.path.exists(old.archive_path):
+                try:
+                    os.remove(old.archive_path)
+                except OSError:
+                    pass
+    return progress
+
+
+def get_batch(batch_id: str) -> Optional[CertificateBatchProgress]:
+    with _batches_lock:
+        return _batches.get(batch_id)
+
+
+def select_certificate_ids(
+    db: Session,
+    *,
+    course_id: Optional[int] = None,
+    session_id: Optional[int] = None,
+    certificate_ids: Optional[List[int]] = None,
+    only_missing: bool = False,
+) -> List[int]:
+    """
+    Certificados de una cohorte de curso, de una sesión de asistencia o de una
+    lista explícita. Los revocados se excluyen.
+    """
+    query = db.query(Certificate.id).filter(Certificate.status != CertificateStatus.REVOKED)
+    if certificate_ids:
+        query = query.filter(Certificate.id.in_(certificate_ids))
+    if course_id is not None:
+        query = query.filter(Certificate.course_id == course_id)
+    if session_id is not None:
+        # Los certificados de asistencia se emiten con completion_date = session_date.
+        query = query.join(
+            Attendance,
+            (Attendance.user_id == Certificate.user_id)
+            & (Attendance.session_date == Certificate.completion_date),
+        ).filter(
+            Attendance.session_id == session_id,
+            Certificate.template_used == "attendance",
+        )
+    if only_missing:
+        query = query.filter((Certificate.file_path.is_(None)) | (Certificate.file_path == ""))
+    return [row.id for row in query.distinct().order_by(Certificate.id).all()]
+
+
+def _store_certificate_pdf(pdf_content: bytes, filename: str) -> str:
+    """Sube el PDF al almacenamiento de objetos, o lo deja en el directorio local."""
+    if settings.use_contabo_storage and contabo_service:
+        return contabo_service.upload_bytes(
+            pdf_content, f"{CERTIFICATES_FOLDER}/{filename}", content_type="application/pdf"
+        )
+    os.makedirs(CERTIFICATES_FOLDER, exist_ok=True)
+    local_filepath = os.path.join(CERTIFICATES_FOLDER, filename)
+    with open(local_filepath, "wb") as f:
+        f.write(pdf_content)
+    return local_filepath
+
+
+def _write_archive(batch_id: str, output: str, documents: List[Tuple[str, bytes]]) -> str:
+    os.makedirs(BATCH_ARCHIVE_DIR, exist_ok=True)
+    if output == "zip":
+        path = os.path.join(BATCH_ARCHIVE_DIR, f"{batch_id}.zip")
+        # Los PDF ya van comprimidos: ZIP_STORED evita gastar CPU sin ganar espacio.
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+            for filename, pdf_content in documents:
+                archive.writestr(filename, pdf_content)
+        return path
+
+    from pypdf import PdfReader, PdfWriter
+
+    path = os.path.join(BATCH_ARCHIVE_DIR, f"{batch_id}.pdf")
+    writer = PdfWriter()
+    for _filename, pdf_content in documents:
+        writer.append(PdfReader(io.BytesIO(pdf_content)))
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+async def run_certificate_batch(
+    db: Session,
+    certificate_ids: List[int],
+    progress: CertificateBatchProgress,
+    *,
+    max_workers: Optional[int] = None,
+    upload_concurrency: int = DEFAULT_UPLOAD_CONCURRENCY,
+) -> CertificateBatchProgress:
+    """
+    Genera los PDF de un lote de certificados en cuatro etapas:
+
+    1. una sola consulta para certificados, usuarios y cursos;
+    2. render en un pool de procesos (`render_many`);
+    3. subida concurrente al almacenamiento (acotada por `upload_concurrency`);
+    4. un único UPDATE masivo de `Certificate.file_path`.
+
+    Opcionalmente deja un ZIP o un PDF combinado con todos los documentos.
+    El avance se publica en `progress`.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        progress.stage = "loading"
+        rows = (
+            db.query(Certificate, User, Course)
+            .join(User, Certificate.user_id == User.id)
+            .outerjoin(Course, Certificate.course_id == Course.id)
+            .filter(Certificate.id.in_(certificate_ids))
+            .order_by(Certificate.id)
+            .all()
+        )
+        progress.total = len(rows)
+
+        logo_url = get_html_to_pdf_converter().logo_url()
+        documents = []
+        jobs = []
+        for certificate, user, course in rows:
+            template_name, css_files, template_data = build_certificate_document(
+                certificate, user, course, logo_url=logo_url
+            )
+            documents.append(
+                (certificate.id, certificate_filename(user.full_name, certificate.certificate_number))
+            )
+            jobs.append(("render_pdf", (template_name, template_data, css_files)))
+
+        progress.stage = "rendering"
+        rendered = await loop.run_in_executor(
+            None, functools.partial(render_many, jobs, max_workers, progress.mark_rendered)
+        )
+
+        progress.stage = "uploading"
+        semaphore = asyncio.Semaphore(upload_concurrency)
+
+        async def upload(filename: str, pdf_content: bytes) -> Optional[str]:
+            async with semaphore:
+                try:
+                    file_path = await loop.run_in_executor(
+                        None, _store_certificate_pdf, pdf_content, filename
+                    )
+                except Exception as e:
+                    logger.error(f"Error subiendo certificado {filename}: {e}")
+                    progress.mark_uploaded(False)
+                    return None
+            progress.mark_uploaded(True)
+            return file_path
+
+        ready = [
+            (certificate_id, filename, pdf_content)
+            for (certificate_id, filename), (pdf_content, emergency) in zip(documents, rendered)
+            if not emergency
+        ]
+        file_paths = await asyncio.gather(
+            *(upload(filename, pdf_content) for _, filename, pdf_content in ready)
+        )
+
+        progress.stage = "saving"
+        updates = [
+            {"id": certificate_id, "file_path": file_path}
+            for (certificate_id, _, _), file_path in zip(ready, file_paths)
+            if file_path
+        ]
+        if updates:
+            db.execute(update(Certificate), updates)
+            db.commit()
+
+        if progress.output in BATCH_OUTPUTS and ready:
+            progress.stage = "archiving"
+            progress.archive_path = await loop.run_in_executor(
+                None,
+                _write_archive,
+                progress.batch_id,
+                progress.output,
+                [(filename, pdf_content) for _, filename, pdf_content in ready],
+            )
+
+        progress.finish()
+        logger.info(
+            f"Lote de certificados {progress.batch_id}: {progress.uploaded}/{progress.total} "
+            f"generados, {progress.failed} con error"
+        )
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error en lote de certificados {progress.batch_id}: {e}")
+        progress.finish(error=str(e))
+    return progress
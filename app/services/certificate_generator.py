@@ -1,9 +1,9 @@
 import os
 import io
-import base64
+import re
 import logging
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from sqlalchemy.orm import Session
 
 from app.models.certificate import Certificate
@@ -11,11 +11,91 @@ from app.models.user import User
 from app.models.course import Course
 from app.utils.storage import StorageManager
 from app.config import settings
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.html_to_pdf import get_html_to_pdf_converter
 
 logger = logging.getLogger(__name__)
 
 
+def sanitize_filename(name: str) -> str:
+    """Nombre en minúsculas, sin tildes ni caracteres especiales, apto para archivos."""
+    name = name.lower()
+    name = re.sub(r'[áàäâ]', 'a', name)
+    name = re.sub(r'[éèëê]', 'e', name)
+    name = re.sub(r'[íìïî]', 'i', name)
+    name = re.sub(r'[óòöô]', 'o', name)
+    name = re.sub(r'[úùüû]', 'u', name)
+    name = re.sub(r'[ñ]', 'n', name)
+    name = re.sub(r'[^a-z0-9]', '_', name)
+    name = re.sub(r'_+', '_', name)  # Evitar múltiples guiones bajos seguidos
+    return name.strip('_')
+
+
+def certificate_filename(user_full_name: str, certificate_number: str) -> str:
+    return f"certificate_{sanitize_filename(user_full_name)}_{certificate_number}.pdf"
+
+
+def build_certificate_document(
+    certificate: Certificate, user: User, course: Optional[Course], logo_url: str = ""
+) -> Tuple[str, List[str], Dict[str, Any]]:
+    """
+    Plantilla, hojas de estilo y contexto del certificado.
+
+    El contexto solo contiene tipos básicos (no objetos ORM), de modo que se
+    puede enviar a un proceso de render del pool.
+
+    Returns:
+        (template_name, css_files, template_data)
+    """
+    if certificate.template_used == "attendance":
+        attendance_data = {
+            "course_name": course.title if course else certificate.title.replace("Certificado de Asistencia - ", ""),
+            "session_date_formatted": certificate.completion_date.strftime("%d/%m/%Y"),
+            "status": "present",
+            "status_display": "PRESENTE",
+            "completion_percentage": 100,
+            "notes": certificate.description or ""
+        }
+        participant_data = {
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "full_name": user.full_name,
+            "document": user.document_number,
+            "phone": getattr(user, 'phone', ''),
+            "position": getattr(user, 'position', ''),
+            "area": getattr(user, 'area', '')
+        }
+        template_data = {
+            "attendance": attendance_data,
+            "participant": participant_data,
+            "generation_date": certificate.issue_date.strftime("%d/%m/%Y"),
+            "generation_time": certificate.issue_date.strftime("%H:%M:%S"),
+            "logo_url": logo_url,
+        }
+        return 'attendance_certificate.html', ['attendance_certificate.css'], template_data
+
+    # Plantilla de certificado de curso (por defecto para "default" y otros tipos)
+    template_data = {
+        "certificate": {
+            "certificate_number": certificate.certificate_number,
+            "verification_code": certificate.verification_code,
+            "score_achieved": certificate.score_achieved,
+            "title": certificate.title,
+        },
+        "user": {
+            "first_name": user.first_name,
+            "last_name": user.last_name,
+            "full_name": user.full_name,
+            "document_number": user.document_number,
+        },
+        "course": {"title": course.title} if course else None,
+        "completion_date": certificate.completion_date.strftime("%d de %B de %Y"),
+        "issue_date": certificate.issue_date.strftime("%d de %B de %Y"),
+        "expiry_date": certificate.expiry_date.strftime("%d/%m/%Y") if certificate.expiry_date else None,
+        "logo_url": logo_url,
+    }
+    return 'certificate.html', ['certificate.css'], template_data
+
+
 class CertificateGenerator:
     def __init__(self, db: Session):
         self.db = db
@@ -48,22 +128,7 @@ class CertificateGenerator:
             raise ValueError("Course not found")
         
         # Generar nombre del archivo
-        import re
-        def sanitize_filename(name):
-            # Reemplazar espacios y caracteres especiales
-            name = name.lower()
-            name = re.sub(r'[áàäâ]', 'a', name)
-            name = re.sub(r'[éèëê]', 'e', name)
-            name = re.sub(r'[íìïî]', 'i', name)
-            name = re.sub(r'[óòöô]', 'o', name)
-            name = re.sub(r'[úùüû]', 'u', name)
-            name = re.sub(r'[ñ]', 'n', name)
-            name = re.sub(r'[^a-z0-9]', '_', name)
-            name = re.sub(r'_+', '_', name) # Evitar múltiples guiones bajos seguidos
-            return name.strip('_')
-
-        user_name_sanitized = sanitize_filename(user.full_name)
-        filename = f"certificate_{user_name_sanitized}_{certificate.certificate_number}.pdf"
+        filename = certificate_filename(user.full_name, certificate.certificate_number)
         local_filepath = os.path.join(self.certificates_dir, filename)
         
         # Crear el PDF localmente usando WeasyPrint
@@ -107,83 +172,16 @@ class CertificateGenerator:
         Crea el archivo PDF del certificado con diseño profesional usando WeasyPrint
         """
         try:
-            # Inicializar el convertidor HTML a PDF
-            converter = HTMLToPDFConverter()
-            
-            # Preparar datos para la plantilla
-            completion_date = certificate.completion_date.strftime("%d de %B de %Y")
-            issue_date = certificate.issue_date.strftime("%d de %B de %Y")
-            expiry_date = certificate.expiry_date.strftime("%d/%m/%Y") if certificate.expiry_date else None
-            
-            template_data = {
-                "certificate": certificate,
-                "user": user,
-                "course": course,
-                "completion_date": completion_date,
-                "issue_date": issue_date,
-                "expiry_date": expiry_date
-            }
-            
-            # Asegurar que template_data sea un diccionario
-            if not isinstance(template_data, dict):
-                if hasattr(template_data, '__dict__'):
-                    template_data = template_data.__dict__
-                else:
-                    template_data = {}
-            
-            # Cargar logo si existe
-            try:
-                logo_path = os.path.join(converter.template_dir, 'logo_3.png')
-                with open(logo_path, 'rb') as image_file:
-                    template_data["logo_base64"] = base64.b64encode(image_file.read()).decode('utf-8')
-            except Exception as e:
-                print(f"Error al cargar el logo: {str(e)}")
-                template_data["logo_base64"] = ""
-            
-            # Determinar qué plantilla usar según el tipo de certificado
-            if certificate.template_used == "attendance":
-                # Usar plantilla de certificado de asistencia
-                template_name = 'attendance_certificate.html'
-                css_files = ['attendance_certificate.css']
-                
-                # Preparar datos específicos para certificado de asistencia
-                # Buscar datos de asistencia si están disponibles
-                attendance_data = {
-                    "course_name": course.title if course else certificate.title.replace("Certificado de Asistencia - ", ""),
-                    "session_date_formatted": certificate.completion_date.strftime("%d/%m/%Y"),
-                    "status": "present",
-                    "status_display": "PRESENTE",
-                    "completion_percentage": 100,
-                    "notes": certificate.description or ""
-                }
-                
-                participant_data = {
-                    "first_name": user.first_name,
-                    "last_name": user.last_name,
-                    "full_name": user.full_name,
-                    "document": user.document_number,
-                    "phone": getattr(user, 'phone', ''),
-                    "position": getattr(user, 'position', ''),
-                    "area": getattr(user, 'area', '')
-                }
-                
-                template_data = {
-                    "attendance": attendance_data,
-                    "participant": participant_data,
-                    "generation_date": certificate.issue_date.strftime("%d/%m/%Y"),
-                    "generation_time": certificate.issue_date.strftime("%H:%M:%S"),
-                    "logo_base64": template_data.get("logo_base64", "")
-                }
-            else:
-                # Usar plantilla de certificado de curso (por defecto para "default" y otros tipos)
-                template_name = 'certificate.html'
-                css_files = ['certificate.css']
-            
+            converter = get_html_to_pdf_converter()
+            template_name, css_files, template_data = build_certificate_document(
+                certificate, user, course, logo_url=converter.logo_url()
+            )
+
             # Renderizar la plantilla HTML
             html_content = converter.render_template(template_name, template_data)
             
             # Generar el PDF usando archivo CSS externo
-            pdf_content = converter.generate_pdf(
+            converter.generate_pdf(
                 html_content=html_content,
                 css_files=css_files,
                 output_path=filepath
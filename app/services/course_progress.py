@@ -0,0 +1,414 @@
+"""
+Motor incremental de progreso de cursos.
+
+Cada evento (material o lección completada, encuesta enviada, evaluación
+calificada) actualiza en la misma transacción los contadores del módulo
+afectado (`UserModuleProgress`) y los de la inscripción (`Enrollment`) con
+consultas agregadas de tamaño constante. La lectura de progreso y la decisión
+de completar el curso se toman de esos contadores en lugar de recorrer
+módulos, materiales, encuestas y evaluaciones una por una.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from sqlalchemy import and_, distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.course import CourseMaterial, CourseModule
+from app.models.enrollment import Enrollment
+from app.models.evaluation import Evaluation, EvaluationStatus, UserEvaluation, UserEvaluationStatus
+from app.models.interactive_lesson import InteractiveLesson, LessonStatus
+from app.models.interactive_progress import LessonProgressStatus, UserLessonProgress
+from app.models.survey import Survey, SurveyStatus, UserSurvey, UserSurveyStatus
+from app.models.user_progress import MaterialProgressStatus, UserModuleProgress, UserMaterialProgress
+
+
+# Porcentaje de avance a partir del cual se habilitan encuestas/evaluación y se puede completar el curso
+COMPLETION_THRESHOLD = 95.0
+
+
+@dataclass
+class CourseRequirementStatus:
+    """Estado de encuestas y evaluaciones de un usuario en un curso (2 consultas por tipo)."""
+
+    surveys: List[Survey] = field(default_factory=list)
+    completed_survey_ids: Set[int] = field(default_factory=set)
+    evaluations: List[Evaluation] = field(default_factory=list)
+    user_evaluations: Dict[int, List[UserEvaluation]] = field(default_factory=dict)
+
+    @property
+    def required_surveys(self) -> List[Survey]:
+        return [s for s in self.surveys if s.required_for_completion]
+
+    @property
+    def pending_required_surveys(self) -> List[Survey]:
+        return [s for s in self.required_surveys if s.id not in self.completed_survey_ids]
+
+    @property
+    def required_surveys_completed(self) -> int:
+        return len(self.required_surveys) - len(self.pending_required_surveys)
+
+    @property
+    def completed_surveys_count(self) -> int:
+        return sum(1 for s in self.surveys if s.id in self.completed_survey_ids)
+
+    def passed_evaluation(self, evaluation_id: int) -> Optional[UserEvaluation]:
+        """Intento completado y aprobado de una evaluación, si existe."""
+        for attempt in self.user_evaluations.get(evaluation_id, []):
+            if attempt.status == UserEvaluationStatus.COMPLETED and attempt.passed:
+                return attempt
+        return None
+
+    @property
+    def pending_evaluations(self) -> List[Evaluation]:
+        return [
+            e for e in self.evaluations
+            if not any(a.passed for a in self.user_evaluations.get(e.id, []))
+        ]
+
+    @property
+    def evaluations_passed(self) -> int:
+        return sum(1 for e in self.evaluations if self.passed_evaluation(e.id))
+
+
+def refresh_module_progress(
+    db: Session, user_id: int, enrollment_id: int, module_id: int
+) -> UserModuleProgress:
+    """
+    Recalcula los contadores de un módulo (materiales + lecciones publicadas)
+    con una sola consulta agregada y crea el registro si aún no existe.
+    """
+    db.flush()
+
+    total_materials = (
+        select(func.count(CourseMaterial.id))
+        .where(CourseMaterial.module_id == module_id)
+        .scalar_subquery()
+    )
+    completed_materials = (
+        select(func.count(UserMaterialProgress.id))
+        .join(CourseMaterial, CourseMaterial.id == UserMaterialProgress.material_id)
+        .where(
+            CourseMaterial.module_id == module_id,
+            UserMaterialProgress.user_id == user_id,
+            UserMaterialProgress.status == MaterialProgressStatus.COMPLETED,
+        )
+        .scalar_subquery()
+    )
+    total_lessons = (
+        select(func.count(InteractiveLesson.id))
+        .where(
+            InteractiveLesson.module_id == module_id,
+            InteractiveLesson.status == LessonStatus.PUBLISHED,
+        )
+        .scalar_subquery()
+    )
+    completed_lessons = (
+        select(func.count(UserLessonProgress.id))
+        .join(InteractiveLesson, InteractiveLesson.id == UserLessonProgress.lesson_id)
+        .where(
+            InteractiveLesson.module_id == module_id,
+            InteractiveLesson.status == LessonStatus.PUBLISHED,
+            UserLessonProgress.user_id == user_id,
+            UserLessonProgress.enrollment_id == enrollment_id,
+            UserLessonProgress.status == LessonProgressStatus.COMPLETED.value,
+        )
+        .scalar_subquery()
+    )
+    counts = db.query(
+        total_materials, completed_materials, total_lessons, completed_lessons
+    ).one()
+
+    module_progress = db.query(UserModuleProgress).filter(
+        and_(
+            UserModuleProgress.user_id == user_id,
+            UserModuleProgress.module_id == module_id
+        )
+    ).first()
+    if not module_progress:
+        module_progress = UserModuleProgress(
+            user_id=user_id,
+            module_id=module_id,
+            enrollment_id=enrollment_id
+        )
+        db.add(module_progress)
+
+    module_progress.materials_completed = (counts[1] or 0) + (counts[3] or 0)
+    module_progress.total_materials = (counts[0] or 0) + (counts[2] or 0)
+    module_progress.calculate_progress()
+    return module_progress
+
+
+def refresh_enrollment_progress(db: Session, enrollment: Enrollment) -> float:
+    """
+    Actualiza el avance de la inscripción como promedio del avance de sus
+    módulos, con una sola consulta agregada sobre `user_module_progress`.
+    """
+    db.flush()
+
+    modules_total = (
+        select(func.count(CourseModule.id))
+        .where(CourseModule.course_id == enrollment.course_id)
+        .scalar_subquery()
+    )
+    row = (
+        db.query(
+            modules_total,
+            func.coalesce(func.sum(UserModuleProgress.progress_percentage), 0.0),
+            func.count(UserModuleProgress.id).filter(
+                UserModuleProgress.status == MaterialProgressStatus.COMPLETED
+            ),
+        )
+        .select_from(UserModuleProgress)
+        .join(CourseModule, CourseModule.id == UserModuleProgress.module_id)
+        .filter(
+            CourseModule.course_id == enrollment.course_id,
+            UserModuleProgress.user_id == enrollment.user_id,
+        )
+        .one()
+    )
+    total_modules = row[0] or 0
+    course_progress_percentage = (row[1] or 0.0) / total_modules if total_modules else 0
+
+    enrollment.modules_total = total_modules
+    enrollment.modules_completed = row[2] or 0
+    enrollment.update_progress(course_progress_percentage)
+    return course_progress_percentage
+
+
+def record_module_activity(
+    db: Session, enrollment: Enrollment, module_id: int
+) -> tuple:
+    """
+    Evento de material o lección completada: actualiza el módulo afectado y el
+    avance de la inscripción. Retorna (module_progress, course_progress_percentage).
+    El commit queda a cargo del llamador.
+    """
+    module_progress = refresh_module_progress(db, enrollment.user_id, enrollment.id, module_id)
+    course_progress_percentage = refresh_enrollment_progress(db, enrollment)
+    return module_progress, course_progress_percentage
+
+
+def refresh_survey_counters(db: Session, enrollment: Enrollment) -> int:
+    """Cuenta las encuestas obligatorias publicadas del curso que el usuario ya completó."""
+    completed = (
+        db.query(func.count(distinct(UserSurvey.survey_id)))
+        .join(Survey, Survey.id == UserSurvey.survey_id)
+        .filter(
+            Survey.course_id == enrollment.course_id,
+            Survey.required_for_completion == True,
+            Survey.status == SurveyStatus.PUBLISHED,
+            UserSurvey.user_id == enrollment.user_id,
+            UserSurvey.status == UserSurveyStatus.COMPLETED,
+        )
+        .scalar()
+    )
+    enrollment.required_surveys_completed = completed or 0
+    return enrollment.required_surveys_completed
+
+
+def refresh_evaluation_counters(db: Session, enrollment: Enrollment) -> int:
+    """Cuenta las evaluaciones publicadas del curso que el usuario completó y aprobó."""
+    passed = (
+        db.query(func.count(distinct(UserEvaluation.evaluation_id)))
+        .join(Evaluation, Evaluation.id == UserEvaluation.evaluation_id)
+        .filter(
+            Evaluation.course_id == enrollment.course_id,
+            Evaluation.status == EvaluationStatus.PUBLISHED,
+            UserEvaluation.user_id == enrollment.user_id,
+            UserEvaluation.status == UserEvaluationStatus.COMPLETED,
+            UserEvaluation.passed == True,
+        )
+        .scalar()
+    )
+    enrollment.evaluations_passed = passed or 0
+    return enrollment.evaluations_passed
+
+
+def _get_enrollment(db: Session, user_id: int, course_id: int) -> Optional[Enrollment]:
+    return db.query(Enrollment).filter(
+        and_(
+            Enrollment.user_id == user_id,
+            Enrollment.course_id == course_id
+        )
+    ).first()
+
+
+def record_survey_completion(db: Session, user_id: int, course_id: int) -> Optional[Enrollment]:
+    """Evento de encuesta enviada: actualiza el contador de la inscripción y confirma."""
+    enrollment = _get_enrollment(db, user_id, course_id)
+    if enrollment:
+        refresh_survey_counters(db, enrollment)
+        db.commit()
+    return enrollment
+
+
+def record_evaluation_result(db: Session, user_id: int, course_id: int) -> Optional[Enrollment]:
+    """Evento de evaluación calificada: actualiza el contador de la inscripción y confirma."""
+    enrollment = _get_enrollment(db, user_id, course_id)
+    if enrollment:
+        refresh_evaluation_counters(db, enrollment)
+        db.commit()
+    return enrollment
+
+
+def course_requirement_totals(db: Session, course_id: int) -> tuple:
+    """Retorna (encuestas_obligatorias, evaluaciones_publicadas) del curso en una consulta."""
+    required_surveys = (
+        select(func.count(Survey.id))
+        .where(
+            Survey.course_id == course_id,
+            Survey.required_for_completion == True,
+            Survey.status == SurveyStatus.PUBLISHED,
+        )
+        .scalar_subquery()
+    )
+    published_evaluations = (
+        select(func.count(Evaluation.id))
+        .where(
+            Evaluation.course_id == course_id,
+            Evaluation.status == EvaluationStatus.PUBLISHED,
+        )
+        .scalar_subquery()
+    )
+    row = db.query(required_surveys, published_evaluations).one()
+    return row[0] or 0, row[1] or 0
+
+
+def _counters_satisfy(enrollment: Enrollment, required_surveys: int, published_evaluations: int) -> bool:
+    surveys_ok = (enrollment.required_surveys_completed or 0) >= required_surveys
+    # Basta con aprobar una de las evaluaciones publicadas del curso
+    evaluation_ok = published_evaluations == 0 or (enrollment.evaluations_passed or 0) > 0
+    return surveys_ok and evaluation_ok
+
+
+def requirements_met(db: Session, enrollment: Enrollment) -> bool:
+    """
+    Decide si la inscripción cumple encuestas y evaluación antes de
+    completarla (y emitir el certificado).
+
+    Los contadores de la inscripción solo se actualizan con los eventos del
+    propio usuario: si se archiva la evaluación aprobada o se reemplaza una
+    encuesta obligatoria, siguen contando el elemento retirado. Por eso se
+    recalculan siempre contra las encuestas y evaluaciones publicadas (dos
+    consultas agregadas); solo se llega aquí con el avance por encima de
+    COMPLETION_THRESHOLD.
+    """
+    required_surveys, published_evaluations = course_requirement_totals(db, enrollment.course_id)
+    refresh_survey_counters(db, enrollment)
+    refresh_evaluation_counters(db, enrollment)
+    return _counters_satisfy(enrollment, required_surveys, published_evaluations)
+
+
+def best_passed_evaluation(db: Session, user_id: int, course_id: int) -> Optional[UserEvaluation]:
+    """Mejor intento aprobado del usuario en las evaluaciones publicadas del curso."""
+    return (
+        db.query(UserEvaluation)
+        .join(Evaluation, Evaluation.id == UserEvaluation.evaluation_id)
+        .filter(
+            Evaluation.course_id == course_id,
+            Evaluation.status == EvaluationStatus.PUBLISHED,
+            UserEvaluation.user_id == user_id,
+            UserEvaluation.status == UserEvaluationStatus.COMPLETED,
+            UserEvaluation.passed == True,
+        )
+        .order_by(UserEvaluation.percentage.desc())
+        .first()
+    )
+
+
+def _published_surveys(course_id: int):
+    return select(Survey).where(
+        and_(
+            Survey.course_id == course_id,
+            Survey.status == SurveyStatus.PUBLISHED
+        )
+    )
+
+
+def _completed_survey_ids(user_id: int, survey_ids: List[int]):
+    return select(UserSurvey.survey_id).where(
+        and_(
+            UserSurvey.user_id == user_id,
+            UserSurvey.survey_id.in_(survey_ids),
+            UserSurvey.status == UserSurveyStatus.COMPLETED
+        )
+    ).distinct()
+
+
+def _published_evaluations(course_id: int):
+    return select(Evaluation).where(
+        and_(
+            Evaluation.course_id == course_id,
+            Evaluation.status == EvaluationStatus.PUBLISHED
+        )
+    )
+
+
+def _evaluation_attempts(user_id: int, evaluation_ids: List[int]):
+    return select(UserEvaluation).where(
+        and_(
+            UserEvaluation.user_id == user_id,
+            UserEvaluation.evaluation_id.in_(evaluation_ids)
+        )
+    ).order_by(UserEvaluation.id)
+
+
+def _requirement_status(
+    surveys: List[Survey],
+    completed_survey_ids: Set[int],
+    evaluations: List[Evaluation],
+    attempts: List[UserEvaluation],
+) -> CourseRequirementStatus:
+    user_evaluations: Dict[int, List[UserEvaluation]] = {}
+    for attempt in attempts:
+        user_evaluations.setdefault(attempt.evaluation_id, []).append(attempt)
+    return CourseRequirementStatus(
+        surveys=surveys,
+        completed_survey_ids=completed_survey_ids,
+        evaluations=evaluations,
+        user_evaluations=user_evaluations,
+    )
+
+
+def load_requirement_status(db: Session, user_id: int, course_id: int) -> CourseRequirementStatus:
+    """
+    Carga encuestas y evaluaciones publicadas del curso junto con las respuestas
+    del usuario en consultas por lote, para armar el detalle de progreso.
+    """
+    surveys = list(db.scalars(_published_surveys(course_id)).all())
+    completed_survey_ids: Set[int] = set()
+    if surveys:
+        completed_survey_ids = set(
+            db.scalars(_completed_survey_ids(user_id, [s.id for s in surveys])).all()
+        )
+
+    evaluations = list(db.scalars(_published_evaluations(course_id)).all())
+    attempts: List[UserEvaluation] = []
+    if evaluations:
+        attempts = list(db.scalars(_evaluation_attempts(user_id, [e.id for e in evaluations])).all())
+
+    return _requirement_status(surveys, completed_survey_ids, evaluations, attempts)
+
+
+async def load_requirement_status_async(
+    db: AsyncSession, user_id: int, course_id: int
+) -> CourseRequirementStatus:
+    """Igual que `load_requirement_status`, con `AsyncSession`."""
+    surveys = list((await db.scalars(_published_surveys(course_id))).all())
+    completed_survey_ids: Set[int] = set()
+    if surveys:
+        completed_survey_ids = set(
+            (await db.scalars(_completed_survey_ids(user_id, [s.id for s in surveys]))).all()
+        )
+
+    evaluations = list((await db.scalars(_published_evaluations(course_id))).all())
+    attempts: List[UserEvaluation] = []
+    if evaluations:
+        attempts = list(
+            (await db.scalars(_evaluation_attempts(user_id, [e.id for e in evaluations]))).all()
+        )
+
+    return _requirement_status(surveys, completed_survey_ids, evaluations, attempts)
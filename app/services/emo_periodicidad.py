@@ -1,13 +1,15 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from datetime import date
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
 from typing import Dict, Iterable, Optional, Tuple
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, insert
+from sqlalchemy.orm import Session, selectinload
 
+from app.config import settings
 from app.models.absenteeism import Absenteeism, EventType
-from app.models.cargo import Cargo
+from app.models.cargo import Cargo, CargoEmoSnapshot
 from app.models.factor_riesgo import FactorRiesgo
 from app.models.occupational_exam import OccupationalExam
 from app.models.profesiograma import Profesiograma, ProfesiogramaFactor
@@ -78,13 +80,13 @@ def compute_stats_from_workers(cargo_id: int, workers: Iterable[Worker], *, toda
     )
 
 
-def compute_stats_for_cargo(db: Session, cargo_id: int) -> CargoEpoStats:
+def compute_stats_for_cargo(db: Session, cargo_id: int, *, today: Optional[date] = None) -> CargoEpoStats:
     workers = (
         db.query(Worker)
         .filter(Worker.cargo_id == cargo_id, Worker.is_active.is_(True))
         .all()
     )
-    return compute_stats_from_workers(cargo_id, workers)
+    return compute_stats_from_workers(cargo_id, workers, today=today)
 
 
 def suggest_periodicidad_emo_meses(stats: CargoEpoStats) -> int:
@@ -248,34 +250,7 @@ class MatrixRiskSummary:
     top_factores: Tuple[MatrixRiskItem, ...]
 
 
-def compute_matrix_risk_summary_for_cargo(
-    db: Session,
-    cargo_id: int,
-    *,
-    today: Optional[date] = None,
-    top_n: int = 3,
-) -> MatrixRiskSummary:
-    today = today or date.today()
-    try:
-        latest = (
-            db.query(Profesiograma)
-            .filter(Profesiograma.cargo_id == cargo_id)
-            .order_by(Profesiograma.fecha_creacion.desc())
-            .first()
-        )
-    except Exception:
-        _safe_rollback(db)
-        latest = None
-
-    if not latest:
-        return MatrixRiskSummary(
-            has_matrix=False,
-            factores_evaluados=0,
-            max_nr=None,
-            conteo_por_nivel={},
-            top_factores=tuple(),
-        )
-
+def _matrix_risk_summary_from_profesiograma(latest: Profesiograma, *, top_n: int = 3) -> MatrixRiskSummary:
     factores = list(getattr(latest, "profesiograma_factores", []) or [])
     if not factores:
         return MatrixRiskSummary(
@@ -333,6 +308,37 @@ def compute_matrix_risk_summary_for_cargo(
     )
 
 
+def compute_matrix_risk_summary_for_cargo(
+    db: Session,
+    cargo_id: int,
+    *,
+    today: Optional[date] = None,
+    top_n: int = 3,
+) -> MatrixRiskSummary:
+    today = today or date.today()
+    try:
+        latest = (
+            db.query(Profesiograma)
+            .filter(Profesiograma.cargo_id == cargo_id)
+            .order_by(Profesiograma.fecha_creacion.desc())
+            .first()
+        )
+    except Exception:
+        _safe_rollback(db)
+        latest = None
+
+    if not latest:
+        return MatrixRiskSummary(
+            has_matrix=False,
+            factores_evaluados=0,
+            max_nr=None,
+            conteo_por_nivel={},
+            top_factores=tuple(),
+        )
+
+    return _matrix_risk_summary_from_profesiograma(latest, top_n=top_n)
+
+
 def compute_matrix_risk_summary_from_inputs(
     db: Session,
     factores: Iterable[Tuple[int, Optional[int], Optional[int], Optional[int]]],
@@ -418,24 +424,8 @@ def _factor_signature(pf: ProfesiogramaFactor) -> Tuple:
     )
 
 
-def compute_matrix_indicators_for_cargo(
-    db: Session,
-    cargo_id: int,
-    *,
-    today: Optional[date] = None,
-) -> MatrixIndicators:
-    today = today or date.today()
-    try:
-        profes = (
-            db.query(Profesiograma)
-            .filter(Profesiograma.cargo_id == cargo_id)
-            .order_by(Profesiograma.fecha_creacion.desc())
-            .limit(2)
-            .all()
-        )
-    except Exception:
-        _safe_rollback(db)
-        profes = []
+def _matrix_indicators_from_profesiogramas(profes: list) -> MatrixIndicators:
+    """`profes`: los profesiogramas del cargo, el más reciente primero (basta con dos)."""
     if not profes:
         return MatrixIndicators(
             has_profesiograma=False,
@@ -478,41 +468,459 @@ def compute_matrix_indicators_for_cargo(
     )
 
 
-def suggest_periodicidad_emo_meses_from_db(
+def compute_matrix_indicators_for_cargo(
     db: Session,
     cargo_id: int,
     *,
     today: Optional[date] = None,
-    matrix_override: Optional[MatrixRiskSummary] = None,
-) -> int:
+) -> MatrixIndicators:
     today = today or date.today()
-    stats = compute_stats_for_cargo(db, cargo_id)
+    try:
+        profes = (
+            db.query(Profesiograma)
+            .filter(Profesiograma.cargo_id == cargo_id)
+            .order_by(Profesiograma.fecha_creacion.desc())
+            .limit(2)
+            .all()
+        )
+    except Exception:
+        _safe_rollback(db)
+        profes = []
+    return _matrix_indicators_from_profesiogramas(profes)
 
-    base = suggest_periodicidad_emo_meses(stats)
-    if base == 24:
+
+# ----------------------------------------------------------------------
+# Insumos de la periodicidad de un cargo: en vivo o desde el snapshot
+# ----------------------------------------------------------------------
+# Ventanas (meses) de los indicadores: 36 para la sugerencia, 24 para los
+# borradores de periodicidades menores a 36 meses
+VENTANAS_MESES = (24, 36)
+
+
+@dataclass(frozen=True)
+class CargoEmoInputs:
+    stats: CargoEpoStats
+    ausentismo: Dict[int, AbsenteeismIndicators]  # por ventana en meses
+    examenes: Dict[int, OccupationalExamIndicators]
+    matriz: MatrixIndicators
+    riesgo_matriz: MatrixRiskSummary
+    fecha_corte: date
+    computed_at: Optional[datetime] = None  # None: calculado al momento
+
+
+def suggest_periodicidad_from_inputs(
+    inputs: CargoEmoInputs,
+    *,
+    matrix_override: Optional[MatrixRiskSummary] = None,
+) -> int:
+    stats = inputs.stats
+    if suggest_periodicidad_emo_meses(stats) == 24:
         return 24
 
-    abs_stats = compute_absenteeism_indicators_for_cargo(db, cargo_id, today=today, window_months=36)
+    abs_stats = inputs.ausentismo[36]
     if abs_stats.accidentes_trabajo > 0 or abs_stats.enfermedades_laborales > 0:
         return 24
 
-    exam_stats = compute_occupational_exam_indicators_for_cargo(db, cargo_id, today=today, window_months=36)
+    exam_stats = inputs.examenes[36]
     if exam_stats.no_apto > 0 or exam_stats.requires_follow_up > 0:
         return 24
 
-    matriz = compute_matrix_indicators_for_cargo(db, cargo_id, today=today)
+    matriz = inputs.matriz
     if matrix_override is None and stats.total_trabajadores_activos > 0 and not matriz.has_profesiograma:
         return 24
     if matriz.has_previous and matriz.is_stable_vs_previous is False:
         return 24
 
-    riesgo_matriz = matrix_override or compute_matrix_risk_summary_for_cargo(db, cargo_id, today=today)
+    riesgo_matriz = matrix_override or inputs.riesgo_matriz
     if riesgo_matriz.max_nr is not None and riesgo_matriz.max_nr >= 50:
         return 24
 
     return 36
 
 
+def compute_cargo_emo_inputs(db: Session, cargo_id: int, *, today: Optional[date] = None) -> CargoEmoInputs:
+    """Insumos de un cargo calculados al momento (varias consultas por cargo)."""
+    today = today or date.today()
+    return CargoEmoInputs(
+        stats=compute_stats_for_cargo(db, cargo_id, today=today),
+        ausentismo={
+            m: compute_absenteeism_indicators_for_cargo(db, cargo_id, today=today, window_months=m)
+            for m in VENTANAS_MESES
+        },
+        examenes={
+            m: compute_occupational_exam_indicators_for_cargo(db, cargo_id, today=today, window_months=m)
+            for m in VENTANAS_MESES
+        },
+        matriz=compute_matrix_indicators_for_cargo(db, cargo_id, today=today),
+        riesgo_matriz=compute_matrix_risk_summary_for_cargo(db, cargo_id, today=today),
+        fecha_corte=today,
+    )
+
+
+def cargo_emo_inputs(db: Session, cargo_id: int, *, today: Optional[date] = None) -> CargoEmoInputs:
+    """
+    Insumos de un cargo desde el snapshot si está vigente
+    (EMO_SNAPSHOT_MAX_AGE_HOURS); si no, o si se pide otra fecha de corte,
+    se calculan al momento.
+    """
+    if today is None or today == date.today():
+        snapshot = get_emo_snapshot(db, cargo_id)
+        if snapshot is not None:
+            return snapshot
+    return compute_cargo_emo_inputs(db, cargo_id, today=today)
+
+
+def suggest_periodicidad_emo_meses_from_db(
+    db: Session,
+    cargo_id: int,
+    *,
+    today: Optional[date] = None,
+    matrix_override: Optional[MatrixRiskSummary] = None,
+    inputs: Optional[CargoEmoInputs] = None,
+) -> int:
+    inputs = inputs or cargo_emo_inputs(db, cargo_id, today=today)
+    return suggest_periodicidad_from_inputs(inputs, matrix_override=matrix_override)
+
+
+# ----------------------------------------------------------------------
+# Recálculo por lotes de todos los cargos
+# ----------------------------------------------------------------------
+_SIN_MATRIZ = MatrixRiskSummary(
+    has_matrix=False,
+    factores_evaluados=0,
+    max_nr=None,
+    conteo_por_nivel={},
+    top_factores=tuple(),
+)
+
+
+def _subtract_years(d: date, years: int) -> date:
+    try:
+        return d.replace(year=d.year - years)
+    except ValueError:  # 29 de febrero
+        return d.replace(year=d.year - years, day=28)
+
+
+def _batch_worker_stats(db: Session, today: date) -> Dict[int, CargoEpoStats]:
+    # Mismos criterios que `compute_stats_from_workers`, agregados en SQL:
+    # edad < 21 <=> nació después de hoy hace 21 años; antigüedad < 2 años
+    # <=> (hoy - ingreso).days / 365.25 < 2 <=> ingresó hace 730 días o menos.
+    corte_21 = _subtract_years(today, 21)
+    corte_2_anios = today - timedelta(days=730)
+    edad_conocida = and_(Worker.birth_date.isnot(None), Worker.birth_date <= today)
+    ingreso_conocido = and_(Worker.fecha_de_ingreso.isnot(None), Worker.fecha_de_ingreso <= today)
+
+    def contar(condicion):
+        return func.coalesce(func.sum(case((condicion, 1), else_=0)), 0)
+
+    rows = (
+        db.query(
+            Worker.cargo_id,
+            func.count(Worker.id),
+            contar(and_(edad_conocida, Worker.birth_date > corte_21)),
+            contar(and_(edad_conocida, Worker.birth_date <= corte_21)),
+            contar(and_(ingreso_conocido, Worker.fecha_de_ingreso >= corte_2_anios)),
+            contar(and_(ingreso_conocido, Worker.fecha_de_ingreso < corte_2_anios)),
+            contar(~ingreso_conocido),
+        )
+        .filter(Worker.is_active.is_(True), Worker.cargo_id.isnot(None))
+        .group_by(Worker.cargo_id)
+        .all()
+    )
+    return {
+        cargo_id: CargoEpoStats(
+            cargo_id=cargo_id,
+            total_trabajadores_activos=int(total),
+            menores_21=int(menores),
+            mayores_igual_21=int(mayores),
+            antiguedad_menor_2_anios=int(antig_menor),
+            antiguedad_mayor_igual_2_anios=int(antig_mayor),
+            sin_fecha_ingreso=int(sin_fecha),
+        )
+        for cargo_id, total, menores, mayores, antig_menor, antig_mayor, sin_fecha in rows
+    }
+
+
+def _batch_absenteeism(db: Session, inicios: Dict[int, date]) -> Dict[Tuple[int, int], AbsenteeismIndicators]:
+    columnas = []
+    for meses in VENTANAS_MESES:
+        en_ventana = Absenteeism.start_date >= inicios[meses]
+        columnas += [
+            func.sum(case((en_ventana, 1), else_=0)),
+            func.sum(case((en_ventana, func.coalesce(Absenteeism.disability_or_charged_days, 0)), else_=0)),
+            func.sum(case((and_(en_ventana, Absenteeism.event_type == EventType.ACCIDENTE_TRABAJO), 1), else_=0)),
+            func.sum(case((and_(en_ventana, Absenteeism.event_type == EventType.ENFERMEDAD_LABORAL), 1), else_=0)),
+        ]
+    rows = (
+        db.query(Worker.cargo_id, *columnas)
+        .join(Worker, Worker.id == Absenteeism.worker_id)
+        .filter(Worker.cargo_id.isnot(None), Absenteeism.start_date >= min(inicios.values()))
+        .group_by(Worker.cargo_id)
+        .all()
+    )
+    result = {}
+    for cargo_id, *valores in rows:
+        for i, meses in enumerate(VENTANAS_MESES):
+            eventos, dias, at, el = (int(v or 0) for v in valores[i * 4:(i + 1) * 4])
+            result[(cargo_id, meses)] = AbsenteeismIndicators(
+                window_start=inicios[meses],
+                window_months=meses,
+                total_eventos=eventos,
+                total_dias_incapacidad=dias,
+                accidentes_trabajo=at,
+                enfermedades_laborales=el,
+            )
+    return result
+
+
+def _batch_exams(db: Session, inicios: Dict[int, date]) -> Dict[Tuple[int, int], OccupationalExamIndicators]:
+    # Un examen cuenta para el cargo al momento del examen y para el cargo
+    # actual del trabajador (como en `compute_occupational_exam_indicators_for_cargo`),
+    # así que se agrega en Python sobre una sola lectura de columnas.
+    rows = (
+        db.query(
+            OccupationalExam.cargo_id_momento_examen,
+            Worker.cargo_id,
+            OccupationalExam.exam_date,
+            OccupationalExam.medical_aptitude_concept,
+            OccupationalExam.requires_follow_up,
+        )
+        .join(Worker, Worker.id == OccupationalExam.worker_id)
+        .filter(OccupationalExam.exam_date >= min(inicios.values()))
+        .all()
+    )
+    conteos: Dict[Tuple[int, int], list] = {}
+    for cargo_examen, cargo_actual, exam_date, concepto, seguimiento in rows:
+        for cargo_id in {cargo_examen, cargo_actual} - {None}:
+            for meses in VENTANAS_MESES:
+                if exam_date < inicios[meses]:
+                    continue
+                c = conteos.setdefault((cargo_id, meses), [0, 0, 0, 0, 0])
+                c[0] += 1
+                c[1] += concepto == "apto"
+                c[2] += concepto == "apto_con_recomendaciones"
+                c[3] += concepto == "no_apto"
+                c[4] += bool(seguimiento)
+    return {
+        (cargo_id, meses): OccupationalExamIndicators(
+            window_start=inicios[meses],
+            window_months=meses,
+            total_examenes=c[0],
+            apto=c[1],
+            apto_con_recomendaciones=c[2],
+            no_apto=c[3],
+            requires_follow_up=c[4],
+        )
+        for (cargo_id, meses), c in conteos.items()
+    }
+
+
+def _batch_profesiogramas(db: Session) -> Dict[int, list]:
+    """Los dos profesiogramas más recientes de cada cargo, con sus factores."""
+    ranking = (
+        db.query(
+            Profesiograma.id.label("id"),
+            func.row_number().over(
+                partition_by=Profesiograma.cargo_id,
+                order_by=(Profesiograma.fecha_creacion.desc(), Profesiograma.id.desc()),
+            ).label("posicion"),
+        ).subquery()
+    )
+    profes = (
+        db.query(Profesiograma)
+        .join(ranking, ranking.c.id == Profesiograma.id)
+        .filter(ranking.c.posicion <= 2)
+        .options(
+            selectinload(Profesiograma.profesiograma_factores).joinedload(ProfesiogramaFactor.factor_riesgo),
+            selectinload(Profesiograma.programas_sve),
+        )
+        .order_by(Profesiograma.cargo_id, ranking.c.posicion)
+        .all()
+    )
+    por_cargo: Dict[int, list] = {}
+    for p in profes:
+        por_cargo.setdefault(p.cargo_id, []).append(p)
+    return por_cargo
+
+
+def compute_company_emo_inputs(db: Session, *, today: Optional[date] = None) -> Dict[int, CargoEmoInputs]:
+    """
+    Insumos de todos los cargos con un número fijo de consultas agrupadas
+    (trabajadores, ausentismo, exámenes y profesiogramas), en vez de
+    varias consultas por cargo.
+    """
+    today = today or date.today()
+    inicios = {m: _subtract_months(_first_day_of_month(today), m) for m in VENTANAS_MESES}
+
+    cargo_ids = [cargo_id for (cargo_id,) in db.query(Cargo.id).order_by(Cargo.id)]
+    stats = _batch_worker_stats(db, today)
+    ausentismo = _batch_absenteeism(db, inicios)
+    examenes = _batch_exams(db, inicios)
+    profesiogramas = _batch_profesiogramas(db)
+
+    result = {}
+    for cargo_id in cargo_ids:
+        profes = profesiogramas.get(cargo_id, [])
+        result[cargo_id] = CargoEmoInputs(
+            stats=stats.get(cargo_id) or compute_stats_from_workers(cargo_id, [], today=today),
+            ausentismo={
+                m: ausentismo.get((cargo_id, m)) or AbsenteeismIndicators(inicios[m], m, 0, 0, 0, 0)
+                for m in VENTANAS_MESES
+            },
+            examenes={
+                m: examenes.get((cargo_id, m)) or OccupationalExamIndicators(inicios[m], m, 0, 0, 0, 0, 0)
+                for m in VENTANAS_MESES
+            },
+            matriz=_matrix_indicators_from_profesiogramas(profes),
+            riesgo_matriz=_matrix_risk_summary_from_profesiograma(profes[0]) if profes else _SIN_MATRIZ,
+            fecha_corte=today,
+        )
+    return result
+
+
+# ----------------------------------------------------------------------
+# Snapshot (tabla cargo_emo_snapshots)
+# ----------------------------------------------------------------------
+def _to_json(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json(v) for v in value]
+    return value
+
+
+def _parse_fecha(value: Optional[str]):
+    if value is None:
+        return None
+    return datetime.fromisoformat(value) if "T" in value else date.fromisoformat(value)
+
+
+def _inputs_to_json(inputs: CargoEmoInputs) -> dict:
+    return _to_json({
+        "stats": asdict(inputs.stats),
+        "ausentismo": {m: asdict(v) for m, v in inputs.ausentismo.items()},
+        "examenes": {m: asdict(v) for m, v in inputs.examenes.items()},
+        "matriz": asdict(inputs.matriz),
+        "riesgo_matriz": asdict(inputs.riesgo_matriz),
+    })
+
+
+def _inputs_from_snapshot(row: CargoEmoSnapshot) -> CargoEmoInputs:
+    datos = row.datos
+    matriz = datos["matriz"]
+    riesgo = datos["riesgo_matriz"]
+    return CargoEmoInputs(
+        stats=CargoEpoStats(**datos["stats"]),
+        ausentismo={
+            int(m): AbsenteeismIndicators(**{**v, "window_start": date.fromisoformat(v["window_start"])})
+            for m, v in datos["ausentismo"].items()
+        },
+        examenes={
+            int(m): OccupationalExamIndicators(**{**v, "window_start": date.fromisoformat(v["window_start"])})
+            for m, v in datos["examenes"].items()
+        },
+        matriz=MatrixIndicators(**{**matriz, "latest_fecha": _parse_fecha(matriz["latest_fecha"])}),
+        riesgo_matriz=MatrixRiskSummary(**{
+            **riesgo,
+            "top_factores": tuple(MatrixRiskItem(**item) for item in riesgo["top_factores"]),
+        }),
+        fecha_corte=row.fecha_corte,
+        computed_at=row.computed_at,
+    )
+
+
+def _snapshot_vigente_desde() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(hours=settings.emo_snapshot_max_age_hours)
+
+
+def get_emo_snapshot(db: Session, cargo_id: int) -> Optional[CargoEmoInputs]:
+    """Insumos del snapshot del cargo si está vigente, si no None."""
+    try:
+        row = (
+            db.query(CargoEmoSnapshot)
+            .filter(
+                CargoEmoSnapshot.cargo_id == cargo_id,
+                CargoEmoSnapshot.computed_at >= _snapshot_vigente_desde(),
+            )
+            .first()
+        )
+    except Exception:
+        _safe_rollback(db)
+        return None
+    return _inputs_from_snapshot(row) if row is not None else None
+
+
+def discard_emo_snapshot(db: Session, cargo_id: int) -> None:
+    """
+    Elimina el snapshot del cargo en la transacción en curso: tras escribir su
+    profesiograma los indicadores de la matriz cambian y las lecturas deben
+    volver al cálculo al momento hasta el próximo recálculo por lotes.
+    """
+    db.query(CargoEmoSnapshot).filter(CargoEmoSnapshot.cargo_id == cargo_id).delete(synchronize_session=False)
+
+
+def snapshot_worker_counts(db: Session, cargo_ids: Iterable[int]) -> Dict[int, int]:
+    """
+    Trabajadores activos por cargo: del snapshot vigente y, para los cargos
+    sin snapshot, con un único conteo agrupado.
+    """
+    cargo_ids = set(cargo_ids) - {None}
+    if not cargo_ids:
+        return {}
+    counts: Dict[int, int] = {}
+    try:
+        counts = dict(
+            db.query(CargoEmoSnapshot.cargo_id, CargoEmoSnapshot.total_trabajadores_activos)
+            .filter(
+                CargoEmoSnapshot.cargo_id.in_(cargo_ids),
+                CargoEmoSnapshot.computed_at >= _snapshot_vigente_desde(),
+            )
+            .all()
+        )
+    except Exception:
+        _safe_rollback(db)
+    faltantes = cargo_ids - counts.keys()
+    if faltantes:
+        counts.update(
+            db.query(Worker.cargo_id, func.count(Worker.id))
+            .filter(Worker.cargo_id.in_(faltantes), Worker.is_active.is_(True))
+            .group_by(Worker.cargo_id)
+            .all()
+        )
+    return {cargo_id: counts.get(cargo_id, 0) for cargo_id in cargo_ids}
+
+
+def refresh_emo_snapshots(db: Session, *, today: Optional[date] = None) -> int:
+    """
+    Recalcula los insumos de todos los cargos y reemplaza el snapshot en una
+    sola transacción (las lecturas ven el anterior hasta el commit).
+    Devuelve el número de cargos.
+    """
+    today = today or date.today()
+    inputs = compute_company_emo_inputs(db, today=today)
+    computed_at = datetime.now(timezone.utc)
+    db.query(CargoEmoSnapshot).delete(synchronize_session=False)
+    if inputs:
+        db.execute(
+            insert(CargoEmoSnapshot),
+            [
+                {
+                    "cargo_id": cargo_id,
+                    "total_trabajadores_activos": data.stats.total_trabajadores_activos,
+                    "periodicidad_sugerida": suggest_periodicidad_from_inputs(data),
+                    "datos": _inputs_to_json(data),
+                    "fecha_corte": today,
+                    "computed_at": computed_at,
+                }
+                for cargo_id, data in inputs.items()
+            ],
+        )
+    db.commit()
+    return len(inputs)
+
+
 def generate_justificacion_periodicidad_emo(
     stats: CargoEpoStats,
     periodicidad_emo_meses: int,
@@ -588,8 +996,10 @@ def generate_justificacion_periodicidad_emo_from_db(
     matrix_override: Optional[MatrixRiskSummary] = None,
     matrix_label: Optional[str] = None,
     formato: str = "breve",
+    inputs: Optional[CargoEmoInputs] = None,
 ) -> str:
-    today = today or date.today()
+    inputs = inputs or cargo_emo_inputs(db, cargo_id, today=today)
+    today = inputs.fecha_corte
     cargo_nombre: Optional[str] = None
     try:
         cargo = db.query(Cargo).filter(Cargo.id == cargo_id).first()
@@ -598,14 +1008,14 @@ def generate_justificacion_periodicidad_emo_from_db(
         _safe_rollback(db)
         cargo_nombre = None
 
-    stats = compute_stats_for_cargo(db, cargo_id)
-    recomendada = suggest_periodicidad_emo_meses_from_db(db, cargo_id, today=today, matrix_override=matrix_override)
+    stats = inputs.stats
+    recomendada = suggest_periodicidad_from_inputs(inputs, matrix_override=matrix_override)
 
     window_months = 36 if periodicidad_emo_meses == 36 else 24
-    abs_stats = compute_absenteeism_indicators_for_cargo(db, cargo_id, today=today, window_months=window_months)
-    exam_stats = compute_occupational_exam_indicators_for_cargo(db, cargo_id, today=today, window_months=window_months)
-    matriz = compute_matrix_indicators_for_cargo(db, cargo_id, today=today)
-    riesgo_matriz = matrix_override or compute_matrix_risk_summary_for_cargo(db, cargo_id, today=today)
+    abs_stats = inputs.ausentismo[window_months]
+    exam_stats = inputs.examenes[window_months]
+    matriz = inputs.matriz
+    riesgo_matriz = matrix_override or inputs.riesgo_matriz
 
     fmt = (formato or "breve").strip().lower()
     if fmt not in ("breve", "detallado"):
@@ -1,21 +1,221 @@
+from __future__ import annotations
+
 import os
+import re
 import jinja2
 import base64
 import tempfile
 import io
 import logging
 import gc
+import mimetypes
 import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from functools import lru_cache
-from typing import Optional, Dict, Any, List
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple, Callable
 
-import weasyprint
+# WeasyPrint (cairo/pango) se importa al renderizar el primer documento y no
+# al importar este módulo, que cargan casi todos los routers.
+if TYPE_CHECKING:
+    import weasyprint
+    from weasyprint.text.fonts import FontConfiguration
 
 logger = logging.getLogger(__name__)
 
 
+# Esquema de URL para recursos estáticos de las plantillas (logo, imágenes)
+# que se resuelven desde memoria con `PDFRenderingResources.url_fetcher`.
+ASSET_URL_SCHEME = "sst-asset:"
+DEFAULT_LOGO_FILENAME = "logo_3.png"
+
+
+# Marca por hilo de que el último render terminó en el PDF de emergencia, para
+# que las cachés de artefactos no guarden documentos de error.
+_render_state = threading.local()
+
+
+def reset_emergency_pdf_flag() -> None:
+    _render_state.emergency = False
+
+
+def emergency_pdf_generated() -> bool:
+    return getattr(_render_state, "emergency", False)
+
+
+def _default_template_dir() -> str:
+    base_dir = Path(__file__).resolve().parent.parent
+    return os.path.join(base_dir, "templates", "reports")
+
+
+class PDFRenderingResources:
+    """
+    Recursos de renderizado compartidos por todo el proceso para un directorio
+    de plantillas: entorno Jinja2 con caché de bytecode, hojas de estilo ya
+    parseadas por WeasyPrint, `FontConfiguration` y los recursos estáticos
+    (logo) servidos desde memoria mediante `url_fetcher`.
+
+    `FontConfiguration` (y los CSS parseados contra ella) no es segura entre
+    hilos: los renders del threadpool usan una por hilo, con su propia caché
+    de hojas de estilo. Jinja2 y los recursos estáticos sí se comparten.
+
+    Las hojas de estilo y los recursos se invalidan por fecha de modificación
+    del archivo, de modo que editar una plantilla no requiere reiniciar.
+    """
+
+    def __init__(self, template_dir: str):
+        self.template_dir = template_dir
+
+        bytecode_dir = os.path.join(tempfile.gettempdir(), "sst-jinja-bytecode")
+        os.makedirs(bytecode_dir, exist_ok=True)
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(self.template_dir),
+            autoescape=jinja2.select_autoescape(["html", "xml"]),
+            bytecode_cache=jinja2.FileSystemBytecodeCache(bytecode_dir),
+        )
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # Se incrementa en clear() para invalidar las cachés de CSS de cada hilo
+        self._css_generation = 0
+        self._assets: Dict[str, Tuple[float, bytes]] = {}
+        self._assets_base64: Dict[str, Tuple[float, str]] = {}
+
+    def _asset_path(self, name: str) -> Optional[str]:
+        """Ruta de un recurso dentro del directorio de plantillas (sin salir de él)."""
+        root = os.path.realpath(self.template_dir)
+        path = os.path.realpath(os.path.join(root, name))
+        if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+            return None
+        return path
+
+    @property
+    def font_config(self) -> FontConfiguration:
+        """`FontConfiguration` del hilo actual (se crea en su primer render)."""
+        font_config = getattr(self._local, "font_config", None)
+        if font_config is None:
+            from weasyprint.text.fonts import FontConfiguration
+
+            font_config = FontConfiguration()
+            self._local.font_config = font_config
+        return font_config
+
+    def _thread_css(self) -> Dict[str, Tuple[float, weasyprint.CSS]]:
+        """Caché de CSS del hilo actual, vaciada si hubo un clear() desde otro hilo."""
+        if getattr(self._local, "css_generation", None) != self._css_generation:
+            self._local.css = {}
+            self._local.css_generation = self._css_generation
+        return self._local.css
+
+    def get_css(self, css_path: str) -> Optional[weasyprint.CSS]:
+        """Hoja de estilo parseada una sola vez por versión del archivo y por hilo."""
+        try:
+            mtime = os.path.getmtime(css_path)
+        except OSError:
+            return None
+
+        css_cache = self._thread_css()
+        cached = css_cache.get(css_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        import weasyprint
+
+        try:
+            css_obj = weasyprint.CSS(
+                filename=css_path,
+                font_config=self.font_config,
+                url_fetcher=self.url_fetcher,
+            )
+        except Exception as e:
+            logger.warning(f"Error al cargar CSS {css_path}: {str(e)}")
+            return None
+
+        css_cache[css_path] = (mtime, css_obj)
+        return css_obj
+
+    def read_asset(self, name: str) -> Optional[bytes]:
+        """Contenido de un recurso estático, leído de disco una sola vez por versión."""
+        path = self._asset_path(name)
+        if path is None:
+            return None
+        mtime = os.path.getmtime(path)
+
+        with self._lock:
+            cached = self._assets.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        with open(path, "rb") as asset_file:
+            data = asset_file.read()
+        with self._lock:
+            self._assets[path] = (mtime, data)
+        return data
+
+    def asset_url(self, name: str) -> str:
+        """URL `sst-asset:` del recurso, o cadena vacía si no existe."""
+        if self._asset_path(name) is None:
+            logger.warning(f"Recurso de plantilla no encontrado: {name}")
+            return ""
+        return f"{ASSET_URL_SCHEME}{name}"
+
+    def asset_base64(self, name: str) -> str:
+        """Recurso en base64 (para plantillas que aún lo embeben en línea), con caché."""
+        path = self._asset_path(name)
+        if path is None:
+            logger.warning(f"Logo no encontrado: {os.path.join(self.template_dir, name)}")
+            return ""
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            cached = self._assets_base64.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+        encoded = base64.b64encode(self.read_asset(name) or b"").decode("utf-8")
+        with self._lock:
+            self._assets_base64[path] = (mtime, encoded)
+        return encoded
+
+    def url_fetcher(self, url: str, *args, **kwargs):
+        """Resuelve `sst-asset:` desde memoria y delega el resto a WeasyPrint."""
+        if url.startswith(ASSET_URL_SCHEME):
+            name = url[len(ASSET_URL_SCHEME):]
+            data = self.read_asset(name)
+            if data is None:
+                raise ValueError(f"Recurso de plantilla no encontrado: {name}")
+            return {
+                "string": data,
+                "mime_type": mimetypes.guess_type(name)[0] or "application/octet-stream",
+                "redirected_url": url,
+            }
+        import weasyprint
+
+        return weasyprint.default_url_fetcher(url, *args, **kwargs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._css_generation += 1
+            self._assets.clear()
+            self._assets_base64.clear()
+
+
+_resources_lock = threading.Lock()
+_resources_by_dir: Dict[str, PDFRenderingResources] = {}
+
+
+def get_rendering_resources(template_dir: Optional[str] = None) -> PDFRenderingResources:
+    """Recursos compartidos del proceso para el directorio de plantillas dado."""
+    key = os.path.realpath(template_dir or _default_template_dir())
+    resources = _resources_by_dir.get(key)
+    if resources is None:
+        with _resources_lock:
+            resources = _resources_by_dir.get(key)
+            if resources is None:
+                resources = PDFRenderingResources(template_dir or _default_template_dir())
+                _resources_by_dir[key] = resources
+    return resources
+
+
 class HTMLToPDFConverter:
     def prepare_attendance_context(self, session_obj, attendees_list):
         """
@@ -74,8 +274,7 @@ class HTMLToPDFConverter:
         """
         if template_dir is None:
             # Usar el directorio de plantillas por defecto
-            base_dir = Path(__file__).resolve().parent.parent
-            self.template_dir = os.path.join(base_dir, "templates", "reports")
+            self.template_dir = _default_template_dir()
         else:
             self.template_dir = template_dir
 
@@ -84,19 +283,9 @@ class HTMLToPDFConverter:
             os.makedirs(self.template_dir, exist_ok=True)
             logger.warning(f"Directorio de plantillas creado: {self.template_dir}")
 
-        # Configurar el entorno de Jinja2
-        self.env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(self.template_dir),
-            autoescape=jinja2.select_autoescape(["html", "xml"]),
-        )
-        
-        # Cache para recursos reutilizables
-        self._logo_cache = None
-        self._css_cache = {}
-        self._template_cache = {}
-        
-        # Lock para operaciones thread-safe
-        self._cache_lock = threading.Lock()
+        # Entorno Jinja2 y logo compartidos por el proceso; fuentes y CSS, por hilo
+        self._resources = get_rendering_resources(self.template_dir)
+        self.env = self._resources.env
         
         # Configuración de optimización
         self.optimization_config = {
@@ -108,7 +297,6 @@ class HTMLToPDFConverter:
         
         # Configuración específica de WeasyPrint para optimizar fuentes
         self.weasyprint_config = {
-            'font_config': None,  # Usar configuración del sistema
             'optimize_images': True,
             'compress': True,
             'pdf_version': (1, 7),
@@ -282,28 +470,11 @@ class HTMLToPDFConverter:
 
             html_content = html_content.replace("</head>", f"{meta_tags}\n</head>")
 
-        # Configurar base_url
-        base_url = self._get_file_url(self.template_dir)
+        # Estilos CSS parseados desde la caché compartida (sin volver a leer los <link>)
+        html_content, stylesheets = self._prepare_stylesheets(html_content, css_files)
 
         # Crear objeto HTML
-        html_obj = weasyprint.HTML(
-            string=html_content, base_url=base_url, encoding="utf-8"
-        )
-
-        # Preparar estilos CSS con cache
-        stylesheets = []
-        if css_files:
-            for css_file in css_files:
-                css_path = os.path.join(self.template_dir, "css", css_file)
-                if os.path.exists(css_path):
-                    try:
-                        # Usar cache para CSS
-                        css = self._load_css_cached(css_path)
-                        if css:
-                            stylesheets.append(css)
-                            logger.info(f"CSS cargado: {css_path}")
-                    except Exception as e:
-                        logger.warning(f"Error al cargar CSS {css_file}: {str(e)}")
+        html_obj = self._make_html(html_content)
 
         # Metadatos para el PDF
         pdf_metadata = {
@@ -322,7 +493,7 @@ class HTMLToPDFConverter:
             "pdf_version": self.weasyprint_config['pdf_version'],
             "optimize_images": self.weasyprint_config['optimize_images'],
             "compress": self.weasyprint_config['compress'],
-            "font_config": self.weasyprint_config['font_config'],
+            "font_config": self._resources.font_config,
             "dpi": self.weasyprint_config['dpi'],
         }
 
@@ -335,6 +506,7 @@ class HTMLToPDFConverter:
             simple_options = {
                 "stylesheets": stylesheets,
                 "metadata": pdf_metadata,
+                "font_config": self._resources.font_config,
             }
             pdf_content = html_obj.write_pdf(**simple_options)
 
@@ -367,6 +539,7 @@ class HTMLToPDFConverter:
         Returns:
             Bytes del PDF básico o mensaje de error
         """
+        _render_state.emergency = True
         try:
             emergency_html = f"""<!DOCTYPE html>
 <html>
@@ -381,6 +554,8 @@ class HTMLToPDFConverter:
 </body>
 </html>"""
 
+            import weasyprint
+
             html_obj = weasyprint.HTML(string=emergency_html)
             return html_obj.write_pdf(
                 pdf_version=(1, 7), metadata={"title": "Error", "author": "SST Sistema"}
@@ -389,10 +564,9 @@ class HTMLToPDFConverter:
             logger.critical(f"Error crítico en PDF de emergencia: {str(e)}")
             return f"Error crítico al generar PDF: {str(e)}".encode("utf-8")
 
-    @lru_cache(maxsize=1)
-    def _load_logo_base64(self, logo_filename="logo_3.png"):
+    def _load_logo_base64(self, logo_filename=DEFAULT_LOGO_FILENAME):
         """
-        Carga el logo y lo convierte a base64 con cache.
+        Logo en base64 desde la caché compartida del proceso.
 
         Args:
             logo_filename: Nombre del archivo de logo
@@ -400,56 +574,69 @@ class HTMLToPDFConverter:
         Returns:
             String base64 del logo o cadena vacía si hay error
         """
-        if self.optimization_config['enable_caching'] and self._logo_cache is not None:
-            return self._logo_cache
-            
-        logo_path = os.path.join(self.template_dir, logo_filename)
-
-        if not os.path.exists(logo_path):
-            logger.warning(f"Logo no encontrado: {logo_path}")
-            return ""
-
         try:
-            with open(logo_path, "rb") as image_file:
-                logo_data = image_file.read()
-                logo_base64 = base64.b64encode(logo_data).decode("utf-8")
-            
-            if self.optimization_config['enable_caching']:
-                with self._cache_lock:
-                    self._logo_cache = logo_base64
-                    
-            logger.info(f"Logo cargado correctamente: {logo_path}")
-            return logo_base64
+            return self._resources.asset_base64(logo_filename)
         except Exception as e:
             logger.error(f"Error al cargar logo: {str(e)}")
             return ""
+
+    def logo_url(self, logo_filename=DEFAULT_LOGO_FILENAME) -> str:
+        """
+        URL del logo resuelta por el `url_fetcher` compartido: WeasyPrint lo
+        obtiene de memoria en lugar de decodificar un data URI en cada PDF.
+        """
+        return self._resources.asset_url(logo_filename)
     
     def _load_css_cached(self, css_path: str) -> Optional[weasyprint.CSS]:
-        """Cargar CSS con cache para mejorar rendimiento."""
+        """Cargar CSS parseado desde la caché compartida del proceso."""
         if not self.optimization_config['enable_caching']:
+            import weasyprint
+
             try:
-                return weasyprint.CSS(filename=css_path)
-            except Exception as e:
-                logger.warning(f"Error al cargar CSS {css_path}: {str(e)}")
-                return None
-        
-        with self._cache_lock:
-            if css_path in self._css_cache:
-                return self._css_cache[css_path]
-            
-            try:
-                css_obj = weasyprint.CSS(filename=css_path)
-                self._css_cache[css_path] = css_obj
-                return css_obj
+                return weasyprint.CSS(filename=css_path, font_config=self._resources.font_config)
             except Exception as e:
                 logger.warning(f"Error al cargar CSS {css_path}: {str(e)}")
                 return None
+        return self._resources.get_css(css_path)
+
+    def _prepare_stylesheets(self, html_content: str, css_files: Optional[List[str]]):
+        """
+        Carga las hojas de estilo parseadas y quita del HTML los `<link>` que
+        apuntan a ellas, para que WeasyPrint no las vuelva a leer y parsear.
+
+        Returns:
+            (html_content, stylesheets)
+        """
+        stylesheets = []
+        for css_file in css_files or []:
+            css_path = os.path.join(self.template_dir, "css", css_file)
+            if not os.path.exists(css_path):
+                continue
+            css = self._load_css_cached(css_path)
+            if css is None:
+                continue
+            stylesheets.append(css)
+            html_content = re.sub(
+                r'<link[^>]*href="[^"]*css/' + re.escape(css_file) + r'"[^>]*>',
+                "",
+                html_content,
+            )
+        return html_content, stylesheets
+
+    def _make_html(self, html_content: str) -> weasyprint.HTML:
+        """Documento WeasyPrint con el `url_fetcher` compartido (recursos `sst-asset:`)."""
+        import weasyprint
+
+        return weasyprint.HTML(
+            string=html_content,
+            base_url=self._get_file_url(self.template_dir),
+            encoding="utf-8",
+            url_fetcher=self._resources.url_fetcher,
+        )
     
     def _clear_memory_cache(self):
         """Limpiar cache de memoria para liberar recursos."""
-        with self._cache_lock:
-            self._css_cache.clear()
-            self._template_cache.clear()
+        self._resources.clear()
         gc.collect()
         logger.info("Cache de memoria limpiado")
 
@@ -466,7 +653,7 @@ class HTMLToPDFConverter:
         """
         try:
             now = datetime.now()
-            logo_base64 = self._load_logo_base64()
+            logo_url = self.logo_url()
             # Si no es dict, intentar convertir
             if not isinstance(template_data, dict):
                 if hasattr(template_data, "__dict__"):
@@ -480,7 +667,7 @@ class HTMLToPDFConverter:
                 session_data, attendees_data
             )
             # Agregar logo y fechas
-            context_validated["logo_base64"] = logo_base64
+            context_validated["logo_url"] = logo_url
             context_validated["generation_date"] = now.strftime("%d/%m/%Y")
             context_validated["generation_time"] = now.strftime("%H:%M:%S")
             # Renderizar plantilla
@@ -489,11 +676,6 @@ class HTMLToPDFConverter:
             )
             # Procesar CSS
             css_path = os.path.join(self.template_dir, "css", "attendance_list.css")
-            if os.path.exists(css_path):
-                css_url = self._get_file_url(css_path)
-                html_content = html_content.replace(
-                    'href="css/attendance_list.css"', f'href="{css_url}"'
-                )
             # Añadir metadatos específicos
             specific_meta = """
     <meta name="title" content="Lista de Asistencia">
@@ -501,16 +683,11 @@ class HTMLToPDFConverter:
     <meta name="keywords" content="asistencia, capacitación, lista">"""
             html_content = html_content.replace("</head>", f"{specific_meta}\n</head>")
             # Generar PDF con configuración específica
-            base_url = self._get_file_url(self.template_dir)
-            html_obj = weasyprint.HTML(
-                string=html_content, base_url=base_url, encoding="utf-8"
+            # Estilos parseados desde la caché compartida (sin volver a leer el <link>)
+            html_content, stylesheets = self._prepare_stylesheets(
+                html_content, [os.path.basename(css_path)]
             )
-            # Cargar CSS con cache
-            stylesheets = []
-            if os.path.exists(css_path):
-                css_obj = self._load_css_cached(css_path)
-                if css_obj:
-                    stylesheets.append(css_obj)
+            html_obj = self._make_html(html_content)
             # Metadatos específicos
             pdf_metadata = {
                 "title": "Lista de Asistencia",
@@ -523,6 +700,7 @@ class HTMLToPDFConverter:
             # Generar PDF con configuración optimizada
             pdf_content = html_obj.write_pdf(
                 stylesheets=stylesheets, 
+                font_config=self._resources.font_config,
                 metadata=pdf_metadata, 
                 pdf_version=(1, 7),
                 optimize_images=True,  # Optimizar imágenes
@@ -553,7 +731,7 @@ class HTMLToPDFConverter:
         """
         try:
             now = datetime.now()
-            logo_base64 = self._load_logo_base64()
+            logo_url = self.logo_url()
 
             # Verificar si template_data es un diccionario o necesita ser convertido
             if not isinstance(template_data, dict):
@@ -565,7 +743,7 @@ class HTMLToPDFConverter:
 
             # Crear contexto
             context = {
-                "logo_base64": logo_base64,
+                "logo_url": logo_url,
                 "statistics": template_data.get("statistics", {}),
                 "pending_exams": template_data.get("pending_exams", []),
                 "overdue_exams": template_data.get("overdue_exams", []),
@@ -579,16 +757,6 @@ class HTMLToPDFConverter:
                 "occupational_exam_report.html", context
             )
 
-            # Procesar CSS
-            css_path = os.path.join(
-                self.template_dir, "css", "occupational_exam_report.css"
-            )
-            if os.path.exists(css_path):
-                css_url = self._get_file_url(css_path)
-                html_content = html_content.replace(
-                    'href="css/occupational_exam_report.css"', f'href="{css_url}"'
-                )
-
             # Generar PDF
             return self.generate_pdf(
                 html_content, ["occupational_exam_report.css"], output_path
@@ -603,7 +771,7 @@ class HTMLToPDFConverter:
     def generate_survey_year_report_pdf(self, template_data, output_path=None):
         try:
             now = datetime.now()
-            logo_base64 = self._load_logo_base64()
+            logo_url = self.logo_url()
 
             if not isinstance(template_data, dict):
                 if hasattr(template_data, "__dict__"):
@@ -612,7 +780,7 @@ class HTMLToPDFConverter:
                     template_data = {}
 
             context = {
-                "logo_base64": logo_base64,
+                "logo_url": logo_url,
                 "survey_title": template_data.get("survey_title", ""),
                 "survey_description": template_data.get("survey_description"),
                 "course_title": template_data.get("course_title"),
@@ -626,13 +794,6 @@ class HTMLToPDFConverter:
 
             html_content = self.render_template("survey_year_report.html", context)
 
-            css_path = os.path.join(self.template_dir, "css", "survey_year_report.css")
-            if os.path.exists(css_path):
-                css_url = self._get_file_url(css_path)
-                html_content = html_content.replace(
-                    'href="css/survey_year_report.css"', f'href="{css_url}"'
-                )
-
             return self.generate_pdf(html_content, ["survey_year_report.css"], output_path)
 
         except Exception as e:
@@ -644,18 +805,12 @@ class HTMLToPDFConverter:
     def generate_nordic_report_pdf(self, template_data, output_path=None):
         """Genera PDF con análisis del Cuestionario Nórdico por región corporal."""
         try:
-            logo_base64 = self._load_logo_base64()
+            logo_url = self.logo_url()
             context = {
-                "logo_base64": logo_base64,
+                "logo_url": logo_url,
                 **template_data,
             }
             html_content = self.render_template("nordic_report.html", context)
-            css_path = os.path.join(self.template_dir, "css", "nordic_report.css")
-            if os.path.exists(css_path):
-                html_content = html_content.replace(
-                    'href="css/nordic_report.css"',
-                    f'href="{self._get_file_url(css_path)}"',
-                )
             return self.generate_pdf(html_content, ["nordic_report.css"], output_path)
         except Exception as e:
             logger.error(f"Error en generate_nordic_report_pdf: {str(e)}")
@@ -664,18 +819,12 @@ class HTMLToPDFConverter:
     def generate_burnout_report_pdf(self, template_data, output_path=None):
         """Genera PDF con análisis MBI (EE, DP, RP) del Síndrome de Burnout."""
         try:
-            logo_base64 = self._load_logo_base64()
+            logo_url = self.logo_url()
             context = {
-                "logo_base64": logo_base64,
+                "logo_url": logo_url,
                 **template_data,
             }
             html_content = self.render_template("burnout_report.html", context)
-            css_path = os.path.join(self.template_dir, "css", "burnout_report.css")
-            if os.path.exists(css_path):
-                html_content = html_content.replace(
-                    'href="css/burnout_report.css"',
-                    f'href="{self._get_file_url(css_path)}"',
-                )
             return self.generate_pdf(html_content, ["burnout_report.css"], output_path)
         except Exception as e:
             logger.error(f"Error en generate_burnout_report_pdf: {str(e)}")
@@ -695,7 +844,7 @@ class HTMLToPDFConverter:
         """
         try:
             now = datetime.now()
-            logo_base64 = self._load_logo_base64()
+            logo_url = self.logo_url()
             
             # Validar y procesar datos de asistencia
             if not isinstance(attendance_data, dict):
@@ -759,7 +908,7 @@ class HTMLToPDFConverter:
             
             # Crear contexto para la plantilla
             context = {
-                "logo_base64": logo_base64,
+                "logo_url": logo_url,
                 "attendance": {
                     "course_name": attendance_data.get("course_name", "Curso no especificado"),
                     "session_date_formatted": session_date_formatted,
@@ -788,11 +937,6 @@ class HTMLToPDFConverter:
             
             # Procesar CSS
             css_path = os.path.join(self.template_dir, "css", "attendance_certificate.css")
-            if os.path.exists(css_path):
-                css_url = self._get_file_url(css_path)
-                html_content = html_content.replace(
-                    'href="css/attendance_certificate.css"', f'href="{css_url}"'
-                )
             
             # Añadir metadatos específicos
             specific_meta = """
@@ -802,17 +946,11 @@ class HTMLToPDFConverter:
             html_content = html_content.replace("</head>", f"{specific_meta}\n</head>")
             
             # Generar PDF con configuración específica para formato horizontal
-            base_url = self._get_file_url(self.template_dir)
-            html_obj = weasyprint.HTML(
-                string=html_content, base_url=base_url, encoding="utf-8"
+            # Estilos parseados desde la caché compartida (sin volver a leer el <link>)
+            html_content, stylesheets = self._prepare_stylesheets(
+                html_content, [os.path.basename(css_path)]
             )
-            
-            # Cargar CSS con cache
-            stylesheets = []
-            if os.path.exists(css_path):
-                css_obj = self._load_css_cached(css_path)
-                if css_obj:
-                    stylesheets.append(css_obj)
+            html_obj = self._make_html(html_content)
             
             # Metadatos específicos
             pdf_metadata = {
@@ -827,6 +965,7 @@ class HTMLToPDFConverter:
             # Generar PDF con configuración optimizada
             pdf_content = html_obj.write_pdf(
                 stylesheets=stylesheets, 
+                font_config=self._resources.font_config,
                 metadata=pdf_metadata, 
                 pdf_version=(1, 7),
                 optimize_images=True,  # Optimizar imágenes
@@ -870,7 +1009,7 @@ class HTMLToPDFConverter:
         """
         try:
             now = datetime.now()
-            logo_base64 = self._load_logo_base64()
+            logo_url = self.logo_url()
 
             if not isinstance(template_data, dict):
                 if hasattr(template_data, "__dict__"):
@@ -882,7 +1021,7 @@ class HTMLToPDFConverter:
             actividad = template_data.get("actividad", {})
 
             context = {
-                "logo_base64": logo_base64,
+                "logo_url": logo_url,
                 "seguimiento": {
                     "id": seguimiento.get("id"),
                     "programa": seguimiento.get("programa", ""),
@@ -925,11 +1064,6 @@ class HTMLToPDFConverter:
             html_content = self.render_template("seguimiento_actividad.html", context)
 
             css_path = os.path.join(self.template_dir, "css", "seguimiento_actividad.css")
-            if os.path.exists(css_path):
-                css_url = self._get_file_url(css_path)
-                html_content = html_content.replace(
-                    'href="css/seguimiento_actividad.css"', f'href="{css_url}"'
-                )
 
             specific_meta = """
     <meta name="title" content="Actividad de Seguimiento SST">
@@ -937,16 +1071,10 @@ class HTMLToPDFConverter:
     <meta name="keywords" content="seguimiento, actividad, sst, trabajador">"""
             html_content = html_content.replace("</head>", f"{specific_meta}\n</head>")
 
-            base_url = self._get_file_url(self.template_dir)
-            html_obj = weasyprint.HTML(
-                string=html_content, base_url=base_url, encoding="utf-8"
+            html_content, stylesheets = self._prepare_stylesheets(
+                html_content, [os.path.basename(css_path)]
             )
-
-            stylesheets = []
-            if os.path.exists(css_path):
-                css_obj = self._load_css_cached(css_path)
-                if css_obj:
-                    stylesheets.append(css_obj)
+            html_obj = self._make_html(html_content)
 
             pdf_metadata = {
                 "title": f"Actividad de Seguimiento SST - {context['actividad']['titulo']}",
@@ -959,6 +1087,7 @@ class HTMLToPDFConverter:
 
             pdf_content = html_obj.write_pdf(
                 stylesheets=stylesheets,
+                font_config=self._resources.font_config,
                 metadata=pdf_metadata,
                 pdf_version=(1, 7),
                 optimize_images=True,
@@ -986,82 +1115,51 @@ class HTMLToPDFConverter:
                 f"Error en actividad de seguimiento: {str(e)}"
             )
     
+    def render_pdf(self, template_name: str, context: Dict[str, Any], css_files: Optional[List[str]] = None):
+        """Renderiza una plantilla y la convierte a PDF (síncrono, apto para procesos hijo)."""
+        html_content = self.render_template(template_name, context)
+        return self.generate_pdf(html_content, css_files)
+
     def generate_bulk_attendance_certificates(self, attendance_list: List[Dict[str, Any]], 
-                                            output_dir: Optional[str] = None) -> List[bytes]:
+                                            output_dir: Optional[str] = None,
+                                            max_workers: Optional[int] = None) -> List[bytes]:
         """
-        Generar múltiples certificados de asistencia de forma optimizada.
+        Generar múltiples certificados de asistencia en paralelo.
+
+        Cada certificado se renderiza en un proceso del pool (WeasyPrint es
+        intensivo en CPU y no libera el GIL); los resultados conservan el
+        orden de `attendance_list`.
         
         Args:
             attendance_list: Lista de datos de asistencia
             output_dir: Directorio donde guardar los PDFs (opcional)
+            max_workers: Procesos de render (por defecto, número de CPUs)
             
         Returns:
             List[bytes]: Lista de contenidos PDF generados
         """
-        results = []
-        batch_size = self.optimization_config['batch_size']
-        gc_frequency = self.optimization_config['gc_frequency']
-        
-        try:
-            logger.info(f"Iniciando generación masiva de {len(attendance_list)} certificados")
-            
-            # Procesar en lotes para optimizar memoria
-            for i in range(0, len(attendance_list), batch_size):
-                batch = attendance_list[i:i + batch_size]
-                batch_results = []
-                
-                logger.info(f"Procesando lote {i//batch_size + 1}/{(len(attendance_list) + batch_size - 1)//batch_size}")
-                
-                for j, attendance_data in enumerate(batch):
-                    try:
-                        # Extraer datos del participante y asistencia
-                        participant_data = attendance_data.get('participant', {})
-                        attendance_info = attendance_data.get('attendance', attendance_data)
-                        
-                        # Generar PDF individual
-                        pdf_content = self.generate_attendance_certificate_pdf(
-                            attendance_info, participant_data
-                        )
-                        
-                        # Guardar si se especifica directorio
-                        if output_dir and isinstance(pdf_content, bytes):
-                            filename = f"certificado_{participant_data.get('document', f'item_{i+j}')}.pdf"
-                            filepath = os.path.join(output_dir, filename)
-                            os.makedirs(output_dir, exist_ok=True)
-                            
-                            with open(filepath, 'wb') as f:
-                                f.write(pdf_content)
-                        
-                        batch_results.append(pdf_content)
-                        
-                        # Ejecutar garbage collection periódicamente
-                        if (i + j + 1) % gc_frequency == 0:
-                            gc.collect()
-                            
-                    except Exception as e:
-                        logger.error(f"Error generando certificado {i+j}: {str(e)}")
-                        batch_results.append(self._generate_emergency_pdf(
-                            f"Error en certificado: {str(e)}"
-                        ))
-                
-                results.extend(batch_results)
-                
-                # Limpiar cache entre lotes para liberar memoria
-                if i + batch_size < len(attendance_list):
-                    self._clear_memory_cache()
-            
-            logger.info(f"Generación masiva completada: {len(results)} certificados")
-            return results
-            
-        except Exception as e:
-            logger.error(f"Error en generación masiva: {str(e)}")
-            # Retornar PDFs de emergencia para los elementos restantes
-            emergency_results = []
-            for _ in range(len(attendance_list) - len(results)):
-                emergency_results.append(self._generate_emergency_pdf(
-                    f"Error en generación masiva: {str(e)}"
-                ))
-            return results + emergency_results
+        logger.info(f"Iniciando generación masiva de {len(attendance_list)} certificados")
+
+        jobs = []
+        for attendance_data in attendance_list:
+            participant_data = attendance_data.get('participant', {})
+            attendance_info = attendance_data.get('attendance', attendance_data)
+            jobs.append(("generate_attendance_certificate_pdf", (attendance_info, participant_data)))
+
+        results = [pdf for pdf, _emergency in render_many(jobs, max_workers=max_workers)]
+
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+            for index, (attendance_data, pdf_content) in enumerate(zip(attendance_list, results)):
+                if not isinstance(pdf_content, bytes):
+                    continue
+                participant_data = attendance_data.get('participant', {})
+                filename = f"certificado_{participant_data.get('document', f'item_{index}')}.pdf"
+                with open(os.path.join(output_dir, filename), 'wb') as f:
+                    f.write(pdf_content)
+
+        logger.info(f"Generación masiva completada: {len(results)} certificados")
+        return results
 
     def generate_meeting_minutes_pdf(self, template_data, output_path=None):
         """
@@ -1076,7 +1174,7 @@ class HTMLToPDFConverter:
         """
         try:
             now = datetime.now()
-            logo_base64 = self._load_logo_base64()
+            logo_url = self.logo_url()
 
             if not isinstance(template_data, dict):
                 if hasattr(template_data, "__dict__"):
@@ -1085,7 +1183,7 @@ class HTMLToPDFConverter:
                     template_data = {}
 
             context = {
-                "logo_base64": logo_base64,
+                "logo_url": logo_url,
                 "acta_number": template_data.get("acta_number", 1),
                 "committee_type": template_data.get("committee_type", "copasst"),
                 "committee_name": template_data.get("committee_name", ""),
@@ -1117,11 +1215,6 @@ class HTMLToPDFConverter:
             html_content = self.render_template("meeting_minutes.html", context)
 
             css_path = os.path.join(self.template_dir, "css", "meeting_minutes.css")
-            if os.path.exists(css_path):
-                css_url = self._get_file_url(css_path)
-                html_content = html_content.replace(
-                    'href="css/meeting_minutes.css"', f'href="{css_url}"'
-                )
 
             specific_meta = """
     <meta name="title" content="Acta de Reunión">
@@ -1129,16 +1222,10 @@ class HTMLToPDFConverter:
     <meta name="keywords" content="acta, reunión, comité, sst">"""
             html_content = html_content.replace("</head>", f"{specific_meta}\n</head>")
 
-            base_url = self._get_file_url(self.template_dir)
-            html_obj = weasyprint.HTML(
-                string=html_content, base_url=base_url, encoding="utf-8"
+            html_content, stylesheets = self._prepare_stylesheets(
+                html_content, [os.path.basename(css_path)]
             )
-
-            stylesheets = []
-            if os.path.exists(css_path):
-                css_obj = self._load_css_cached(css_path)
-                if css_obj:
-                    stylesheets.append(css_obj)
+            html_obj = self._make_html(html_content)
 
             pdf_metadata = {
                 "title": f"Acta de Reunión No. {context['acta_number']}",
@@ -1151,6 +1238,7 @@ class HTMLToPDFConverter:
 
             pdf_content = html_obj.write_pdf(
                 stylesheets=stylesheets,
+                font_config=self._resources.font_config,
                 metadata=pdf_metadata,
                 pdf_version=(1, 7),
                 optimize_images=True,
@@ -1177,3 +1265,85 @@ class HTMLToPDFConverter:
             return self._generate_emergency_pdf(
                 f"Error en acta de reunión: {str(e)}"
             )
+
+
+_default_converter: Optional[HTMLToPDFConverter] = None
+_default_converter_lock = threading.Lock()
+
+
+def get_html_to_pdf_converter() -> HTMLToPDFConverter:
+    """
+    Convertidor compartido del proceso para el directorio de plantillas por defecto.
+
+    El convertidor no guarda estado por petición, así que todos los endpoints
+    pueden reutilizar la misma instancia (y con ella el entorno Jinja2, los CSS
+    parseados y la configuración de fuentes).
+    """
+    global _default_converter
+    if _default_converter is None:
+        with _default_converter_lock:
+            if _default_converter is None:
+                _default_converter = HTMLToPDFConverter()
+    return _default_converter
+
+
+# Por debajo de este número de documentos no compensa arrancar procesos.
+PARALLEL_RENDER_MIN_JOBS = 4
+
+
+def _render_job(method_name: str, args: tuple) -> Tuple[bytes, bool]:
+    """Ejecuta un método del convertidor del proceso actual (proceso hijo del pool)."""
+    reset_emergency_pdf_flag()
+    pdf_content = getattr(get_html_to_pdf_converter(), method_name)(*args)
+    return pdf_content, emergency_pdf_generated()
+
+
+def render_many(
+    jobs: List[Tuple[str, tuple]],
+    max_workers: Optional[int] = None,
+    on_done: Optional[Callable[[int, bool], None]] = None,
+) -> List[Tuple[bytes, bool]]:
+    """
+    Renderiza varios PDF en un pool de procesos.
+
+    Args:
+        jobs: Lista de (método del convertidor, argumentos). Los argumentos
+            deben ser serializables (dicts y tipos básicos, no objetos ORM).
+        max_workers: Número de procesos; por defecto el número de CPUs.
+        on_done: Callback `(índice, emergencia)` al terminar cada documento,
+            para seguimiento de progreso. Se llama desde el hilo que invoca.
+
+    Returns:
+        Lista de (pdf, emergencia) en el mismo orden que `jobs`. `emergencia`
+        indica que el render falló y el PDF es el documento de error.
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    results: List[Optional[Tuple[bytes, bool]]] = [None] * len(jobs)
+
+    if workers <= 1 or len(jobs) < PARALLEL_RENDER_MIN_JOBS:
+        for index, (method_name, args) in enumerate(jobs):
+            results[index] = _render_job(method_name, args)
+            if on_done:
+                on_done(index, results[index][1])
+        return results
+
+    # `spawn` evita heredar hilos y conexiones del proceso del servidor.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {
+            pool.submit(_render_job, method_name, args): index
+            for index, (method_name, args) in enumerate(jobs)
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                logger.error(f"Error renderizando documento {index} en el pool: {str(e)}")
+                results[index] = (
+                    get_html_to_pdf_converter()._generate_emergency_pdf(f"Error en render: {str(e)}"),
+                    True,
+                )
+            if on_done:
+                on_done(index, results[index][1])
+    return results
@@ -0,0 +1,393 @@
+"""
+Derivados redimensionados de las imágenes del almacenamiento (fotos de las
+autoevaluaciones de trabajo en casa, firmas) con caché en disco.
+
+Cada imagen se sirve en uno de los tamaños de `DERIVATIVE_SIZES` (lado
+mayor en píxeles) y en WebP o JPEG según lo que acepte el cliente; las
+imágenes con transparencia (firmas) salen en PNG cuando no se pide WebP.
+Los PDF incrustan el tamaño `small` en JPEG/PNG.
+
+La clave de un derivado es el SHA-256 de (hash del original, tamaño,
+formato, versión del pipeline), y sirve también de ETag. Las fotos se
+suben con nombre fijo (`{tipo}.jpg`), así que una URL puede cambiar de
+contenido: el hash del original de cada URL se recuerda en memoria durante
+`source_ttl` segundos; pasado ese tiempo se vuelve a descargar el original
+y, si no cambió, el derivado sigue saliendo del disco sin redimensionar.
+"""
+
+import asyncio
+import base64
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Cambiar al modificar el redimensionado o la calidad: invalida los derivados.
+PIPELINE_VERSION = "1"
+
+# Lado mayor de cada tamaño; `original` sirve los bytes tal cual.
+DERIVATIVE_SIZES: Dict[str, Optional[int]] = {
+    "thumb": 320,
+    "small": 800,
+    "large": 1600,
+    "original": None,
+}
+DEFAULT_SIZE = "large"
+PDF_SIZE = "small"
+
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+
+@dataclass
+class ImageDerivative:
+    data: bytes
+    content_type: str
+    etag: str
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """`webp` si el cliente lo acepta (cabecera Accept), si no `jpeg`."""
+    return "webp" if accept and "image/webp" in accept else "jpeg"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def sniff_content_type(data: bytes, url: str = "") -> str:
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return mimetypes.guess_type(url)[0] or "application/octet-stream"
+
+
+def render_derivative(source: bytes, max_side: int, image_format: str) -> bytes:
+    """Redimensiona `source` para que su lado mayor no pase de `max_side` (sin ampliar)."""
+    from PIL import Image, ImageOps
+
+    with Image.open(BytesIO(source)) as opened:
+        # En JPEG, draft decodifica directamente a 1/2, 1/4 u 1/8 de la resolución.
+        opened.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(opened)
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or (image.mode == "P" and "transparency" in image.info)
+    output = BytesIO()
+    if image_format == "webp":
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        image.save(output, "WEBP", quality=WEBP_QUALITY, method=4)
+    elif has_alpha:
+        image.convert("RGBA").save(output, "PNG", optimize=True)
+    else:
+        image.convert("RGB").save(output, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+class ImageDerivativeCache:
+    """
+    Caché de derivados de imágenes en disco local, con desalojo LRU (por
+    fecha de acceso) al superar `max_bytes`.
+
+    El redimensionado y todo acceso al disco corren en un pool de `workers`
+    hilos para no bloquear el event loop, y las peticiones simultáneas del
+    mismo derivado esperan un único render.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int,
+        fetch: Callable[[str], Awaitable[Optional[bytes]]],
+        source_ttl: float = 300,
+        workers: int = 2,
+        enabled: bool = True,
+        max_sources: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.source_ttl = source_ttl
+        self.enabled = enabled
+        self.max_sources = max_sources
+        self._fetch = fetch
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self._evicting = False
+        # url -> (hash del original, momento de la descarga), de la menos a la más reciente
+        self._sources: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="image-derivatives")
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.downloads = 0
+
+    # ------------------------------------------------------------------
+    # Claves y originales
+    # ------------------------------------------------------------------
+    def key_for(self, source_digest: str, size: str, image_format: str) -> str:
+        if DERIVATIVE_SIZES[size] is None:
+            image_format = ""  # el original no depende del formato pedido
+        payload = f"{source_digest}\0{size}\0{image_format}\0{PIPELINE_VERSION}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def etag_for(key: str) -> str:
+        return f'"{key}"'
+
+    def _source_digest(self, url: str) -> Optional[str]:
+        with self._lock:
+            entry = self._sources.get(url)
+            if entry is None:
+                return None
+            if self._clock() - entry[1] > self.source_ttl:
+                del self._sources[url]
+                return None
+            self._sources.move_to_end(url)
+            return entry[0]
+
+    def _remember(self, url: str, digest: str) -> None:
+        with self._lock:
+            self._sources.pop(url, None)
+            self._sources[url] = (digest, self._clock())
+            while len(self._sources) > self.max_sources:
+                self._sources.popitem(last=False)
+
+    def forget(self, url: str) -> None:
+        """Olvida el hash del original de `url` (p. ej. tras volver a subir la imagen)."""
+        with self._lock:
+            self._sources.pop(url, None)
+
+    async def _download(self, url: str) -> Tuple[Optional[bytes], Optional[str]]:
+        self.downloads += 1
+        source = await self._fetch(url)
+        if not source:
+            self.forget(url)
+            return None, None
+        digest = hashlib.sha256(source).hexdigest()
+        self._remember(url, digest)
+        return source, digest
+
+    def cached_etag(self, url: str, size: str, image_format: str) -> Optional[str]:
+        """ETag del derivado si el hash del original sigue vigente; no descarga nada."""
+        digest = self._source_digest(url)
+        if digest is None:
+            return None
+        return self.etag_for(self.key_for(digest, size, image_format))
+
+    # ------------------------------------------------------------------
+    # API principal
+    # ------------------------------------------------------------------
+    async def get(self, url: str, size: str = DEFAULT_SIZE, image_format: str = "jpeg") -> Optional[ImageDerivative]:
+        """
+        Devuelve el derivado de `url` en `size`/`image_format`, desde el disco
+        o generándolo. None si el original no existe en el almacenamiento.
+        """
+        if size not in DERIVATIVE_SIZES:
+            raise ValueError(f"Tamaño de imagen no soportado: {size}")
+
+        source = None
+        digest = self._source_digest(url)
+        if digest is None:
+            source, digest = await self._download(url)
+            if source is None:
+                return None
+
+        key = self.key_for(digest, size, image_format)
+        data = await self._in_executor(self._read, key)
+        if data is None and source is None:
+            # El hash vigente no tiene derivado en disco (desalojado o tamaño nuevo).
+            source, digest = await self._download(url)
+            if source is None:
+                return None
+            key = self.key_for(digest, size, image_format)
+            data = await self._in_executor(self._read, key)
+
+        if data is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            data = await self._render_once(key, source, size, image_format)
+        return ImageDerivative(data=data, content_type=sniff_content_type(data, url), etag=self.etag_for(key))
+
+    async def data_uri(self, url: Optional[str], size: str = PDF_SIZE) -> Optional[str]:
+        """Derivado en JPEG/PNG como data URI, para incrustarlo en un PDF."""
+        if not url:
+            return None
+        try:
+            derivative = await self.get(url, size, "jpeg")
+        except Exception as e:
+            logger.warning(f"Error preparando imagen {url} para PDF: {e}")
+            return None
+        if derivative is None:
+            return None
+        return f"data:{derivative.content_type};base64,{base64.b64encode(derivative.data).decode('ascii')}"
+
+    async def _render_once(self, key: str, source: bytes, size: str, image_format: str) -> bytes:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render_and_store(key, source, size, image_format))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _in_executor(self, func: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def _render_and_store(self, key: str, source: bytes, size: str, image_format: str) -> bytes:
+        max_side = DERIVATIVE_SIZES[size]
+        if max_side is None:
+            data = source
+        else:
+            try:
+                data = await self._in_executor(render_derivative, source, max_side, image_format)
+            except Exception as e:
+                # Formato que Pillow no sabe leer: se sirve el original sin guardarlo.
+                logger.warning(f"No se pudo redimensionar la imagen {key}: {e}")
+                return source
+            self.renders += 1
+        await self._in_executor(self._write, key, data)
+        return data
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "renders": self.renders,
+            "downloads": self.downloads,
+            "sources": len(self._sources),
+            "bytes": self._size,
+        }
+
+    # ------------------------------------------------------------------
+    # Disco (siempre desde los hilos del pool, nunca en el event loop)
+    # ------------------------------------------------------------------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.img")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cached:
+                data = cached.read()
+            os.utime(path)  # marca de acceso para el LRU
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Error leyendo imagen en caché {key}: {e}")
+            return None
+
+    def _write(self, key: str, data: bytes) -> None:
+        if not self.enabled:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as tmp:
+                tmp.write(data)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Error escribiendo imagen en caché {key}: {e}")
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data) - previous
+        self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".img"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        # El recorrido del directorio se hace sin el lock, que también protege
+        # los hashes de originales que se consultan desde el event loop. Solo
+        # desaloja un hilo a la vez; mientras tanto el tamaño queda sin contar
+        # (None) y el recorrido lo vuelve a fijar (o lo deja en None si falla).
+        with self._lock:
+            if self._evicting or (self._size is not None and self._size <= self.max_bytes):
+                return
+            self._evicting = True
+            self._size = None
+        total: Optional[int] = None
+        try:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_bytes:
+                # Se desaloja hasta el 90% para no recorrer el directorio en cada escritura.
+                target = int(self.max_bytes * 0.9)
+                for _, size, path in sorted(entries):
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                        total -= size
+                    except OSError:
+                        continue
+        finally:
+            with self._lock:
+                self._size = total
+                self._evicting = False
+
+    def clear(self) -> None:
+        """Vacía la caché (bloqueante: para tareas de mantenimiento y tests)."""
+        with self._lock:
+            self._sources.clear()
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._size = 0
+
+
+def _build_default_cache() -> ImageDerivativeCache:
+    from app.utils.storage import storage_manager
+
+    return ImageDerivativeCache(
+        cache_dir=settings.image_cache_dir,
+        max_bytes=settings.image_cache_max_bytes,
+        fetch=storage_manager.download_file,
+        source_ttl=settings.image_cache_source_ttl,
+        workers=settings.image_derivative_workers,
+        enabled=settings.image_cache_enabled,
+    )
+
+
+image_derivatives = _build_default_cache()
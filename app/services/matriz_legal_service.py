@@ -9,26 +9,46 @@ Proporciona funcionalidades para:
 - Cálculo de estadísticas
 """
 
+from __future__ import annotations
+
 import hashlib
 import json
 import logging
 import re
 from datetime import date, datetime
 from io import BytesIO
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import pandas as pd
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, exists, insert, literal, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    class _LazyPandas:
+        """
+        pandas solo se carga al importar un Excel, no en el arranque de la API:
+        el primer acceso a `pd.<atributo>` hace el import real.
+        """
+
+        def __getattr__(self, name: str) -> Any:
+            import pandas
+
+            return getattr(pandas, name)
+
+    pd = _LazyPandas()
+
 from app.models.matriz_legal import (
     MatrizLegalNorma, MatrizLegalNormaHistorial,
     MatrizLegalCumplimiento, MatrizLegalCumplimientoHistorial,
     MatrizLegalImportacion,
-    EstadoImportacion, EstadoNorma, EstadoCumplimiento, AmbitoAplicacion
+    EstadoImportacion, EstadoNorma, EstadoCumplimiento, AmbitoAplicacion,
+    APLICABILIDAD_MASK_COMPLETA, calcular_mask_empresa, calcular_mask_norma
 )
 from app.models.sector_economico import SectorEconomico
 from app.models.empresa import Empresa
+from app.utils.catalog_cache import catalog_cache
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +56,18 @@ logger = logging.getLogger(__name__)
 class MatrizLegalService:
     """Servicio principal para gestión de la Matriz Legal."""
 
+    # Filas por lote en la importación: cada lote se inserta/actualiza en bloque
+    # y se confirma por separado para reportar progreso y no retener la transacción
+    IMPORT_BATCH_SIZE = 500
+
+    # Columnas de texto que se limpian de forma vectorizada antes de procesar filas
+    TEXT_COLUMNS = (
+        'ambito_aplicacion', 'sector_economico_texto', 'clasificacion_norma',
+        'tema_general', 'subtema_riesgo_especifico', 'tipo_numero_raw',
+        'tipo_norma', 'numero_norma', 'expedida_por', 'descripcion_norma',
+        'articulo', 'estado', 'info_adicional', 'descripcion_articulo_exigencias',
+    )
+
     # Mapeo de columnas del Excel a campos del modelo
     # Soporta múltiples variantes de nombres de columnas (incluye formato ARL Bolívar)
     COLUMN_MAPPING = {
@@ -312,35 +344,34 @@ class MatrizLegalService:
             df = self._read_excel_with_header_detection(file_content)
             df = self._normalize_columns(df)
 
+            df = self._normalize_values(df)
+
             errors = []
             normas_nuevas = 0
             normas_existentes = 0
+            muestra = []
+
+            existing_keys = self._prefetch_existing_normas()
 
-            for idx, row in df.iterrows():
-                row_num = idx + 2  # +2 por header y 0-index
+            for row_num, row in self._iter_rows(df):
                 validation_errors = self._validate_row(row, row_num)
                 if validation_errors:
                     errors.extend(validation_errors)
                     continue
 
+                # Muestra de datos (primeras 5 filas válidas)
+                if len(muestra) < 5:
+                    muestra.append(row)
+
                 # Verificar si existe
-                existing = self._find_existing_norma(row)
-                if existing:
+                tipo_norma, numero_norma = self._extract_tipo_numero(row)
+                if tipo_norma and numero_norma and self._norma_key(
+                    tipo_norma, numero_norma, row.get('articulo')
+                ) in existing_keys:
                     normas_existentes += 1
                 else:
                     normas_nuevas += 1
 
-            # Muestra de datos (primeras 5 filas válidas)
-            muestra = []
-            valid_rows = 0
-            for idx, row in df.iterrows():
-                if valid_rows >= 5:
-                    break
-                row_errors = self._validate_row(row, idx + 2)
-                if not row_errors:
-                    muestra.append(row.to_dict())
-                    valid_rows += 1
-
             # Log de columnas para diagnóstico
             columnas_originales = list(df.columns)
             columnas_mapeadas = {}
@@ -381,38 +412,99 @@ class MatrizLegalService:
     ) -> MatrizLegalImportacion:
         """
         Importa el archivo Excel de la ARL.
+
+        El proceso se hace en tres fases:
+        1. Limpieza vectorizada del DataFrame y extracción de los datos de cada fila.
+        2. Comparación en memoria contra las normas existentes, precargadas en un
+           mapa indexado por (tipo, número, artículo) normalizados, usando el hash
+           de contenido para detectar cambios.
+        3. Inserciones y actualizaciones en bloque por lotes de IMPORT_BATCH_SIZE;
+           cada lote se confirma y actualiza `filas_procesadas` en la importación.
         """
-        # Crear registro de importación
+        # Crear registro de importación (visible de inmediato para consultar el progreso)
         importacion = MatrizLegalImportacion(
             nombre_archivo=filename,
             creado_por=user_id,
-            estado=EstadoImportacion.EN_PROCESO.value
+            estado=EstadoImportacion.EN_PROCESO.value,
+            total_filas=0,
+            filas_procesadas=0,
+            normas_nuevas=0,
+            normas_actualizadas=0,
+            normas_sin_cambios=0,
+            errores=0,
         )
         self.db.add(importacion)
-        self.db.flush()
+        self.db.commit()
 
         try:
             df = self._read_excel_with_header_detection(file_content)
             df = self._normalize_columns(df)
+            df = self._normalize_values(df)
 
             importacion.total_filas = len(df)
             errores_log = []
 
-            for idx, row in df.iterrows():
-                row_num = idx + 2
+            existing = self._prefetch_existing_normas()
+            nuevas: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+            actualizaciones: Dict[int, Dict[str, Any]] = {}
+            sin_cambios = 0
+
+            for row_num, row in self._iter_rows(df):
                 try:
-                    result = self._process_row(row, importacion.id, user_id, sobrescribir)
-                    if result == 'new':
-                        importacion.normas_nuevas += 1
-                    elif result == 'updated':
-                        importacion.normas_actualizadas += 1
-                    elif result == 'unchanged':
-                        importacion.normas_sin_cambios += 1
+                    data = self._extract_norma_data(row)
+                    content_hash = self._compute_hash(data)
                 except Exception as e:
                     importacion.errores += 1
                     errores_log.append(f"Fila {row_num}: {str(e)}")
                     logger.warning(f"Error procesando fila {row_num}: {e}")
+                    continue
 
+                key = self._norma_key(data['tipo_norma'], data['numero_norma'], data['articulo'])
+                match = existing.get(key)
+
+                if match is not None:
+                    if match['hash_contenido'] == content_hash or not sobrescribir:
+                        sin_cambios += 1
+                        continue
+                    # Filas repetidas en el archivo: prevalece la última
+                    actualizaciones[match['id']] = {'data': data, 'hash': content_hash}
+                    match['hash_contenido'] = content_hash
+                elif key in nuevas:
+                    # Norma repetida dentro del mismo archivo: se inserta una sola vez
+                    if sobrescribir and nuevas[key]['hash'] != content_hash:
+                        nuevas[key] = {'data': data, 'hash': content_hash}
+                    sin_cambios += 1
+                else:
+                    nuevas[key] = {'data': data, 'hash': content_hash}
+
+            importacion.normas_sin_cambios = sin_cambios
+            importacion.filas_procesadas = sin_cambios + importacion.errores
+            self.db.commit()
+
+            sector_ids = self._ensure_sectores(
+                item['data'].get('sector_economico_texto') for item in nuevas.values()
+            )
+
+            pendientes_nuevas = list(nuevas.values())
+            for start in range(0, len(pendientes_nuevas), self.IMPORT_BATCH_SIZE):
+                batch = pendientes_nuevas[start:start + self.IMPORT_BATCH_SIZE]
+                inserted = self._insert_normas_batch(batch, sector_ids, importacion.id)
+                importacion.normas_nuevas += inserted
+                importacion.normas_sin_cambios += len(batch) - inserted
+                importacion.filas_procesadas += len(batch)
+                self.db.commit()
+            # Los sectores creados por `_ensure_sectores` quedan confirmados con el primer lote
+            catalog_cache.invalidate("sectores_economicos")
+
+            pendientes_actualizacion = list(actualizaciones.items())
+            for start in range(0, len(pendientes_actualizacion), self.IMPORT_BATCH_SIZE):
+                batch = pendientes_actualizacion[start:start + self.IMPORT_BATCH_SIZE]
+                self._update_normas_batch(batch, importacion.id, user_id)
+                importacion.normas_actualizadas += len(batch)
+                importacion.filas_procesadas += len(batch)
+                self.db.commit()
+
+            importacion.filas_procesadas = importacion.total_filas
             importacion.log_errores = "\n".join(errores_log) if errores_log else None
 
             if importacion.errores == 0:
@@ -425,8 +517,19 @@ class MatrizLegalService:
             self.db.commit()
 
         except Exception as e:
-            importacion.estado = EstadoImportacion.FALLIDA.value
-            importacion.log_errores = str(e)
+            self.db.rollback()
+            # Tras el rollback los contadores se recargan con lo ya confirmado:
+            # los lotes anteriores al error quedaron aplicados en la tabla.
+            if importacion.normas_nuevas or importacion.normas_actualizadas:
+                importacion.estado = EstadoImportacion.PARCIAL.value
+                importacion.log_errores = (
+                    f"Importación interrumpida tras aplicar {importacion.filas_procesadas} de "
+                    f"{importacion.total_filas} filas ({importacion.normas_nuevas} normas nuevas, "
+                    f"{importacion.normas_actualizadas} actualizadas): {e}"
+                )
+            else:
+                importacion.estado = EstadoImportacion.FALLIDA.value
+                importacion.log_errores = str(e)
             self.db.commit()
             logger.error(f"Error en importación: {e}")
             raise
@@ -467,6 +570,25 @@ class MatrizLegalService:
 
         return df
 
+    def _normalize_values(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Limpia las columnas de texto en bloque: convierte a str, recorta espacios
+        y deja como nulos los valores vacíos. Las fechas y el año se conservan tal cual.
+        """
+        for col in self.TEXT_COLUMNS:
+            if col not in df.columns or not isinstance(df[col], pd.Series):
+                continue
+            series = df[col]
+            present = series.notna()
+            cleaned = series.where(~present, series.astype(str).str.strip())
+            df[col] = cleaned.where(present & (cleaned != ''), None)
+        return df
+
+    def _iter_rows(self, df: pd.DataFrame):
+        """Itera (número de fila en Excel, fila como dict) sin el costo de `iterrows`."""
+        row_numbers = (df.index + 2).tolist()  # +2 por header y 0-index
+        return zip(row_numbers, df.to_dict('records'))
+
     def _validate_row(self, row: pd.Series, row_num: int) -> List[Dict]:
         """Valida una fila del Excel."""
         errors = []
@@ -494,39 +616,34 @@ class MatrizLegalService:
 
         return errors
 
-    def _find_existing_norma(self, row: pd.Series) -> Optional[MatrizLegalNorma]:
-        """Busca si ya existe una norma con el mismo tipo/número/artículo."""
-        tipo_norma, numero_norma = self._extract_tipo_numero(row)
-        articulo = self._clean_string(row.get('articulo'))
-
-        if not tipo_norma or not numero_norma:
-            logger.debug(f"_find_existing_norma: tipo_norma o numero_norma vacío")
-            return None
-
-        logger.debug(f"Buscando norma existente: tipo='{tipo_norma}', numero='{numero_norma}', articulo='{articulo}'")
-
-        # Usar comparación case-insensitive con func.lower para mayor robustez
-        query = self.db.query(MatrizLegalNorma).filter(
-            func.lower(MatrizLegalNorma.tipo_norma) == func.lower(tipo_norma),
-            func.lower(MatrizLegalNorma.numero_norma) == func.lower(numero_norma),
-        )
-
-        if articulo:
-            # Comparar artículo con case-insensitive
-            query = query.filter(func.lower(MatrizLegalNorma.articulo) == func.lower(articulo))
-        else:
-            query = query.filter(
-                or_(
-                    MatrizLegalNorma.articulo.is_(None),
-                    MatrizLegalNorma.articulo == ''
-                )
-            )
+    @staticmethod
+    def _norma_key(tipo_norma: Any, numero_norma: Any, articulo: Any) -> Tuple[str, str, str]:
+        """
+        Llave normalizada (tipo, número, artículo) sin distinción de mayúsculas.
+        Un artículo vacío o nulo se trata igual.
+        """
+        def _norm(value: Any) -> str:
+            if value is None or (not isinstance(value, str) and pd.isna(value)):
+                return ''
+            return str(value).strip().lower()
+
+        return _norm(tipo_norma), _norm(numero_norma), _norm(articulo)
+
+    def _prefetch_existing_normas(self) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+        """Carga en una sola consulta las llaves, hash y versión de todas las normas."""
+        rows = self.db.query(
+            MatrizLegalNorma.id,
+            MatrizLegalNorma.tipo_norma,
+            MatrizLegalNorma.numero_norma,
+            MatrizLegalNorma.articulo,
+            MatrizLegalNorma.hash_contenido,
+        ).all()
 
-        existing = query.first()
-        if existing:
-            logger.debug(f"  -> Encontrada norma existente ID={existing.id}")
-        else:
-            logger.debug(f"  -> No se encontró norma existente")
+        existing: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+        for row in rows:
+            key = self._norma_key(row.tipo_norma, row.numero_norma, row.articulo)
+            # Ante duplicados por mayúsculas se conserva el primero, como el `.first()` anterior
+            existing.setdefault(key, {'id': row.id, 'hash_contenido': row.hash_contenido})
         return existing
 
     def _extract_tipo_numero(self, row: pd.Series) -> Tuple[Optional[str], Optional[str]]:
@@ -555,76 +672,102 @@ class MatrizLegalService:
         cleaned = str(value).strip()
         return cleaned if cleaned else None
 
-    def _process_row(
+    def _insert_normas_batch(
         self,
-        row: pd.Series,
-        importacion_id: int,
-        user_id: int,
-        sobrescribir: bool
-    ) -> str:
+        batch: List[Dict[str, Any]],
+        sector_ids: Dict[str, int],
+        importacion_id: int
+    ) -> int:
         """
-        Procesa una fila del Excel.
-        Retorna: 'new', 'updated', 'unchanged'
+        Inserta un lote de normas nuevas en bloque. Retorna cuántas se insertaron.
+        Si el lote choca con la restricción única, se reintenta fila por fila.
         """
-        # Extraer datos
-        data = self._extract_norma_data(row)
-        content_hash = self._compute_hash(data)
-
-        logger.debug(f"Procesando: tipo='{data.get('tipo_norma')}', numero='{data.get('numero_norma')}', articulo='{data.get('articulo')}'")
-
-        # Buscar existente
-        existing = self._find_existing_norma(row)
-
-        if existing:
-            if existing.hash_contenido == content_hash:
-                return 'unchanged'
-
-            if sobrescribir:
-                # Guardar versión anterior en historial
-                self._save_to_history(existing, user_id)
-                # Actualizar
-                for key, value in data.items():
-                    if hasattr(existing, key):
-                        setattr(existing, key, value)
-                existing.hash_contenido = content_hash
-                existing.version += 1
-                existing.importacion_id = importacion_id
-                existing.updated_at = datetime.utcnow()
-                return 'updated'
-            else:
-                return 'unchanged'
-        else:
-            # Obtener o crear sector económico
-            sector_texto = data.pop('sector_economico_texto', None)
-            sector = self._get_or_create_sector(sector_texto)
+        now = datetime.utcnow()
+        mappings = []
+        for item in batch:
+            data = dict(item['data'])
+            sector_texto = data.get('sector_economico_texto')
 
             # Detectar aplicabilidad automática
-            applicability = self._detect_applicability(data)
-            data.update(applicability)
-
-            # Crear nueva norma
-            norma = MatrizLegalNorma(
-                **data,
-                sector_economico_id=sector.id if sector else None,
-                sector_economico_texto=sector_texto,
-                hash_contenido=content_hash,
-                importacion_id=importacion_id
+            data.update(self._detect_applicability(data))
+            data['aplicabilidad_mask'] = calcular_mask_norma(data)
+            data.update(
+                sector_economico_id=sector_ids.get(sector_texto.strip().upper()) if sector_texto else None,
+                hash_contenido=item['hash'],
+                importacion_id=importacion_id,
+                version=1,
+                activo=True,
+                created_at=now,
+                updated_at=now,
             )
+            mappings.append(data)
 
-            # Usar savepoint para manejar posibles duplicados sin afectar toda la transacción
+        try:
+            savepoint = self.db.begin_nested()
+            self.db.bulk_insert_mappings(MatrizLegalNorma, mappings)
+            savepoint.commit()
+            return len(mappings)
+        except IntegrityError as e:
+            savepoint.rollback()
+            logger.warning(f"Lote con normas duplicadas, reintentando fila por fila: {e}")
+
+        inserted = 0
+        for data in mappings:
+            # Usar savepoint para manejar posibles duplicados sin afectar todo el lote
             try:
                 savepoint = self.db.begin_nested()
-                self.db.add(norma)
-                # Flush para que el registro sea visible en queries posteriores dentro del mismo batch
-                self.db.flush()
+                self.db.bulk_insert_mappings(MatrizLegalNorma, [data])
                 savepoint.commit()
-                return 'new'
-            except Exception as e:
-                # Si hay error de duplicado, rollback del savepoint y tratar como existente
+                inserted += 1
+            except IntegrityError as e:
                 savepoint.rollback()
                 logger.warning(f"Error al insertar norma (posible duplicado): tipo='{data.get('tipo_norma')}', numero='{data.get('numero_norma')}', articulo='{data.get('articulo')}' - {e}")
-                # La norma probablemente ya existe, tratarla como sin cambios
-                return 'unchanged'
+        return inserted
+
+    def _update_normas_batch(
+        self,
+        batch: List[Tuple[int, Dict[str, Any]]],
+        importacion_id: int,
+        user_id: int
+    ) -> None:
+        """Guarda en historial la versión vigente y actualiza un lote de normas en bloque."""
+        ids = [norma_id for norma_id, _ in batch]
+        current = {
+            norma.id: norma
+            for norma in self.db.query(MatrizLegalNorma).filter(MatrizLegalNorma.id.in_(ids))
+        }
+
+        now = datetime.utcnow()
+        historial = []
+        updates = []
+        for norma_id, item in batch:
+            norma = current.get(norma_id)
+            if norma is None:
+                continue
+            historial.append({
+                'norma_id': norma.id,
+                'version': norma.version,
+                'datos_json': json.dumps(self._history_snapshot(norma), default=str),
+                'motivo_cambio': 'Actualización por importación',
+                'creado_por': user_id,
+                'created_at': now,
+            })
+            updates.append({
+                **item['data'],
+                'id': norma.id,
+                'hash_contenido': item['hash'],
+                'version': norma.version + 1,
+                'importacion_id': importacion_id,
+                'updated_at': now,
+            })
+
+        # Las instancias cargadas solo se usaron para el historial; se liberan
+        # para que la actualización en bloque no compita con su estado en la sesión
+        for norma in current.values():
+            self.db.expunge(norma)
+
+        self.db.bulk_insert_mappings(MatrizLegalNormaHistorial, historial)
+        self.db.bulk_update_mappings(MatrizLegalNorma, updates)
 
     def _extract_norma_data(self, row: pd.Series) -> Dict[str, Any]:
         """Extrae los datos de una norma de la fila."""
@@ -703,9 +846,9 @@ class MatrizLegalService:
         content = json.dumps(data, sort_keys=True, default=str)
         return hashlib.sha256(content.encode()).hexdigest()
 
-    def _save_to_history(self, norma: MatrizLegalNorma, user_id: int) -> None:
-        """Guarda la versión actual de una norma en el historial."""
-        data = {
+    def _history_snapshot(self, norma: MatrizLegalNorma) -> Dict[str, Any]:
+        """Datos de la versión actual de una norma para guardar en el historial."""
+        return {
             'ambito_aplicacion': norma.ambito_aplicacion,
             'sector_economico_texto': norma.sector_economico_texto,
             'clasificacion_norma': norma.clasificacion_norma,
@@ -722,40 +865,41 @@ class MatrizLegalService:
             'descripcion_articulo_exigencias': norma.descripcion_articulo_exigencias,
         }
 
-        historial = MatrizLegalNormaHistorial(
-            norma_id=norma.id,
-            version=norma.version,
-            datos_json=json.dumps(data, default=str),
-            motivo_cambio='Actualización por importación',
-            creado_por=user_id
-        )
-        self.db.add(historial)
-
-    def _get_or_create_sector(self, sector_texto: Optional[str]) -> Optional[SectorEconomico]:
-        """Obtiene o crea un sector económico."""
-        if not sector_texto:
-            return None
-
-        sector_texto_clean = sector_texto.strip().upper()
+    def _ensure_sectores(self, textos) -> Dict[str, int]:
+        """
+        Resuelve los sectores económicos de un lote de textos con una sola consulta
+        y crea de una vez los que falten. Retorna un mapa NOMBRE_EN_MAYÚSCULAS -> id.
+        """
+        requested: Dict[str, str] = {}
+        for texto in textos:
+            if texto:
+                requested.setdefault(texto.strip().upper(), texto.strip())
 
-        # Buscar sector existente
-        sector = self.db.query(SectorEconomico).filter(
-            func.upper(SectorEconomico.nombre) == sector_texto_clean
-        ).first()
+        if not requested:
+            return {}
 
-        if not sector:
-            # Verificar si es "TODOS LOS SECTORES"
-            es_todos = 'TODOS' in sector_texto_clean and 'SECTOR' in sector_texto_clean
+        sector_ids = {
+            nombre.upper(): sector_id
+            for sector_id, nombre in self.db.query(SectorEconomico.id, SectorEconomico.nombre)
+        }
 
-            sector = SectorEconomico(
-                nombre=sector_texto.strip(),
-                es_todos_los_sectores=es_todos,
+        nuevos = [
+            SectorEconomico(
+                nombre=original,
+                # Verificar si es "TODOS LOS SECTORES"
+                es_todos_los_sectores='TODOS' in clave and 'SECTOR' in clave,
                 activo=True
             )
-            self.db.add(sector)
+            for clave, original in requested.items()
+            if clave not in sector_ids
+        ]
+        if nuevos:
+            self.db.add_all(nuevos)
             self.db.flush()
+            for sector in nuevos:
+                sector_ids[sector.nombre.upper()] = sector.id
 
-        return sector
+        return sector_ids
 
     def _detect_applicability(self, data: Dict[str, Any]) -> Dict[str, bool]:
         """
@@ -781,6 +925,35 @@ class MatrizLegalService:
 
         return result
 
+    def _condiciones_aplicabilidad(self, empresa: Empresa) -> List[Any]:
+        """
+        Condiciones SQL que determinan si una norma aplica a la empresa:
+        1. Sector económico (si es específico) o TODOS LOS SECTORES
+        2. Características de la empresa, como prueba de bits sobre
+           `aplicabilidad_mask`: la norma no puede exigir características
+           que la empresa no tenga (las normas generales tienen máscara 0).
+        """
+        # Condiciones de sector
+        sector_conditions = [
+            MatrizLegalNorma.aplica_general == True,
+            MatrizLegalNorma.sector_economico_id.in_(
+                select(SectorEconomico.id).where(SectorEconomico.es_todos_los_sectores == True)
+            ),
+        ]
+        if empresa.sector_economico_id:
+            sector_conditions.append(
+                MatrizLegalNorma.sector_economico_id == empresa.sector_economico_id
+            )
+
+        caracteristicas_faltantes = APLICABILIDAD_MASK_COMPLETA & ~calcular_mask_empresa(empresa)
+
+        return [
+            MatrizLegalNorma.activo == True,
+            MatrizLegalNorma.estado == EstadoNorma.VIGENTE.value,
+            or_(*sector_conditions),
+            MatrizLegalNorma.aplicabilidad_mask.op('&')(caracteristicas_faltantes) == 0,
+        ]
+
     def get_normas_aplicables_empresa(
         self,
         empresa: Empresa,
@@ -792,113 +965,9 @@ class MatrizLegalService:
         2. Características de la empresa (teletrabajo, alturas, etc.)
         """
         query = self.db.query(MatrizLegalNorma).filter(
-            MatrizLegalNorma.activo == True,
-            MatrizLegalNorma.estado == EstadoNorma.VIGENTE.value
+            *self._condiciones_aplicabilidad(empresa)
         )
 
-        # Obtener sector "TODOS LOS SECTORES"
-        sector_todos = self.db.query(SectorEconomico).filter(
-            SectorEconomico.es_todos_los_sectores == True
-        ).first()
-
-        # Condiciones de sector
-        sector_conditions = [MatrizLegalNorma.aplica_general == True]
-
-        if sector_todos:
-            sector_conditions.append(
-                MatrizLegalNorma.sector_economico_id == sector_todos.id
-            )
-
-        if empresa.sector_economico_id:
-            sector_conditions.append(
-                MatrizLegalNorma.sector_economico_id == empresa.sector_economico_id
-            )
-
-        query = query.filter(or_(*sector_conditions))
-
-        # Filtrar por características de la empresa
-        # Solo incluir normas específicas si la empresa tiene esa característica
-        characteristic_filters = []
-
-        if not empresa.tiene_trabajadores_independientes:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_trabajadores_independientes == False
-            )
-        if not empresa.tiene_teletrabajo:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_teletrabajo == False
-            )
-        if not empresa.tiene_trabajo_alturas:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_trabajo_alturas == False
-            )
-        if not empresa.tiene_trabajo_espacios_confinados:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_espacios_confinados == False
-            )
-        if not empresa.tiene_trabajo_caliente:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_trabajo_caliente == False
-            )
-        if not empresa.tiene_sustancias_quimicas:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_sustancias_quimicas == False
-            )
-        if not empresa.tiene_radiaciones:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_radiaciones == False
-            )
-        if not empresa.tiene_trabajo_nocturno:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_trabajo_nocturno == False
-            )
-        if not empresa.tiene_menores_edad:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_menores_edad == False
-            )
-        if not empresa.tiene_mujeres_embarazadas:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_mujeres_embarazadas == False
-            )
-        if not empresa.tiene_conductores:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_conductores == False
-            )
-        if not empresa.tiene_manipulacion_alimentos:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_manipulacion_alimentos == False
-            )
-        if not empresa.tiene_maquinaria_pesada:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_maquinaria_pesada == False
-            )
-        if not empresa.tiene_riesgo_electrico:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_riesgo_electrico == False
-            )
-        if not empresa.tiene_riesgo_biologico:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_riesgo_biologico == False
-            )
-        if not empresa.tiene_trabajo_excavaciones:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_trabajo_excavaciones == False
-            )
-        if not empresa.tiene_trabajo_administrativo:
-            characteristic_filters.append(
-                MatrizLegalNorma.aplica_trabajo_administrativo == False
-            )
-
-        # Aplicar filtros de características
-        # Las normas generales siempre aplican, las específicas solo si la empresa tiene la característica
-        if characteristic_filters:
-            query = query.filter(
-                or_(
-                    MatrizLegalNorma.aplica_general == True,
-                    and_(*characteristic_filters)
-                )
-            )
-
         # Aplicar filtros adicionales
         if filtros:
             if filtros.get('clasificacion'):
@@ -931,51 +1000,67 @@ class MatrizLegalService:
         - Marca aplica_empresa=False para normas que ya no aplican (característica removida)
         - Reactiva aplica_empresa=True para normas que vuelven a aplicar
         - No elimina registros existentes (pueden tener historial)
+
+        Todo se resuelve en la base de datos con un INSERT ... SELECT y dos UPDATE,
+        sin cargar normas ni cumplimientos en memoria.
         """
         empresa = self.db.query(Empresa).filter(Empresa.id == empresa_id).first()
         if not empresa:
             raise ValueError("Empresa no encontrada")
 
-        normas_aplicables = self.get_normas_aplicables_empresa(empresa)
-        normas_aplicables_ids = {n.id for n in normas_aplicables}
+        condiciones = self._condiciones_aplicabilidad(empresa)
+        normas_aplicables_ids = select(MatrizLegalNorma.id).where(*condiciones)
 
-        # Cumplimientos existentes
-        cumplimientos_existentes = self.db.query(MatrizLegalCumplimiento).filter(
+        total_normas_aplicables = self.db.query(func.count(MatrizLegalNorma.id)).filter(
+            *condiciones
+        ).scalar() or 0
+        cumplimientos_existentes = self.db.query(func.count(MatrizLegalCumplimiento.id)).filter(
             MatrizLegalCumplimiento.empresa_id == empresa_id
-        ).all()
+        ).scalar() or 0
 
-        cumplimientos_por_norma = {c.norma_id: c for c in cumplimientos_existentes}
+        now = datetime.utcnow()
 
         # Crear nuevos cumplimientos para normas que ahora aplican y no tienen registro
-        nuevos = 0
-        for norma_id in normas_aplicables_ids - set(cumplimientos_por_norma.keys()):
-            cumplimiento = MatrizLegalCumplimiento(
-                empresa_id=empresa_id,
-                norma_id=norma_id,
-                estado=EstadoCumplimiento.PENDIENTE.value,
-                aplica_empresa=True
-            )
-            self.db.add(cumplimiento)
-            nuevos += 1
+        sin_cumplimiento = ~exists().where(
+            MatrizLegalCumplimiento.empresa_id == empresa_id,
+            MatrizLegalCumplimiento.norma_id == MatrizLegalNorma.id,
+        )
+        insert_nuevos = insert(MatrizLegalCumplimiento).from_select(
+            ['empresa_id', 'norma_id', 'estado', 'aplica_empresa', 'created_at', 'updated_at'],
+            select(
+                literal(empresa_id),
+                MatrizLegalNorma.id,
+                literal(EstadoCumplimiento.PENDIENTE.value),
+                literal(True),
+                literal(now),
+                literal(now),
+            ).where(*condiciones, sin_cumplimiento)
+        )
+        nuevos = self.db.execute(insert_nuevos).rowcount
 
         # Actualizar aplica_empresa en registros existentes según las características actuales
-        reactivados = 0
-        desactivados = 0
-        for norma_id, cumplimiento in cumplimientos_por_norma.items():
-            if norma_id in normas_aplicables_ids:
-                if not cumplimiento.aplica_empresa:
-                    cumplimiento.aplica_empresa = True
-                    reactivados += 1
-            else:
-                if cumplimiento.aplica_empresa:
-                    cumplimiento.aplica_empresa = False
-                    desactivados += 1
+        reactivados = self.db.query(MatrizLegalCumplimiento).filter(
+            MatrizLegalCumplimiento.empresa_id == empresa_id,
+            MatrizLegalCumplimiento.aplica_empresa == False,
+            MatrizLegalCumplimiento.norma_id.in_(normas_aplicables_ids),
+        ).update(
+            {MatrizLegalCumplimiento.aplica_empresa: True, MatrizLegalCumplimiento.updated_at: now},
+            synchronize_session=False
+        )
+        desactivados = self.db.query(MatrizLegalCumplimiento).filter(
+            MatrizLegalCumplimiento.empresa_id == empresa_id,
+            MatrizLegalCumplimiento.aplica_empresa == True,
+            ~MatrizLegalCumplimiento.norma_id.in_(normas_aplicables_ids),
+        ).update(
+            {MatrizLegalCumplimiento.aplica_empresa: False, MatrizLegalCumplimiento.updated_at: now},
+            synchronize_session=False
+        )
 
         self.db.commit()
 
         return {
-            'total_normas_aplicables': len(normas_aplicables_ids),
-            'cumplimientos_existentes': len(cumplimientos_existentes),
+            'total_normas_aplicables': total_normas_aplicables,
+            'cumplimientos_existentes': cumplimientos_existentes,
             'nuevos_creados': nuevos,
             'reactivados': reactivados,
             'desactivados': desactivados,
@@ -1,6 +1,5 @@
 import os
 import tempfile
-import base64
 from datetime import datetime
 from typing import Optional, Dict, Any
 from sqlalchemy.orm import Session
@@ -11,7 +10,7 @@ from app.models.worker import Worker
 from app.models.occupational_exam import OccupationalExam
 from app.models.cargo import Cargo
 from app.utils.storage import StorageManager
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.html_to_pdf import get_html_to_pdf_converter
 from app.config import settings
 
 
@@ -20,7 +19,7 @@ class MedicalRecommendationGenerator:
         self.db = db
         self.storage_manager = StorageManager()
         self.reports_dir = "medical_reports"
-        self.html_to_pdf = HTMLToPDFConverter()
+        self.html_to_pdf = get_html_to_pdf_converter()
         
         # Crear directorio local si no existe (para fallback)
         if not os.path.exists(self.reports_dir):
@@ -128,16 +127,8 @@ class MedicalRecommendationGenerator:
             'created_by_user': None  # El modelo Seguimiento no tiene relación con User
         }
         
-        # Cargar logo como base64
-        company_logo = ""
-        try:
-            logo_path = os.path.join(self.html_to_pdf.template_dir, "logo_3.png")
-            if os.path.exists(logo_path):
-                with open(logo_path, "rb") as image_file:
-                    encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-                    company_logo = f"data:image/png;base64,{encoded_string}"
-        except Exception as e:
-            print(f"Error loading logo: {e}")
+        # Logo servido desde la caché compartida del convertidor
+        company_logo = self.html_to_pdf.logo_url()
         
         return {
             'worker': worker_data,
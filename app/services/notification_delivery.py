@@ -0,0 +1,563 @@
+"""
+Entrega en tiempo real de notificaciones y contador de no leídas por usuario.
+
+- `notification_unread_counters` guarda cuántas notificaciones sin leer tiene
+  cada usuario. Un listener de la sesión lo ajusta en el mismo flush en que
+  el ORM crea, marca como leída o borra una notificación; las escrituras
+  masivas (`fan_out`, `mark_all_read`) lo actualizan ellas mismas. Así
+  `/notifications/unread/count` es una lectura por clave primaria y no un
+  COUNT sobre `notifications` en cada sondeo.
+- `broker` entrega los cambios a las conexiones SSE (`/notifications/stream`)
+  después del commit, con el contador ya calculado: un cliente conectado no
+  necesita volver a consultar. El backend `memory` sirve a un solo proceso;
+  con varios workers, `postgres` reparte los eventos con LISTEN/NOTIFY.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from select import select as wait_readable
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import case, cast, event, func, insert, inspect, literal, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import engine, session_scope
+from app.models.notification import (
+    Notification,
+    NotificationPriority,
+    NotificationStatus,
+    NotificationType,
+    NotificationUnreadCounter,
+)
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Eventos de la sesión pendientes de publicar (se publican tras el commit)
+PENDING_EVENTS_KEY = "notification_events"
+# Mensajes en cola por conexión; si un cliente lento la llena, se vacía y el
+# stream vuelve a leer su contador
+SUBSCRIBER_QUEUE_SIZE = 100
+# Comentario SSE para que proxies y navegadores no cierren la conexión
+STREAM_KEEPALIVE_SECONDS = 15.0
+PG_CHANNEL = "sst_notifications"
+# NOTIFY admite cargas de hasta 8000 bytes
+PG_NOTIFY_MAX_PAYLOAD = 7500
+PG_LISTEN_RECONNECT_SECONDS = 5.0
+
+Event = Dict[str, Any]
+# Mensaje para una conexión sin contador: debe releerlo de la base de datos
+RESYNC: Dict[str, Any] = {"unread_count": None, "notification": None}
+
+_UNKNOWN = object()
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def _encode(event: Event) -> str:
+    return json.dumps(event, separators=(",", ":"), default=str)
+
+
+def _decode(payload: str) -> Event:
+    event = json.loads(payload)
+    if event.get("counts") is not None:
+        # JSON solo tiene claves de texto
+        event["counts"] = {int(user_id): count for user_id, count in event["counts"].items()}
+    return event
+
+
+# ----------------------------------------------------------------------
+# Broker
+# ----------------------------------------------------------------------
+class MemoryBackend:
+    """Un solo proceso: el evento va directo a las conexiones locales."""
+
+    def start(self, dispatch: Callable[[Event], None]) -> None:
+        pass
+
+    def publish(self, event: Event, dispatch: Callable[[Event], None]) -> None:
+        dispatch(event)
+
+    def stop(self) -> None:
+        pass
+
+
+class PostgresNotifyBackend:
+    """
+    Varios procesos: cada evento se publica con NOTIFY y un hilo por proceso
+    escucha el canal (LISTEN) en una conexión propia, fuera del pool, y lo
+    entrega a sus conexiones locales, también en el proceso que lo publicó.
+    """
+
+    def __init__(self, engine, channel: str = PG_CHANNEL):
+        self.engine = engine
+        self.channel = channel
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self, dispatch: Callable[[Event], None]) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._listen, args=(dispatch,), name="notification-listener", daemon=True
+        )
+        self._thread.start()
+
+    def publish(self, event: Event, dispatch: Callable[[Event], None]) -> None:
+        payload = _encode(event)
+        if len(payload.encode("utf-8")) > PG_NOTIFY_MAX_PAYLOAD:
+            # Demasiados contadores para un NOTIFY: cada conexión relee el suyo
+            payload = _encode({**event, "counts": None})
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": self.channel, "payload": payload})
+            conn.commit()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _listen(self, dispatch: Callable[[Event], None]) -> None:
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self.engine.raw_connection()
+                # La conexión queda dedicada a LISTEN: el pool puede reponerla
+                connection.detach()
+                dbapi_connection = connection.dbapi_connection
+                dbapi_connection.autocommit = True
+                with dbapi_connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                while not self._stop.is_set():
+                    if wait_readable([dbapi_connection], [], [], 1.0) == ([], [], []):
+                        continue
+                    dbapi_connection.poll()
+                    while dbapi_connection.notifies:
+                        dispatch(_decode(dbapi_connection.notifies.pop(0).payload))
+            except Exception as exc:
+                logger.warning(f"Escucha de notificaciones interrumpida, reintentando: {exc}")
+                # Pudieron perderse eventos: todas las conexiones releen su contador
+                dispatch({"counts": None, "notification": None})
+                self._stop.wait(PG_LISTEN_RECONNECT_SECONDS)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+
+
+class NotificationBroker:
+    """
+    Reparte eventos de notificaciones a las conexiones SSE de este proceso.
+
+    Un evento es `{"counts": {user_id: no_leídas}, "notification": {...}}`:
+    llega a las conexiones de los usuarios de `counts` con su contador
+    nuevo; con `counts = None` llega a todas, que releen el suyo. `publish`
+    se puede llamar desde cualquier hilo; la entrega ocurre en el event loop.
+    """
+
+    def __init__(self, backend=None, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.backend = backend or MemoryBackend()
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def publish(self, event: Event) -> None:
+        self.published += 1
+        self.backend.publish(event, self.dispatch)
+
+    def dispatch(self, event: Event) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:
+            # El loop se cerró entre la comprobación y la llamada (apagado)
+            pass
+
+    def _deliver(self, event: Event) -> None:
+        counts: Optional[Dict[int, int]] = event.get("counts")
+        notification = event.get("notification")
+        if counts is None:
+            targets: Iterable[Tuple[int, Optional[int]]] = [(user_id, None) for user_id in self._subscribers]
+        elif len(counts) > len(self._subscribers):
+            targets = [(user_id, counts[user_id]) for user_id in self._subscribers if user_id in counts]
+        else:
+            targets = [(user_id, count) for user_id, count in counts.items() if user_id in self._subscribers]
+
+        for user_id, count in targets:
+            message = {"unread_count": count, "notification": notification}
+            for queue in self._subscribers.get(user_id, ()):
+                try:
+                    queue.put_nowait(message)
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    self.dropped += 1
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(RESYNC)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        """Cola con los mensajes del usuario mientras dure el bloque."""
+        self._loop = asyncio.get_running_loop()
+        self.backend.start(self.dispatch)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": sum(len(queues) for queues in self._subscribers.values()),
+            "users": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+    def close(self) -> None:
+        self.backend.stop()
+
+
+def _default_backend():
+    if settings.notifications_broker == "postgres":
+        return PostgresNotifyBackend(engine)
+    return MemoryBackend()
+
+
+broker = NotificationBroker(_default_backend())
+
+
+def queue_event(db: Session, event: Event) -> None:
+    """Publica `event` cuando la sesión confirme (se descarta si revierte)."""
+    db.info.setdefault(PENDING_EVENTS_KEY, []).append(event)
+
+
+# ----------------------------------------------------------------------
+# Contadores
+# ----------------------------------------------------------------------
+_counters = NotificationUnreadCounter.__table__
+
+
+def _upsert(db: Session):
+    dialect = sqlite if db.get_bind().dialect.name == "sqlite" else postgresql
+    return dialect.insert(_counters)
+
+
+def unread_count_statement(user_id: int):
+    """Contador del usuario; sirve tanto para `Session` como para `AsyncSession`."""
+    return select(_counters.c.unread_count).where(_counters.c.user_id == user_id)
+
+
+def adjust_unread(db: Session, deltas: Dict[int, int]) -> Dict[int, int]:
+    """Suma `deltas` ({user_id: +n/-n}) a los contadores y devuelve sus
+    valores nuevos. Una sentencia por signo; no confirma.
+
+    Las restas solo actualizan contadores existentes y no bajan de cero: si
+    el usuario aún no tiene contador, se recalcula desde `notifications` en
+    lugar de insertar un valor negativo.
+    """
+    increments = {user_id: delta for user_id, delta in deltas.items() if delta > 0}
+    decrements = {user_id: delta for user_id, delta in deltas.items() if delta < 0}
+    now = datetime.utcnow()
+    counts: Dict[int, int] = {}
+    if increments:
+        stmt = _upsert(db)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[_counters.c.user_id],
+            set_={
+                "unread_count": _counters.c.unread_count + stmt.excluded.unread_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(_counters.c.user_id, _counters.c.unread_count)
+        rows = db.execute(
+            stmt,
+            [{"user_id": user_id, "unread_count": delta, "updated_at": now} for user_id, delta in increments.items()],
+        )
+        counts.update({user_id: count for user_id, count in rows})
+    if decrements:
+        total = _counters.c.unread_count + case(decrements, value=_counters.c.user_id, else_=0)
+        rows = db.execute(
+            update(_counters)
+            .where(_counters.c.user_id.in_(decrements))
+            .values(unread_count=case((total < 0, 0), else_=total), updated_at=now)
+            .returning(_counters.c.user_id, _counters.c.unread_count)
+        )
+        counts.update({user_id: count for user_id, count in rows})
+        counts.update(recount_unread(db, decrements.keys() - counts.keys()))
+    return counts
+
+
+def set_unread(db: Session, counts: Dict[int, int]) -> None:
+    """Fija los contadores de `counts` ({user_id: no_leídas}). No confirma."""
+    if not counts:
+        return
+    stmt = _upsert(db)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_counters.c.user_id],
+        set_={"unread_count": stmt.excluded.unread_count, "updated_at": stmt.excluded.updated_at},
+    )
+    now = datetime.utcnow()
+    db.execute(stmt, [{"user_id": user_id, "unread_count": count, "updated_at": now} for user_id, count in counts.items()])
+
+
+def recount_unread(db: Session, user_ids: Iterable[int]) -> Dict[int, int]:
+    """Recalcula desde `notifications` los contadores de `user_ids`."""
+    counts = {user_id: 0 for user_id in user_ids}
+    if not counts:
+        return counts
+    rows = db.execute(
+        select(Notification.user_id, func.count(Notification.id))
+        .where(Notification.user_id.in_(counts), Notification.read_at.is_(None))
+        .group_by(Notification.user_id)
+    )
+    counts.update({user_id: count for user_id, count in rows})
+    set_unread(db, counts)
+    return counts
+
+
+def get_unread_count(db: Session, user_id: int) -> int:
+    return db.scalar(unread_count_statement(user_id)) or 0
+
+
+# ----------------------------------------------------------------------
+# Escrituras masivas
+# ----------------------------------------------------------------------
+def _summary(title: str, notification_type: Any, priority: Any, **extra: Any) -> Dict[str, Any]:
+    return {
+        "title": title,
+        "notification_type": _enum_value(notification_type),
+        "priority": _enum_value(priority),
+        **extra,
+    }
+
+
+def fan_out(
+    db: Session,
+    *,
+    title: str,
+    message: str,
+    notification_type: NotificationType = NotificationType.IN_APP,
+    priority: NotificationPriority = NotificationPriority.NORMAL,
+    user_ids: Optional[Sequence[int]] = None,
+    roles: Optional[Sequence[str]] = None,
+    active_only: bool = True,
+) -> List[Tuple[int, int]]:
+    """
+    Crea la misma notificación para los usuarios que cumplen el filtro con un
+    solo INSERT ... SELECT sobre `users`, ajusta sus contadores y deja el
+    evento listo para publicarse con el commit. Devuelve (id, user_id) de las
+    notificaciones creadas. No confirma.
+    """
+    conditions = []
+    if user_ids is not None:
+        conditions.append(User.id.in_(user_ids))
+    if roles is not None:
+        conditions.append(User.role.in_(roles))
+    if active_only:
+        conditions.append(User.is_active == True)
+
+    now = datetime.utcnow()
+    columns = Notification.__table__.c
+    values = {
+        "title": title,
+        "message": message,
+        "notification_type": notification_type,
+        "status": NotificationStatus.PENDING,
+        "priority": priority,
+        "created_at": now,
+        "updated_at": now,
+    }
+    # CAST explícito: PostgreSQL no convierte texto a enum/timestamp en un INSERT ... SELECT
+    source = select(
+        User.id, *(cast(literal(value, columns[name].type), columns[name].type) for name, value in values.items())
+    ).where(*conditions)
+    rows = db.execute(
+        insert(Notification.__table__)
+        .from_select(["user_id", *values], source)
+        .returning(columns.id, columns.user_id)
+    ).all()
+    if not rows:
+        return []
+
+    counts = adjust_unread(db, Counter(user_id for _, user_id in rows))
+    queue_event(db, {"counts": counts, "notification": _summary(title, notification_type, priority)})
+    return [(notification_id, user_id) for notification_id, user_id in rows]
+
+
+def mark_all_read(db: Session, user_id: int) -> int:
+    """Marca como leídas todas las notificaciones del usuario con un solo
+    UPDATE y deja su contador en cero. Devuelve cuántas marcó; no confirma.
+
+    El contador se pone en cero (y queda bloqueado) antes del UPDATE: una
+    notificación insertada en paralelo, que el UPDATE no llega a ver, suma su
+    +1 después de este cero en lugar de quedar borrada por él."""
+    set_unread(db, {user_id: 0})
+    now = datetime.now()
+    result = db.execute(
+        update(Notification)
+        .where(Notification.user_id == user_id, Notification.read_at.is_(None))
+        .values(read_at=now, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    queue_event(db, {"counts": {user_id: 0}, "notification": None})
+    return result.rowcount
+
+
+# ----------------------------------------------------------------------
+# Escrituras con el ORM
+# ----------------------------------------------------------------------
+def _before_after(state, key: str) -> Tuple[Any, Any]:
+    """Valor antes y después del flush sin cargar atributos (`_UNKNOWN` si no está cargado)."""
+    history = state.attrs[key].history
+    if not history.has_changes():
+        value = state.dict.get(key, _UNKNOWN)
+        return value, value
+    before = history.deleted[0] if history.deleted else _UNKNOWN
+    after = history.added[0] if history.added else None
+    return before, after
+
+
+@event.listens_for(Session, "after_flush")
+def _track_notification_changes(session, flush_context):
+    deltas: Dict[int, int] = {}
+    recount: Set[int] = set()
+    created: List[Notification] = []
+
+    for obj in session.new:
+        if isinstance(obj, Notification) and obj.read_at is None:
+            deltas[obj.user_id] = deltas.get(obj.user_id, 0) + 1
+            created.append(obj)
+
+    for obj in session.dirty:
+        if not isinstance(obj, Notification):
+            continue
+        state = inspect(obj)
+        user_before, user_after = _before_after(state, "user_id")
+        read_before, read_after = _before_after(state, "read_at")
+        if user_before is _UNKNOWN or user_after is _UNKNOWN:
+            continue
+        if read_before is _UNKNOWN or read_after is _UNKNOWN:
+            recount.update((user_before, user_after))
+            continue
+        if read_before is None:
+            deltas[user_before] = deltas.get(user_before, 0) - 1
+        if read_after is None:
+            deltas[user_after] = deltas.get(user_after, 0) + 1
+
+    for obj in session.deleted:
+        if not isinstance(obj, Notification):
+            continue
+        state = inspect(obj)
+        user_id = state.dict.get("user_id", _UNKNOWN)
+        read_at = state.dict.get("read_at", _UNKNOWN)
+        if user_id is _UNKNOWN:
+            continue
+        if read_at is _UNKNOWN:
+            recount.add(user_id)
+        elif read_at is None:
+            deltas[user_id] = deltas.get(user_id, 0) - 1
+
+    for user_id in recount:
+        deltas.pop(user_id, None)
+    counts = adjust_unread(session, deltas)
+    counts.update(recount_unread(session, recount))
+    if not counts:
+        return
+
+    notified = set()
+    for notification in created:
+        notified.add(notification.user_id)
+        queue_event(
+            session,
+            {
+                "counts": {notification.user_id: counts[notification.user_id]},
+                "notification": _summary(
+                    notification.title,
+                    notification.notification_type,
+                    notification.priority,
+                    id=notification.id,
+                    created_at=inspect(notification).dict.get("created_at"),
+                ),
+            },
+        )
+    rest = {user_id: count for user_id, count in counts.items() if user_id not in notified}
+    if rest:
+        queue_event(session, {"counts": rest, "notification": None})
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_notification_events(session):
+    for pending in session.info.pop(PENDING_EVENTS_KEY, None) or ():
+        try:
+            broker.publish(pending)
+        except Exception as exc:
+            # El cambio ya está confirmado: los clientes lo verán al reconectar
+            logger.warning(f"No se pudo publicar un evento de notificaciones: {exc}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_notification_events(session):
+    session.info.pop(PENDING_EVENTS_KEY, None)
+
+
+# ----------------------------------------------------------------------
+# Server-sent events
+# ----------------------------------------------------------------------
+def _read_unread_count(user_id: int) -> int:
+    with session_scope() as db:
+        return get_unread_count(db, user_id)
+
+
+def _sse(event_name: str, data: Dict[str, Any]) -> str:
+    return f"event: {event_name}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
+async def notification_events(
+    user_id: int, keepalive: float = STREAM_KEEPALIVE_SECONDS
+) -> AsyncIterator[str]:
+    """
+    Eventos SSE del usuario: `unread` con el contador al conectar y en cada
+    cambio, y `notification` (con el contador) por cada notificación nueva.
+    Sin cambios no consulta la base de datos.
+    """
+    async with broker.subscribe(user_id) as queue:
+        # Suscrito antes de leer el contador: no se pierde ningún cambio posterior
+        count = await run_in_threadpool(_read_unread_count, user_id)
+        yield _sse("unread", {"unread_count": count})
+        while True:
+            try:
+                message = await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            count = message["unread_count"]
+            if count is None:
+                count = await run_in_threadpool(_read_unread_count, user_id)
+            if message["notification"] is not None:
+                yield _sse("notification", {"unread_count": count, "notification": message["notification"]})
+            else:
+                yield _sse("unread", {"unread_count": count})
@@ -5,7 +5,7 @@ from jinja2 import Template
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, func, cast, String
 
-from app.database import get_db
+from app.database import session_scope
 from app.models.worker import Worker
 from app.models.occupational_exam import OccupationalExam
 from app.models.tipo_examen import TipoExamen
@@ -394,12 +394,9 @@ Sistema de Gestión SST
 
 def run_daily_exam_notifications():
     """Función para ejecutar las notificaciones diarias"""
-    db = next(get_db())
-    try:
+    with session_scope() as db:
         service = OccupationalExamNotificationService(db)
         return service.send_daily_notifications()
-    finally:
-        db.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,339 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import html_to_pdf
+
+logger = logging.getLogger(__name__)
+
+PDF_CACHE_REMOTE_PREFIX = "pdf-cache/"
+
+# Claves del contexto que cambian en cada render (fecha/hora de generación) y
+# no forman parte del contenido del reporte.
+VOLATILE_CONTEXT_KEYS = frozenset(
+    {
+        "generated_at",
+        "generated_date",
+        "generation_date",
+        "generation_time",
+        "current_date",
+        "logo_url",
+        "logo_base64",
+    }
+)
+
+
+class UncacheableContext(TypeError):
+    """El contexto contiene valores sin representación estable (objetos ORM, etc.)."""
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return sorted(_normalize(v) for v in value)
+    if isinstance(value, bytes):
+        return hashlib.sha256(value).hexdigest()
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise UncacheableContext(f"Valor no normalizable en el contexto: {type(value).__name__}")
+
+
+def normalize_context(context: Dict[str, Any]) -> str:
+    """JSON canónico del contexto, sin las claves volátiles."""
+    stable = {k: v for k, v in context.items() if k not in VOLATILE_CONTEXT_KEYS}
+    return json.dumps(stable, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=_normalize)
+
+
+def data_stamp(db: Session, model, *criteria) -> List[Any]:
+    """
+    Sello de versión de los datos de una tabla: número de filas, id máximo y
+    última modificación, en una sola consulta agregada.
+
+    Cualquier alta, baja o edición cambia el sello, y con él la clave del
+    artefacto; las entradas anteriores quedan inalcanzables y las retira el LRU.
+    """
+    columns = [func.count(model.id), func.max(model.id)]
+    updated_at = getattr(model, "updated_at", None)
+    if updated_at is not None:
+        columns.append(func.max(updated_at))
+    row = db.query(*columns).filter(*criteria).one()
+    return [_normalize(v) if isinstance(v, (datetime, date)) else v for v in row]
+
+
+class PDFArtifactCache:
+    """
+    Caché de PDFs generados, direccionada por contenido.
+
+    La clave es el SHA-256 de (plantilla, versión de la plantilla, contexto
+    normalizado). Hay dos niveles:
+
+    - disco local, con desalojo LRU (por fecha de acceso) al superar `max_bytes`;
+    - almacenamiento de objetos (Contabo), compartido entre instancias y que
+      sobrevive a los despliegues. Las subidas se hacen en segundo plano.
+
+    No hay invalidación explícita: cuando cambian los datos cambia el contexto
+    (o el sello de datos incluido en él) y por tanto la clave.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int,
+        remote=None,
+        remote_prefix: str = PDF_CACHE_REMOTE_PREFIX,
+        enabled: bool = True,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.remote = remote
+        self.remote_prefix = remote_prefix
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._template_versions: Dict[Tuple[str, ...], Tuple[Tuple[float, ...], str]] = {}
+        self._size: Optional[int] = None
+        self._uploader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pdf-cache-upload") if remote else None
+
+    # ------------------------------------------------------------------
+    # Claves
+    # ------------------------------------------------------------------
+    def template_version(self, *paths: str) -> str:
+        """Hash del contenido de los archivos de plantilla/CSS (o del módulo que genera el HTML)."""
+        existing = tuple(p for p in paths if p and os.path.exists(p))
+        mtimes = tuple(os.path.getmtime(p) for p in existing)
+        cached = self._template_versions.get(existing)
+        if cached and cached[0] == mtimes:
+            return cached[1]
+        digest = hashlib.sha256()
+        for path in existing:
+            with open(path, "rb") as source:
+                digest.update(source.read())
+        version = digest.hexdigest()[:16]
+        self._template_versions[existing] = (mtimes, version)
+        return version
+
+    def report_template_version(self, template_name: str, css_files: Iterable[str] = ()) -> str:
+        """Versión de una plantilla de `app/templates/reports` y sus hojas de estilo."""
+        template_dir = html_to_pdf._default_template_dir()
+        if not css_files:
+            css_files = [template_name.replace(".html", ".css")]
+        return self.template_version(
+            os.path.join(template_dir, template_name),
+            *(os.path.join(template_dir, "css", css) for css in css_files),
+        )
+
+    def key_for(self, template_name: str, template_version: str, context: Dict[str, Any]) -> str:
+        payload = f"{template_name}\0{template_version}\0{normalize_context(context)}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Lectura / escritura
+    # ------------------------------------------------------------------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as cached:
+                data = cached.read()
+            os.utime(path)  # marca de acceso para el LRU
+            return data
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Error leyendo PDF en caché {key}: {e}")
+
+        if self.remote is None:
+            return None
+        try:
+            data = self.remote.download_file_as_bytes(f"{self.remote_prefix}{key}.pdf")
+        except Exception as e:
+            logger.warning(f"Error leyendo PDF en caché remota {key}: {e}")
+            return None
+        if data:
+            self._write_local(key, data)
+        return data or None
+
+    def put(self, key: str, data: bytes) -> None:
+        self._write_local(key, data)
+        if self._uploader is not None:
+            self._uploader.submit(self._upload, key, data)
+
+    def _upload(self, key: str, data: bytes) -> None:
+        try:
+            self.remote.upload_bytes(
+                data, f"{self.remote_prefix}{key}.pdf", content_type="application/pdf", public=False
+            )
+        except Exception as e:
+            logger.warning(f"Error subiendo PDF a la caché remota {key}: {e}")
+
+    def _write_local(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as tmp:
+                tmp.write(data)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Error escribiendo PDF en caché {key}: {e}")
+            return
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data) - previous
+        self._evict()
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".pdf"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self) -> None:
+        with self._lock:
+            if self._size is not None and self._size <= self.max_bytes:
+                return
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_bytes:
+                # Se desaloja hasta el 90% para no recorrer el directorio en cada escritura.
+                target = int(self.max_bytes * 0.9)
+                for _, size, path in sorted(entries):
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                        total -= size
+                    except OSError:
+                        continue
+            self._size = total
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+
+    # ------------------------------------------------------------------
+    # API principal
+    # ------------------------------------------------------------------
+    def lookup(
+        self,
+        template_name: str,
+        context: Dict[str, Any],
+        template_version: Optional[str] = None,
+    ) -> Tuple[Optional[str], Optional[bytes]]:
+        """
+        Busca el artefacto en la caché.
+
+        Returns:
+            (clave, pdf). La clave es None si la caché está desactivada o el
+            contexto no es normalizable; el pdf es None en un fallo de caché.
+            Tras un fallo, el PDF generado se guarda con `store(clave, pdf)`.
+        """
+        html_to_pdf.reset_emergency_pdf_flag()
+        if not self.enabled:
+            return None, None
+        try:
+            version = template_version or self.report_template_version(template_name)
+            key = self.key_for(template_name, version, context)
+        except UncacheableContext as e:
+            logger.debug(f"PDF {template_name} sin caché: {e}")
+            return None, None
+        return key, self.get(key)
+
+    def store(self, key: Optional[str], pdf_content: Any) -> None:
+        # Los PDF de emergencia (errores de render) no se guardan.
+        if key is None or html_to_pdf.emergency_pdf_generated():
+            return
+        if isinstance(pdf_content, (bytes, bytearray)) and pdf_content:
+            self.put(key, bytes(pdf_content))
+
+    def get_or_render(
+        self,
+        template_name: str,
+        context: Dict[str, Any],
+        render: Callable[[], Any],
+        *,
+        template_version: Optional[str] = None,
+    ) -> bytes:
+        """
+        Devuelve el PDF desde la caché o ejecuta `render` y lo guarda.
+
+        Args:
+            template_name: Nombre lógico del artefacto (plantilla o exportación).
+            context: Datos de los que depende el PDF (contexto completo o sellos de datos).
+            render: Función que genera el PDF; solo se llama en un fallo de caché.
+            template_version: Versión de la plantilla; por defecto se calcula
+                desde `app/templates/reports`.
+        """
+        key, cached = self.lookup(template_name, context, template_version)
+        if cached is not None:
+            return cached
+        pdf_content = render()
+        self.store(key, pdf_content)
+        return pdf_content
+
+    async def get_or_render_async(
+        self,
+        template_name: str,
+        context: Dict[str, Any],
+        render: Callable[[], Awaitable[Any]],
+        *,
+        template_version: Optional[str] = None,
+    ) -> bytes:
+        """Igual que `get_or_render` para funciones de render asíncronas."""
+        key, cached = self.lookup(template_name, context, template_version)
+        if cached is not None:
+            return cached
+        pdf_content = await render()
+        self.store(key, pdf_content)
+        return pdf_content
+
+
+def _build_default_cache() -> PDFArtifactCache:
+    remote = None
+    if settings.pdf_cache_remote:
+        from app.services.s3_storage import contabo_service
+
+        remote = contabo_service
+    return PDFArtifactCache(
+        cache_dir=settings.pdf_cache_dir,
+        max_bytes=settings.pdf_cache_max_bytes,
+        remote=remote,
+        enabled=settings.pdf_cache_enabled,
+    )
+
+
+pdf_artifact_cache = _build_default_cache()
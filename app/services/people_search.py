@@ -0,0 +1,115 @@
+"""
+Búsqueda de personas (trabajadores y usuarios) compartida por los listados,
+las exportaciones y los autocompletados.
+
+`workers.search_text` y `users.search_text` son columnas generadas con
+nombres, documento y correo en minúsculas y sin tildes, indexadas con un GIN
+de pg_trgm: `LIKE '%term%'` usa el índice en vez de recorrer la tabla. Los
+términos numéricos se tratan como documentos y además se buscan por prefijo
+con el índice `text_pattern_ops` de `document_number`, que es lo que se
+escribe en un autocompletado de cédula.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Any, List, Optional
+
+from sqlalchemy import and_, case, func, or_, select, true
+from sqlalchemy.orm import Session
+
+from app.models.worker import Worker
+
+# Cédulas escritas con puntos, guiones o espacios ("1.020.345.678")
+_DOCUMENT_TERM = re.compile(r"^[\d.\-\s]+$")
+_LIKE_ESCAPE = "\\"
+# Coincidencias que se ordenan por relevancia en un autocompletado
+TYPEAHEAD_CANDIDATES = 200
+
+
+def normalize_search_term(term: str) -> str:
+    """Minúsculas, sin tildes y con espacios simples, igual que `f_unaccent(lower(...))`."""
+    decomposed = unicodedata.normalize("NFKD", term.lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.split())
+
+
+def document_digits(term: str) -> Optional[str]:
+    """Dígitos del término si parece un número de documento, si no None."""
+    if not _DOCUMENT_TERM.match(term):
+        return None
+    digits = re.sub(r"\D", "", term)
+    return digits or None
+
+
+def _escape_like(value: str) -> str:
+    return (
+        value.replace(_LIKE_ESCAPE, _LIKE_ESCAPE * 2)
+        .replace("%", _LIKE_ESCAPE + "%")
+        .replace("_", _LIKE_ESCAPE + "_")
+    )
+
+
+def _contains(column: Any, value: str):
+    return column.like(f"%{_escape_like(value)}%", escape=_LIKE_ESCAPE)
+
+
+def search_condition(model: Any, term: str):
+    """
+    Filtro de búsqueda para `model` (Worker, User o cualquier objeto con
+    columnas `search_text` y `document_number`).
+
+    Cada palabra del término debe aparecer en el texto de búsqueda, así
+    "maria gomez" encuentra a "María Fernanda Gómez". Un término numérico
+    coincide por prefijo o subcadena del documento.
+    """
+    digits = document_digits(term)
+    if digits:
+        return or_(
+            model.document_number.like(f"{digits}%"),
+            _contains(model.search_text, digits),
+        )
+    tokens = normalize_search_term(term).split()
+    if not tokens:
+        return true()
+    return and_(*[_contains(model.search_text, token) for token in tokens])
+
+
+def search_rank(model: Any, term: str) -> List[Any]:
+    """Criterios de orden por relevancia: prefijo de documento y similitud de palabras."""
+    order = []
+    digits = document_digits(term)
+    if digits:
+        order.append(case((model.document_number.like(f"{digits}%"), 0), else_=1))
+    order.append(func.word_similarity(normalize_search_term(term), model.search_text).desc())
+    return order
+
+
+def typeahead_query(model: Any, term: str, limit: int, *filters):
+    """
+    Consulta de autocompletado: las `limit` filas de `model` más relevantes.
+
+    La relevancia se calcula solo sobre las primeras `TYPEAHEAD_CANDIDATES`
+    coincidencias del índice: con términos cortos y comunes ("mar") ordenar
+    todas las coincidencias costaría tanto como el recorrido que se evita, y
+    en un autocompletado el usuario sigue escribiendo.
+    """
+    candidates = (
+        select(model.id)
+        .where(search_condition(model, term), *filters)
+        .limit(TYPEAHEAD_CANDIDATES)
+        .subquery()
+    )
+    return (
+        select(model)
+        .join(candidates, model.id == candidates.c.id)
+        .order_by(*search_rank(model, term), model.id)
+        .limit(limit)
+    )
+
+
+def find_workers(db: Session, term: str, limit: int = 10, active_only: bool = True) -> List[Worker]:
+    """Trabajadores que coinciden con `term`, los más relevantes primero."""
+    filters = [Worker.is_active == True] if active_only else []
+    return db.scalars(typeahead_query(Worker, term, limit, *filters)).all()
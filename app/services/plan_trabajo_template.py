@@ -15,6 +15,11 @@ Cada actividad incluye:
 - meses_programados: lista de meses (1-12) donde la actividad está programada (P)
 """
 
+from app.models.plan_trabajo_anual import (
+    CategoriaActividad, CicloPhva, PlanTrabajoActividad, PlanTrabajoSeguimiento
+)
+from app.services.template_instantiation import TemplateRow, monthly_rows
+
 
 NOMBRE_MESES = [
     "", "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
@@ -859,3 +864,30 @@ def get_plantilla_actividades(año: int) -> list:
         act.setdefault("costo", None)
 
     return actividades
+
+
+def get_plantilla_filas(año: int) -> list:
+    """
+    Actividades de la plantilla con sus 12 seguimientos, listas para
+    `instantiate(db, filas, parent_id=plan.id)`.
+    """
+    filas = []
+    for act_data in get_plantilla_actividades(año):
+        meses_programados = act_data.pop("meses_programados", [])
+        actividad = {
+            "ciclo": CicloPhva(act_data["ciclo"]),
+            "categoria": CategoriaActividad(act_data["categoria"]),
+            "estandar": act_data.get("estandar"),
+            "descripcion": act_data["descripcion"],
+            "frecuencia": act_data.get("frecuencia"),
+            "responsable": act_data.get("responsable"),
+            "recurso_financiero": act_data.get("recurso_financiero", False),
+            "recurso_tecnico": act_data.get("recurso_tecnico", False),
+            "costo": act_data.get("costo"),
+            "orden": act_data.get("orden", 0),
+        }
+        filas.append(TemplateRow(
+            PlanTrabajoActividad, actividad, "plan_id",
+            children=monthly_rows(PlanTrabajoSeguimiento, "actividad_id", meses_programados, ejecutada=False),
+        ))
+    return filas
@@ -3,6 +3,11 @@ Datos semilla para el Presupuesto SST (AN-SST-03)
 Basado en el documento "Consolidado General Presupuesto"
 """
 
+from decimal import Decimal
+
+from app.models.presupuesto_sst import PresupuestoCategoria, PresupuestoItem, PresupuestoMensual
+from app.services.template_instantiation import TemplateRow, monthly_rows
+
 CATEGORIAS_ORDER = [
     "MEDICINA_PREVENTIVA",
     "HIGIENE_INDUSTRIAL",
@@ -53,3 +58,25 @@ DEFAULT_ITEMS: dict[str, list[str]] = {
 def get_default_items(categoria: str) -> list[str]:
     """Retorna la lista de actividades por defecto para una categoría."""
     return DEFAULT_ITEMS.get(categoria, [])
+
+
+def get_plantilla_filas() -> list:
+    """Categorías con sus ítems por defecto y los 12 montos mensuales de cada ítem,
+    para `instantiate(db, filas, parent_id=presupuesto.id)`."""
+    filas = []
+    for orden_cat, cat_str in enumerate(CATEGORIAS_ORDER):
+        items = [
+            TemplateRow(
+                PresupuestoItem,
+                {"actividad": nombre, "es_default": True, "orden": orden_item},
+                "categoria_id",
+                children=monthly_rows(
+                    PresupuestoMensual, "item_id", proyectado=Decimal("0"), ejecutado=Decimal("0")
+                ),
+            )
+            for orden_item, nombre in enumerate(get_default_items(cat_str))
+        ]
+        filas.append(TemplateRow(
+            PresupuestoCategoria, {"categoria": cat_str, "orden": orden_cat}, "presupuesto_id", children=items
+        ))
+    return filas
@@ -5,7 +5,7 @@ from typing import Any, Dict, List, Optional
 
 from app.models.cargo import Cargo
 from app.models.profesiograma import Profesiograma, ProfesiogramaFactor
-from app.services.html_to_pdf import HTMLToPDFConverter
+from app.services.html_to_pdf import get_html_to_pdf_converter
 
 
 def _fmt(value: Any) -> str:
@@ -113,8 +113,8 @@ def _serialize_factor(pf: ProfesiogramaFactor) -> Dict[str, Any]:
 
 
 def build_profesiograma_report_context(cargo: Cargo, profesiograma: Profesiograma) -> Dict[str, Any]:
-    converter = HTMLToPDFConverter()
-    logo_base64 = converter._load_logo_base64("logo_3.png")
+    converter = get_html_to_pdf_converter()
+    logo_url = converter.logo_url()
     factors: List[Dict[str, Any]] = []
     for pf in list(getattr(profesiograma, "profesiograma_factores", []) or []):
         factors.append(_serialize_factor(pf))
@@ -124,7 +124,7 @@ def build_profesiograma_report_context(cargo: Cargo, profesiograma: Profesiogram
         examenes.append(_serialize_examen(pe))
 
     context = {
-        "logo_base64": logo_base64,
+        "logo_url": logo_url,
         "generated_at": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
         "cargo": {
             "id": getattr(cargo, "id", None),
@@ -160,7 +160,7 @@ def build_profesiograma_report_context(cargo: Cargo, profesiograma: Profesiogram
 
 
 def generate_profesiograma_report_pdf(cargo: Cargo, profesiograma: Profesiograma) -> bytes:
-    converter = HTMLToPDFConverter()
+    converter = get_html_to_pdf_converter()
     context = build_profesiograma_report_context(cargo, profesiograma)
     html_content = converter.render_template("profesiograma_report.html", context)
     return converter.generate_pdf(html_content, ["profesiograma_report.css"])
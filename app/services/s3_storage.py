@@ -4,20 +4,151 @@ Servicio de almacenamiento S3 para documentos de empleados y exámenes médicos.
 
 import os
 import re
-import boto3
 import logging
-from typing import Optional, Dict, Any, BinaryIO
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, BinaryIO, Callable, Iterable, Tuple
 from datetime import datetime
-from botocore.exceptions import ClientError, NoCredentialsError
 from fastapi import UploadFile
 import uuid
 from pathlib import Path
+from urllib.parse import urlparse
 from app.config import settings
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
-class S3StorageService:
+# Mismo formato de región que valida botocore al crear el cliente
+_REGION_PATTERN = re.compile(r"^[a-zA-Z0-9](?:[a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?$")
+
+
+class _LazyS3ClientMixin(ABC):
+    """
+    Crea el cliente boto3 en el primer uso y no al importar el módulo.
+
+    Importar boto3/botocore y construir el cliente cuesta cientos de
+    milisegundos; la mayoría de los procesos (migraciones, workers, arranque
+    de la API) no llegan a tocar el almacenamiento.
+
+    Las subclases llaman a `_validate_client_config()` en su `__init__`: así
+    una configuración que boto3 rechazaría (endpoint o región inválidos) sigue
+    fallando al crear el servicio y no en la primera subida o descarga.
+    """
+
+    _client = None
+    _client_lock = threading.Lock()
+
+    @abstractmethod
+    def _client_kwargs(self) -> Dict[str, Any]:
+        """Argumentos de `boto3.client("s3", ...)`."""
+
+    def _validate_client_config(self) -> None:
+        kwargs = self._client_kwargs()
+        endpoint_url = kwargs.get("endpoint_url")
+        if endpoint_url is not None:
+            parsed = urlparse(endpoint_url)
+            if parsed.scheme not in ("http", "https") or not parsed.netloc:
+                raise ValueError(f"Endpoint de almacenamiento inválido: {endpoint_url}")
+        region = kwargs.get("region_name")
+        if region is not None and not _REGION_PATTERN.match(region):
+            raise ValueError(f"Región de almacenamiento inválida: {region}")
+
+    @property
+    def s3_client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+
+                    try:
+                        self._client = boto3.client("s3", **self._client_kwargs())
+                    except Exception as e:
+                        logger.error(f"Error creando el cliente de {type(self).__name__}: {e}")
+                        raise
+        return self._client
+
+
+class PresignedURLCache:
+    """
+    URLs firmadas reutilizables por clave de objeto y franja de expiración.
+
+    El tiempo se divide en franjas de `reuse_seconds`. Una URL pedida con
+    `expiration` se firma por `expiration + reuse_seconds` y se reutiliza
+    hasta que termina su franja, así que quien la recibe siempre tiene al
+    menos `expiration` segundos de validez. Entre tanto, la misma URL sale
+    en cada listado y el navegador puede reaprovechar su caché.
+
+    También recuerda las claves que se sabe que existen (subidas, firmadas o
+    verificadas con HEAD) para no volver a consultarlas. Si otro proceso borra
+    el objeto, la URL firmada responde 404, igual que cualquier URL vieja.
+    """
+
+    def __init__(self, reuse_seconds: int = 900, max_entries: int = 10_000, clock: Callable[[], float] = time.time):
+        self.reuse_seconds = reuse_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (clave, expiración pedida) -> (franja, url)
+        self._urls: "OrderedDict[Tuple[str, int], Tuple[int, str]]" = OrderedDict()
+        self._known: "OrderedDict[str, None]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def window(self, expiration: int) -> int:
+        return max(1, min(self.reuse_seconds, expiration))
+
+    def bucket(self, expiration: int) -> int:
+        return int(self._clock() // self.window(expiration))
+
+    def signing_expiration(self, expiration: int) -> int:
+        return expiration + self.window(expiration)
+
+    def get(self, file_key: str, expiration: int) -> Optional[str]:
+        with self._lock:
+            entry = self._urls.get((file_key, expiration))
+            if entry is not None and entry[0] == self.bucket(expiration):
+                self._urls.move_to_end((file_key, expiration))
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, file_key: str, expiration: int, bucket: int, url: str) -> None:
+        """Guarda `url`, firmada en la franja `bucket` (calculada antes de firmar)."""
+        with self._lock:
+            self._urls[(file_key, expiration)] = (bucket, url)
+            self._urls.move_to_end((file_key, expiration))
+            while len(self._urls) > self.max_entries:
+                self._urls.popitem(last=False)
+        self.mark_known(file_key)
+
+    def is_known(self, file_key: str) -> bool:
+        with self._lock:
+            return file_key in self._known
+
+    def mark_known(self, file_key: str) -> None:
+        with self._lock:
+            self._known[file_key] = None
+            self._known.move_to_end(file_key)
+            while len(self._known) > self.max_entries:
+                self._known.popitem(last=False)
+
+    def discard(self, file_key: str) -> None:
+        """Olvida la clave y sus URLs (p. ej. al borrar el objeto)."""
+        with self._lock:
+            self._known.pop(file_key, None)
+            for cache_key in [k for k in self._urls if k[0] == file_key]:
+                del self._urls[cache_key]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"urls": len(self._urls), "known_keys": len(self._known), "hits": self.hits, "misses": self.misses}
+
+
+class S3StorageService(_LazyS3ClientMixin):
     """Servicio para manejar el almacenamiento de archivos en S3."""
     
     def __init__(self):
@@ -42,19 +173,15 @@ class S3StorageService:
             error_msg = f"Variables de entorno faltantes para S3: {', '.join(missing_vars)}"
             logger.error(error_msg)
             raise ValueError(error_msg)
-        
-        # Inicializar cliente S3
-        try:
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=self.aws_access_key_id,
-                aws_secret_access_key=self.aws_secret_access_key,
-                region_name=self.region
-            )
-            logger.info("Cliente S3 inicializado correctamente")
-        except Exception as e:
-            logger.error(f"Error al inicializar cliente S3: {e}")
-            raise
+
+        self._validate_client_config()
+
+    def _client_kwargs(self) -> Dict[str, Any]:
+        return {
+            "aws_access_key_id": self.aws_access_key_id,
+            "aws_secret_access_key": self.aws_secret_access_key,
+            "region_name": self.region,
+        }
     
     def _generate_file_key(self, folder: str, worker_id: int, filename: str) -> str:
         """
@@ -549,7 +676,7 @@ class S3StorageService:
         return config_status
 
 
-class ContaboStorageService:
+class ContaboStorageService(_LazyS3ClientMixin):
     def __init__(self):
         self.endpoint_url = settings.contabo_endpoint_url
         self.access_key_id = settings.contabo_access_key_id
@@ -558,6 +685,11 @@ class ContaboStorageService:
         self.bucket_name = settings.contabo_bucket_name
         self.public_base_url = settings.contabo_public_base_url
         self.make_public = settings.contabo_make_public
+        self.url_cache = PresignedURLCache(
+            reuse_seconds=settings.presigned_url_reuse_seconds,
+            max_entries=settings.presigned_url_cache_size,
+        )
+        self._probe_executor: Optional[ThreadPoolExecutor] = None
 
         if not all([self.endpoint_url, self.access_key_id, self.secret_access_key, self.bucket_name]):
             missing_vars = []
@@ -573,13 +705,15 @@ class ContaboStorageService:
             logger.error(error_msg)
             raise ValueError(error_msg)
 
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=self.access_key_id,
-            aws_secret_access_key=self.secret_access_key,
-            region_name=self.region,
-            endpoint_url=self.endpoint_url
-        )
+        self._validate_client_config()
+
+    def _client_kwargs(self) -> Dict[str, Any]:
+        return {
+            "aws_access_key_id": self.access_key_id,
+            "aws_secret_access_key": self.secret_access_key,
+            "region_name": self.region,
+            "endpoint_url": self.endpoint_url,
+        }
 
     def _build_public_url(self, file_key: str) -> str:
         if self.public_base_url:
@@ -591,21 +725,29 @@ class ContaboStorageService:
     def get_public_url(self, file_key: str) -> str:
         return self._build_public_url(file_key)
 
-    def upload_bytes(self, file_content: bytes, file_key: str, content_type: str = "application/octet-stream") -> str:
+    def upload_bytes(
+        self,
+        file_content: bytes,
+        file_key: str,
+        content_type: str = "application/octet-stream",
+        public: Optional[bool] = None,
+    ) -> str:
         params = {
             "Bucket": self.bucket_name,
             "Key": file_key,
             "Body": file_content,
             "ContentType": content_type or "application/octet-stream"
         }
-        if self.make_public:
+        if self.make_public if public is None else public:
             params["ACL"] = "public-read"
         self.s3_client.put_object(**params)
+        self.url_cache.mark_known(file_key)
         return self._build_public_url(file_key)
 
     def delete_file(self, file_key: str) -> bool:
         try:
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=file_key)
+            self.url_cache.discard(file_key)
             return True
         except Exception as e:
             logger.error(f"Error al eliminar archivo en Contabo: {e}")
@@ -642,41 +784,92 @@ class ContaboStorageService:
             logger.error(f"Error al listar archivos en Contabo: {e}")
             return []
 
+    def _sign(self, file_key: str, expiration: int) -> str:
+        bucket = self.url_cache.bucket(expiration)
+        url = self.s3_client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': self.bucket_name,
+                'Key': file_key,
+                'ResponseContentDisposition': 'inline'
+            },
+            ExpiresIn=self.url_cache.signing_expiration(expiration)
+        )
+        self.url_cache.put(file_key, expiration, bucket, url)
+        return url
+
     def get_presigned_url(self, file_key: str, expiration: int = 3600) -> Optional[str]:
         """
         Genera una URL firmada para acceso temporal al archivo.
 
+        La URL sale de `url_cache` mientras siga en su franja, y la consulta
+        de existencia (HEAD) solo se hace para claves que aún no se conocen.
+
         Args:
             file_key: Clave del archivo en el bucket
-            expiration: Tiempo de expiración en segundos (default: 1 hora)
+            expiration: Validez mínima de la URL en segundos (default: 1 hora)
 
         Returns:
             URL firmada o None si hay error
         """
+        cached = self.url_cache.get(file_key, expiration)
+        if cached:
+            return cached
         try:
             # Verificar si el archivo existe
-            try:
-                self.s3_client.head_object(Bucket=self.bucket_name, Key=file_key)
-            except Exception as head_error:
-                logger.error(f"Archivo no encontrado en Contabo: {file_key}, Error: {head_error}")
-                return None
-
-            # Generar URL firmada
-            url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': file_key,
-                    'ResponseContentDisposition': 'inline'
-                },
-                ExpiresIn=expiration
-            )
-            logger.info(f"URL firmada generada para Contabo: {file_key}")
+            if not self.url_cache.is_known(file_key):
+                try:
+                    self.s3_client.head_object(Bucket=self.bucket_name, Key=file_key)
+                except Exception as head_error:
+                    logger.error(f"Archivo no encontrado en Contabo: {file_key}, Error: {head_error}")
+                    return None
+
+            url = self._sign(file_key, expiration)
+            logger.debug(f"URL firmada generada para Contabo: {file_key}")
             return url
         except Exception as e:
             logger.error(f"Error al generar URL firmada en Contabo para {file_key}: {e}")
             return None
 
+    def get_presigned_urls(self, file_keys: Iterable[str], expiration: int = 3600) -> Dict[str, Optional[str]]:
+        """
+        Firma varias claves a la vez (listados de materiales, documentos).
+
+        Las claves que no están en caché ni se conocen se verifican con HEAD en
+        paralelo, de modo que un listado espera una sola ronda al almacenamiento
+        en lugar de una por elemento.
+
+        Returns:
+            Diccionario clave -> URL firmada (None si el archivo no existe o hay error)
+        """
+        keys = list(dict.fromkeys(k for k in file_keys if k))
+        urls: Dict[str, Optional[str]] = {}
+        unknown = []
+        for key in keys:
+            urls[key] = self.url_cache.get(key, expiration)
+            if urls[key] is None and not self.url_cache.is_known(key):
+                unknown.append(key)
+
+        missing = set()
+        if unknown:
+            if self._probe_executor is None:
+                self._probe_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="contabo-head")
+            for key, exists in zip(unknown, self._probe_executor.map(self.file_exists, unknown)):
+                if exists:
+                    self.url_cache.mark_known(key)
+                else:
+                    logger.error(f"Archivo no encontrado en Contabo: {key}")
+                    missing.add(key)
+
+        for key in keys:
+            if urls[key] is not None or key in missing:
+                continue
+            try:
+                urls[key] = self._sign(key, expiration)
+            except Exception as e:
+                logger.error(f"Error al generar URL firmada en Contabo para {key}: {e}")
+        return urls
+
 
 # Instancia global del servicio
 s3_service = S3StorageService()
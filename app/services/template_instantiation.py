@@ -0,0 +1,99 @@
+"""
+Instanciación de plantillas (planes, programas, presupuestos, cronogramas)
+con inserciones por lotes.
+
+Una plantilla es un árbol de `TemplateRow`: cada fila indica su modelo, sus
+valores y la columna que la une con su padre. `instantiate` inserta el árbol
+nivel por nivel: todas las filas de un mismo modelo y nivel van en un único
+INSERT multi-fila, y los ids generados (RETURNING, en el orden de los
+parámetros) se asignan a los hijos del nivel siguiente. Un plan anual con
+~60 actividades y 12 seguimientos por actividad pasa de cientos de viajes a
+la base de datos a uno por nivel.
+
+No confirma la transacción: el endpoint crea el registro padre, llama a
+`instantiate` y hace un solo commit.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+# Filas de seguimiento mensual que acompañan a cada actividad
+MESES = range(1, 13)
+
+
+@dataclass
+class TemplateRow:
+    model: Any
+    values: Dict[str, Any]
+    # Columna de `model` que guarda el id del padre (None en la raíz sin padre)
+    parent_key: Optional[str] = None
+    children: List["TemplateRow"] = field(default_factory=list)
+
+
+def monthly_rows(
+    model: Any, parent_key: str, meses_programados: Optional[Sequence[int]] = None, **values: Any
+) -> List[TemplateRow]:
+    """Los 12 seguimientos mensuales de una actividad; con `meses_programados`
+    marca `programada` en los meses de la plantilla."""
+    rows = []
+    for mes in MESES:
+        row_values = {"mes": mes, **values}
+        if meses_programados is not None:
+            row_values["programada"] = mes in meses_programados
+        rows.append(TemplateRow(model, row_values, parent_key))
+    return rows
+
+
+def instantiate(db: Session, rows: Sequence[TemplateRow], parent_id: Optional[int] = None) -> List[int]:
+    """
+    Inserta `rows` y todos sus descendientes; devuelve los ids de `rows` en
+    el mismo orden. `parent_id` se asigna a la `parent_key` de las filas de
+    primer nivel.
+    """
+    level: List[Tuple[TemplateRow, Optional[int]]] = [(row, parent_id) for row in rows]
+    top_ids: List[Optional[int]] = []
+    while level:
+        ids = _insert_level(db, level, need_ids=not top_ids)
+        if not top_ids:
+            top_ids = ids
+        level = [
+            (child, row_id)
+            for (row, _), row_id in zip(level, ids)
+            for child in row.children
+        ]
+    return top_ids
+
+
+def _insert_level(
+    db: Session, level: List[Tuple[TemplateRow, Optional[int]]], need_ids: bool
+) -> List[Optional[int]]:
+    # Agrupar por modelo conservando la posición de cada fila en el nivel
+    groups: Dict[Any, List[int]] = {}
+    for position, (row, _) in enumerate(level):
+        groups.setdefault(row.model, []).append(position)
+
+    ids: List[Optional[int]] = [None] * len(level)
+    for model, positions in groups.items():
+        params = []
+        for position in positions:
+            row, parent_id = level[position]
+            values = dict(row.values)
+            if row.parent_key:
+                values[row.parent_key] = parent_id
+            params.append(values)
+
+        if need_ids or any(level[position][0].children for position in positions):
+            inserted = db.scalars(
+                insert(model).returning(model.id, sort_by_parameter_order=True), params
+            ).all()
+            for position, row_id in zip(positions, inserted):
+                ids[position] = row_id
+        else:
+            # Hojas: no hace falta leer los ids generados
+            db.execute(insert(model), params)
+    return ids
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import and_, func, literal_column
+from sqlalchemy.orm import Session
+
+from app.models.worker import Worker
+from app.models.worker_vacation import VacationStatus, WorkerVacation
+
+
+ACTIVE_STATUSES = (VacationStatus.APPROVED, VacationStatus.PENDING)
+
+
+@dataclass(frozen=True)
+class OccupancyInterval:
+    vacation_id: int
+    worker_id: int
+    worker_name: str
+    start_date: date
+    end_date: date
+    status: VacationStatus
+
+
+@dataclass(frozen=True)
+class OccupancyRange:
+    start_date: date
+    end_date: date
+    headcount: int
+
+
+def business_days_between(start: date, end: date) -> int:
+    """Cuenta los días hábiles (lunes a viernes) entre dos fechas inclusive, en O(1)."""
+    if end < start:
+        return 0
+    total_days = (end - start).days + 1
+    full_weeks, remainder = divmod(total_days, 7)
+    business = full_weeks * 5
+    first_weekday = start.weekday()
+    for offset in range(remainder):
+        if (first_weekday + offset) % 7 < 5:
+            business += 1
+    return business
+
+
+class VacationOccupancy:
+    """Índice en memoria de ocupación de vacaciones por rangos de fechas.
+
+    Se construye una sola vez a partir de los intervalos y responde:
+    - rangos fusionados con el número de personas ausentes en cada uno;
+    - ocupación en un día o máxima en un rango, con búsqueda binaria;
+    - intervalos que se solapan con un rango (árbol de intervalos implícito,
+      O(log n + k));
+    - un mapa compacto de un carácter por día para el frontend.
+    """
+
+    def __init__(self, intervals: Iterable[OccupancyInterval]):
+        self._intervals: List[OccupancyInterval] = sorted(
+            intervals, key=lambda i: (i.start_date, i.end_date, i.vacation_id)
+        )
+        self._starts: List[date] = [i.start_date for i in self._intervals]
+        self._max_end: List[date] = [i.end_date for i in self._intervals]
+        self._build_max_end(0, len(self._intervals))
+
+        self._boundaries: List[date] = []
+        self._counts: List[int] = []
+        self._build_segments()
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    # ------------------------------------------------------------------
+    # Construcción
+    # ------------------------------------------------------------------
+    def _build_max_end(self, lo: int, hi: int) -> Optional[date]:
+        """Calcula el fin máximo de cada subárbol del árbol implícito sobre el arreglo ordenado."""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        best = self._intervals[mid].end_date
+        for child in (self._build_max_end(lo, mid), self._build_max_end(mid + 1, hi)):
+            if child is not None and child > best:
+                best = child
+        self._max_end[mid] = best
+        return best
+
+    def _build_segments(self) -> None:
+        """Barrido de eventos: cada frontera abre un segmento de ocupación constante."""
+        deltas: Dict[date, int] = {}
+        for interval in self._intervals:
+            deltas[interval.start_date] = deltas.get(interval.start_date, 0) + 1
+            after_end = interval.end_date + timedelta(days=1)
+            deltas[after_end] = deltas.get(after_end, 0) - 1
+
+        running = 0
+        for boundary in sorted(deltas):
+            delta = deltas[boundary]
+            if delta == 0:
+                continue
+            running += delta
+            if self._counts and self._counts[-1] == running:
+                continue
+            self._boundaries.append(boundary)
+            self._counts.append(running)
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def headcount_on(self, day: date) -> int:
+        """Número de personas de vacaciones en un día."""
+        idx = bisect_right(self._boundaries, day) - 1
+        return self._counts[idx] if idx >= 0 else 0
+
+    def ranges(self, start: date, end: date) -> List[OccupancyRange]:
+        """Rangos fusionados con ocupación > 0, recortados a [start, end]."""
+        result: List[OccupancyRange] = []
+        if end < start or not self._boundaries:
+            return result
+
+        idx = max(bisect_right(self._boundaries, start) - 1, 0)
+        while idx < len(self._boundaries):
+            seg_start = self._boundaries[idx]
+            if seg_start > end:
+                break
+            if idx + 1 < len(self._boundaries):
+                seg_end = self._boundaries[idx + 1] - timedelta(days=1)
+            else:
+                seg_end = end
+            count = self._counts[idx]
+            if count > 0 and seg_end >= start:
+                result.append(
+                    OccupancyRange(
+                        start_date=max(seg_start, start),
+                        end_date=min(seg_end, end),
+                        headcount=count,
+                    )
+                )
+            idx += 1
+        return result
+
+    def max_headcount(self, start: date, end: date) -> int:
+        """Ocupación máxima simultánea dentro de [start, end]."""
+        return max((r.headcount for r in self.ranges(start, end)), default=0)
+
+    def overlapping(
+        self,
+        start: date,
+        end: date,
+        *,
+        statuses: Optional[Sequence[VacationStatus]] = None,
+        exclude_worker_id: Optional[int] = None,
+    ) -> List[OccupancyInterval]:
+        """Intervalos que se solapan con [start, end], ordenados por fecha de inicio."""
+        found: List[OccupancyInterval] = []
+        self._collect(0, len(self._intervals), start, end, found)
+        if statuses is not None:
+            found = [i for i in found if i.status in statuses]
+        if exclude_worker_id is not None:
+            found = [i for i in found if i.worker_id != exclude_worker_id]
+        return found
+
+    def _collect(self, lo: int, hi: int, start: date, end: date, found: List[OccupancyInterval]) -> None:
+        if lo >= hi:
+            return
+        mid = (lo + hi) // 2
+        # Ningún intervalo del subárbol termina después de `start`: se poda completo.
+        if self._max_end[mid] < start:
+            return
+        self._collect(lo, mid, start, end, found)
+        # A la derecha todos empiezan en o después de starts[mid].
+        if self._starts[mid] > end:
+            return
+        if self._intervals[mid].end_date >= start:
+            found.append(self._intervals[mid])
+        self._collect(mid + 1, hi, start, end, found)
+
+    def is_available(
+        self,
+        start: date,
+        end: date,
+        *,
+        capacity: int = 1,
+        exclude_worker_id: Optional[int] = None,
+    ) -> bool:
+        """True si ningún día de [start, end] alcanza `capacity` personas ausentes."""
+        if exclude_worker_id is None:
+            return self.max_headcount(start, end) < capacity
+        others = VacationOccupancy(self.overlapping(start, end, exclude_worker_id=exclude_worker_id))
+        return others.max_headcount(start, end) < capacity
+
+    def day_map(self, start: date, end: date) -> str:
+        """Mapa compacto de un carácter por día ('0'-'9', '9' significa 9 o más)."""
+        if end < start:
+            return ""
+        total_days = (end - start).days + 1
+        cells = ["0"] * total_days
+        for occupied in self.ranges(start, end):
+            digit = str(min(occupied.headcount, 9))
+            first = (occupied.start_date - start).days
+            last = (occupied.end_date - start).days
+            cells[first:last + 1] = digit * (last - first + 1)
+        return "".join(cells)
+
+
+def _daterange(start, end):
+    return func.daterange(start, end, literal_column("'[]'"))
+
+
+def load_area_occupancy(
+    db: Session,
+    start: date,
+    end: date,
+    *,
+    area_id: Optional[int] = None,
+    department: Optional[str] = None,
+    statuses: Sequence[VacationStatus] = ACTIVE_STATUSES,
+) -> VacationOccupancy:
+    """Carga en una sola consulta las vacaciones del área que se solapan con el rango.
+
+    En PostgreSQL el solapamiento se expresa con `daterange && daterange`, que
+    aprovecha el índice GiST `ix_worker_vacations_active_daterange`.
+    """
+    query = (
+        db.query(
+            WorkerVacation.id,
+            WorkerVacation.worker_id,
+            WorkerVacation.start_date,
+            WorkerVacation.end_date,
+            WorkerVacation.status,
+            Worker.first_name,
+            Worker.last_name,
+        )
+        .join(Worker, WorkerVacation.worker_id == Worker.id)
+        .filter(
+            WorkerVacation.status.in_(list(statuses)),
+            Worker.is_active == True,
+        )
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        query = query.filter(
+            _daterange(WorkerVacation.start_date, WorkerVacation.end_date).op("&&")(
+                _daterange(start, end)
+            )
+        )
+    else:
+        query = query.filter(
+            and_(WorkerVacation.start_date <= end, WorkerVacation.end_date >= start)
+        )
+
+    if area_id is not None:
+        query = query.filter(Worker.area_id == area_id)
+    elif department:
+        query = query.filter(Worker.department == department)
+
+    return VacationOccupancy(
+        OccupancyInterval(
+            vacation_id=row.id,
+            worker_id=row.worker_id,
+            worker_name=f"{row.first_name} {row.last_name}",
+            start_date=row.start_date,
+            end_date=row.end_date,
+            status=row.status,
+        )
+        for row in query.all()
+    )
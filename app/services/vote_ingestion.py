@@ -0,0 +1,318 @@
+"""
+Registro de votos (candidatos y comités) con una sola sentencia por voto y
+contadores por candidato/opción mantenidos en la misma transacción.
+
+Cada voto es un único INSERT ... ON CONFLICT encadenado con CTEs que:
+
+1. comprueba que la votación está activa y el candidato (o miembro) es válido;
+2. reserva el voto en la papeleta del votante (`candidate_voting_ballots`),
+   cuya fila bloqueada impide superar `max_votes_per_user` con votos
+   simultáneos;
+3. inserta el voto; los índices únicos rechazan los dobles votos;
+4. suma 1 al contador del candidato u opción.
+
+Los contadores se reparten en `TALLY_SHARDS` filas por candidato (el votante
+elige la fila con `voter_id % TALLY_SHARDS`): con una sola fila, todos los
+votos por el candidato más votado esperarían por el mismo bloqueo hasta el
+commit. Los resultados en vivo suman esas filas en vez de recontar votos.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import enum
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import read_session_scope
+from app.models.candidate_voting import CandidateVoteTally, CandidateVotingBallot
+from app.models.committee import CommitteeVoteTally
+
+TALLY_SHARDS = 8
+# Cada cuánto consulta los contadores un stream de resultados en vivo
+TALLY_STREAM_INTERVAL_SECONDS = 2.0
+# Comentario SSE para que proxies y navegadores no cierren la conexión
+TALLY_STREAM_KEEPALIVE_SECONDS = 15.0
+
+
+class VoteOutcome(str, enum.Enum):
+    ACCEPTED = "accepted"
+    NOT_ELIGIBLE = "not_eligible"    # votación inactiva/fuera de fechas, candidato o miembro inválido
+    LIMIT_REACHED = "limit_reached"  # el votante ya usó todos sus votos
+    DUPLICATE = "duplicate"          # ya votó por este candidato / en esta votación
+
+
+@dataclass(frozen=True)
+class VoteResult:
+    outcome: VoteOutcome
+    vote_id: Optional[int] = None
+    voted_at: Optional[datetime] = None
+
+
+_CAST_CANDIDATE_VOTE_SQL = text(
+    """
+    WITH eligible AS (
+        SELECT 1
+        FROM candidate_votings v
+        JOIN candidate_voting_candidates c ON c.voting_id = v.id
+        WHERE v.id = :voting_id
+          AND v.status = :active_status
+          AND :now BETWEEN v.start_date AND v.end_date
+          AND c.id = :candidate_id
+          AND c.is_active
+    ), ballot AS (
+        INSERT INTO candidate_voting_ballots (voting_id, voter_id, votes_cast, updated_at)
+        SELECT :voting_id, :voter_id, 1, :now FROM eligible
+        ON CONFLICT (voting_id, voter_id) DO UPDATE
+            SET votes_cast = candidate_voting_ballots.votes_cast + 1, updated_at = :now
+            WHERE candidate_voting_ballots.votes_cast < (
+                SELECT max_votes_per_user FROM candidate_votings WHERE id = :voting_id
+            )
+        RETURNING votes_cast
+    ), vote AS (
+        INSERT INTO candidate_votes (voting_id, candidate_id, voter_id, comments, vote_date, created_at)
+        SELECT :voting_id, :candidate_id, :voter_id, :comments, :now, :now FROM ballot
+        ON CONFLICT (voting_id, candidate_id, voter_id) DO NOTHING
+        RETURNING id
+    ), tally AS (
+        INSERT INTO candidate_vote_tallies (candidate_id, shard, voting_id, votes)
+        SELECT :candidate_id, :shard, :voting_id, 1 FROM vote
+        ON CONFLICT (candidate_id, shard) DO UPDATE
+            SET votes = candidate_vote_tallies.votes + 1
+    )
+    SELECT
+        EXISTS (SELECT 1 FROM eligible) AS eligible,
+        (SELECT votes_cast FROM ballot) AS votes_cast,
+        (SELECT id FROM vote) AS vote_id
+    """
+)
+
+_CAST_COMMITTEE_VOTE_SQL = text(
+    """
+    WITH eligible AS (
+        SELECT 1
+        FROM committee_votings v
+        JOIN committee_members m ON m.committee_id = v.committee_id
+        WHERE v.id = :voting_id
+          AND v.status = :active_status
+          AND (v.start_date IS NULL OR v.start_date <= :now)
+          AND (v.end_date IS NULL OR v.end_date >= :now)
+          AND m.id = :member_id
+          AND m.is_active
+    ), vote AS (
+        INSERT INTO committee_votes (
+            voting_id, member_id, vote_value, vote_date, comments,
+            is_proxy_vote, proxy_member_id, created_at, updated_at
+        )
+        SELECT :voting_id, :member_id, :vote_value, :now, :comments,
+               :is_proxy_vote, CAST(:proxy_member_id AS integer), :now, :now
+        FROM eligible
+        ON CONFLICT (voting_id, member_id) DO NOTHING
+        RETURNING id
+    ), tally AS (
+        INSERT INTO committee_vote_tallies (voting_id, vote_value, shard, votes)
+        SELECT :voting_id, :vote_value, :shard, 1 FROM vote
+        ON CONFLICT (voting_id, vote_value, shard) DO UPDATE
+            SET votes = committee_vote_tallies.votes + 1
+    )
+    SELECT
+        EXISTS (SELECT 1 FROM eligible) AS eligible,
+        (SELECT id FROM vote) AS vote_id
+    """
+)
+
+# El voto original sumó en la fila `shard` del miembro (la migración también
+# reparte así los votos anteriores), así que se resta de esa misma fila.
+_MOVE_COMMITTEE_TALLY_SQL = text(
+    """
+    WITH removed AS (
+        UPDATE committee_vote_tallies SET votes = votes - 1
+        WHERE voting_id = :voting_id AND vote_value = :old_value AND shard = :shard AND votes > 0
+    )
+    INSERT INTO committee_vote_tallies (voting_id, vote_value, shard, votes)
+    VALUES (:voting_id, :new_value, :shard, 1)
+    ON CONFLICT (voting_id, vote_value, shard) DO UPDATE
+        SET votes = committee_vote_tallies.votes + 1
+    """
+)
+
+
+def _shard(voter_id: int) -> int:
+    return voter_id % TALLY_SHARDS
+
+
+def cast_candidate_vote(
+    db: Session,
+    voting_id: int,
+    candidate_id: int,
+    voter_id: int,
+    comments: Optional[str] = None,
+    active_status: str = "active",
+) -> VoteResult:
+    """
+    Registra un voto por un candidato y confirma la transacción si se acepta;
+    si no, la revierte y devuelve el motivo. Un solo viaje a la base de datos.
+    """
+    now = datetime.utcnow()
+    row = db.execute(
+        _CAST_CANDIDATE_VOTE_SQL,
+        {
+            "voting_id": voting_id,
+            "candidate_id": candidate_id,
+            "voter_id": voter_id,
+            "comments": comments,
+            "active_status": active_status,
+            "now": now,
+            "shard": _shard(voter_id),
+        },
+    ).one()
+
+    if row.vote_id is not None:
+        db.commit()
+        return VoteResult(VoteOutcome.ACCEPTED, row.vote_id, now)
+
+    # La papeleta pudo sumar el voto aunque el INSERT chocara: se deshace todo
+    db.rollback()
+    if not row.eligible:
+        return VoteResult(VoteOutcome.NOT_ELIGIBLE)
+    if row.votes_cast is None:
+        return VoteResult(VoteOutcome.LIMIT_REACHED)
+    return VoteResult(VoteOutcome.DUPLICATE)
+
+
+def cast_committee_vote(
+    db: Session,
+    voting_id: int,
+    member_id: int,
+    vote_value: str,
+    comments: Optional[str] = None,
+    is_proxy_vote: bool = False,
+    proxy_member_id: Optional[int] = None,
+    active_status: str = "ACTIVE",
+) -> VoteResult:
+    """Registra el voto de un miembro del comité (uno por votación)."""
+    # Las fechas de las votaciones de comité están en hora local
+    now = datetime.now()
+    row = db.execute(
+        _CAST_COMMITTEE_VOTE_SQL,
+        {
+            "voting_id": voting_id,
+            "member_id": member_id,
+            "vote_value": vote_value,
+            "comments": comments,
+            "is_proxy_vote": is_proxy_vote,
+            "proxy_member_id": proxy_member_id,
+            "active_status": active_status,
+            "now": now,
+            "shard": _shard(member_id),
+        },
+    ).one()
+
+    if row.vote_id is not None:
+        db.commit()
+        return VoteResult(VoteOutcome.ACCEPTED, row.vote_id, now)
+    db.rollback()
+    return VoteResult(VoteOutcome.DUPLICATE if row.eligible else VoteOutcome.NOT_ELIGIBLE)
+
+
+def move_committee_tally(db: Session, voting_id: int, member_id: int, old_value: str, new_value: str) -> None:
+    """Pasa un voto de una opción a otra en los contadores (cambio de voto).
+    No confirma: debe ir en la transacción que actualiza el voto."""
+    if old_value == new_value:
+        return
+    db.execute(
+        _MOVE_COMMITTEE_TALLY_SQL,
+        {"voting_id": voting_id, "old_value": old_value, "new_value": new_value, "shard": _shard(member_id)},
+    )
+
+
+# ----------------------------------------------------------------------
+# Resultados desde los contadores
+# ----------------------------------------------------------------------
+def candidate_tallies(db: Session, voting_id: int) -> Dict[int, int]:
+    """Votos por candidato ({candidate_id: votos}) sumando sus contadores."""
+    rows = (
+        db.query(CandidateVoteTally.candidate_id, func.sum(CandidateVoteTally.votes))
+        .filter(CandidateVoteTally.voting_id == voting_id)
+        .group_by(CandidateVoteTally.candidate_id)
+        .all()
+    )
+    return {candidate_id: int(votes) for candidate_id, votes in rows}
+
+
+def candidate_voter_count(db: Session, voting_id: int) -> int:
+    return (
+        db.query(func.count())
+        .select_from(CandidateVotingBallot)
+        .filter(CandidateVotingBallot.voting_id == voting_id, CandidateVotingBallot.votes_cast > 0)
+        .scalar()
+    )
+
+
+def committee_tallies(db: Session, voting_id: int) -> Dict[str, int]:
+    """Votos por opción ({"yes": n, "no": n, "abstain": n}) sumando sus contadores."""
+    rows = (
+        db.query(CommitteeVoteTally.vote_value, func.sum(CommitteeVoteTally.votes))
+        .filter(CommitteeVoteTally.voting_id == voting_id)
+        .group_by(CommitteeVoteTally.vote_value)
+        .all()
+    )
+    return {value: int(votes) for value, votes in rows if votes}
+
+
+def candidate_tally_snapshot(db: Session, voting_id: int) -> dict:
+    tallies = candidate_tallies(db, voting_id)
+    return {
+        "voting_id": voting_id,
+        "total_votes": sum(tallies.values()),
+        "total_voters": candidate_voter_count(db, voting_id),
+        "candidates": [
+            {"candidate_id": candidate_id, "votes": votes}
+            for candidate_id, votes in sorted(tallies.items(), key=lambda item: item[1], reverse=True)
+        ],
+    }
+
+
+def committee_tally_snapshot(db: Session, voting_id: int) -> dict:
+    tallies = committee_tallies(db, voting_id)
+    return {"voting_id": voting_id, "total_votes": sum(tallies.values()), "votes_by_choice": tallies}
+
+
+# ----------------------------------------------------------------------
+# Server-sent events
+# ----------------------------------------------------------------------
+def _read_snapshot(snapshot: Callable[[Session, int], dict], voting_id: int) -> dict:
+    with read_session_scope() as db:
+        return snapshot(db, voting_id)
+
+
+async def tally_events(
+    snapshot: Callable[[Session, int], dict],
+    voting_id: int,
+    interval: float = TALLY_STREAM_INTERVAL_SECONDS,
+) -> AsyncIterator[str]:
+    """
+    Eventos SSE `tally` con el recuento de la votación. Consulta los
+    contadores cada `interval` segundos en una sesión de lectura propia (la
+    del endpoint ya se cerró) y solo emite cuando el recuento cambia.
+    """
+    last_payload = None
+    idle = 0.0
+    while True:
+        data = await run_in_threadpool(_read_snapshot, snapshot, voting_id)
+        payload = json.dumps(data, separators=(",", ":"))
+        if payload != last_payload:
+            last_payload = payload
+            idle = 0.0
+            yield f"event: tally\ndata: {payload}\n\n"
+        elif idle >= TALLY_STREAM_KEEPALIVE_SECONDS:
+            idle = 0.0
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(interval)
+        idle += interval
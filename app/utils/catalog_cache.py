@@ -0,0 +1,188 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+CATALOG_CACHE_TTL_SECONDS = 300
+CATALOG_CACHE_MAX_ENTRIES = 512
+CATALOG_CACHE_CONTROL = "private, no-cache"
+PENDING_INVALIDATIONS_KEY = "catalog_cache_pending"
+
+
+@dataclass(frozen=True)
+class _CachedBody:
+    body: bytes
+    etag: str
+    stored_at: float
+
+
+class CatalogCache:
+    """Caché en memoria de las respuestas de catálogos (cargos, EPS/AFP/ARL, áreas...).
+
+    Cada catálogo tiene un contador de versión que incrementan los endpoints de
+    creación, edición y borrado después del commit. Las respuestas se guardan ya
+    serializadas junto con un ETag fuerte (hash del cuerpo), de modo que una
+    petición repetida no toca la base de datos y un cliente con `If-None-Match`
+    recibe un 304 sin cuerpo.
+
+    El TTL acota la obsolescencia cuando el catálogo se modifica por fuera de
+    estos endpoints (seeds, scripts, otro proceso).
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = CATALOG_CACHE_TTL_SECONDS,
+        max_entries: int = CATALOG_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+        self._entries: "OrderedDict[Tuple[str, int, str], _CachedBody]" = OrderedDict()
+        self._adapters: Dict[Any, TypeAdapter] = {}
+        self._tracked_models: Dict[type, Tuple[str, ...]] = {}
+
+    def track_model(self, model: type, *catalogs: str) -> None:
+        """Invalida `catalogs` tras el commit de cualquier sesión que cree,
+        modifique o borre instancias de `model`, sin importar el endpoint o
+        servicio que haga la escritura."""
+        self._tracked_models[model] = self._tracked_models.get(model, ()) + catalogs
+
+    def _catalogs_for(self, instance: Any) -> Tuple[str, ...]:
+        for model, catalogs in self._tracked_models.items():
+            if isinstance(instance, model):
+                return catalogs
+        return ()
+
+    def version(self, catalog: str) -> int:
+        with self._lock:
+            return self._versions.get(catalog, 0)
+
+    def invalidate(self, *catalogs: str) -> None:
+        """Incrementa la versión de los catálogos y descarta sus respuestas guardadas."""
+        with self._lock:
+            for catalog in catalogs:
+                self._versions[catalog] = self._versions.get(catalog, 0) + 1
+            stale = [key for key in self._entries if key[0] in catalogs]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def respond(
+        self,
+        request: Request,
+        catalog: str,
+        response_type: Any,
+        loader: Callable[[], Any],
+    ) -> Response:
+        """Devuelve la respuesta del catálogo desde caché o ejecutando `loader`.
+
+        `response_type` es el mismo tipo del `response_model` del endpoint y se
+        usa para serializar el resultado de `loader` (objetos ORM).
+        """
+        key_suffix = _request_key(request)
+        version = self.version(catalog)
+        key = (catalog, version, key_suffix)
+
+        cached = self._get(key)
+        if cached is None:
+            adapter = self._adapter(response_type)
+            data = adapter.validate_python(loader(), from_attributes=True)
+            body = adapter.dump_json(data)
+            cached = _CachedBody(
+                body=body,
+                etag=f'"{hashlib.sha256(body).hexdigest()[:40]}"',
+                stored_at=time.monotonic(),
+            )
+            self._put(key, version, cached)
+
+        headers = {"ETag": cached.etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+        if _etag_matches(request.headers.get("if-none-match"), cached.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=cached.body, media_type="application/json", headers=headers)
+
+    def _adapter(self, response_type: Any) -> TypeAdapter:
+        adapter = self._adapters.get(response_type)
+        if adapter is None:
+            adapter = TypeAdapter(response_type)
+            self._adapters[response_type] = adapter
+        return adapter
+
+    def _get(self, key: Tuple[str, int, str]) -> Optional[_CachedBody]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            if time.monotonic() - cached.stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return cached
+
+    def _put(self, key: Tuple[str, int, str], version: int, cached: _CachedBody) -> None:
+        with self._lock:
+            # Si hubo una escritura mientras se consultaba, el resultado ya es viejo.
+            if self._versions.get(key[0], 0) != version:
+                return
+            self._entries[key] = cached
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def _request_key(request: Request) -> str:
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"{request.url.path}?{params}"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+catalog_cache = CatalogCache()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_catalog_writes(session: Session, flush_context) -> None:
+    if not catalog_cache._tracked_models:
+        return
+    pending = session.info.setdefault(PENDING_INVALIDATIONS_KEY, set())
+    for instance in chain(session.new, session.deleted):
+        pending.update(catalog_cache._catalogs_for(instance))
+    for instance in session.dirty:
+        catalogs = catalog_cache._catalogs_for(instance)
+        if catalogs and session.is_modified(instance):
+            pending.update(catalogs)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_catalogs(session: Session) -> None:
+    pending = session.info.pop(PENDING_INVALIDATIONS_KEY, None)
+    if pending:
+        catalog_cache.invalidate(*pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_catalog_writes(session: Session) -> None:
+    session.info.pop(PENDING_INVALIDATIONS_KEY, None)
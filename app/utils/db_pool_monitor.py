@@ -0,0 +1,222 @@
+import logging
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+DB_POOL_WAIT_SAMPLES = 1000
+DB_POOL_STACK_LIMIT = 30
+DB_POOL_MAX_LONG_HELD_REPORTED = 20
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class _Checkout:
+    started_at: float
+    thread: str
+    stack: Optional[List[traceback.FrameSummary]]
+    reported: bool = False
+
+
+class PoolMonitor:
+    """Instrumentación del pool de conexiones de SQLAlchemy.
+
+    Registra, mediante los eventos `checkout`/`checkin` del pool:
+
+    - conexiones prestadas en este momento y el pico alcanzado;
+    - tiempo de espera para obtener una conexión (solo con `InstrumentedQueuePool`)
+      y número de `pool_timeout` agotados;
+    - conexiones retenidas más de `long_held_seconds`, con el hilo y la pila
+      de llamadas del código que las pidió, para encontrar sesiones que no se
+      cierran (p. ej. un `next(get_db())` sin `close()`).
+
+    La pila se captura en cada checkout (unas decenas de microsegundos); se
+    puede desactivar con `capture_stacks=False`.
+    """
+
+    def __init__(self, long_held_seconds: float = 30.0, capture_stacks: bool = True):
+        self.long_held_seconds = long_held_seconds
+        self.capture_stacks = capture_stacks
+        self._lock = threading.Lock()
+        self._engine = None
+        self._active: Dict[int, _Checkout] = {}
+        self._wait_ms: Deque[float] = deque(maxlen=DB_POOL_WAIT_SAMPLES)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.long_held_total = 0
+        self.peak_checked_out = 0
+        self.max_wait_ms = 0.0
+        # Callback opcional (elapsed_ms, timed_out) por cada espera; lo usa
+        # app/utils/metrics.py para atribuir la espera a la petición en curso
+        self.on_wait: Optional[Callable[[float, bool], None]] = None
+
+    def attach(self, engine) -> None:
+        self._engine = engine
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.monitor = self
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    # ------------------------------------------------------------------
+    # Eventos
+    # ------------------------------------------------------------------
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        stack = traceback.extract_stack(limit=DB_POOL_STACK_LIMIT)[:-1] if self.capture_stacks else None
+        checkout = _Checkout(time.monotonic(), threading.current_thread().name, stack)
+        with self._lock:
+            self._active[id(connection_record)] = checkout
+            self.checkouts += 1
+            self.peak_checked_out = max(self.peak_checked_out, len(self._active))
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            checkout = self._active.pop(id(connection_record), None)
+        if checkout is None:
+            return
+        held = time.monotonic() - checkout.started_at
+        if held >= self.long_held_seconds:
+            with self._lock:
+                if not checkout.reported:
+                    self.long_held_total += 1
+            logger.warning(
+                f"Conexión a la base de datos retenida {held:.1f} s por {checkout.thread}:\n"
+                f"{_format_stack(checkout.stack)}"
+            )
+
+    def record_wait(self, elapsed_ms: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._wait_ms.append(elapsed_ms)
+            self.max_wait_ms = max(self.max_wait_ms, elapsed_ms)
+            if timed_out:
+                self.timeouts += 1
+        if self.on_wait is not None:
+            self.on_wait(elapsed_ms, timed_out)
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def long_held(self) -> List[Dict[str, Any]]:
+        """Conexiones prestadas hace más de `long_held_seconds`, de la más antigua a la más reciente."""
+        now = time.monotonic()
+        with self._lock:
+            held = [c for c in self._active.values() if now - c.started_at >= self.long_held_seconds]
+            for checkout in held:
+                if not checkout.reported:
+                    checkout.reported = True
+                    self.long_held_total += 1
+        held.sort(key=lambda c: c.started_at)
+        return [
+            {
+                "held_seconds": round(now - c.started_at, 1),
+                "thread": c.thread,
+                "stack": _format_stack(c.stack).splitlines(),
+            }
+            for c in held[:DB_POOL_MAX_LONG_HELD_REPORTED]
+        ]
+
+    def counters(self) -> Dict[str, Any]:
+        """Contadores y estado del pool, sin pilas de llamadas ni efectos.
+
+        Es la lectura de `/health` y de `/metrics`: no formatea pilas ni marca
+        como reportadas las conexiones retenidas (`long_held_total` solo lo
+        actualizan el checkin y `long_held()`).
+        """
+        pool = self._engine.pool if self._engine is not None else None
+        now = time.monotonic()
+        with self._lock:
+            stats = {
+                "checked_out": len(self._active),
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "long_held_total": self.long_held_total,
+                "long_held_now": sum(
+                    1 for c in self._active.values() if now - c.started_at >= self.long_held_seconds
+                ),
+                "wait_ms_max": round(self.max_wait_ms, 2),
+            }
+        if isinstance(pool, QueuePool):
+            stats.update(
+                {
+                    "pool_size": pool.size(),
+                    "max_overflow": pool._max_overflow,
+                    "overflow": max(pool.overflow(), 0),
+                    "idle": pool.checkedin(),
+                    "capacity": pool.size() + max(pool._max_overflow, 0),
+                }
+            )
+        return stats
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Detalle para el endpoint de administración: percentiles de espera y
+        las conexiones retenidas con su pila."""
+        stats = self.counters()
+        with self._lock:
+            waits = sorted(self._wait_ms)
+        stats["wait_ms"] = {
+            "samples": len(waits),
+            "avg": round(sum(waits) / len(waits), 2) if waits else 0.0,
+            "p95": round(waits[int(len(waits) * 0.95) - 1], 2) if len(waits) >= 20 else None,
+            "max": stats.pop("wait_ms_max"),
+        }
+        stats["long_held"] = self.long_held()
+        stats["long_held_total"] = self.long_held_total
+        return stats
+
+    def health(self) -> Dict[str, Any]:
+        """Resumen para `/health`: sin pilas de llamadas."""
+        stats = self.counters()
+        capacity = stats.get("capacity")
+        if stats["long_held_now"] or (capacity and stats["checked_out"] >= capacity):
+            status = "degraded"
+        else:
+            status = "ok"
+        return {
+            "status": status,
+            "checked_out": stats["checked_out"],
+            "overflow": stats.get("overflow"),
+            "capacity": capacity,
+            "timeouts": stats["timeouts"],
+            "long_held": stats["long_held_now"],
+            "wait_ms_max": stats["wait_ms_max"],
+        }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """`QueuePool` que mide cuánto espera cada petición por una conexión libre."""
+
+    monitor: Optional[PoolMonitor] = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            if self.monitor is not None:
+                self.monitor.record_wait((time.perf_counter() - start) * 1000, timed_out)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+def _format_stack(stack: Optional[List[traceback.FrameSummary]]) -> str:
+    if not stack:
+        return "  (pila no capturada)"
+    # Solo el código de la aplicación: las capas de SQLAlchemy/Starlette no aportan.
+    frames = [f for f in stack if f.filename.startswith(_APP_DIR)] or stack
+    return "".join(traceback.format_list(frames)).rstrip()
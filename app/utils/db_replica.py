@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Retraso de la réplica en segundos. Si ya aplicó todo el WAL recibido, el
+# retraso es 0 aunque la última transacción sea antigua (primario sin escrituras);
+# fuera de recuperación (un servidor normal, p. ej. en pruebas locales) también es 0.
+REPLICA_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaLagMonitor:
+    """Decide si las lecturas pueden ir a la réplica.
+
+    El retraso se consulta como mucho una vez cada `check_interval` segundos;
+    entre consultas se usa el último valor. Mientras un hilo consulta, los demás
+    no esperan: usan el valor anterior. Si la réplica no responde se considera
+    no disponible hasta la siguiente comprobación, y las lecturas van al primario.
+    """
+
+    def __init__(self, engine, max_lag_seconds: float = 30.0, check_interval: float = 10.0):
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._lag_seconds: Optional[float] = None
+        self._error: Optional[str] = None
+        self.routed_to_replica = 0
+        self.routed_to_primary = 0
+
+    def _check(self) -> None:
+        try:
+            with self.engine.connect() as connection:
+                lag = float(connection.execute(REPLICA_LAG_QUERY).scalar() or 0)
+            error = None
+        except Exception as e:
+            lag, error = None, str(e)
+        was_available = self._is_usable()
+        self._lag_seconds, self._error = lag, error
+        self._checked_at = time.monotonic()
+        if was_available and not self._is_usable():
+            if error:
+                logger.warning(f"Réplica de lectura no disponible, se usa el primario: {error}")
+            else:
+                logger.warning(
+                    f"Réplica de lectura atrasada {lag:.1f} s "
+                    f"(máximo {self.max_lag_seconds:.0f} s), se usa el primario"
+                )
+        elif not was_available and self._is_usable() and self.routed_to_replica + self.routed_to_primary:
+            logger.info("Réplica de lectura disponible de nuevo")
+
+    def _is_usable(self) -> bool:
+        return self._lag_seconds is not None and self._lag_seconds <= self.max_lag_seconds
+
+    def is_available(self) -> bool:
+        stale = self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval
+        if stale and self._lock.acquire(blocking=self._checked_at is None):
+            try:
+                if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_interval:
+                    self._check()
+            finally:
+                self._lock.release()
+        available = self._is_usable()
+        if available:
+            self.routed_to_replica += 1
+        else:
+            self.routed_to_primary += 1
+        return available
+
+    def status(self) -> Dict[str, Any]:
+        """Último estado conocido; no consulta la réplica."""
+        checked_ago = None if self._checked_at is None else round(time.monotonic() - self._checked_at, 1)
+        return {
+            "status": "ok" if self._is_usable() else ("unknown" if self._checked_at is None else "fallback"),
+            "lag_seconds": None if self._lag_seconds is None else round(self._lag_seconds, 2),
+            "max_lag_seconds": self.max_lag_seconds,
+            "checked_seconds_ago": checked_ago,
+            "error": self._error,
+            "routed_to_replica": self.routed_to_replica,
+            "routed_to_primary": self.routed_to_primary,
+        }
@@ -0,0 +1,364 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_SECONDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+POOL_WAIT_BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+INF_BUCKET = 'le="+Inf"'
+SLOW_STATEMENTS_KEPT = 100
+SLOW_STATEMENT_MAX_CHARS = 2000
+PARAMETER_SHAPE_MAX_KEYS = 20
+# Etiqueta de las consultas hechas fuera de una petición (schedulers, scripts)
+BACKGROUND_ROUTE = "background"
+UNMATCHED_ROUTE = "unmatched"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class Histogram:
+    """Histograma acumulativo con buckets fijos (formato Prometheus)."""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+@dataclass
+class RequestStats:
+    """Consultas de la petición en curso; compartido con los hilos del threadpool."""
+
+    scope: Dict[str, Any] = field(default_factory=dict)
+    statements: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+
+    @property
+    def route(self) -> str:
+        # El router deja la ruta en el scope al resolverla; antes (middlewares)
+        # o en un 404 la petición no tiene plantilla
+        return getattr(self.scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("metrics_request", default=None)
+
+
+def _value_shape(value: Any) -> str:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        inner = {type(v).__name__ for v in list(value)[:5]}
+        return f"{type(value).__name__}[{'|'.join(sorted(inner)) or '?'}] x{len(value)}"
+    return type(value).__name__
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """
+    Forma de los parámetros de una sentencia, sin sus valores: nombres y tipos
+    (y longitud de las listas). Permite distinguir un `IN` de 3 ids de uno de
+    3000 sin escribir datos personales en los logs.
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return f"{len(parameters)} x {parameter_shape(first)}"
+    if isinstance(parameters, dict):
+        items = list(parameters.items())
+        shown = ", ".join(f"{key}: {_value_shape(value)}" for key, value in items[:PARAMETER_SHAPE_MAX_KEYS])
+        more = f", +{len(items) - PARAMETER_SHAPE_MAX_KEYS}" if len(items) > PARAMETER_SHAPE_MAX_KEYS else ""
+        return "{" + shown + more + "}"
+    if isinstance(parameters, (list, tuple)):
+        shown = ", ".join(_value_shape(value) for value in parameters[:PARAMETER_SHAPE_MAX_KEYS])
+        more = f", +{len(parameters) - PARAMETER_SHAPE_MAX_KEYS}" if len(parameters) > PARAMETER_SHAPE_MAX_KEYS else ""
+        return "(" + shown + more + ")"
+    return "None" if parameters is None else _value_shape(parameters)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[Any, ...], extra: str = "") -> str:
+    parts = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class MetricsRegistry:
+    """Métricas de peticiones HTTP y de la base de datos.
+
+    - latencia por ruta (plantilla de la ruta, no la URL) y código de estado;
+    - sentencias SQL, tiempo en la base de datos y espera por conexión del
+      pool por petición, a partir de los eventos del engine de SQLAlchemy;
+    - sentencias lentas (más de `slow_query_ms`) con la forma de sus
+      parámetros, en memoria y, si se configura, en un archivo JSON lines.
+
+    `render_prometheus` las expone en el formato de texto de Prometheus.
+    """
+
+    def __init__(
+        self, slow_query_ms: float = 500.0, slow_query_log_file: Optional[str] = None, enabled: bool = True
+    ):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._statements_per_request: Dict[Tuple[str, str], Histogram] = {}
+        self._db_seconds: Dict[Tuple[str, str], float] = {}
+        self._request_pool_wait: Dict[Tuple[str, str], float] = {}
+        self._statements: Dict[Tuple[str, str], int] = {}
+        self._statement_seconds: Dict[Tuple[str, str], float] = {}
+        self._slow: Dict[Tuple[str, str], int] = {}
+        self._pool_wait: Dict[str, Histogram] = {}
+        self._pool_timeouts: Dict[str, int] = {}
+        self._recent_slow: Deque[Dict[str, Any]] = deque(maxlen=SLOW_STATEMENTS_KEPT)
+        self._pool_monitors: Dict[str, Any] = {}
+        self._slow_log = self._slow_query_logger(slow_query_log_file) if enabled and slow_query_log_file else None
+
+    @staticmethod
+    def _slow_query_logger(path: str) -> logging.Logger:
+        slow_logger = logging.getLogger("app.slow_queries")
+        slow_logger.setLevel(logging.INFO)
+        slow_logger.propagate = False
+        if not slow_logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            slow_logger.addHandler(handler)
+        return slow_logger
+
+    # ------------------------------------------------------------------
+    # Instrumentación
+    # ------------------------------------------------------------------
+    def instrument_engine(self, engine, name: str, pool_monitor=None) -> None:
+        """Cuenta y cronometra las sentencias de `engine`; con `pool_monitor`,
+        también la espera por conexión del pool."""
+        if not self.enabled:
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute(name))
+        event.listen(engine, "handle_error", self._handle_error)
+        if pool_monitor is not None:
+            self._pool_monitors[name] = pool_monitor
+            pool_monitor.on_wait = lambda elapsed_ms, timed_out: self.record_pool_wait(name, elapsed_ms, timed_out)
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, engine_name: str):
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+            started = conn.info.get("metrics_started")
+            if not started:
+                return
+            self.record_statement(
+                engine_name, time.perf_counter() - started.pop(), statement, parameters, executemany
+            )
+
+        return after_cursor_execute
+
+    @staticmethod
+    def _handle_error(exception_context) -> None:
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_started"):
+            conn.info["metrics_started"].pop()
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+    def record_statement(
+        self, engine_name: str, seconds: float, statement: str, parameters: Any, executemany: bool
+    ) -> None:
+        request = _current_request.get()
+        route = request.route if request is not None else BACKGROUND_ROUTE
+        if request is not None:
+            request.statements += 1
+            request.db_seconds += seconds
+        key = (engine_name, route)
+        with self._lock:
+            self._statements[key] = self._statements.get(key, 0) + 1
+            self._statement_seconds[key] = self._statement_seconds.get(key, 0.0) + seconds
+        if seconds * 1000 >= self.slow_query_ms:
+            self._record_slow(engine_name, route, seconds, statement, parameters, executemany)
+
+    def _record_slow(self, engine_name, route, seconds, statement, parameters, executemany) -> None:
+        entry = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "engine": engine_name,
+            "route": route,
+            "duration_ms": round(seconds * 1000, 1),
+            "statement": _WHITESPACE.sub(" ", statement).strip()[:SLOW_STATEMENT_MAX_CHARS],
+            "parameters": parameter_shape(parameters, executemany),
+        }
+        with self._lock:
+            key = (engine_name, route)
+            self._slow[key] = self._slow.get(key, 0) + 1
+            self._recent_slow.append(entry)
+        if self._slow_log is not None:
+            self._slow_log.info(json.dumps(entry, ensure_ascii=False))
+
+    def record_pool_wait(self, pool_name: str, elapsed_ms: float, timed_out: bool = False) -> None:
+        request = _current_request.get()
+        if request is not None:
+            request.pool_wait_seconds += elapsed_ms / 1000
+        with self._lock:
+            histogram = self._pool_wait.get(pool_name)
+            if histogram is None:
+                histogram = self._pool_wait[pool_name] = Histogram(POOL_WAIT_BUCKETS_SECONDS)
+            histogram.observe(elapsed_ms / 1000)
+            if timed_out:
+                self._pool_timeouts[pool_name] = self._pool_timeouts.get(pool_name, 0) + 1
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            status_key = (method, route, str(status))
+            self._requests[status_key] = self._requests.get(status_key, 0) + 1
+            latency = self._latency.get(key)
+            if latency is None:
+                latency = self._latency[key] = Histogram(LATENCY_BUCKETS_SECONDS)
+                self._statements_per_request[key] = Histogram(STATEMENT_BUCKETS)
+            latency.observe(seconds)
+            self._statements_per_request[key].observe(stats.statements)
+            self._db_seconds[key] = self._db_seconds.get(key, 0.0) + stats.db_seconds
+            self._request_pool_wait[key] = self._request_pool_wait.get(key, 0.0) + stats.pool_wait_seconds
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+    def slow_statements(self) -> List[Dict[str, Any]]:
+        """Sentencias lentas recientes, de la más reciente a la más antigua."""
+        with self._lock:
+            return list(reversed(self._recent_slow))
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def counter(name, help_text, label_names, values: Dict[tuple, float]) -> None:
+            header(name, "counter", help_text)
+            for label_values, value in sorted(values.items()):
+                lines.append(f"{name}{_labels(label_names, label_values)} {_format_number(value)}")
+
+        def histogram(name, help_text, label_names, values: Dict[tuple, Histogram]) -> None:
+            header(name, "histogram", help_text)
+            for label_values, hist in sorted(values.items()):
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    le = f'le="{_format_number(bound)}"'
+                    lines.append(f"{name}_bucket{_labels(label_names, label_values, le)} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(label_names, label_values, INF_BUCKET)} {hist.count}")
+                lines.append(f"{name}_sum{_labels(label_names, label_values)} {_format_number(hist.sum)}")
+                lines.append(f"{name}_count{_labels(label_names, label_values)} {hist.count}")
+
+        with self._lock:
+            counter("sst_http_requests_total", "Peticiones HTTP por ruta y código de estado.",
+                    ("method", "route", "status"), dict(self._requests))
+            histogram("sst_http_request_duration_seconds", "Latencia de las peticiones HTTP por ruta.",
+                      ("method", "route"), dict(self._latency))
+            histogram("sst_http_request_db_statements", "Sentencias SQL por petición HTTP.",
+                      ("method", "route"), dict(self._statements_per_request))
+            counter("sst_http_request_db_seconds_total", "Tiempo en la base de datos de las peticiones por ruta.",
+                    ("method", "route"), dict(self._db_seconds))
+            counter("sst_http_request_pool_wait_seconds_total",
+                    "Espera por una conexión del pool de las peticiones por ruta.",
+                    ("method", "route"), dict(self._request_pool_wait))
+            counter("sst_db_statements_total", "Sentencias SQL ejecutadas por engine y ruta.",
+                    ("engine", "route"), dict(self._statements))
+            counter("sst_db_statement_seconds_total", "Tiempo de ejecución de sentencias SQL por engine y ruta.",
+                    ("engine", "route"), dict(self._statement_seconds))
+            counter("sst_db_slow_statements_total", "Sentencias SQL más lentas que SLOW_QUERY_MS.",
+                    ("engine", "route"), dict(self._slow))
+            histogram("sst_db_pool_wait_seconds", "Espera para obtener una conexión del pool.",
+                      ("pool",), {(name,): hist for name, hist in self._pool_wait.items()})
+            counter("sst_db_pool_timeouts_total", "Esperas por conexión que agotaron pool_timeout.",
+                    ("pool",), {(name,): value for name, value in self._pool_timeouts.items()})
+            pool_monitors = dict(self._pool_monitors)
+
+        gauges = {"checked_out": "Conexiones prestadas.", "capacity": "pool_size + max_overflow.",
+                  "overflow": "Conexiones de overflow abiertas.", "idle": "Conexiones libres en el pool."}
+        snapshots = {name: monitor.counters() for name, monitor in sorted(pool_monitors.items())}
+        for gauge, help_text in gauges.items():
+            header(f"sst_db_pool_{gauge}", "gauge", help_text)
+            for name, snapshot in snapshots.items():
+                if snapshot.get(gauge) is not None:
+                    lines.append(f'sst_db_pool_{gauge}{{pool="{_escape_label(name)}"}} {snapshot[gauge]}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Mide cada petición HTTP y le asocia las sentencias SQL que ejecuta.
+
+    Middleware ASGI puro: la petición se etiqueta con la plantilla de su ruta
+    (`/api/v1/workers/{worker_id}`), que el router deja en `scope["route"]`,
+    para no crear una serie por cada id. La latencia incluye el envío del
+    cuerpo completo (también en respuestas en streaming).
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_request.reset(token)
+            self.registry.observe_request(
+                scope["method"], stats.route, status_code, time.perf_counter() - started, stats
+            )
+
+
+# Registro del proceso; app/database.py instrumenta sus engines con él
+metrics = MetricsRegistry(
+    slow_query_ms=settings.slow_query_ms,
+    slow_query_log_file=settings.slow_query_log_file,
+    enabled=settings.metrics_enabled,
+)
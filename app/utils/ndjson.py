@@ -0,0 +1,64 @@
+from decimal import Decimal
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import orjson
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Query, Session
+
+from app.database import read_session_scope
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Las líneas se agrupan en fragmentos de este tamaño antes de enviarlas
+NDJSON_CHUNK_BYTES = 64 * 1024
+# Filas que se traen de la base de datos por lote (cursor del lado del servidor)
+NDJSON_YIELD_PER = 500
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def ndjson_lines(rows: Iterable[Any]) -> Iterator[bytes]:
+    """Una línea JSON por fila, en fragmentos de ~`NDJSON_CHUNK_BYTES`."""
+    buffer = bytearray()
+    for row in rows:
+        buffer += orjson.dumps(row, default=_default, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+        if len(buffer) >= NDJSON_CHUNK_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def stream_query_rows(build_query: Callable[[Session], Query], serialize: Callable[[Any], Any]) -> Iterator[Any]:
+    """
+    Ejecuta la consulta en una sesión de lectura propia, que vive mientras dura
+    el streaming (la de `Depends(get_db)` se cierra antes de enviar el cuerpo),
+    y recorre los resultados por lotes sin cargarlos todos en memoria.
+    """
+    with read_session_scope() as db:
+        for row in build_query(db).yield_per(NDJSON_YIELD_PER):
+            yield serialize(row)
+
+
+def ndjson_response(
+    build_query: Callable[[Session], Query],
+    serialize: Callable[[Any], Any],
+    filename: Optional[str] = None,
+) -> StreamingResponse:
+    """
+    Respuesta NDJSON para listados completos sin paginar. Los permisos y los
+    parámetros deben validarse antes de llamarla: una vez enviadas las
+    cabeceras ya no se puede responder con un error HTTP.
+    """
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+    return StreamingResponse(
+        ndjson_lines(stream_query_rows(build_query, serialize)),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers=headers,
+    )
@@ -0,0 +1,245 @@
+"""
+Paginación de listados: OFFSET/LIMIT compatible con los parámetros de siempre,
+cursores (keyset) para recorrer tablas grandes sin OFFSET, y tres estrategias
+de conteo (`exact`, `estimated`, `none`).
+
+Uso típico en un endpoint:
+
+    page = paginate(
+        query,
+        sort=[SortKey(AuditLog.created_at, descending=True), SortKey(AuditLog.id, descending=True)],
+        page=page_number, size=limit, cursor=cursor, count=count,
+    )
+    return PaginatedResponse(items=[...page.items...], **page.meta())
+
+Las columnas de orden no deben admitir NULL y la última debe ser única (el id),
+para que el orden sea total y el cursor no salte ni repita filas.
+"""
+
+import base64
+import enum
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_, tuple_
+from sqlalchemy.orm import Query
+
+from app.config import settings
+
+# Descripciones de los parámetros de consulta, comunes a todos los listados
+CURSOR_DESCRIPTION = "Cursor de la página siguiente (`next_cursor`); si se envía, se ignora la página"
+COUNT_DESCRIPTION = "Conteo del total: exact, estimated (planificador) o none (solo has_next)"
+
+# Con una estimación menor que esto el conteo exacto es barato y se prefiere.
+ESTIMATED_COUNT_EXACT_BELOW = 10_000
+
+
+class CountMode(str, enum.Enum):
+    EXACT = "exact"          # SELECT count(*): exacto, cuesta lo mismo que recorrer el filtro
+    ESTIMATED = "estimated"  # filas estimadas por el planificador (EXPLAIN)
+    NONE = "none"            # sin total; solo has_next
+
+
+@dataclass(frozen=True)
+class SortKey:
+    column: Any
+    descending: bool = False
+
+    @property
+    def name(self) -> str:
+        return getattr(self.column, "key", None) or str(self.column)
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    page: int
+    size: int
+    total: Optional[int]
+    has_next: bool
+    has_prev: bool
+    next_cursor: Optional[str]
+
+    @property
+    def pages(self) -> Optional[int]:
+        if self.total is None:
+            return None
+        return (self.total + self.size - 1) // self.size if self.size else 1
+
+    def meta(self) -> Dict[str, Any]:
+        """Campos de `PaginatedResponse` salvo `items`."""
+        return {
+            "total": self.total,
+            "page": self.page,
+            "size": self.size,
+            "pages": self.pages,
+            "has_next": self.has_next,
+            "has_prev": self.has_prev,
+            "next_cursor": self.next_cursor,
+        }
+
+
+# ----------------------------------------------------------------------
+# Cursores
+# ----------------------------------------------------------------------
+def _sort_signature(sort: Sequence[SortKey]) -> str:
+    spec = ",".join(f"{key.name}:{'d' if key.descending else 'a'}" for key in sort)
+    return hashlib.sha1(spec.encode()).hexdigest()[:8]
+
+
+def _encode_value(value: Any) -> List[Any]:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, Decimal):
+        return ["dec", str(value)]
+    if isinstance(value, enum.Enum):
+        return ["v", value.value]
+    return ["v", value]
+
+
+def _decode_value(tagged: List[Any]) -> Any:
+    tag, value = tagged
+    if tag == "dt":
+        return datetime.fromisoformat(value)
+    if tag == "d":
+        return date.fromisoformat(value)
+    if tag == "dec":
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort: Sequence[SortKey], values: Sequence[Any]) -> str:
+    payload = {"k": _sort_signature(sort), "v": [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(sort: Sequence[SortKey], cursor: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = [_decode_value(v) for v in payload["v"]]
+        valid = payload["k"] == _sort_signature(sort) and len(values) == len(sort)
+    except (ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido o de otro listado",
+        )
+    return values
+
+
+def keyset_condition(sort: Sequence[SortKey], values: Sequence[Any]):
+    """Filas posteriores a `values` en el orden `sort`."""
+    columns = [key.column for key in sort]
+    if all(key.descending == sort[0].descending for key in sort):
+        # Comparación de tuplas: PostgreSQL la resuelve con un índice compuesto
+        if sort[0].descending:
+            return tuple_(*columns) < tuple_(*values)
+        return tuple_(*columns) > tuple_(*values)
+    clauses = []
+    for i, key in enumerate(sort):
+        equal = [columns[j] == values[j] for j in range(i)]
+        after = columns[i] < values[i] if key.descending else columns[i] > values[i]
+        clauses.append(and_(*equal, after))
+    return or_(*clauses)
+
+
+# ----------------------------------------------------------------------
+# Conteo
+# ----------------------------------------------------------------------
+def estimate_count(query: Query) -> Optional[int]:
+    """Filas que el planificador de PostgreSQL estima para la consulta, o None."""
+    session = query.session
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    # Sin joins de carga: las colecciones con joinedload inflarían la estimación
+    compiled = query.enable_eagerloads(False).order_by(None).statement.compile(
+        dialect=bind.dialect, compile_kwargs={"render_postcompile": True}
+    )
+    plan = session.connection().exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_rows(query: Query, mode: CountMode, count_query: Optional[Query] = None) -> Optional[int]:
+    if mode == CountMode.NONE:
+        return None
+    if mode == CountMode.ESTIMATED:
+        estimate = estimate_count(query)
+        if estimate is not None and estimate >= ESTIMATED_COUNT_EXACT_BELOW:
+            return estimate
+    if count_query is not None:
+        return count_query.scalar() or 0
+    return query.order_by(None).count()
+
+
+# ----------------------------------------------------------------------
+# Paginación
+# ----------------------------------------------------------------------
+def paginate(
+    query: Query,
+    *,
+    sort: Sequence[SortKey],
+    size: int,
+    page: int = 1,
+    offset: Optional[int] = None,
+    cursor: Optional[str] = None,
+    count: Optional[CountMode] = None,
+    count_query: Optional[Query] = None,
+    cursor_values: Optional[Callable[[Any], Sequence[Any]]] = None,
+) -> Page:
+    """
+    Pagina `query` ordenada por `sort`.
+
+    Con `cursor` (el `next_cursor` de la respuesta anterior) se usa keyset y se
+    ignoran `page`/`offset`; sin él, OFFSET como hasta ahora. Se lee una fila de
+    más para saber si hay página siguiente sin necesidad de contar.
+
+    `count` por defecto es PAGINATION_COUNT_MODE. `count_query` reemplaza al
+    conteo por defecto en modo exacto (p. ej. un count sin los joins de carga).
+    `cursor_values` extrae los valores de orden de una fila cuando no es una
+    entidad (consultas de varias columnas).
+    """
+    total = count_rows(query, count or CountMode(settings.pagination_count_mode), count_query)
+    if offset is None:
+        offset = max(page - 1, 0) * size
+    else:
+        page = offset // size + 1 if size else 1
+
+    ordered = query.order_by(*[key.column.desc() if key.descending else key.column.asc() for key in sort])
+    if cursor:
+        ordered = ordered.filter(keyset_condition(sort, decode_cursor(sort, cursor)))
+        rows = ordered.limit(size + 1).all()
+    else:
+        rows = ordered.offset(offset).limit(size + 1).all()
+
+    has_next = len(rows) > size
+    items = rows[:size]
+    next_cursor = None
+    if has_next and items:
+        last = items[-1]
+        values = cursor_values(last) if cursor_values else [getattr(last, key.name) for key in sort]
+        next_cursor = encode_cursor(sort, values)
+
+    return Page(
+        items=items,
+        page=page,
+        size=size,
+        total=total,
+        has_next=has_next,
+        has_prev=bool(cursor) or offset > 0,
+        next_cursor=next_cursor,
+    )
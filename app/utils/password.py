@@ -1,21 +1,45 @@
 """
 Password utilities using bcrypt directly.
 This replaces the passlib dependency for better compatibility.
+
+A bcrypt check at 12 rounds takes ~250 ms of CPU. Async handlers must use
+the `*_async` methods, which run bcrypt in a small dedicated thread pool
+(bcrypt releases the GIL) so a burst of logins does not stall the event
+loop, and reject work with `PasswordHashBusy` once too many hashes are
+queued instead of letting the queue grow without bound.
 """
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
 import bcrypt
 
+from app.config import settings
+
+
+class PasswordHashBusy(Exception):
+    """Raised when the password hashing pool already has too many queued jobs."""
+
 
 class PasswordManager:
     """Password manager using bcrypt directly for hashing and verification."""
     
-    def __init__(self, rounds: int = 12):
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 64):
         """
         Initialize password manager.
         
         Args:
             rounds: Number of rounds for bcrypt hashing (default: 12)
+            workers: Threads that run bcrypt for the async methods
+            max_pending: Async hashes allowed to run or wait at once
         """
         self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
     
     def hash_password(self, password: str) -> str:
         """
@@ -58,7 +82,52 @@ class PasswordManager:
         except (ValueError, TypeError):
             # Handle any encoding or bcrypt errors
             return False
+    
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Check whether a hash was made with a cost other than `rounds`.
+        
+        Args:
+            hashed_password: Stored bcrypt hash ("$2b$12$...")
+            
+        Returns:
+            True if it should be replaced with a hash at the configured cost
+        """
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+    
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PasswordHashBusy()
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+    
+    async def hash_password_async(self, password: str) -> str:
+        """`hash_password` off the event loop; raises `PasswordHashBusy` if the pool is saturated."""
+        return await self._run(self.hash_password, password)
+    
+    async def verify_password_async(self, password: str, hashed_password: str) -> bool:
+        """`verify_password` off the event loop; raises `PasswordHashBusy` if the pool is saturated."""
+        return await self._run(self.verify_password, password, hashed_password)
+    
+    @property
+    def pending(self) -> int:
+        """Async hashes currently running or waiting for a thread."""
+        return self._pending
 
 
-# Global instance with default settings
-password_manager = PasswordManager()
\ No newline at end of file
+# Global instance with the configured cost and pool size
+password_manager = PasswordManager(
+    rounds=settings.bcrypt_rounds,
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Límite de intentos en memoria con token buckets.
+
+Cada clave (una cuenta, una IP) tiene un balde de `capacity` fichas que se
+recarga a `refill_per_second`; cada intento gasta una. Sin fichas, el
+intento se rechaza antes de consultar la base de datos o de calcular un hash.
+
+Los baldes viven en el proceso: con varios workers, el límite efectivo se
+multiplica por el número de procesos. Se guardan como mucho `max_keys`
+claves y se descartan las usadas hace más tiempo (descartar un balde
+equivale a dejarlo lleno).
+"""
+
+import ipaddress
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, Optional, Sequence, Tuple, Union
+
+IPNetwork = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+
+class TokenBucketLimiter:
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        # clave -> (fichas, última actualización), de la menos a la más reciente
+        self._buckets: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, key: Hashable) -> float:
+        """Gasta una ficha de `key`. Devuelve 0 si el intento se permite o,
+        si no, los segundos que faltan para la siguiente ficha."""
+        now = self._clock()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_per_second)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.refill_per_second if self.refill_per_second > 0 else float("inf")
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def reset(self, key: Hashable) -> None:
+        """Deja lleno el balde de `key` (p. ej. tras un login correcto)."""
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"keys": len(self._buckets), "allowed": self.allowed, "rejected": self.rejected}
+
+
+# ----------------------------------------------------------------------
+# IP del cliente detrás de proxies
+# ----------------------------------------------------------------------
+def parse_networks(entries: Iterable[str]) -> Tuple[IPNetwork, ...]:
+    """Redes de `entries` ("10.0.0.5", "172.20.0.0/16"); un valor inválido es un error."""
+    return tuple(ipaddress.ip_network(entry.strip(), strict=False) for entry in entries if entry.strip())
+
+
+def _is_trusted(address: str, trusted: Sequence[IPNetwork]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def client_ip(peer: Optional[str], forwarded_for: Optional[str], trusted: Sequence[IPNetwork]) -> Optional[str]:
+    """
+    IP del cliente para `peer` (la dirección de la conexión). Solo si `peer`
+    es un proxy de confianza se lee X-Forwarded-For, de derecha a izquierda:
+    la primera dirección que no es de un proxy de confianza es la del
+    cliente. Las entradas más a la izquierda las escribe el propio cliente y
+    no se usan, para que no pueda elegir su balde.
+    """
+    if not peer or not forwarded_for or not _is_trusted(peer, trusted):
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, trusted):
+            return hop
+    return hops[0] if hops else peer
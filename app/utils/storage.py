@@ -1,7 +1,7 @@
 import os
 import re
 import shutil
-from typing import Optional, BinaryIO
+from typing import Dict, Iterable, Optional, BinaryIO
 from fastapi import UploadFile
 from app.config import settings
 from app.services.s3_storage import contabo_service
@@ -327,5 +327,37 @@ class StorageManager:
             logger.error(f"Error al obtener URL firmada: {str(e)}")
             return None
 
+    def get_presigned_urls(self, file_paths: Iterable[str], expiration: int = 3600) -> Dict[str, Optional[str]]:
+        """
+        Versión por lotes de `get_presigned_url` para listados: las rutas de
+        Contabo se firman con una sola ronda de verificaciones en paralelo.
+
+        Returns:
+            Diccionario ruta -> URL firmada (o ruta local, o None si hay error)
+        """
+        urls: Dict[str, Optional[str]] = {}
+        contabo_paths: Dict[str, str] = {}
+        for file_path in dict.fromkeys(p for p in file_paths if p):
+            try:
+                resolved_type, resolved_path = self._resolve_storage_target(file_path, None)
+            except Exception as e:
+                logger.error(f"Error al obtener URL firmada: {str(e)}")
+                urls[file_path] = None
+                continue
+            if resolved_type == "contabo":
+                contabo_paths[file_path] = resolved_path
+            else:
+                urls[file_path] = resolved_path
+
+        if contabo_paths:
+            if not contabo_service:
+                logger.error("Contabo service no está disponible")
+                urls.update(dict.fromkeys(contabo_paths))
+            else:
+                signed = contabo_service.get_presigned_urls(contabo_paths.values(), expiration)
+                for file_path, key in contabo_paths.items():
+                    urls[file_path] = signed.get(key)
+        return urls
+
 # Instancia global del gestor de almacenamiento
 storage_manager = StorageManager()
@@ -5,13 +5,29 @@ Script Unificado de Backup para SST Platform
 Este script permite crear respaldos de la base de datos PostgreSQL
 con diferentes opciones de configuración para desarrollo y producción.
 
+Formatos (--format o BACKUP_FORMAT):
+    plain      SQL plano; la salida de pg_dump se comprime con gzip mientras
+               se escribe (sin archivo intermedio sin comprimir)
+    custom     formato custom de pg_dump (comprimido); se restaura con
+               pg_restore, que admite --jobs
+    directory  un archivo comprimido por tabla, volcado en paralelo con
+               --jobs; se restaura también en paralelo
+
+Cada respaldo deja al lado un manifiesto (<respaldo>.manifest.json) con el
+tamaño y el SHA-256 de cada archivo, calculados al escribirlo. `verify`
+compara tamaños y cabeceras contra el manifiesto sin descomprimir nada;
+`verify --deep` recalcula los SHA-256 (en paralelo).
+
 Uso:
     python backup.py create --env local
     python backup.py create --env production
     python backup.py create --table usuarios
+    python backup.py create --format directory --jobs 4
     python backup.py list
     python backup.py cleanup
     python backup.py verify
+    python backup.py verify --deep
+    python backup.py restore backups/full/2026-01-01/sst_full_20260101_020000.dir --target-db sst_restore
 """
 
 import os
@@ -20,9 +36,14 @@ import argparse
 import subprocess
 import datetime
 import gzip
+import hashlib
+import json
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
 try:
     from dotenv import load_dotenv
@@ -30,11 +51,175 @@ except ImportError:
     print("Error: python-dotenv no está instalado. Instálalo con: pip install python-dotenv")
     sys.exit(1)
 
+
+BACKUP_FORMATS = ('plain', 'custom', 'directory')
+FORMAT_EXTENSIONS = {'plain': '.sql', 'custom': '.dump', 'directory': '.dir'}
+MANIFEST_SUFFIX = '.manifest.json'
+CHUNK_SIZE = 1024 * 1024
+# Cabeceras esperadas al inicio de cada archivo
+GZIP_MAGIC = b'\x1f\x8b'
+PGDMP_MAGIC = b'PGDMP'
+# Tiempo máximo de pg_dump (30 minutos), también mientras se transmite su salida
+BACKUP_TIMEOUT_SECONDS = 1800
+
+
+class HashingWriter:
+    """Archivo de salida que calcula SHA-256 y tamaño de lo que se escribe."""
+
+    def __init__(self, f_out):
+        self.f_out = f_out
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.f_out.write(data)
+
+    def flush(self):
+        self.f_out.flush()
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path(backup_path: Path) -> Path:
+    return backup_path.with_name(backup_path.name + MANIFEST_SUFFIX)
+
+
+def read_manifest(backup_path: Path) -> Optional[dict]:
+    path = manifest_path(backup_path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(backup_path: Path, files: Dict[str, dict], **info) -> Path:
+    """Escribe el manifiesto (archivo temporal + rename: nunca queda a medias)."""
+    path = manifest_path(backup_path)
+    tmp_path = path.with_name(path.name + '.tmp')
+    manifest = {
+        'backup': backup_path.name,
+        'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        **info,
+        'files': files,
+    }
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def stream_to_file(stream, target: Path, compress_level: Optional[int] = None) -> dict:
+    """
+    Copia `stream` (la salida de pg_dump) a `target`, comprimiendo con gzip si
+    se indica un nivel. Devuelve tamaño y SHA-256 de lo escrito en disco.
+    """
+    raw_size = 0
+    with open(target, 'wb') as f_raw:
+        writer = HashingWriter(f_raw)
+        if compress_level is not None:
+            f_out = gzip.GzipFile(filename='', mode='wb', fileobj=writer, compresslevel=compress_level, mtime=0)
+        else:
+            f_out = writer
+        try:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                raw_size += len(chunk)
+                f_out.write(chunk)
+        finally:
+            if f_out is not writer:
+                f_out.close()
+    return {'size': writer.size, 'sha256': writer.sha256.hexdigest(), 'raw_size': raw_size}
+
+
+def backup_files(backup_path: Path) -> List[Path]:
+    """Archivos de un respaldo: el propio archivo o los de su directorio."""
+    if backup_path.is_dir():
+        return sorted(p for p in backup_path.rglob('*') if p.is_file())
+    return [backup_path]
+
+
+def checksum_files(backup_path: Path, jobs: int = 1) -> Dict[str, dict]:
+    """Tamaño y SHA-256 por archivo (relativos al respaldo), en paralelo."""
+    files = backup_files(backup_path)
+    base = backup_path if backup_path.is_dir() else backup_path.parent
+
+    def entry(path: Path) -> Tuple[str, dict]:
+        return str(path.relative_to(base)), {'size': path.stat().st_size, 'sha256': sha256_file(path)}
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        return dict(pool.map(entry, files))
+
+
+def verify_manifest(backup_path: Path, manifest: dict, deep: bool = False, jobs: int = 1) -> Tuple[bool, str]:
+    """
+    Rápida: cada archivo existe con el tamaño registrado y su cabecera es la
+    esperada (gzip o PGDMP); no depende del tamaño del respaldo más allá del
+    número de archivos. Profunda: además recalcula los SHA-256.
+    """
+    base = backup_path if backup_path.is_dir() else backup_path.parent
+    expected = manifest.get('files') or {}
+    if not expected:
+        return False, 'manifiesto sin archivos'
+
+    for rel_path, info in expected.items():
+        path = base / rel_path
+        if not path.is_file():
+            return False, f'falta {rel_path}'
+        if path.stat().st_size != info['size']:
+            return False, f'tamaño distinto en {rel_path}'
+
+    header_file, magic = None, None
+    if manifest.get('format') == 'plain' and manifest.get('compressed'):
+        header_file, magic = backup_path, GZIP_MAGIC
+    elif manifest.get('format') == 'custom':
+        header_file, magic = backup_path, PGDMP_MAGIC
+    elif manifest.get('format') == 'directory':
+        header_file, magic = backup_path / 'toc.dat', PGDMP_MAGIC
+    if header_file is not None:
+        with open(header_file, 'rb') as f:
+            if f.read(len(magic)) != magic:
+                return False, f'cabecera inválida en {header_file.name}'
+
+    if deep:
+        actual = checksum_files(backup_path, jobs)
+        for rel_path, info in expected.items():
+            if actual.get(rel_path, {}).get('sha256') != info['sha256']:
+                return False, f'SHA-256 distinto en {rel_path}'
+    return True, 'ok'
+
+
+def remove_backup(backup_path: Path) -> None:
+    """Elimina un respaldo (archivo o directorio) junto con su manifiesto."""
+    if backup_path.is_dir():
+        shutil.rmtree(backup_path)
+    else:
+        backup_path.unlink()
+    manifest = manifest_path(backup_path)
+    if manifest.exists():
+        manifest.unlink()
+
+
+def is_backup_entry(path: Path) -> bool:
+    return not path.name.endswith(('.log', MANIFEST_SUFFIX, MANIFEST_SUFFIX + '.tmp'))
+
+
+def backup_size(backup_path: Path) -> int:
+    return sum(p.stat().st_size for p in backup_files(backup_path))
+
+
 class BackupManager:
     def __init__(self, env: str = "local"):
         """Inicializar el sistema de respaldos"""
         self.env = env
         self.env_file = '.env' if env == 'local' else '.env.production'
+        self.last_backup: Optional[Path] = None
         self.load_environment()
         self.setup_directories()
         
@@ -68,17 +253,39 @@ class BackupManager:
         self.backup_compress = os.getenv('BACKUP_COMPRESS', 'true').lower() == 'true'
         self.backup_retention_days = int(os.getenv('BACKUP_RETENTION_DAYS', '30'))
         self.backup_keep_count = int(os.getenv('BACKUP_KEEP_COUNT', '7'))
+        self.backup_format = os.getenv('BACKUP_FORMAT', 'plain').lower()
+        self.backup_jobs = int(os.getenv('BACKUP_JOBS', '4'))
+        self.backup_compress_level = int(os.getenv('BACKUP_COMPRESS_LEVEL', '6'))
         
         # Ruta de pg_dump según el entorno
         if self.env == "production" and os.name == 'nt':  # Windows
             self.pg_dump_path = r'C:\Program Files\PostgreSQL\17\bin\pg_dump.exe'
         else:
             self.pg_dump_path = 'pg_dump'
+        # pg_restore y psql junto a pg_dump
+        self.pg_restore_path = self._sibling_tool('pg_restore')
+        self.psql_path = self._sibling_tool('psql')
         
         if not all([self.db_host, self.db_name, self.db_user]):
             print("[ERROR] Faltan variables de entorno requeridas para la base de datos")
             sys.exit(1)
             
+    def _sibling_tool(self, name: str) -> str:
+        pg_dump = Path(self.pg_dump_path)
+        if pg_dump.parent == Path('.'):
+            return name
+        return str(pg_dump.with_name(name + pg_dump.suffix))
+
+    def pg_env(self) -> dict:
+        """Variables de entorno para pg_dump / pg_restore / psql"""
+        env = os.environ.copy()
+        if self.db_password:
+            env['PGPASSWORD'] = self.db_password
+        if self.env == "production":
+            env['PGOPTIONS'] = '--client-min-messages=warning'
+            env['PGCLIENTENCODING'] = 'UTF8'
+        return env
+
     def setup_directories(self):
         """Crear directorios de respaldo si no existen"""
         self.backup_path = Path(self.backup_dir)
@@ -100,13 +307,20 @@ class BackupManager:
     def create_backup(self, table: Optional[str] = None) -> bool:
         """Crear respaldo de la base de datos"""
         timestamp = self.get_timestamp()
+        fmt = self.backup_format
+        if fmt not in BACKUP_FORMATS:
+            print(f"[ERROR] Formato de backup no soportado: {fmt} (opciones: {', '.join(BACKUP_FORMATS)})")
+            return False
+        extension = FORMAT_EXTENSIONS[fmt]
+        if fmt == 'plain' and self.backup_compress:
+            extension += '.gz'
         
         if self.env == "production":
             # Para producción, usar formato simple
             if table:
-                filename = f"sst_{self.env}_table_{table}_{timestamp}.sql"
+                filename = f"sst_{self.env}_table_{table}_{timestamp}{extension}"
             else:
-                filename = f"sst_{self.env}_backup_{timestamp}.sql"
+                filename = f"sst_{self.env}_backup_{timestamp}{extension}"
             backup_file = self.backup_path / filename
         else:
             # Para desarrollo, usar estructura de directorios por fecha
@@ -115,9 +329,9 @@ class BackupManager:
             backup_date_path.mkdir(exist_ok=True)
             
             if table:
-                filename = f"{self.db_name}_table_{table}_{timestamp}.sql"
+                filename = f"{self.db_name}_table_{table}_{timestamp}{extension}"
             else:
-                filename = f"{self.db_name}_full_{timestamp}.sql"
+                filename = f"{self.db_name}_full_{timestamp}{extension}"
             backup_file = backup_date_path / filename
         
         log_file = self.logs_path / f"{filename}.log"
@@ -126,6 +340,7 @@ class BackupManager:
         print(f"[INFO] Base de datos: {self.db_name}")
         print(f"[INFO] Servidor: {self.db_host}:{self.db_port}")
         print(f"[INFO] Usuario: {self.db_user}")
+        print(f"[INFO] Formato: {fmt}" + (f" ({self.backup_jobs} jobs)" if fmt == 'directory' else ""))
         print(f"[INFO] Archivo: {backup_file}")
         
         # Construir comando pg_dump
@@ -135,7 +350,8 @@ class BackupManager:
             '--port', str(self.db_port),
             '--username', self.db_user,
             '--dbname', self.db_name,
-            '--verbose'
+            '--verbose',
+            f'--format={fmt}',
         ]
         
         if table:
@@ -144,80 +360,204 @@ class BackupManager:
         if self.env == "production":
             # Opciones específicas para producción
             cmd.extend([
-                '--format=plain',
                 '--no-owner',
                 '--no-privileges'
             ])
         
-        # Configurar variables de entorno para pg_dump
-        env = os.environ.copy()
-        if self.db_password:
-            env['PGPASSWORD'] = self.db_password
-        if self.env == "production":
-            env['PGOPTIONS'] = '--client-min-messages=warning'
-            env['PGCLIENTENCODING'] = 'UTF8'
+        if fmt != 'plain':
+            # pg_dump comprime cada archivo al escribirlo
+            cmd.append(f'--compress={self.backup_compress_level if self.backup_compress else 0}')
+        if fmt == 'directory':
+            cmd.extend(['--jobs', str(self.backup_jobs), '--file', str(backup_file)])
+        
+        env = self.pg_env()
         
+        started = time.perf_counter()
         try:
             print("\n[INFO] Ejecutando pg_dump...")
             
-            # Ejecutar pg_dump
-            with open(backup_file, 'w') as f_out, open(log_file, 'w') as f_log:
-                process = subprocess.run(
-                    cmd,
-                    stdout=f_out,
-                    stderr=f_log,
-                    env=env,
-                    check=True,
-                    timeout=1800  # Timeout de 30 minutos
-                )
+            with open(log_file, 'w') as f_log:
+                if fmt == 'directory':
+                    subprocess.run(
+                        cmd,
+                        stderr=f_log,
+                        env=env,
+                        check=True,
+                        timeout=BACKUP_TIMEOUT_SECONDS
+                    )
+                    # pg_dump escribe los archivos: se registran en cuanto termina,
+                    # en paralelo y mientras siguen en la caché de páginas
+                    files = checksum_files(backup_file, self.backup_jobs)
+                    raw_size = None
+                else:
+                    # La salida se comprime (plain) y se firma mientras se escribe
+                    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=f_log, env=env)
+                    # La lectura bloquea mientras pg_dump no escribe: el vigilante
+                    # lo termina al vencer el plazo y la lectura ve el fin del flujo
+                    expired = threading.Event()
+                    watchdog = threading.Timer(BACKUP_TIMEOUT_SECONDS, lambda: (expired.set(), process.kill()))
+                    watchdog.daemon = True
+                    watchdog.start()
+                    try:
+                        written = stream_to_file(
+                            process.stdout,
+                            backup_file,
+                            self.backup_compress_level if fmt == 'plain' and self.backup_compress else None,
+                        )
+                        process.stdout.close()
+                        process.wait()
+                    except BaseException:
+                        process.kill()
+                        process.wait()
+                        raise
+                    finally:
+                        watchdog.cancel()
+                    if expired.is_set():
+                        raise subprocess.TimeoutExpired(cmd, BACKUP_TIMEOUT_SECONDS)
+                    if process.returncode != 0:
+                        raise subprocess.CalledProcessError(process.returncode, cmd)
+                    files = {backup_file.name: {'size': written['size'], 'sha256': written['sha256']}}
+                    raw_size = written['raw_size']
             
             # Verificar que el archivo se creó correctamente
-            if not backup_file.exists() or backup_file.stat().st_size == 0:
+            total_size = sum(info['size'] for info in files.values())
+            if not backup_file.exists() or total_size == 0:
                 print("[ERROR] El archivo de backup no se creó o está vacío")
                 return False
             
-            file_size = backup_file.stat().st_size
-            print(f"[SUCCESS] Respaldo completado: {backup_file}")
-            print(f"[INFO] Tamaño: {file_size / 1024 / 1024:.2f} MB")
+            elapsed = time.perf_counter() - started
+            write_manifest(
+                backup_file,
+                files,
+                format=fmt,
+                compressed=self.backup_compress,
+                jobs=self.backup_jobs if fmt == 'directory' else 1,
+                database=self.db_name,
+                table=table,
+                raw_size=raw_size,
+                elapsed_seconds=round(elapsed, 2),
+            )
             
-            # Comprimir si está habilitado
-            if self.backup_compress:
-                compressed_file = self.compress_file(backup_file)
-                if compressed_file:
-                    backup_file.unlink()  # Eliminar archivo original
-                    compressed_size = compressed_file.stat().st_size
-                    compression_ratio = (1 - compressed_size / file_size) * 100
-                    print(f"[INFO] Archivo comprimido: {compressed_file}")
-                    print(f"[INFO] Tamaño comprimido: {compressed_size / 1024 / 1024:.2f} MB")
-                    print(f"[INFO] Compresión: {compression_ratio:.1f}%")
+            print(f"[SUCCESS] Respaldo completado: {backup_file}")
+            print(f"[INFO] Tamaño: {total_size / 1024 / 1024:.2f} MB ({len(files)} archivo(s), {elapsed:.1f} s)")
+            if raw_size:
+                print(f"[INFO] Tamaño sin comprimir: {raw_size / 1024 / 1024:.2f} MB")
+                print(f"[INFO] Compresión: {(1 - total_size / raw_size) * 100:.1f}%")
+            print(f"[INFO] Manifiesto: {manifest_path(backup_file)}")
             
+            self.last_backup = backup_file
             return True
             
         except subprocess.TimeoutExpired:
             print("[ERROR] Timeout en la ejecución del backup")
+            self._discard_partial(backup_file)
             return False
         except subprocess.CalledProcessError as e:
             print(f"[ERROR] Error al crear respaldo: {e}")
             print(f"[ERROR] Ver logs en: {log_file}")
+            self._discard_partial(backup_file)
             return False
         except Exception as e:
             print(f"[ERROR] Error inesperado: {e}")
+            self._discard_partial(backup_file)
             return False
-            
-    def compress_file(self, file_path: Path) -> Optional[Path]:
-        """Comprimir archivo usando gzip"""
-        compressed_path = file_path.with_suffix(file_path.suffix + '.gz')
-        
+    
+    def _discard_partial(self, backup_file: Path):
+        """Eliminar un respaldo incompleto para que no pase por válido"""
         try:
-            with open(file_path, 'rb') as f_in:
-                with gzip.open(compressed_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
-            
-            return compressed_path
+            if backup_file.exists():
+                remove_backup(backup_file)
         except Exception as e:
-            print(f"[ERROR] Error al comprimir archivo: {e}")
-            return None
+            print(f"[WARNING] No se pudo eliminar el respaldo incompleto {backup_file}: {e}")
+    
+    def restore_backup(self, backup_file: Path, target_db: Optional[str] = None,
+                       jobs: Optional[int] = None, clean: bool = False) -> bool:
+        """
+        Restaurar un respaldo en `target_db` (por defecto, la base configurada).
+        custom/directory usan pg_restore con --jobs; plain se descomprime en
+        streaming hacia psql.
+
+        En producción, restaurar sobre la base configurada exige confirmarlo
+        escribiendo su nombre; sin terminal interactiva hay que indicar
+        `target_db` de forma explícita.
+        """
+        if target_db is None and self.env == "production" and not self._confirm_production_restore():
+            return False
+        target_db = target_db or self.db_name
+        jobs = jobs or self.backup_jobs
+        manifest = read_manifest(backup_file) or {}
+        fmt = manifest.get('format')
+        if fmt is None:
+            # Respaldos anteriores a los manifiestos
+            if backup_file.is_dir():
+                fmt = 'directory'
+            elif backup_file.suffix == '.dump':
+                fmt = 'custom'
+            else:
+                fmt = 'plain'
+        
+        connection = [
+            '--host', self.db_host,
+            '--port', str(self.db_port),
+            '--username', self.db_user,
+            '--dbname', target_db,
+        ]
+        env = self.pg_env()
+        print(f"[INFO] Restaurando {backup_file} ({fmt}) en {target_db}...")
+        
+        started = time.perf_counter()
+        try:
+            if fmt == 'plain':
+                cmd = [self.psql_path, *connection, '--quiet', '--no-psqlrc', '--set', 'ON_ERROR_STOP=1']
+                process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, env=env)
+                try:
+                    opener = gzip.open if backup_file.suffix == '.gz' else open
+                    with opener(backup_file, 'rb') as f_in:
+                        shutil.copyfileobj(f_in, process.stdin, CHUNK_SIZE)
+                    process.stdin.close()
+                    process.wait()
+                except BaseException:
+                    process.kill()
+                    process.wait()
+                    raise
+                if process.returncode != 0:
+                    raise subprocess.CalledProcessError(process.returncode, cmd)
+            else:
+                cmd = [self.pg_restore_path, *connection, '--jobs', str(jobs), '--exit-on-error']
+                if clean:
+                    cmd.extend(['--clean', '--if-exists'])
+                if self.env == "production":
+                    cmd.extend(['--no-owner', '--no-privileges'])
+                cmd.append(str(backup_file))
+                subprocess.run(cmd, env=env, check=True)
+        except subprocess.CalledProcessError as e:
+            print(f"[ERROR] Error al restaurar respaldo: {e}")
+            return False
+        
+        print(f"[SUCCESS] Restauración completada en {time.perf_counter() - started:.1f} s")
+        return True
             
+    def _confirm_production_restore(self) -> bool:
+        """Confirmar una restauración sobre la base de producción configurada"""
+        if not sys.stdin.isatty():
+            print(f"[ERROR] Restaurar en producción requiere --target-db "
+                  f"(o confirmar de forma interactiva la base {self.db_name})")
+            return False
+        print(f"[WARNING] Se va a restaurar sobre la base de producción {self.db_name} "
+              f"en {self.db_host}:{self.db_port}")
+        answer = input(f"Escribe el nombre de la base ({self.db_name}) para confirmar: ")
+        if answer.strip() != self.db_name:
+            print("[INFO] Restauración cancelada")
+            return False
+        return True
+
+    def _production_backups(self) -> List[Path]:
+        """Respaldos completos de producción (archivos .sql/.sql.gz/.dump y directorios .dir)"""
+        return [p for p in self.backup_path.glob(f'sst_{self.env}_backup_*') if is_backup_entry(p)]
+    
+    def _date_dir_backups(self, date_dir: Path) -> List[Path]:
+        return [p for p in date_dir.iterdir() if is_backup_entry(p)]
+    
     def cleanup_old_backups(self):
         """Limpiar respaldos antiguos según la política de retención"""
         if self.env == "production":
@@ -230,7 +570,7 @@ class BackupManager:
     def _cleanup_by_count(self):
         """Limpiar backups manteniendo solo los más recientes (para producción)"""
         try:
-            backup_files = list(self.backup_path.glob(f'sst_{self.env}_backup_*.sql*'))
+            backup_files = self._production_backups()
             
             if len(backup_files) <= self.backup_keep_count:
                 print(f"[INFO] Manteniendo {len(backup_files)} backups (límite: {self.backup_keep_count})")
@@ -245,7 +585,7 @@ class BackupManager:
             print(f"[INFO] Eliminando {len(files_to_delete)} backups antiguos...")
             
             for file_path in files_to_delete:
-                file_path.unlink()
+                remove_backup(file_path)
                 print(f"[INFO] Eliminado: {file_path.name}")
             
             print(f"[INFO] Limpieza completada. Manteniendo {self.backup_keep_count} backups más recientes")
@@ -281,7 +621,7 @@ class BackupManager:
         
         if self.env == "production":
             # Para producción, listar archivos directamente
-            backup_files = list(self.backup_path.glob(f'sst_{self.env}_backup_*.sql*'))
+            backup_files = self._production_backups()
             backup_files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
             
             if not backup_files:
@@ -289,7 +629,7 @@ class BackupManager:
                 return
             
             for backup_file in backup_files:
-                size_mb = backup_file.stat().st_size / (1024 * 1024)
+                size_mb = backup_size(backup_file) / (1024 * 1024)
                 mtime = datetime.datetime.fromtimestamp(backup_file.stat().st_mtime)
                 print(f"  - {backup_file.name} ({size_mb:.2f} MB) - {mtime.strftime('%Y-%m-%d %H:%M:%S')}")
         else:
@@ -302,16 +642,16 @@ class BackupManager:
                 if date_dir.is_dir():
                     print(f"\n  {date_dir.name}:")
                     
-                    backup_files = [f for f in date_dir.iterdir() if f.is_file() and not f.name.endswith('.log')]
+                    backup_files = self._date_dir_backups(date_dir)
                     if not backup_files:
                         print("    No hay archivos de backup")
                         continue
                     
                     for backup_file in sorted(backup_files):
-                        size_mb = backup_file.stat().st_size / (1024 * 1024)
+                        size_mb = backup_size(backup_file) / (1024 * 1024)
                         print(f"    - {backup_file.name} ({size_mb:.2f} MB)")
                         
-    def verify_backups(self):
+    def verify_backups(self, deep: bool = False):
         """Verificar la integridad de los respaldos"""
         print("\n[INFO] Verificando integridad de respaldos...")
         print("=" * 50)
@@ -320,15 +660,15 @@ class BackupManager:
         error_count = 0
         
         if self.env == "production":
-            backup_files = list(self.backup_path.glob(f'sst_{self.env}_backup_*.sql*'))
+            backup_files = self._production_backups()
         else:
             backup_files = []
             for date_dir in self.full_backup_path.iterdir():
                 if date_dir.is_dir():
-                    backup_files.extend([f for f in date_dir.iterdir() if f.is_file() and not f.name.endswith('.log')])
+                    backup_files.extend(self._date_dir_backups(date_dir))
         
         for backup_file in backup_files:
-            if self._verify_backup_integrity(backup_file):
+            if self._verify_backup_integrity(backup_file, deep=deep):
                 print(f"[OK] {backup_file.name}")
                 verified_count += 1
             else:
@@ -341,9 +681,18 @@ class BackupManager:
         
         return error_count == 0
     
-    def _verify_backup_integrity(self, backup_path: Path) -> bool:
+    def _verify_backup_integrity(self, backup_path: Path, deep: bool = False) -> bool:
         """Verificar la integridad básica del backup"""
         try:
+            manifest = read_manifest(backup_path)
+            if manifest is not None:
+                # Contra el manifiesto: sin descomprimir el respaldo
+                ok, reason = verify_manifest(backup_path, manifest, deep=deep, jobs=self.backup_jobs)
+                if not ok:
+                    print(f"[WARNING] {backup_path.name}: {reason}")
+                return ok
+            
+            # Respaldos anteriores a los manifiestos
             if backup_path.suffix == '.gz':
                 # Verificar archivo comprimido
                 with gzip.open(backup_path, 'rt') as f:
@@ -374,6 +723,10 @@ def main():
     create_parser.add_argument('--table', help='Respaldar solo una tabla específica')
     create_parser.add_argument('--compress', action='store_true',
                               help='Forzar compresión del respaldo')
+    create_parser.add_argument('--format', choices=BACKUP_FORMATS,
+                              help='Formato de pg_dump (default: BACKUP_FORMAT o plain)')
+    create_parser.add_argument('--jobs', type=int,
+                              help='Procesos paralelos para --format directory (default: BACKUP_JOBS o 4)')
     
     # Comando list
     list_parser = subparsers.add_parser('list', help='Listar backups disponibles')
@@ -389,6 +742,21 @@ def main():
     verify_parser = subparsers.add_parser('verify', help='Verificar integridad de backups')
     verify_parser.add_argument('--env', choices=['local', 'production'], default='local',
                               help='Entorno de los backups a verificar (default: local)')
+    verify_parser.add_argument('--deep', action='store_true',
+                              help='Recalcular los SHA-256 de cada archivo contra el manifiesto')
+    
+    # Comando restore
+    restore_parser = subparsers.add_parser('restore', help='Restaurar un backup')
+    restore_parser.add_argument('backup', help='Ruta del backup (archivo o directorio .dir)')
+    restore_parser.add_argument('--env', choices=['local', 'production'], default='local',
+                               help='Entorno de la base de datos (default: local)')
+    restore_parser.add_argument('--target-db',
+                               help='Base de datos destino (default: la configurada; '
+                                    'en producción se pide confirmación)')
+    restore_parser.add_argument('--jobs', type=int,
+                               help='Procesos paralelos de pg_restore (default: BACKUP_JOBS o 4)')
+    restore_parser.add_argument('--clean', action='store_true',
+                               help='Eliminar los objetos existentes antes de restaurarlos')
     
     args = parser.parse_args()
     
@@ -403,6 +771,10 @@ def main():
             # Forzar compresión si se especifica
             if hasattr(args, 'compress') and args.compress:
                 backup_manager.backup_compress = True
+            if args.format:
+                backup_manager.backup_format = args.format
+            if args.jobs:
+                backup_manager.backup_jobs = args.jobs
             
             success = backup_manager.create_backup(getattr(args, 'table', None))
             if not success:
@@ -415,7 +787,14 @@ def main():
             backup_manager.cleanup_old_backups()
             
         elif args.command == 'verify':
-            success = backup_manager.verify_backups()
+            success = backup_manager.verify_backups(deep=args.deep)
+            if not success:
+                sys.exit(1)
+                
+        elif args.command == 'restore':
+            success = backup_manager.restore_backup(
+                Path(args.backup), target_db=args.target_db, jobs=args.jobs, clean=args.clean
+            )
             if not success:
                 sys.exit(1)
         
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark del cliente de IA con el backend local (`StubBackend`, sin red).
+
+Envía `--requests` peticiones de sugerencias de cumplimiento con
+`--concurrency` simultáneas; una fracción `--repeat` repite normas ya
+pedidas (con espacios distintos, que la normalización del prompt ignora).
+Compara el servicio sin caché y con caché (`AIResponseCache`): peticiones
+por segundo, latencias p50/p95, tasa de aciertos y llamadas al backend.
+
+Luego genera lecciones con `stream_interactive_lesson_content` y reporta el
+tiempo hasta el primer fragmento frente al tiempo hasta la respuesta
+completa.
+
+Uso:
+    python benchmarks/ai_client.py --requests 500 --concurrency 20 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.ai_service import AIResponseCache, AIService, StubBackend  # noqa: E402
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def workload(requests: int, repeat: float, seed: int = 7):
+    rng = random.Random(seed)
+    normas = []
+    for i in range(requests):
+        if normas and rng.random() < repeat:
+            numero, descripcion = rng.choice(normas)
+            # Mismo contenido con otros espacios: misma clave de caché
+            descripcion = descripcion.replace(" ", "  ", 1)
+        else:
+            numero, descripcion = str(1000 + i), f"Obligaciones del empleador para la norma {i}"
+            normas.append((numero, descripcion))
+        yield numero, descripcion
+
+
+async def run_suggestions(service: AIService, requests: int, concurrency: int, repeat: float) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one(numero: str, descripcion: str):
+        async with semaphore:
+            start = time.perf_counter()
+            await service.generate_compliance_suggestions(
+                tipo_norma="Resolución",
+                numero_norma=numero,
+                anio=2024,
+                descripcion_norma=descripcion,
+                articulo=None,
+                exigencias=None,
+                tema_general="SST",
+                clasificacion=None,
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(numero, descripcion) for numero, descripcion in workload(requests, repeat)))
+    elapsed = time.perf_counter() - start
+    return {
+        "rps": requests / elapsed,
+        "p50": statistics.median(timings),
+        "p95": percentile(timings, 0.95),
+        "hit_rate": service.cache.stats()["hit_rate"],
+        "calls": service.backend.calls,
+    }
+
+
+async def run_lessons(service: AIService, lessons: int) -> dict:
+    first_chunk, total = [], []
+    for i in range(lessons):
+        start = time.perf_counter()
+        first = None
+        async for _ in service.stream_interactive_lesson_content(
+            titulo=f"Lección {i}", tema="Trabajo en alturas", num_slides=8
+        ):
+            if first is None:
+                first = time.perf_counter() - start
+        first_chunk.append(first * 1000)
+        total.append((time.perf_counter() - start) * 1000)
+    return {"first": statistics.median(first_chunk), "total": statistics.median(total)}
+
+
+async def main_async(args) -> None:
+    print(
+        f"{args.requests} sugerencias, {args.concurrency} simultáneas, {args.repeat:.0%} repetidas, "
+        f"latencia del backend {args.latency_ms:.0f} ms\n"
+    )
+    print(f"{'modo':<10} {'pet/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'aciertos':>9} {'llamadas':>9}")
+    for label, max_entries in (("sin-cache", 0), ("cache", 4096)):
+        service = AIService(
+            backend=StubBackend(latency_ms=args.latency_ms),
+            cache=AIResponseCache(max_entries=max_entries),
+        )
+        stats = await run_suggestions(service, args.requests, args.concurrency, args.repeat)
+        print(
+            f"{label:<10} {stats['rps']:8.1f} {stats['p50']:8.1f} {stats['p95']:8.1f} "
+            f"{stats['hit_rate']:9.1%} {stats['calls']:>9}"
+        )
+
+    service = AIService(
+        backend=StubBackend(latency_ms=args.latency_ms, chunk_delay_ms=args.chunk_delay_ms),
+        cache=AIResponseCache(max_entries=0),
+    )
+    lessons = await run_lessons(service, args.lessons)
+    print(
+        f"\nlecciones en streaming ({args.lessons}): primer fragmento {lessons['first']:.0f} ms, "
+        f"respuesta completa {lessons['total']:.0f} ms (medianas)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--repeat", type=float, default=0.5, help="Fracción de peticiones repetidas")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Latencia simulada del backend")
+    parser.add_argument("--chunk-delay-ms", type=float, default=5.0, help="Pausa entre fragmentos en streaming")
+    parser.add_argument("--lessons", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
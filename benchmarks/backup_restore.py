@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark de respaldo, verificación y restauración por formato.
+
+Con la base de datos de DATABASE_URL (un PostgreSQL local) y los comandos
+pg_dump / pg_restore / psql en el PATH, para cada formato de backup.py:
+
+- `plain`: SQL comprimido con gzip mientras se vuelca;
+- `custom`: formato custom de pg_dump, restaurado con pg_restore --jobs;
+- `directory`: volcado y restauración en paralelo con --jobs.
+
+mide el tiempo de respaldo, el tamaño, la verificación rápida (manifiesto),
+la verificación profunda (SHA-256), la verificación anterior (descomprimir
+el respaldo completo, solo en plain) y la restauración en una base de datos
+temporal que se elimina al final. Los respaldos se escriben en un directorio
+temporal.
+
+Uso:
+    python benchmarks/backup_restore.py --jobs 4
+"""
+
+import argparse
+import contextlib
+import gzip
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.engine import make_url  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from backup import BACKUP_FORMATS, CHUNK_SIZE, BackupManager, backup_size, read_manifest, verify_manifest  # noqa: E402
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def quiet(verbose: bool):
+    return contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+
+def decompress_all(path) -> None:
+    """Verificación anterior: leer y descomprimir el respaldo entero."""
+    with gzip.open(path, 'rb') as f:
+        while f.read(CHUNK_SIZE):
+            pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=4)
+    parser.add_argument("--formats", nargs="+", choices=BACKUP_FORMATS, default=list(BACKUP_FORMATS))
+    parser.add_argument("--verbose", action="store_true", help="Mostrar la salida de backup.py")
+    args = parser.parse_args()
+
+    url = make_url(settings.database_url)
+    if url.get_backend_name() != "postgresql":
+        sys.exit("Este benchmark requiere PostgreSQL (DATABASE_URL)")
+
+    work_dir = tempfile.mkdtemp(prefix="sst-backup-bench-")
+    # BackupManager lee la conexión del entorno (load_dotenv no sobrescribe)
+    os.environ.update({
+        "POSTGRES_HOST": url.host or "localhost",
+        "POSTGRES_PORT": str(url.port or 5432),
+        "POSTGRES_DB": url.database,
+        "POSTGRES_USER": url.username or "",
+        "POSTGRES_PASSWORD": url.password or "",
+        "BACKUP_DIR": work_dir,
+        "BACKUP_COMPRESS": "true",
+    })
+    admin_engine = create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+
+    try:
+        with quiet(args.verbose):
+            manager = BackupManager("local")
+        manager.backup_jobs = args.jobs
+
+        print(f"Base de datos {url.database}, {args.jobs} jobs\n")
+        print(
+            f"{'formato':<10} {'respaldo s':>10} {'MB':>8} {'verif. ms':>10} {'--deep ms':>10} "
+            f"{'descomp. ms':>12} {'restaurar s':>12}"
+        )
+        for fmt in args.formats:
+            manager.backup_format = fmt
+            with quiet(args.verbose):
+                ok, dump_seconds = timed(manager.create_backup)
+            if not ok:
+                sys.exit(f"falló el respaldo en formato {fmt} (ver logs en {manager.logs_path})")
+            backup_path = manager.last_backup
+            manifest = read_manifest(backup_path)
+
+            (quick_ok, _), quick_seconds = timed(verify_manifest, backup_path, manifest)
+            (deep_ok, _), deep_seconds = timed(verify_manifest, backup_path, manifest, deep=True, jobs=args.jobs)
+            legacy = "-"
+            if fmt == "plain":
+                _, legacy_seconds = timed(decompress_all, backup_path)
+                legacy = f"{legacy_seconds * 1000:.0f}"
+            if not (quick_ok and deep_ok):
+                sys.exit(f"la verificación falló para {backup_path}")
+
+            target_db = f"sst_bench_restore_{fmt}"
+            with admin_engine.connect() as conn:
+                conn.execute(text(f'DROP DATABASE IF EXISTS "{target_db}"'))
+                conn.execute(text(f'CREATE DATABASE "{target_db}"'))
+            try:
+                with quiet(args.verbose):
+                    restored, restore_seconds = timed(
+                        manager.restore_backup, backup_path, target_db=target_db, jobs=args.jobs
+                    )
+            finally:
+                with admin_engine.connect() as conn:
+                    conn.execute(text(f'DROP DATABASE IF EXISTS "{target_db}"'))
+            if not restored:
+                sys.exit(f"falló la restauración de {backup_path}")
+
+            print(
+                f"{fmt:<10} {dump_seconds:10.2f} {backup_size(backup_path) / 1024 / 1024:8.2f} "
+                f"{quick_seconds * 1000:10.1f} {deep_seconds * 1000:10.0f} {legacy:>12} {restore_seconds:12.2f}"
+            )
+    finally:
+        admin_engine.dispose()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark del render masivo de certificados.
+
+Compara el render secuencial en un solo hilo (como lo hacía
+`generate_bulk_attendance_certificates`) con `render_many` sobre un pool de
+procesos, usando la plantilla real `certificate.html`.
+
+Uso:
+    python benchmarks/certificate_batch.py --certificates 60 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import html_to_pdf  # noqa: E402
+
+
+def certificate_job(i: int, logo_url: str):
+    context = {
+        "certificate": {
+            "certificate_number": f"CERT-{i:06d}",
+            "verification_code": f"VER{i:08d}",
+            "score_achieved": 90.0,
+            "title": "Certificado de Finalización",
+        },
+        "user": {"full_name": f"Trabajador de Prueba {i}"},
+        "course": {"title": "Inducción en Seguridad y Salud en el Trabajo"},
+        "issue_date": "18 de octubre de 2026",
+        "logo_url": logo_url,
+    }
+    return ("render_pdf", ("certificate.html", context, ["certificate.css"]))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--certificates", type=int, default=40)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    logo_url = html_to_pdf.get_html_to_pdf_converter().logo_url()
+    jobs = [certificate_job(i, logo_url) for i in range(args.certificates)]
+
+    start = time.perf_counter()
+    serial = html_to_pdf.render_many(jobs, max_workers=1)
+    serial_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = html_to_pdf.render_many(jobs, max_workers=args.workers)
+    parallel_s = time.perf_counter() - start
+
+    failures = sum(1 for _, emergency in serial + parallel if emergency)
+    print(f"secuencial  n={len(jobs):<4} total={serial_s:7.2f} s  {len(jobs) / serial_s:6.1f} pdf/s")
+    print(f"pool({args.workers:>2})    n={len(jobs):<4} total={parallel_s:7.2f} s  {len(jobs) / parallel_s:6.1f} pdf/s")
+    print(f"speedup: x{serial_s / parallel_s:.2f}  errores: {failures}")
+
+
+if __name__ == "__main__":
+    main()
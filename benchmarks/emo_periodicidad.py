@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Benchmark del cálculo de periodicidad EMO para todos los cargos.
+
+Crea una empresa sintética (cargos, trabajadores, exámenes ocupacionales y
+ausentismo) y calcula los insumos de la sugerencia de periodicidad de todos
+los cargos de dos formas:
+
+- `por-cargo`: `compute_cargo_emo_inputs` cargo a cargo (la ruta de los
+  endpoints antes del snapshot: varias consultas por cargo);
+- `lote`: `compute_company_emo_inputs`, un número fijo de consultas
+  agrupadas para toda la empresa.
+
+Reporta tiempo, sentencias enviadas a la base de datos y si ambas rutas dan
+los mismos insumos y la misma periodicidad sugerida. Todo corre en una
+transacción que se revierte al final: no quedan datos.
+
+Uso:
+    python benchmarks/emo_periodicidad.py --cargos 300 --workers-per-cargo 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from dataclasses import replace
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.models.absenteeism import Absenteeism, EventMonth, EventType  # noqa: E402
+from app.models.cargo import Cargo  # noqa: E402
+from app.models.occupational_exam import MedicalAptitude, OccupationalExam  # noqa: E402
+from app.models.worker import ContractType, DocumentType, Gender, RiskLevel, Worker  # noqa: E402
+from app.services.emo_periodicidad import (  # noqa: E402
+    compute_cargo_emo_inputs,
+    compute_company_emo_inputs,
+    suggest_periodicidad_from_inputs,
+)
+
+
+def seed(db: Session, cargos: int, workers_per_cargo: int, tag: str, today: date) -> list:
+    rng = random.Random(42)
+    cargo_ids = db.scalars(
+        insert(Cargo).returning(Cargo.id, sort_by_parameter_order=True),
+        [{"nombre_cargo": f"Bench EMO {tag} {i}", "activo": True} for i in range(cargos)],
+    ).all()
+
+    workers = []
+    for cargo_id in cargo_ids:
+        for j in range(workers_per_cargo):
+            n = len(workers)
+            workers.append({
+                "gender": Gender.OTHER,
+                "document_type": DocumentType.CEDULA,
+                "document_number": f"BE{tag}{n}",
+                "first_name": "Trabajador",
+                "last_name": f"Benchmark {n}",
+                "birth_date": today - timedelta(days=rng.randint(18 * 365, 60 * 365)),
+                "email": f"bench-emo-{tag}-{n}@example.invalid",
+                "contract_type": ContractType.INDEFINITE,
+                "risk_level": RiskLevel.LEVEL_I,
+                "position": "Benchmark",
+                "cargo_id": cargo_id,
+                "fecha_de_ingreso": None if rng.random() < 0.02 else today - timedelta(days=rng.randint(0, 10 * 365)),
+                "is_active": rng.random() < 0.95,
+            })
+    worker_rows = db.execute(
+        insert(Worker).returning(Worker.id, Worker.cargo_id, sort_by_parameter_order=True), workers
+    ).all()
+
+    exams, absences = [], []
+    conceptos = list(MedicalAptitude)
+    for worker_id, cargo_id in worker_rows:
+        for _ in range(rng.randint(0, 3)):
+            exams.append({
+                "worker_id": worker_id,
+                "exam_date": today - timedelta(days=rng.randint(0, 5 * 365)),
+                "cargo_id_momento_examen": cargo_id if rng.random() < 0.9 else rng.choice(cargo_ids),
+                "medical_aptitude_concept": rng.choices(conceptos, weights=(85, 12, 3))[0],
+                "requires_follow_up": rng.random() < 0.05,
+            })
+        if rng.random() < 0.3:
+            start = today - timedelta(days=rng.randint(0, 5 * 365))
+            days = rng.randint(1, 30)
+            absences.append({
+                "worker_id": worker_id,
+                "event_month": list(EventMonth)[start.month - 1],
+                "event_type": rng.choices(list(EventType), weights=(3, 1, 10, 20, 30))[0],
+                "start_date": start,
+                "end_date": start + timedelta(days=days),
+                "disability_days": days,
+                "disability_or_charged_days": days,
+            })
+    if exams:
+        db.execute(insert(OccupationalExam), exams)
+    if absences:
+        db.execute(insert(Absenteeism), absences)
+    return cargo_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cargos", type=int, default=300)
+    parser.add_argument("--workers-per-cargo", type=int, default=20)
+    args = parser.parse_args()
+
+    statements = 0
+
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    today = date.today()
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            with Session(bind=conn, join_transaction_mode="create_savepoint") as db:
+                cargo_ids = seed(db, args.cargos, args.workers_per_cargo, uuid.uuid4().hex[:8], today)
+                db.flush()
+                all_cargo_ids = [cargo_id for (cargo_id,) in db.query(Cargo.id).order_by(Cargo.id)]
+                print(
+                    f"{len(all_cargo_ids)} cargos ({len(cargo_ids)} sintéticos, "
+                    f"{args.workers_per_cargo} trabajadores c/u)\n"
+                )
+                print(f"{'ruta':<10} {'total s':>8} {'ms/cargo':>9} {'sentencias':>11}")
+
+                event.listen(conn, "before_cursor_execute", count_statement)
+                try:
+                    results = {}
+                    for label in ("por-cargo", "lote"):
+                        db.expunge_all()
+                        statements = 0
+                        start = time.perf_counter()
+                        if label == "lote":
+                            results[label] = compute_company_emo_inputs(db, today=today)
+                        else:
+                            results[label] = {
+                                cargo_id: compute_cargo_emo_inputs(db, cargo_id, today=today)
+                                for cargo_id in all_cargo_ids
+                            }
+                        elapsed = time.perf_counter() - start
+                        print(
+                            f"{label:<10} {elapsed:8.2f} {elapsed * 1000 / len(all_cargo_ids):9.2f} "
+                            f"{statements:>11}"
+                        )
+                finally:
+                    event.remove(conn, "before_cursor_execute", count_statement)
+        finally:
+            transaction.rollback()
+
+    # El lote desempata por id los profesiogramas con la misma fecha de
+    # creación; la comparación ignora ese desempate en la matriz.
+    diferencias = [
+        cargo_id
+        for cargo_id, live in results["por-cargo"].items()
+        if replace(live, matriz=None, riesgo_matriz=None)
+        != replace(results["lote"][cargo_id], matriz=None, riesgo_matriz=None)
+        or suggest_periodicidad_from_inputs(live) != suggest_periodicidad_from_inputs(results["lote"][cargo_id])
+    ]
+    if diferencias:
+        sys.exit(f"\nlos insumos difieren en {len(diferencias)} cargos (p. ej. {diferencias[:5]})")
+    print("\nmismos insumos y misma periodicidad sugerida en las dos rutas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark del proxy de imágenes de las autoevaluaciones de trabajo en casa.
+
+Genera una foto sintética del tamaño de una cámara de celular, la sirve
+desde un almacenamiento simulado (con `--latency-ms` de latencia por
+descarga) y compara por petición:
+
+- `legacy`: la ruta anterior, descargar el original y devolverlo entero;
+- `cold`: derivado generado en el momento (descarga + redimensionado);
+- `warm`: derivado desde el disco con el hash del original vigente;
+- `expired`: pasado el TTL del original, se descarga de nuevo pero el
+  derivado sale del disco;
+- `304`: revalidación con If-None-Match, sin descarga ni cuerpo.
+
+Para cada tamaño de app/services/image_derivatives.py reporta ms por
+petición y bytes enviados, en WebP y JPEG, y el tamaño del data URI que
+se incrusta en los PDF frente al original.
+
+Uso:
+    python benchmarks/image_proxy.py --width 4032 --height 3024 --requests 50
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from app.services.image_derivatives import (  # noqa: E402
+    DERIVATIVE_SIZES,
+    PDF_SIZE,
+    ImageDerivativeCache,
+)
+
+URL = "Autoevaluacion_Trabajo_en_Casa/Benchmark/fotos/workspace.jpg"
+
+
+def synthetic_photo(width: int, height: int) -> bytes:
+    # Ruido sobre un degradado: comprime como una foto real, no como un color plano.
+    noise = Image.effect_noise((width, height), 48)
+    gradient = Image.linear_gradient("L").resize((width, height))
+    image = Image.merge("RGB", (noise, gradient, Image.blend(noise, gradient, 0.5)))
+    output = BytesIO()
+    image.save(output, "JPEG", quality=92)
+    return output.getvalue()
+
+
+async def measure(requests: int, call) -> tuple:
+    """(ms por petición, bytes de la última respuesta)."""
+    start = time.perf_counter()
+    sent = 0
+    for _ in range(requests):
+        sent = await call()
+    return (time.perf_counter() - start) * 1000 / requests, sent
+
+
+async def run(args) -> None:
+    photo = synthetic_photo(args.width, args.height)
+    now = 0.0
+
+    async def fetch(url: str):
+        await asyncio.sleep(args.latency_ms / 1000)
+        return photo
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ImageDerivativeCache(
+            cache_dir, max_bytes=1024 ** 3, fetch=fetch, source_ttl=300, clock=lambda: now
+        )
+
+        async def legacy():
+            return len(await fetch(URL))
+
+        legacy_ms, legacy_bytes = await measure(args.requests, legacy)
+        print(
+            f"original {args.width}x{args.height} JPEG: {len(photo) / 1024:.0f} KiB, "
+            f"descarga simulada {args.latency_ms:g} ms\n"
+        )
+        print(f"{'tamaño':<9} {'formato':<7} {'ruta':<8} {'ms/pet':>8} {'KiB':>8}")
+        print(f"{'original':<9} {'-':<7} {'legacy':<8} {legacy_ms:8.2f} {legacy_bytes / 1024:8.1f}")
+
+        for size in (name for name, side in DERIVATIVE_SIZES.items() if side):
+            for image_format in ("webp", "jpeg"):
+                rows = []
+
+                async def cold():
+                    cache.clear()
+                    return len((await cache.get(URL, size, image_format)).data)
+
+                async def warm():
+                    return len((await cache.get(URL, size, image_format)).data)
+
+                async def expired():
+                    nonlocal now
+                    now += cache.source_ttl + 1
+                    return len((await cache.get(URL, size, image_format)).data)
+
+                async def not_modified():
+                    assert cache.cached_etag(URL, size, image_format) is not None
+                    return 0
+
+                rows.append(("cold", *await measure(max(1, args.requests // 10), cold)))
+                rows.append(("warm", *await measure(args.requests, warm)))
+                rows.append(("expired", *await measure(args.requests, expired)))
+                await cache.get(URL, size, image_format)
+                rows.append(("304", *await measure(args.requests, not_modified)))
+                for label, ms, sent in rows:
+                    print(f"{size:<9} {image_format:<7} {label:<8} {ms:8.2f} {sent / 1024:8.1f}")
+
+        pdf_uri = await cache.data_uri(URL, PDF_SIZE)
+        original_uri = f"data:image/jpeg;base64,{base64.b64encode(photo).decode('ascii')}"
+        print(
+            f"\ndata URI para PDF: original {len(original_uri) / 1024:.0f} KiB, "
+            f"{PDF_SIZE} {len(pdf_uri) / 1024:.0f} KiB"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    parser.add_argument("--requests", type=int, default=50, help="Peticiones medidas por ruta")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Latencia simulada del almacenamiento")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
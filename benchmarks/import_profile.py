@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Perfil de tiempo de importación del arranque de la API.
+
+Ejecuta `python -X importtime -c "import app.main"` en un subproceso limpio,
+interpreta la salida de stderr y muestra los módulos más costosos, tanto por
+módulo individual como agregados por paquete de primer nivel.
+
+Uso:
+    python benchmarks/import_profile.py
+    python benchmarks/import_profile.py --module app.api --top 40 --sort self
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, NamedTuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import time:       self [us] |  cumulative | imported package
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def profile_imports(module: str) -> List[ImportRecord]:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./benchmark_placeholder.db")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(f"La importación de {module} falló (código {result.returncode})")
+    return parse_importtime(result.stderr)
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    records = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        # La profundidad en el árbol de importación se indica con dos espacios por nivel.
+        records.append(ImportRecord(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def by_package(records: List[ImportRecord]) -> Dict[str, int]:
+    totals: Dict[str, int] = defaultdict(int)
+    for record in records:
+        totals[record.module.split(".")[0]] += record.self_us
+    return totals
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Módulo a importar (por defecto app.main)")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", choices=("cumulative", "self"), default="cumulative")
+    args = parser.parse_args()
+
+    records = profile_imports(args.module)
+    if not records:
+        raise SystemExit("No se obtuvo salida de -X importtime")
+
+    total_us = max(r.cumulative_us for r in records if r.depth == 0)
+    key = (lambda r: r.cumulative_us) if args.sort == "cumulative" else (lambda r: r.self_us)
+
+    print(f"Importar {args.module}: {total_us / 1000:.1f} ms ({len(records)} módulos)\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  módulo")
+    for record in sorted(records, key=key, reverse=True)[: args.top]:
+        print(f"{record.cumulative_us / 1000:14.1f} {record.self_us / 1000:9.1f}  {record.module}")
+
+    print(f"\n{'self ms':>14} {'%':>6}  paquete")
+    packages = sorted(by_package(records).items(), key=lambda item: item[1], reverse=True)
+    for package, self_us in packages[: args.top]:
+        print(f"{self_us / 1000:14.1f} {100 * self_us / total_us:6.1f}  {package}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de los endpoints de lectura más consultados.
+
+Lanza `--concurrency` clientes concurrentes contra un servidor ya levantado
+(`make run`) durante `--duration` segundos y reporta, por endpoint, peticiones
+por segundo, latencias p50/p95/p99 y errores.
+
+Para comparar antes y después de un cambio se guarda el resultado con `--save`
+y se pasa luego con `--compare`:
+
+    git stash && make run                         # versión anterior
+    python benchmarks/load_test.py --save before.json
+    git stash pop && make run                     # versión nueva
+    python benchmarks/load_test.py --compare before.json
+
+Autenticación: `--token` (o LOAD_TEST_TOKEN) con un JWT ya emitido, o
+`--email`/`--password` (LOAD_TEST_EMAIL/LOAD_TEST_PASSWORD) para iniciar sesión.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+DEFAULT_ENDPOINTS = (
+    "/api/v1/enrollments/my-enrollments",
+    "/api/v1/certificates/my-certificates",
+    "/api/v1/notifications/",
+    "/api/v1/notifications/unread/count",
+    "/api/v1/surveys/my-surveys",
+)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    index = max(int(round(len(values) * pct / 100)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+    if response.status_code != 200:
+        raise SystemExit(f"Inicio de sesión fallido ({response.status_code}): {response.text[:200]}")
+    return response.json()["access_token"]
+
+
+async def run_endpoint(
+    client: httpx.AsyncClient, path: str, concurrency: int, duration: float
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.get(path)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append((time.perf_counter() - start) * 1000)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "mean_ms": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+    }
+
+
+def print_results(results: Dict[str, Dict[str, float]], baseline: Optional[Dict] = None) -> None:
+    header = f"{'endpoint':<42} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errores':>8}"
+    if baseline:
+        header += f" {'Δ rps':>8} {'Δ p95':>8}"
+    print(header)
+    for path, stats in results.items():
+        line = (
+            f"{path:<42} {stats['rps']:>8.1f} {stats['p50_ms']:>8.1f} "
+            f"{stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f} {stats['errors']:>8}"
+        )
+        before = (baseline or {}).get(path)
+        if before and before["rps"]:
+            rps_change = 100 * (stats["rps"] - before["rps"]) / before["rps"]
+            p95_change = 100 * (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0.0
+            line += f" {rps_change:>+7.1f}% {p95_change:>+7.1f}%"
+        print(line)
+
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30.0) as client:
+        token = args.token
+        if not token:
+            if not (args.email and args.password):
+                raise SystemExit("Indica --token o --email/--password")
+            token = await login(client, args.email, args.password)
+        client.headers["Authorization"] = f"Bearer {token}"
+
+        # Calentamiento: abre conexiones y llena las cachés del servidor.
+        for path in args.endpoints:
+            await client.get(path)
+
+        results = {}
+        for path in args.endpoints:
+            results[path] = await run_endpoint(client, path, args.concurrency, args.duration)
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=os.getenv("LOAD_TEST_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--token", default=os.getenv("LOAD_TEST_TOKEN"))
+    parser.add_argument("--email", default=os.getenv("LOAD_TEST_EMAIL"))
+    parser.add_argument("--password", default=os.getenv("LOAD_TEST_PASSWORD"))
+    parser.add_argument("--endpoint", dest="endpoints", action="append", help="Ruta a probar (repetible)")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15.0, help="Segundos por endpoint")
+    parser.add_argument("--save", help="Guarda los resultados en JSON")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior con el que comparar")
+    args = parser.parse_args()
+    args.endpoints = args.endpoints or list(DEFAULT_ENDPOINTS)
+
+    results = asyncio.run(main_async(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    print(f"{args.base_url}  concurrencia={args.concurrency}  duración={args.duration:.0f} s por endpoint\n")
+    print_results(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {"base_url": args.base_url, "concurrency": args.concurrency, "duration": args.duration, "results": results},
+                f,
+                indent=2,
+            )
+        print(f"\nResultados guardados en {args.save}")
+
+    if any(stats["errors"] for stats in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark de una ráfaga de logins y su efecto sobre endpoints no relacionados.
+
+Monta en proceso una aplicación FastAPI mínima (sin base de datos) con un
+endpoint `/ping` y tres variantes de login con el mismo hash bcrypt:
+
+- `legacy`: bcrypt dentro del handler async, como hacía `authenticate_user`;
+- `offloop`: bcrypt en el pool acotado de app/utils/password.py;
+- `limited`: además, el token bucket por cuenta e IP de app/utils/rate_limit.py
+  (el ataque viene de una sola IP contra una cuenta).
+
+En cada escenario, `--concurrency` clientes envían logins con contraseña
+incorrecta durante `--seconds` segundos mientras otro cliente llama a
+`/ping`. Reporta p50/p99 de `/ping`, logins atendidos, rechazados (429/503) y
+hashes calculados.
+
+Uso:
+    python benchmarks/login_storm.py --concurrency 50 --seconds 10 --rounds 12
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, HTTPException  # noqa: E402
+
+from app.utils.password import PasswordHashBusy, PasswordManager  # noqa: E402
+from app.utils.rate_limit import TokenBucketLimiter  # noqa: E402
+
+ATTACKER_IP = "203.0.113.7"
+ACCOUNT = "victima@example.invalid"
+
+
+def build_app(manager: PasswordManager, hashed: str, limiters) -> tuple:
+    app = FastAPI()
+    hashes = 0
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/login/legacy")
+    async def login_legacy():
+        nonlocal hashes
+        hashes += 1
+        if not manager.verify_password("incorrecta", hashed):
+            raise HTTPException(status_code=401)
+
+    @app.post("/login/offloop")
+    async def login_offloop():
+        nonlocal hashes
+        if limiters:
+            for limiter, key in zip(limiters, (ATTACKER_IP, ACCOUNT)):
+                if limiter.acquire(key):
+                    raise HTTPException(status_code=429)
+        try:
+            hashes += 1
+            valid = await manager.verify_password_async("incorrecta", hashed)
+        except PasswordHashBusy:
+            hashes -= 1
+            raise HTTPException(status_code=503)
+        if not valid:
+            raise HTTPException(status_code=401)
+
+    return app, lambda: hashes
+
+
+async def scenario(name: str, args, hashed: str) -> dict:
+    manager = PasswordManager(rounds=args.rounds, workers=args.workers, max_pending=args.max_pending)
+    limiters = None
+    if name == "limited":
+        limiters = (TokenBucketLimiter(20, 30 / 60), TokenBucketLimiter(5, 5 / 60))
+    app, hash_count = build_app(manager, hashed, limiters)
+    path = "/login/legacy" if name == "legacy" else "/login/offloop"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        deadline = time.perf_counter() + args.seconds
+        statuses = []
+        pings = []
+
+        async def attacker() -> None:
+            while time.perf_counter() < deadline:
+                response = await client.post(path)
+                statuses.append(response.status_code)
+
+        async def prober() -> None:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await client.get("/ping")
+                pings.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(prober(), *(attacker() for _ in range(args.concurrency)))
+
+    pings.sort()
+    return {
+        "p50": statistics.median(pings),
+        "p99": pings[min(len(pings) - 1, int(len(pings) * 0.99))],
+        "pings": len(pings),
+        "logins": len(statuses),
+        "rejected": sum(1 for code in statuses if code in (429, 503)),
+        "hashes": hash_count(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=50, help="Clientes enviando logins a la vez")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duración de cada escenario")
+    parser.add_argument("--rounds", type=int, default=12, help="Costo bcrypt")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Hilos del pool bcrypt")
+    parser.add_argument("--max-pending", type=int, default=64, help="Hashes en cola antes de responder 503")
+    args = parser.parse_args()
+
+    hashed = PasswordManager(rounds=args.rounds).hash_password("correcta")
+    print(
+        f"{args.concurrency} clientes de login durante {args.seconds:g} s, bcrypt {args.rounds} rondas, "
+        f"{args.workers} hilos\n"
+    )
+    print(f"{'escenario':<10} {'ping p50':>9} {'ping p99':>9} {'pings':>7} {'logins':>7} {'rechazos':>9} {'hashes':>7}")
+    for name in ("legacy", "offloop", "limited"):
+        stats = asyncio.run(scenario(name, args, hashed))
+        print(
+            f"{name:<10} {stats['p50']:9.1f} {stats['p99']:9.1f} {stats['pings']:>7} "
+            f"{stats['logins']:>7} {stats['rejected']:>9} {stats['hashes']:>7}"
+        )
+    print("\nlatencias de /ping en ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la carga de sondear el contador de notificaciones frente a
+recibirlo por push (SSE) con miles de usuarios conectados.
+
+Crea usuarios sintéticos con notificaciones sin leer (con `fan_out` de
+app/services/notification_delivery.py) y compara:
+
+- `poll-count`: la ruta anterior de /notifications/unread/count, un COUNT
+  sobre `notifications` por usuario cada `--interval` segundos;
+- `poll-counter`: el mismo sondeo leyendo `notification_unread_counters`;
+- `push`: las conexiones SSE suscritas al broker; sin cambios no hay
+  consultas, y cada cambio se entrega con el contador ya calculado.
+
+Para el sondeo reporta consultas por segundo, ms por consulta y tiempo de
+base de datos por segundo de reloj. Para push, lo que tarda una notificación
+a todos (fan-out) y la latencia de entrega a las `--users` conexiones.
+
+Todo corre en una transacción que se revierte al final: no quedan datos.
+
+Uso:
+    python benchmarks/notification_delivery.py --users 5000 --interval 30
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.models.notification import Notification  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.services.notification_delivery import (  # noqa: E402
+    MemoryBackend,
+    NotificationBroker,
+    fan_out,
+    unread_count_statement,
+)
+
+
+def seed_users(db: Session, users: int, tag: str) -> list:
+    return list(
+        db.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {
+                    "email": f"bench-notif-{tag}-{i}@example.invalid",
+                    "hashed_password": "!",
+                    "first_name": "Usuario",
+                    "last_name": f"Benchmark {i}",
+                    "document_type": "CC",
+                    "document_number": f"BN{tag}{i}",
+                }
+                for i in range(users)
+            ],
+        )
+    )
+
+
+def time_queries(db: Session, statements) -> float:
+    """ms promedio por consulta."""
+    start = time.perf_counter()
+    for statement in statements:
+        db.scalar(statement)
+    return (time.perf_counter() - start) * 1000 / len(statements)
+
+
+def legacy_count(user_id: int):
+    return select(func.count(Notification.id)).where(
+        and_(Notification.user_id == user_id, Notification.read_at.is_(None))
+    )
+
+
+async def push_latencies(user_ids: list, counts: dict) -> list:
+    """Suscribe una conexión por usuario, publica un evento desde otro hilo
+    (como el commit de un endpoint síncrono) y mide cuándo llega a cada una."""
+    broker = NotificationBroker(MemoryBackend())
+    ready = asyncio.Event()
+    subscribed = 0
+    latencies = []
+    published_at = 0.0
+
+    async def connection(user_id: int) -> None:
+        nonlocal subscribed
+        async with broker.subscribe(user_id) as queue:
+            subscribed += 1
+            if subscribed == len(user_ids):
+                ready.set()
+            message = await queue.get()
+            assert message["unread_count"] == counts[user_id]
+            latencies.append((time.perf_counter() - published_at) * 1000)
+
+    tasks = [asyncio.create_task(connection(user_id)) for user_id in user_ids]
+    await ready.wait()
+
+    def publish() -> None:
+        nonlocal published_at
+        published_at = time.perf_counter()
+        broker.publish({"counts": counts, "notification": {"title": "Benchmark"}})
+
+    thread = threading.Thread(target=publish)
+    thread.start()
+    await asyncio.gather(*tasks)
+    thread.join()
+    return sorted(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000, help="Usuarios conectados")
+    parser.add_argument("--interval", type=float, default=30.0, help="Segundos entre sondeos de cada cliente")
+    parser.add_argument("--notifications", type=int, default=20, help="Notificaciones sin leer por usuario")
+    parser.add_argument("--samples", type=int, default=500, help="Consultas medidas por modo de sondeo")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            with Session(bind=conn, join_transaction_mode="create_savepoint") as db:
+                user_ids = seed_users(db, args.users, uuid.uuid4().hex[:8])
+
+                fan_out_ms = []
+                for i in range(args.notifications):
+                    start = time.perf_counter()
+                    fan_out(db, title=f"Benchmark {i}", message="Benchmark", user_ids=user_ids, active_only=False)
+                    fan_out_ms.append((time.perf_counter() - start) * 1000)
+                db.flush()
+
+                sample = random.sample(user_ids, min(args.samples, len(user_ids)))
+                count_ms = time_queries(db, [legacy_count(user_id) for user_id in sample])
+                counter_ms = time_queries(db, [unread_count_statement(user_id) for user_id in sample])
+                counts = {user_id: args.notifications for user_id in user_ids}
+        finally:
+            transaction.rollback()
+
+    latencies = asyncio.run(push_latencies(user_ids, counts))
+    polls_per_second = args.users / args.interval
+
+    print(
+        f"{args.users} usuarios conectados, sondeo cada {args.interval:g} s, "
+        f"{args.notifications} notificaciones sin leer por usuario\n"
+    )
+    print(f"{'modo':<13} {'consultas/s':>12} {'ms/consulta':>12} {'BD ms/s':>9}")
+    for label, ms in (("poll-count", count_ms), ("poll-counter", counter_ms)):
+        print(f"{label:<13} {polls_per_second:12.1f} {ms:12.3f} {polls_per_second * ms:9.1f}")
+    print(f"{'push':<13} {0:12.1f} {'-':>12} {0:9.1f}")
+
+    print(
+        f"\nfan-out a {args.users} usuarios (INSERT ... SELECT y contadores): "
+        f"{statistics.median(fan_out_ms):.1f} ms mediana"
+    )
+    print(
+        f"push: entrega a {len(latencies)} conexiones p50 {statistics.median(latencies):.2f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1]:.2f} ms, máx {latencies[-1]:.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark de generación de PDFs con WeasyPrint.
+
+Compara dos escenarios sobre las plantillas reales de `app/templates/reports`:
+
+- baseline: recursos nuevos en cada PDF (entorno Jinja2 sin caché de bytecode,
+  CSS parseado de nuevo, `FontConfiguration` nueva y logo embebido en base64),
+  que es lo que ocurría al crear un `HTMLToPDFConverter` por petición.
+- shared: el convertidor compartido del proceso (`get_html_to_pdf_converter`).
+
+Uso:
+    python benchmarks/pdf_rendering.py --renders 30
+    python benchmarks/pdf_rendering.py --template attendance_list --renders 10
+"""
+
+import argparse
+import base64
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jinja2  # noqa: E402
+import weasyprint  # noqa: E402
+from weasyprint.text.fonts import FontConfiguration  # noqa: E402
+
+from app.services import html_to_pdf  # noqa: E402
+
+
+def certificate_context(i: int, logo_key: str, logo_value: str) -> dict:
+    return {
+        "certificate": SimpleNamespace(
+            certificate_number=f"CERT-{i:06d}",
+            verification_code=f"VER{i:08d}",
+            score_achieved=92.5,
+        ),
+        "user": SimpleNamespace(full_name=f"Trabajador de Prueba {i}"),
+        "course": SimpleNamespace(title="Inducción en Seguridad y Salud en el Trabajo"),
+        "issue_date": datetime.now().strftime("%d de %B de %Y"),
+        logo_key: logo_value,
+    }
+
+
+def attendance_list_context(i: int, logo_key: str, logo_value: str) -> dict:
+    now = datetime.now()
+    return {
+        "session": {
+            "title": f"Sesión {i}",
+            "session_date": now.strftime("%d/%m/%Y"),
+            "course_title": "Trabajo seguro en alturas",
+            "location": "Sala de capacitación",
+            "duration": "2 horas",
+            "attendance_percentage": 100,
+        },
+        "attendees": [
+            {
+                "name": f"Asistente {n}",
+                "document": f"{10000000 + n}",
+                "position": "Operario",
+                "area": "Producción",
+            }
+            for n in range(40)
+        ],
+        "generation_date": now.strftime("%d/%m/%Y"),
+        "generation_time": now.strftime("%H:%M:%S"),
+        logo_key: logo_value,
+    }
+
+
+TEMPLATES = {
+    "certificate": ("certificate.html", "certificate.css", certificate_context),
+    "attendance_list": ("attendance_list.html", "attendance_list.css", attendance_list_context),
+}
+
+
+def render_baseline(template_dir: str, template: str, css_file: str, build_context, i: int) -> bytes:
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_dir),
+        autoescape=jinja2.select_autoescape(["html", "xml"]),
+    )
+    font_config = FontConfiguration()
+    with open(os.path.join(template_dir, html_to_pdf.DEFAULT_LOGO_FILENAME), "rb") as logo:
+        logo_base64 = base64.b64encode(logo.read()).decode("utf-8")
+    html = env.get_template(template).render(**build_context(i, "logo_base64", logo_base64))
+    css = weasyprint.CSS(filename=os.path.join(template_dir, "css", css_file), font_config=font_config)
+    document = weasyprint.HTML(string=html, base_url=template_dir + os.sep)
+    return document.write_pdf(stylesheets=[css], font_config=font_config)
+
+
+def render_shared(template: str, css_file: str, build_context, i: int) -> bytes:
+    converter = html_to_pdf.get_html_to_pdf_converter()
+    html = converter.render_template(template, build_context(i, "logo_url", converter.logo_url()))
+    return converter.generate_pdf(html, [css_file])
+
+
+def run(label: str, renders: int, render) -> list:
+    timings = []
+    size = 0
+    for i in range(renders):
+        start = time.perf_counter()
+        size = len(render(i))
+        timings.append((time.perf_counter() - start) * 1000)
+    print(
+        f"{label:<10} n={renders:<4} "
+        f"p50={statistics.median(timings):8.1f} ms  "
+        f"p95={sorted(timings)[int(len(timings) * 0.95) - 1]:8.1f} ms  "
+        f"total={sum(timings) / 1000:7.2f} s  "
+        f"pdf={size / 1024:.1f} KiB"
+    )
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--template", choices=sorted(TEMPLATES), default="certificate")
+    parser.add_argument("--renders", type=int, default=20)
+    args = parser.parse_args()
+
+    template, css_file, build_context = TEMPLATES[args.template]
+    template_dir = html_to_pdf._default_template_dir()
+
+    baseline = run(
+        "baseline",
+        args.renders,
+        lambda i: render_baseline(template_dir, template, css_file, build_context, i),
+    )
+    # La primera llamada del convertidor compartido paga el calentamiento (fuentes, CSS).
+    shared = run("shared", args.renders, lambda i: render_shared(template, css_file, build_context, i))
+
+    speedup = statistics.median(baseline) / statistics.median(shared)
+    print(f"speedup p50: x{speedup:.2f}")
+
+
+if __name__ == "__main__":
+    main()
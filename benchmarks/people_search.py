@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la búsqueda de personas (autocompletado de trabajadores).
+
+Crea una tabla temporal con la misma columna generada `search_text` y los
+mismos índices que `workers` (pg_trgm + text_pattern_ops), la llena con
+trabajadores sintéticos y compara, con LIMIT 10:
+
+- el filtro anterior, `ILIKE '%term%'` sobre nombre, apellido, documento y
+  correo (recorrido secuencial);
+- `typeahead_query` de app/services/people_search.py (la consulta de
+  `find_workers`).
+
+Requiere DATABASE_URL apuntando a un PostgreSQL con la migración
+e5a6b7c8d9f0 aplicada (extensiones pg_trgm/unaccent y `f_unaccent`). La
+tabla es TEMP: desaparece al cerrar la conexión y no toca datos reales.
+
+Uso:
+    python benchmarks/people_search.py --rows 100000 --repeat 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import Column, Integer, Text, or_, select, text  # noqa: E402
+from sqlalchemy.orm import declarative_base  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.services.people_search import typeahead_query  # noqa: E402
+
+FIRST_NAMES = (
+    "María", "José", "Luis", "Ana", "Carlos", "Sofía", "Andrés", "Valentina", "Juan", "Camila",
+    "Jesús", "Lucía", "Julián", "Mónica", "Sebastián", "Ángela", "Héctor", "Daniela", "Óscar", "Paula",
+)
+LAST_NAMES = (
+    "Gómez", "Rodríguez", "Martínez", "Pérez", "García", "López", "Hernández", "Sánchez", "Ramírez", "Díaz",
+    "Muñoz", "Castaño", "Ospina", "Zuluaga", "Quintero", "Londoño", "Peña", "Rincón", "Álvarez", "Giraldo",
+)
+TERMS = ("mar", "maria gom", "Gómez", "peña rin", "10000457", "1.000.045", "persona1234@")
+
+BenchBase = declarative_base()
+
+
+class BenchPerson(BenchBase):
+    __tablename__ = "bench_people"
+
+    id = Column(Integer, primary_key=True)
+    first_name = Column(Text)
+    last_name = Column(Text)
+    document_number = Column(Text)
+    email = Column(Text)
+    search_text = Column(Text)
+
+
+def _sql_array(values) -> str:
+    return "ARRAY[" + ", ".join("'" + value.replace("'", "''") + "'" for value in values) + "]"
+
+
+def seed(conn, rows: int) -> None:
+    conn.execute(text(
+        """
+        CREATE TEMP TABLE bench_people (
+            id serial PRIMARY KEY,
+            first_name text NOT NULL,
+            last_name text NOT NULL,
+            document_number text NOT NULL,
+            email text NOT NULL,
+            search_text text GENERATED ALWAYS AS (
+                f_unaccent(lower(first_name || ' ' || last_name || ' ' || document_number || ' ' || email))
+            ) STORED
+        )
+        """
+    ))
+    conn.execute(text("SELECT setseed(0.42)"))
+    first, last = _sql_array(FIRST_NAMES), _sql_array(LAST_NAMES)
+    conn.execute(text(
+        f"""
+        INSERT INTO bench_people (first_name, last_name, document_number, email)
+        SELECT
+            ({first})[1 + floor(random() * {len(FIRST_NAMES)})::int] || ' ' ||
+                ({first})[1 + floor(random() * {len(FIRST_NAMES)})::int],
+            ({last})[1 + floor(random() * {len(LAST_NAMES)})::int] || ' ' ||
+                ({last})[1 + floor(random() * {len(LAST_NAMES)})::int],
+            (1000000000 + i)::text,
+            'persona' || i || '@empresa.com.co'
+        FROM generate_series(1, :rows) AS i
+        """
+    ), {"rows": rows})
+    conn.execute(text("CREATE INDEX ON bench_people USING gin (search_text gin_trgm_ops)"))
+    conn.execute(text("CREATE INDEX ON bench_people (document_number text_pattern_ops)"))
+    conn.execute(text("ANALYZE bench_people"))
+
+
+def ilike_query(term: str):
+    pattern = f"%{term}%"
+    return select(BenchPerson).where(
+        or_(
+            BenchPerson.first_name.ilike(pattern),
+            BenchPerson.last_name.ilike(pattern),
+            BenchPerson.document_number.ilike(pattern),
+            BenchPerson.email.ilike(pattern),
+        )
+    ).limit(10)
+
+
+def trigram_query(term: str):
+    return typeahead_query(BenchPerson, term, 10)
+
+
+def measure(conn, statement, repeat: int):
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(conn.execute(statement).all())
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    return statistics.median(timings), p95, rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--budget-ms", type=float, default=20.0, help="Objetivo de p95 para el autocompletado")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("Este benchmark requiere PostgreSQL (DATABASE_URL)")
+
+    with engine.connect() as conn:
+        start = time.perf_counter()
+        seed(conn, args.rows)
+        print(f"{args.rows} trabajadores sintéticos en {time.perf_counter() - start:.1f} s\n")
+
+        print(f"{'término':<16} {'consulta':<9} {'p50 ms':>8} {'p95 ms':>8} {'filas':>6}")
+        over_budget = []
+        for term in TERMS:
+            for label, build in (("ilike", ilike_query), ("trigram", trigram_query)):
+                p50, p95, rows = measure(conn, build(term), args.repeat)
+                print(f"{term:<16} {label:<9} {p50:8.2f} {p95:8.2f} {rows:>6}")
+                if label == "trigram" and p95 > args.budget_ms:
+                    over_budget.append(term)
+        conn.rollback()
+
+    if over_budget:
+        print(f"\np95 por encima de {args.budget_ms:.0f} ms: {', '.join(over_budget)}")
+        sys.exit(1)
+    print(f"\ntodas las búsquedas por debajo de {args.budget_ms:.0f} ms (p95)")
+
+
+if __name__ == "__main__":
+    main()
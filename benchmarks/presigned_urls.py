@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la firma de URLs para los listados de materiales de un curso.
+
+Levanta en proceso un servidor HTTP compatible con S3 (HEAD/GET/PUT de
+objetos con direccionamiento por ruta, sin validar firmas) que agrega
+`--latency-ms` a cada petición, como el almacenamiento de Contabo visto
+desde la API. Sube `--materials` objetos y simula `--views` vistas del
+listado de un módulo con:
+
+- `legacy`: HEAD + firma por material, como hacía `get_presigned_url`;
+- `per-item`: `get_presigned_url` con la caché de URLs firmadas;
+- `batch`: `get_presigned_urls`, verificaciones de claves nuevas en paralelo.
+
+Reporta ms de la primera vista y de las siguientes, y las peticiones que
+llegaron al almacenamiento.
+
+Uso:
+    python benchmarks/presigned_urls.py --materials 40 --views 20 --latency-ms 30
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BUCKET = "bench-materials"
+
+
+class S3StandIn(BaseHTTPRequestHandler):
+    objects: dict = {}
+    latency = 0.0
+    requests = 0
+    lock = threading.Lock()
+
+    def _object(self):
+        with self.lock:
+            S3StandIn.requests += 1
+        time.sleep(self.latency)
+        key = self.path.split("?", 1)[0].lstrip("/")
+        return key, self.objects.get(key)
+
+    def do_HEAD(self):
+        _, body = self._object()
+        self.send_response(200 if body is not None else 404)
+        self.send_header("Content-Length", str(len(body or b"")))
+        self.end_headers()
+
+    def do_GET(self):
+        _, body = self._object()
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        key, _ = self._object()
+        self.objects[key] = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--materials", type=int, default=40, help="Materiales en el módulo")
+    parser.add_argument("--views", type=int, default=20, help="Vistas del listado")
+    parser.add_argument("--latency-ms", type=float, default=30.0, help="Latencia del almacenamiento por petición")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), S3StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Las variables se fijan antes de importar la app para que los servicios
+    # de almacenamiento apunten al servidor local.
+    os.environ.update(
+        {
+            "CONTABO_ENDPOINT_URL": endpoint,
+            "CONTABO_ACCESS_KEY_ID": "bench",
+            "CONTABO_SECRET_ACCESS_KEY": "bench",
+            "CONTABO_BUCKET_NAME": BUCKET,
+            "CONTABO_REGION": "us-east-1",
+        }
+    )
+    # S3StorageService se instancia al importar el módulo y exige sus variables.
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "S3_BUCKET_NAME", "AWS_REGION"):
+        os.environ.setdefault(name, "bench")
+    import boto3
+    from botocore.config import Config
+
+    from app.services.s3_storage import ContaboStorageService
+
+    def new_service() -> ContaboStorageService:
+        service = ContaboStorageService()
+        service._client = boto3.client(
+            "s3",
+            **service._client_kwargs(),
+            config=Config(s3={"addressing_style": "path"}),
+        )
+        return service
+
+    keys = [f"courses/bench/module-1/material-{i}.pdf" for i in range(args.materials)]
+    uploader = new_service()
+    for key in keys:
+        uploader.upload_bytes(b"%PDF-1.4 benchmark", key, "application/pdf", public=False)
+    S3StandIn.latency = args.latency_ms / 1000
+
+    def legacy_listing(service: ContaboStorageService) -> list:
+        urls = []
+        for key in keys:
+            service.s3_client.head_object(Bucket=BUCKET, Key=key)
+            urls.append(
+                service.s3_client.generate_presigned_url(
+                    "get_object",
+                    Params={"Bucket": BUCKET, "Key": key, "ResponseContentDisposition": "inline"},
+                    ExpiresIn=3600,
+                )
+            )
+        return urls
+
+    def per_item_listing(service: ContaboStorageService) -> list:
+        return [service.get_presigned_url(key, expiration=3600) for key in keys]
+
+    def batch_listing(service: ContaboStorageService) -> list:
+        return list(service.get_presigned_urls(keys, expiration=3600).values())
+
+    print(
+        f"{args.materials} materiales, {args.views} vistas del listado, "
+        f"{args.latency_ms:g} ms por petición al almacenamiento\n"
+    )
+    print(f"{'ruta':<9} {'1ª vista ms':>12} {'siguientes ms':>14} {'peticiones':>11}")
+    for label, listing in (("legacy", legacy_listing), ("per-item", per_item_listing), ("batch", batch_listing)):
+        service = new_service()
+        S3StandIn.requests = 0
+        timings = []
+        for _ in range(args.views):
+            start = time.perf_counter()
+            urls = listing(service)
+            timings.append((time.perf_counter() - start) * 1000)
+        assert all(urls), f"{label}: URLs sin firmar"
+        requests = S3StandIn.requests
+        later = statistics.median(timings[1:]) if len(timings) > 1 else 0.0
+        print(f"{label:<9} {timings[0]:12.1f} {later:14.2f} {requests:>11}")
+
+    with urllib.request.urlopen(urls[0]) as response:
+        assert response.status == 200
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
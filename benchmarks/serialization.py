@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialización y compresión de respuestas JSON.
+
+Para payloads representativos (listado de trabajadores, resultados de
+evaluaciones, auditoría) compara:
+
+- `json.dumps` de la stdlib (lo que hace `JSONResponse`) frente a `orjson.dumps`
+  (`ORJSONResponse`) y a NDJSON con orjson;
+- el tamaño del cuerpo sin comprimir, con gzip (nivel 6) y con Brotli
+  (calidad 4), y el tiempo de compresión de cada uno.
+
+Los payloads son diccionarios ya convertidos a tipos JSON, como los deja
+FastAPI tras validar el `response_model`; no requiere base de datos.
+
+Uso:
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --rows 5000 --repeat 20
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+import brotli
+import orjson
+
+RISK_LEVELS = ("riesgo_1", "riesgo_2", "riesgo_3", "riesgo_4", "riesgo_5")
+POSITIONS = ("Operario de producción", "Auxiliar administrativo", "Conductor", "Técnico de mantenimiento", "Analista SST")
+AREAS = ("Producción", "Logística", "Administración", "Mantenimiento", "Calidad")
+ACTIONS = ("create", "update", "delete", "login", "view", "download")
+
+
+def worker_rows(n: int) -> List[Dict]:
+    rng = random.Random(1)
+    rows = []
+    for i in range(n):
+        first, last = f"Nombre{i}", f"Apellido{i % 97} Pérez"
+        rows.append({
+            "id": i + 1,
+            "first_name": first,
+            "last_name": last,
+            "full_name": f"{first} {last}",
+            "document_number": str(1_000_000_000 + i),
+            "email": f"trabajador{i}@empresa.com.co",
+            "position": rng.choice(POSITIONS),
+            "cargo_id": rng.randint(1, 40),
+            "department": rng.choice(AREAS),
+            "direccion": f"Calle {rng.randint(1, 200)} # {rng.randint(1, 99)}-{rng.randint(1, 99)}",
+            "age": rng.randint(18, 65),
+            "risk_level": rng.choice(RISK_LEVELS),
+            "fecha_de_ingreso": (date(2015, 1, 1) + timedelta(days=rng.randint(0, 3650))).isoformat(),
+            "is_active": rng.random() > 0.1,
+            "assigned_role": "employee",
+            "is_registered": rng.random() > 0.3,
+            "user_id": i + 10 if rng.random() > 0.3 else None,
+            "photo": None,
+            "area_id": rng.randint(1, 5),
+            "area_name": rng.choice(AREAS),
+            "cedula": None,
+            "base_salary": round(rng.uniform(1_300_000, 6_000_000), 2),
+        })
+    return rows
+
+
+def evaluation_rows(n: int) -> List[Dict]:
+    rng = random.Random(2)
+    start = datetime(2026, 1, 1, 8, 0)
+    rows = []
+    for i in range(n):
+        started = start + timedelta(minutes=rng.randint(0, 400_000))
+        percentage = round(rng.uniform(30, 100), 2)
+        rows.append({
+            "id": i + 1,
+            "user_id": rng.randint(1, 2000),
+            "email": f"trabajador{i}@empresa.com.co",
+            "full_name": f"Nombre{i} Apellido{i % 97}",
+            "user_email": f"trabajador{i}@empresa.com.co",
+            "evaluation_id": rng.randint(1, 60),
+            "evaluation_title": f"Evaluación de inducción SST módulo {rng.randint(1, 12)}",
+            "course_title": "Inducción en Seguridad y Salud en el Trabajo",
+            "attempt_number": rng.randint(1, 3),
+            "status": "completed",
+            "score": percentage,
+            "total_points": percentage / 10,
+            "max_points": 10.0,
+            "percentage": percentage,
+            "time_spent_minutes": rng.randint(3, 60),
+            "passed": percentage >= 70,
+            "started_at": started.isoformat(),
+            "completed_at": (started + timedelta(minutes=20)).isoformat(),
+            "created_at": started.isoformat(),
+        })
+    return rows
+
+
+def audit_rows(n: int) -> List[Dict]:
+    rng = random.Random(3)
+    start = datetime(2026, 1, 1)
+    return [
+        {
+            "id": i + 1,
+            "action": rng.choice(ACTIONS),
+            "resource_type": rng.choice(("worker", "course", "enrollment", "certificate")),
+            "resource_id": rng.randint(1, 5000),
+            "resource_name": f"Recurso {rng.randint(1, 5000)}",
+            "details": "Actualización de datos del trabajador desde el módulo administrativo",
+            "ip_address": f"10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}",
+            "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/129.0",
+            "user_id": rng.randint(1, 200),
+            "created_at": (start + timedelta(seconds=rng.randint(0, 20_000_000))).isoformat(),
+            "user_name": f"Usuario {rng.randint(1, 200)}",
+            "user_email": f"usuario{rng.randint(1, 200)}@empresa.com.co",
+        }
+        for i in range(n)
+    ]
+
+
+def stdlib_json(payload) -> bytes:
+    # Mismas opciones que starlette.responses.JSONResponse.render
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_dumps(payload) -> bytes:
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+
+
+def ndjson(payload) -> bytes:
+    return b"".join(orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in payload["items"])
+
+
+def timed(fn: Callable, arg, repeat: int):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000, help="Filas por payload (por defecto el máximo de get_workers)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    payloads = {
+        "workers": {"items": worker_rows(args.rows)},
+        "evaluation_results": {"items": evaluation_rows(args.rows), "total": args.rows},
+        "audit_logs": {"items": audit_rows(args.rows), "total": args.rows},
+    }
+
+    print(f"filas por payload: {args.rows}  (mejor de {args.repeat} repeticiones)\n")
+    print(f"{'payload':<20} {'serializador':<12} {'ms':>8} {'x stdlib':>9}")
+    for name, payload in payloads.items():
+        base_ms = None
+        for label, fn in (("json", stdlib_json), ("orjson", orjson_dumps), ("ndjson", ndjson)):
+            _, ms = timed(fn, payload, args.repeat)
+            base_ms = base_ms or ms
+            print(f"{name:<20} {label:<12} {ms:8.2f} {base_ms / ms:8.1f}x")
+
+    print(f"\n{'payload':<20} {'codificación':<12} {'bytes':>10} {'ratio':>7} {'ms':>8}")
+    for name, payload in payloads.items():
+        body = orjson_dumps(payload)
+        print(f"{name:<20} {'identity':<12} {len(body):>10} {1:>7.2f} {0:>8.2f}")
+        encoders = (
+            ("gzip-6", lambda data: gzip.compress(data, compresslevel=6)),
+            ("br-4", lambda data: brotli.compress(data, mode=brotli.MODE_TEXT, quality=4)),
+        )
+        for label, fn in encoders:
+            compressed, ms = timed(fn, body, args.repeat)
+            print(f"{name:<20} {label:<12} {len(compressed):>10} {len(body) / len(compressed):>7.2f} {ms:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío de la API, con presupuesto.
+
+Mide en subprocesos limpios el tiempo de `import app.main` (routers, modelos
+y servicios incluidos) y comprueba que las librerías pesadas que se cargan
+bajo demanda (WeasyPrint, pandas, openpyxl, boto3, PIL, qrcode) no quedan
+importadas al terminar el arranque.
+
+Sale con código 1 si la mediana supera el presupuesto o si alguna librería
+pesada se importa en el arranque, de modo que sirve como comprobación local
+antes de abrir un PR.
+
+Uso:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --runs 7 --budget-ms 2500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "3000"))
+
+# Paquetes que solo deben cargarse en los endpoints que los usan.
+LAZY_MODULES = ("weasyprint", "pandas", "openpyxl", "boto3", "botocore", "PIL", "qrcode")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - start) * 1000
+lazy = {lazy!r}
+loaded = sorted(name for name in lazy if name in sys.modules)
+print(json.dumps({{"elapsed_ms": elapsed_ms, "loaded": loaded}}))
+"""
+
+
+def measure(module: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./benchmark_placeholder.db")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, lazy=LAZY_MODULES)],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(f"La importación de {module} falló (código {result.returncode})")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    # La primera ejecución compila los .pyc y calienta la caché del sistema de archivos.
+    measure(args.module)
+    samples = [measure(args.module) for _ in range(args.runs)]
+    timings = [s["elapsed_ms"] for s in samples]
+    loaded = sorted({name for s in samples for name in s["loaded"]})
+
+    p50 = statistics.median(timings)
+    print(
+        f"import {args.module}  n={args.runs}  "
+        f"p50={p50:7.1f} ms  min={min(timings):7.1f} ms  max={max(timings):7.1f} ms  "
+        f"presupuesto={args.budget_ms:.0f} ms"
+    )
+
+    failed = False
+    if p50 > args.budget_ms:
+        print(f"FALLO: el arranque supera el presupuesto en {p50 - args.budget_ms:.1f} ms")
+        failed = True
+    if loaded:
+        print(f"FALLO: librerías pesadas importadas en el arranque: {', '.join(loaded)}")
+        print("       ejecuta `make profile-imports` para ver quién las importa")
+        failed = True
+    if failed:
+        raise SystemExit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
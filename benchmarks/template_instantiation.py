@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la creación de planes desde plantilla para toda la empresa.
+
+Por cada empresa simulada crea el Plan de Trabajo Anual, el Programa de
+Capacitaciones y el Presupuesto SST desde sus plantillas, de dos formas:
+
+- `legacy`: la ruta anterior, un flush por actividad (o categoría e ítem) y
+  los seguimientos mensuales fila a fila;
+- `bulk`: `instantiate` de app/services/template_instantiation.py, un INSERT
+  multi-fila por modelo y nivel del árbol.
+
+Reporta tiempo total, tiempo por empresa y sentencias enviadas a la base de
+datos. Todo corre en una transacción que se revierte al final: no quedan
+datos.
+
+Uso:
+    python benchmarks/template_instantiation.py --companies 20
+"""
+
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.models.plan_trabajo_anual import (  # noqa: E402
+    CategoriaActividad, CicloPhva, PlanTrabajoActividad, PlanTrabajoAnual, PlanTrabajoSeguimiento,
+)
+from app.models.presupuesto_sst import (  # noqa: E402
+    PresupuestoCategoria, PresupuestoItem, PresupuestoMensual, PresupuestoSST,
+)
+from app.models.programa_capacitaciones import (  # noqa: E402
+    CapacitacionActividad, CapacitacionSeguimiento, ProgramaCapacitaciones,
+)
+from app.services import capacitacion_template, plan_trabajo_template, presupuesto_template  # noqa: E402
+from app.services.template_instantiation import instantiate  # noqa: E402
+
+
+def legacy_company(db: Session, año: int) -> None:
+    plan = PlanTrabajoAnual(año=año)
+    db.add(plan)
+    db.flush()
+    for act_data in plan_trabajo_template.get_plantilla_actividades(año):
+        meses = act_data.pop("meses_programados", [])
+        actividad = PlanTrabajoActividad(
+            plan_id=plan.id,
+            ciclo=CicloPhva(act_data["ciclo"]),
+            categoria=CategoriaActividad(act_data["categoria"]),
+            estandar=act_data.get("estandar"),
+            descripcion=act_data["descripcion"],
+            frecuencia=act_data.get("frecuencia"),
+            responsable=act_data.get("responsable"),
+            recurso_financiero=act_data.get("recurso_financiero", False),
+            recurso_tecnico=act_data.get("recurso_tecnico", False),
+            costo=act_data.get("costo"),
+            orden=act_data.get("orden", 0),
+        )
+        db.add(actividad)
+        db.flush()
+        for mes in range(1, 13):
+            db.add(PlanTrabajoSeguimiento(actividad_id=actividad.id, mes=mes, programada=mes in meses, ejecutada=False))
+
+    programa = ProgramaCapacitaciones(año=año)
+    db.add(programa)
+    db.flush()
+    for act_data in capacitacion_template.get_plantilla_actividades(año):
+        meses = act_data.pop("meses_programados", [])
+        actividad = CapacitacionActividad(programa_id=programa.id, **act_data)
+        db.add(actividad)
+        db.flush()
+        for mes in range(1, 13):
+            db.add(CapacitacionSeguimiento(actividad_id=actividad.id, mes=mes, programada=mes in meses, ejecutada=False))
+
+    presupuesto = PresupuestoSST(año=año)
+    db.add(presupuesto)
+    db.flush()
+    for orden_cat, cat_str in enumerate(presupuesto_template.CATEGORIAS_ORDER):
+        categoria = PresupuestoCategoria(presupuesto_id=presupuesto.id, categoria=cat_str, orden=orden_cat)
+        db.add(categoria)
+        db.flush()
+        for orden_item, nombre in enumerate(presupuesto_template.get_default_items(cat_str)):
+            item = PresupuestoItem(categoria_id=categoria.id, actividad=nombre, es_default=True, orden=orden_item)
+            db.add(item)
+            db.flush()
+            for mes in range(1, 13):
+                db.add(PresupuestoMensual(item_id=item.id, mes=mes, proyectado=Decimal("0"), ejecutado=Decimal("0")))
+    db.flush()
+
+
+def bulk_company(db: Session, año: int) -> None:
+    plan = PlanTrabajoAnual(año=año)
+    programa = ProgramaCapacitaciones(año=año)
+    presupuesto = PresupuestoSST(año=año)
+    db.add_all([plan, programa, presupuesto])
+    db.flush()
+    instantiate(db, plan_trabajo_template.get_plantilla_filas(año), parent_id=plan.id)
+    instantiate(db, capacitacion_template.get_plantilla_filas(año), parent_id=programa.id)
+    instantiate(db, presupuesto_template.get_plantilla_filas(), parent_id=presupuesto.id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--companies", type=int, default=20)
+    parser.add_argument("--year", type=int, default=2099, help="Año de los planes de prueba")
+    args = parser.parse_args()
+
+    statements = 0
+
+    def count_statement(*_):
+        nonlocal statements
+        statements += 1
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        event.listen(conn, "before_cursor_execute", count_statement)
+        try:
+            print(f"{args.companies} empresas: plan anual + programa de capacitaciones + presupuesto\n")
+            print(f"{'ruta':<8} {'total s':>8} {'ms/empresa':>11} {'sentencias':>11}")
+            for label, create in (("legacy", legacy_company), ("bulk", bulk_company)):
+                with Session(bind=conn, join_transaction_mode="create_savepoint") as db:
+                    statements = 0
+                    start = time.perf_counter()
+                    for _ in range(args.companies):
+                        create(db, args.year)
+                    elapsed = time.perf_counter() - start
+                print(
+                    f"{label:<8} {elapsed:8.2f} {elapsed * 1000 / args.companies:11.1f} "
+                    f"{statements:>11}"
+                )
+        finally:
+            event.remove(conn, "before_cursor_execute", count_statement)
+            transaction.rollback()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia del registro de votos de candidatos.
+
+Crea votantes sintéticos, una votación con `max_votes_per_user = 1` y usa
+como candidatos trabajadores ya existentes. Cada votante envía a la vez dos
+votos por candidatos distintos, así que una sola de las dos peticiones debe
+aceptarse. Se comparan:
+
+- `legacy`: la ruta anterior (comprobaciones con SELECT, INSERT y commit; los
+  resultados se recuentan sobre `candidate_votes`);
+- `ingest`: `cast_candidate_vote` de app/services/vote_ingestion.py (una
+  sentencia con ON CONFLICT y contadores por candidato).
+
+Reporta votos por segundo, latencias p50/p95, votantes con más votos de los
+permitidos y si la suma de los contadores coincide con los votos guardados.
+
+Requiere DATABASE_URL apuntando a un PostgreSQL con la migración f6b7c8d9e0a1
+aplicada y al menos dos trabajadores. Los datos creados se borran al final.
+
+Uso:
+    python benchmarks/vote_ingestion.py --voters 2000 --concurrency 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, func  # noqa: E402
+from sqlalchemy.exc import IntegrityError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.models.candidate_voting import (  # noqa: E402
+    CandidateVote,
+    CandidateVoteTally,
+    CandidateVoting,
+    CandidateVotingBallot,
+    CandidateVotingCandidate,
+    CandidateVotingStatus,
+)
+from app.models.user import User  # noqa: E402
+from app.models.worker import Worker  # noqa: E402
+from app.services.vote_ingestion import VoteOutcome, candidate_tallies, cast_candidate_vote  # noqa: E402
+
+
+def legacy_cast(db, voting_id: int, candidate_id: int, voter_id: int) -> bool:
+    """Ruta anterior de `cast_vote`: comprobaciones y luego INSERT."""
+    voting = db.query(CandidateVoting).filter(CandidateVoting.id == voting_id).first()
+    now = datetime.utcnow()
+    if voting.status != CandidateVotingStatus.ACTIVE.value or not voting.start_date <= now <= voting.end_date:
+        return False
+    candidate = db.query(CandidateVotingCandidate).filter(
+        CandidateVotingCandidate.id == candidate_id,
+        CandidateVotingCandidate.voting_id == voting_id,
+        CandidateVotingCandidate.is_active == True,
+    ).first()
+    if not candidate:
+        return False
+    user_votes = db.query(CandidateVote).filter(
+        CandidateVote.voting_id == voting_id, CandidateVote.voter_id == voter_id
+    ).count()
+    if user_votes >= voting.max_votes_per_user:
+        return False
+    existing = db.query(CandidateVote).filter(
+        CandidateVote.voting_id == voting_id,
+        CandidateVote.candidate_id == candidate_id,
+        CandidateVote.voter_id == voter_id,
+    ).first()
+    if existing:
+        return False
+    db.add(CandidateVote(voting_id=voting_id, candidate_id=candidate_id, voter_id=voter_id))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+    return True
+
+
+def ingest_cast(db, voting_id: int, candidate_id: int, voter_id: int) -> bool:
+    result = cast_candidate_vote(
+        db, voting_id, candidate_id, voter_id, active_status=CandidateVotingStatus.ACTIVE.value
+    )
+    return result.outcome == VoteOutcome.ACCEPTED
+
+
+def seed(Session, voters: int, candidates: int, tag: str):
+    with Session() as db:
+        worker_ids = [row.id for row in db.query(Worker.id).order_by(Worker.id).limit(candidates)]
+        if len(worker_ids) < 2:
+            sys.exit("Se necesitan al menos dos trabajadores para usarlos como candidatos")
+        users = [
+            User(
+                email=f"bench-vote-{tag}-{i}@example.invalid",
+                hashed_password="!",
+                first_name="Votante",
+                last_name=f"Benchmark {i}",
+                document_type="CC",
+                document_number=f"BV{tag}{i}",
+            )
+            for i in range(voters)
+        ]
+        db.add_all(users)
+        db.flush()
+        voter_ids = [user.id for user in users]
+
+        now = datetime.utcnow()
+        votings = {}
+        for mode in ("legacy", "ingest"):
+            voting = CandidateVoting(
+                title=f"Benchmark votos {tag} {mode}",
+                committee_type="BENCHMARK",
+                status=CandidateVotingStatus.ACTIVE.value,
+                start_date=now - timedelta(hours=1),
+                end_date=now + timedelta(hours=1),
+                max_votes_per_user=1,
+                created_by=voter_ids[0],
+                candidates=[CandidateVotingCandidate(worker_id=worker_id) for worker_id in worker_ids],
+            )
+            db.add(voting)
+            db.flush()
+            votings[mode] = (voting.id, [candidate.id for candidate in voting.candidates])
+        db.commit()
+    return voter_ids, votings
+
+
+def cleanup(Session, voter_ids, votings) -> None:
+    voting_ids = [voting_id for voting_id, _ in votings.values()]
+    with Session() as db:
+        db.query(CandidateVote).filter(CandidateVote.voting_id.in_(voting_ids)).delete(synchronize_session=False)
+        db.query(CandidateVoteTally).filter(CandidateVoteTally.voting_id.in_(voting_ids)).delete(
+            synchronize_session=False
+        )
+        db.query(CandidateVotingBallot).filter(CandidateVotingBallot.voting_id.in_(voting_ids)).delete(
+            synchronize_session=False
+        )
+        db.query(CandidateVotingCandidate).filter(CandidateVotingCandidate.voting_id.in_(voting_ids)).delete(
+            synchronize_session=False
+        )
+        db.query(CandidateVoting).filter(CandidateVoting.id.in_(voting_ids)).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(voter_ids)).delete(synchronize_session=False)
+        db.commit()
+
+
+def run(Session, cast, voting_id, candidate_ids, voter_ids, concurrency: int):
+    # Dos votos simultáneos por votante, por candidatos distintos
+    requests = []
+    for i, voter_id in enumerate(voter_ids):
+        first = candidate_ids[i % len(candidate_ids)]
+        second = candidate_ids[(i + 1) % len(candidate_ids)]
+        requests += [(voter_id, first), (voter_id, second)]
+
+    def one(request):
+        voter_id, candidate_id = request
+        start = time.perf_counter()
+        with Session() as db:
+            try:
+                accepted = cast(db, voting_id, candidate_id, voter_id)
+                error = False
+            except Exception:
+                accepted, error = False, True
+        return accepted, error, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, requests))
+    elapsed = time.perf_counter() - start
+
+    timings = sorted(ms for _, _, ms in results)
+    with Session() as db:
+        stored = db.query(func.count(CandidateVote.id)).filter(CandidateVote.voting_id == voting_id).scalar()
+        double_voters = (
+            db.query(CandidateVote.voter_id)
+            .filter(CandidateVote.voting_id == voting_id)
+            .group_by(CandidateVote.voter_id)
+            .having(func.count() > 1)
+            .count()
+        )
+        tallied = sum(candidate_tallies(db, voting_id).values())
+    return {
+        "votes_per_second": len(requests) / elapsed,
+        "p50": statistics.median(timings),
+        "p95": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "accepted": sum(1 for accepted, _, _ in results if accepted),
+        "errors": sum(1 for _, error, _ in results if error),
+        "stored": stored,
+        "double_voters": double_voters,
+        "tallied": tallied,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--voters", type=int, default=2000)
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    bench_engine = create_engine(settings.database_url, pool_size=args.concurrency, max_overflow=0)
+    if bench_engine.dialect.name != "postgresql":
+        sys.exit("Este benchmark requiere PostgreSQL (DATABASE_URL)")
+    Session = sessionmaker(bind=bench_engine, autoflush=False)
+
+    tag = uuid.uuid4().hex[:8]
+    voter_ids, votings = seed(Session, args.voters, args.candidates, tag)
+    failed = False
+    try:
+        print(
+            f"{args.voters} votantes x 2 votos simultáneos, {args.concurrency} conexiones, "
+            f"{len(votings['ingest'][1])} candidatos\n"
+        )
+        print(
+            f"{'ruta':<8} {'votos/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'aceptados':>10} "
+            f"{'errores':>8} {'dobles':>7} {'contadores':>11}"
+        )
+        for mode, cast in (("legacy", legacy_cast), ("ingest", ingest_cast)):
+            voting_id, candidate_ids = votings[mode]
+            stats = run(Session, cast, voting_id, candidate_ids, voter_ids, args.concurrency)
+            # La ruta anterior no mantiene contadores: sus resultados se recuentan
+            tallies_ok = mode == "legacy" or stats["tallied"] == stats["stored"]
+            print(
+                f"{mode:<8} {stats['votes_per_second']:9.0f} {stats['p50']:8.2f} {stats['p95']:8.2f} "
+                f"{stats['accepted']:>10} {stats['errors']:>8} {stats['double_voters']:>7} "
+                f"{'-' if mode == 'legacy' else ('ok' if tallies_ok else 'DESCUADRE'):>11}"
+            )
+            if mode == "ingest" and (stats["double_voters"] or stats["errors"] or not tallies_ok):
+                failed = True
+    finally:
+        cleanup(Session, voter_ids, votings)
+        bench_engine.dispose()
+
+    if failed:
+        sys.exit("\nla ruta nueva aceptó votos de más o sus contadores no cuadran")
+    print("\nsin votos dobles y con los contadores cuadrados en la ruta nueva")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,3 +21,13 @@ def pytest_configure(config):
     # Garantizar que DATABASE_URL exista para que config.py no falle al importar
     if not os.getenv("DATABASE_URL"):
         os.environ.setdefault("DATABASE_URL", "sqlite:///./test_placeholder.db")
+
+    # s3_storage instancia S3StorageService al importarse y exige sus variables;
+    # los tests no llegan al almacenamiento (app.utils.storage, image_derivatives)
+    for name, value in (
+        ("AWS_ACCESS_KEY_ID", "test"),
+        ("AWS_SECRET_ACCESS_KEY", "test"),
+        ("S3_BUCKET_NAME", "test"),
+        ("AWS_REGION", "us-east-1"),
+    ):
+        os.environ.setdefault(name, value)
@@ -0,0 +1,93 @@
+"""
+Tests de la caché de catálogos (app/utils/catalog_cache.py): comparación de
+ETags e invalidación tras el commit de escrituras sobre modelos registrados.
+"""
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from app.utils.catalog_cache import _etag_matches, catalog_cache
+
+pytestmark = pytest.mark.unit
+
+Base = declarative_base()
+
+
+class CatalogItem(Base):
+    __tablename__ = "catalog_items"
+
+    id = Column(Integer, primary_key=True)
+    nombre = Column(String(50))
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    catalog_cache.track_model(CatalogItem, "test_items")
+    try:
+        with Session(engine) as db:
+            yield db
+    finally:
+        catalog_cache._tracked_models.pop(CatalogItem, None)
+        engine.dispose()
+
+
+class TestEtagMatches:
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            (None, False),
+            ('"abc"', True),
+            ('W/"abc"', True),
+            ('"x", "abc"', True),
+            ("*", True),
+            ('"abcd"', False),
+        ],
+    )
+    def test_if_none_match(self, header, expected):
+        assert _etag_matches(header, '"abc"') is expected
+
+
+class TestTrackedModels:
+    def test_commit_invalida_el_catalogo(self, session):
+        version = catalog_cache.version("test_items")
+        session.add(CatalogItem(nombre="Auxiliar"))
+        session.flush()
+        # Hasta el commit la escritura no es visible para otras sesiones.
+        assert catalog_cache.version("test_items") == version
+        session.commit()
+        assert catalog_cache.version("test_items") == version + 1
+
+    def test_edicion_y_borrado(self, session):
+        item = CatalogItem(nombre="Auxiliar")
+        session.add(item)
+        session.commit()
+
+        version = catalog_cache.version("test_items")
+        item.nombre = "Analista"
+        session.commit()
+        assert catalog_cache.version("test_items") == version + 1
+
+        session.delete(item)
+        session.commit()
+        assert catalog_cache.version("test_items") == version + 2
+
+    def test_rollback_no_invalida(self, session):
+        version = catalog_cache.version("test_items")
+        session.add(CatalogItem(nombre="Auxiliar"))
+        session.flush()
+        session.rollback()
+        session.commit()
+        assert catalog_cache.version("test_items") == version
+
+    def test_asignacion_sin_cambios_no_invalida(self, session):
+        item = CatalogItem(nombre="Auxiliar")
+        session.add(item)
+        session.commit()
+
+        version = catalog_cache.version("test_items")
+        assert item.nombre == "Auxiliar"  # recarga el valor expirado por el commit
+        item.nombre = "Auxiliar"
+        session.commit()
+        assert catalog_cache.version("test_items") == version
@@ -0,0 +1,83 @@
+"""
+Tests de la compresión de respuestas (app/utils/compression.py): negociación
+de `Accept-Encoding` y ETag de las respuestas comprimidas.
+"""
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.utils.catalog_cache import _etag_matches
+from app.utils.compression import CompressionMiddleware, negotiate_encoding
+
+pytestmark = pytest.mark.unit
+
+ETAG = '"v1-abc"'
+PAYLOAD = {"items": ["x" * 40] * 100}
+
+
+def _catalog(request: Request) -> Response:
+    if _etag_matches(request.headers.get("if-none-match"), ETAG):
+        return Response(status_code=304, headers={"ETag": ETAG})
+    return JSONResponse(PAYLOAD, headers={"ETag": ETAG})
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[Route("/catalog", _catalog)])
+    return TestClient(CompressionMiddleware(app, minimum_size=100))
+
+
+class TestNegotiateEncoding:
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            ("", None),
+            ("gzip, deflate, br", "br"),
+            ("gzip", "gzip"),
+            ("br;q=0, gzip", "gzip"),
+            ("BR;q=0.5", "br"),
+            ("*", "br"),
+            ("*;q=0", None),
+            ("br;q=0, *", "gzip"),
+            ("gzip;q=abc", None),
+            ("identity", None),
+        ],
+    )
+    def test_accept_encoding(self, header, expected):
+        assert negotiate_encoding(header) == expected
+
+
+class TestCompressedEtag:
+    def test_etag_debil_al_comprimir(self, client):
+        response = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == f"W/{ETAG}"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == PAYLOAD
+
+    def test_sin_compresion_conserva_el_etag_fuerte(self, client):
+        response = client.get("/catalog", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == ETAG
+
+    def test_el_etag_debil_obtiene_304(self, client):
+        etag = client.get("/catalog", headers={"Accept-Encoding": "br"}).headers["etag"]
+        response = client.get("/catalog", headers={"Accept-Encoding": "br", "If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_fragmentos_decodificables(self):
+        async def stream(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/x-ndjson")]})
+            for i in range(3):
+                await send({"type": "http.response.body", "body": b'{"n": %d}\n' % i, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+
+        client = TestClient(CompressionMiddleware(stream, minimum_size=100))
+        response = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert response.text.splitlines() == ['{"n": 0}', '{"n": 1}', '{"n": 2}']
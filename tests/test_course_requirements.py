@@ -0,0 +1,111 @@
+"""
+Tests de la decisión de completar un curso (app/services/course_progress.py):
+los contadores de la inscripción no bastan si el curso cambió después del
+último evento del usuario.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (registra todos los modelos para las relaciones)
+from app.database import Base
+from app.models.course import Course, CourseType
+from app.models.enrollment import Enrollment, EnrollmentStatus
+from app.models.evaluation import Evaluation, EvaluationStatus, UserEvaluation, UserEvaluationStatus
+from app.models.survey import Survey, SurveyStatus, UserSurvey, UserSurveyStatus
+from app.services import course_progress
+
+pytestmark = pytest.mark.unit
+
+USER_ID = 7
+TABLES = ("courses", "enrollments", "evaluations", "user_evaluations", "surveys", "user_surveys")
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[Base.metadata.tables[name] for name in TABLES])
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def course(db):
+    course = Course(title="Alturas", course_type=CourseType.SPECIALIZED, created_by=1)
+    db.add(course)
+    db.flush()
+    return course
+
+
+def add_evaluation(db, course, passed=True):
+    evaluation = Evaluation(title="Final", course_id=course.id, created_by=1, status=EvaluationStatus.PUBLISHED)
+    db.add(evaluation)
+    db.flush()
+    if passed:
+        db.add(UserEvaluation(
+            user_id=USER_ID, evaluation_id=evaluation.id, status=UserEvaluationStatus.COMPLETED, passed=True,
+        ))
+    return evaluation
+
+
+def add_survey(db, course, completed=True):
+    survey = Survey(
+        title="Satisfacción", course_id=course.id, created_by=1,
+        status=SurveyStatus.PUBLISHED, required_for_completion=True,
+    )
+    db.add(survey)
+    db.flush()
+    if completed:
+        db.add(UserSurvey(user_id=USER_ID, survey_id=survey.id, status=UserSurveyStatus.COMPLETED))
+    return survey
+
+
+def enroll(db, course):
+    enrollment = Enrollment(user_id=USER_ID, course_id=course.id, status=EnrollmentStatus.ACTIVE.value)
+    db.add(enrollment)
+    db.flush()
+    course_progress.refresh_survey_counters(db, enrollment)
+    course_progress.refresh_evaluation_counters(db, enrollment)
+    return enrollment
+
+
+class TestRequirementsMet:
+    def test_cumple_con_lo_publicado(self, db, course):
+        add_evaluation(db, course)
+        add_survey(db, course)
+        enrollment = enroll(db, course)
+        assert (enrollment.evaluations_passed, enrollment.required_surveys_completed) == (1, 1)
+        assert course_progress.requirements_met(db, enrollment)
+
+    def test_evaluacion_aprobada_archivada_y_reemplazada(self, db, course):
+        passed = add_evaluation(db, course)
+        enrollment = enroll(db, course)
+        passed.status = EvaluationStatus.ARCHIVED
+        add_evaluation(db, course, passed=False)
+        db.flush()
+
+        assert enrollment.evaluations_passed == 1  # contador de antes del cambio
+        assert not course_progress.requirements_met(db, enrollment)
+        assert enrollment.evaluations_passed == 0
+
+    def test_encuesta_obligatoria_reemplazada(self, db, course):
+        add_evaluation(db, course)
+        completed = add_survey(db, course)
+        enrollment = enroll(db, course)
+        completed.status = SurveyStatus.ARCHIVED
+        add_survey(db, course, completed=False)
+        db.flush()
+
+        assert enrollment.required_surveys_completed == 1
+        assert not course_progress.requirements_met(db, enrollment)
+        assert enrollment.required_surveys_completed == 0
+
+    def test_contadores_atrasados_se_corrigen(self, db, course):
+        """Inscripciones anteriores a los contadores: se cuentan al decidir."""
+        add_evaluation(db, course)
+        add_survey(db, course)
+        enrollment = Enrollment(user_id=USER_ID, course_id=course.id, status=EnrollmentStatus.ACTIVE.value)
+        db.add(enrollment)
+        db.flush()
+        assert course_progress.requirements_met(db, enrollment)
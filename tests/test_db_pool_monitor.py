@@ -0,0 +1,44 @@
+"""
+Tests de la instrumentación del pool (app/utils/db_pool_monitor.py): la
+lectura de `/health` y `/metrics` no debe formatear pilas ni alterar contadores.
+"""
+import pytest
+
+from app.utils import db_pool_monitor
+from app.utils.db_pool_monitor import PoolMonitor
+
+pytestmark = pytest.mark.unit
+
+
+class _Record:
+    """Sustituto del `ConnectionRecord` del pool: solo importa su identidad."""
+
+
+@pytest.fixture
+def monitor():
+    monitor = PoolMonitor(long_held_seconds=0.0)
+    record = _Record()
+    monitor._on_checkout(None, record, None)
+    yield monitor
+    monitor._on_checkin(None, record)
+
+
+class TestPoolMonitor:
+    def test_health_no_formatea_pilas_ni_cuenta(self, monitor, monkeypatch):
+        def fail(stack):
+            raise AssertionError("health() no debe formatear pilas")
+
+        monkeypatch.setattr(db_pool_monitor, "_format_stack", fail)
+        for _ in range(3):
+            health = monitor.health()
+        assert health["status"] == "degraded"
+        assert health["long_held"] == 1
+        assert monitor.long_held_total == 0
+        assert monitor.counters()["long_held_now"] == 1
+
+    def test_snapshot_reporta_la_pila_una_sola_vez(self, monitor):
+        snapshot = monitor.snapshot()
+        assert len(snapshot["long_held"]) == 1
+        assert snapshot["long_held"][0]["stack"]
+        assert snapshot["long_held_total"] == 1
+        assert monitor.snapshot()["long_held_total"] == 1
@@ -0,0 +1,116 @@
+"""
+Tests de la caché de derivados de imágenes (app/services/image_derivatives.py):
+negociación de formato, ETags y acceso a disco fuera del event loop.
+"""
+import asyncio
+import threading
+from io import BytesIO
+
+import pytest
+
+from app.services.image_derivatives import ImageDerivativeCache, etag_matches, negotiate_format
+
+pytestmark = pytest.mark.unit
+
+
+def jpeg(width=800, height=600) -> bytes:
+    from PIL import Image
+
+    output = BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(output, "JPEG")
+    return output.getvalue()
+
+
+class TestNegotiation:
+    @pytest.mark.parametrize(
+        "accept, expected",
+        [
+            (None, "jpeg"),
+            ("image/avif,image/webp,*/*", "webp"),
+            ("image/*", "jpeg"),
+            ("image/png,image/jpeg", "jpeg"),
+        ],
+    )
+    def test_negotiate_format(self, accept, expected):
+        assert negotiate_format(accept) == expected
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            (None, False),
+            ("", False),
+            ('"abc"', True),
+            ('W/"abc"', True),
+            ('"x", W/"abc"', True),
+            ("*", True),
+            ('"abcd"', False),
+        ],
+    )
+    def test_etag_matches(self, header, expected):
+        assert etag_matches(header, '"abc"') is expected
+
+
+@pytest.fixture
+def source():
+    pytest.importorskip("PIL")
+    return jpeg()
+
+
+def make_cache(tmp_path, source, **kwargs):
+    fetched = []
+
+    async def fetch(url):
+        fetched.append(url)
+        return source
+
+    cache = ImageDerivativeCache(str(tmp_path), fetch=fetch, workers=1, **kwargs)
+    cache.fetched = fetched
+    return cache
+
+
+class TestImageDerivativeCache:
+    def test_render_y_acierto_en_disco(self, tmp_path, source):
+        cache = make_cache(tmp_path, source, max_bytes=10_000_000)
+
+        async def scenario():
+            first = await cache.get("fotos/a.jpg", "thumb", "jpeg")
+            second = await cache.get("fotos/a.jpg", "thumb", "jpeg")
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        assert first.content_type == "image/jpeg"
+        assert first.data == second.data and first.etag == second.etag
+        assert cache.cached_etag("fotos/a.jpg", "thumb", "jpeg") == first.etag
+        assert (cache.hits, cache.misses, cache.renders, cache.downloads) == (1, 1, 1, 1)
+
+    def test_el_disco_no_se_toca_desde_el_event_loop(self, tmp_path, source):
+        cache = make_cache(tmp_path, source, max_bytes=10_000_000)
+        threads = []
+        for name in ("_read", "_write"):
+            original = getattr(cache, name)
+
+            def traced(*args, _original=original):
+                threads.append(threading.current_thread())
+                return _original(*args)
+
+            setattr(cache, name, traced)
+
+        asyncio.run(cache.get("fotos/a.jpg", "thumb", "jpeg"))
+        assert threads and threading.main_thread() not in threads
+
+    def test_desalojo_lru(self, tmp_path, source):
+        cache = make_cache(tmp_path, source, max_bytes=1)
+
+        async def scenario():
+            await cache.get("fotos/a.jpg", "thumb", "jpeg")
+            await cache.get("fotos/a.jpg", "small", "jpeg")
+
+        asyncio.run(scenario())
+        # Por encima del límite se desaloja todo lo necesario y el tamaño queda contado.
+        assert cache.stats()["bytes"] == 0
+        assert not list(tmp_path.rglob("*.img"))
+        assert not cache._evicting
+
+    def test_original_inexistente(self, tmp_path):
+        cache = make_cache(tmp_path, None, max_bytes=10_000_000)
+        assert asyncio.run(cache.get("fotos/no-existe.jpg")) is None
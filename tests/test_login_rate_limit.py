@@ -0,0 +1,137 @@
+"""
+Tests del límite de intentos de login (app/utils/rate_limit.py,
+app/services/auth.py) y de la migración del costo de bcrypt
+(app/utils/password.py).
+"""
+import bcrypt
+import pytest
+from fastapi import HTTPException
+
+from app.services.auth import RETRY_AFTER_MAX_SECONDS, AuthService
+from app.utils.password import PasswordManager
+from app.utils.rate_limit import TokenBucketLimiter, client_ip, parse_networks
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestTokenBucketLimiter:
+    def test_rafaga_y_recarga(self, clock):
+        limiter = TokenBucketLimiter(capacity=3, refill_per_second=0.5, clock=clock)
+        assert [limiter.acquire("ip") for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.acquire("ip") == pytest.approx(2.0)
+
+        clock.now += 1  # media ficha
+        assert limiter.acquire("ip") == pytest.approx(1.0)
+        clock.now += 1
+        assert limiter.acquire("ip") == 0.0
+        assert limiter.stats() == {"keys": 1, "allowed": 4, "rejected": 2}
+
+    def test_la_recarga_no_supera_la_capacidad(self, clock):
+        limiter = TokenBucketLimiter(capacity=2, refill_per_second=1, clock=clock)
+        limiter.acquire("ip")
+        clock.now += 3600
+        assert [limiter.acquire("ip") for _ in range(3)][-1] > 0
+
+    def test_claves_independientes_y_reset(self, clock):
+        limiter = TokenBucketLimiter(capacity=1, refill_per_second=0.1, clock=clock)
+        assert limiter.acquire("a") == 0.0
+        assert limiter.acquire("b") == 0.0
+        assert limiter.acquire("a") > 0
+        limiter.reset("a")
+        assert limiter.acquire("a") == 0.0
+
+    def test_sin_recarga_espera_infinita(self, clock):
+        limiter = TokenBucketLimiter(capacity=1, refill_per_second=0, clock=clock)
+        limiter.acquire("ip")
+        assert limiter.acquire("ip") == float("inf")
+
+    def test_descarta_las_claves_menos_recientes(self, clock):
+        limiter = TokenBucketLimiter(capacity=1, refill_per_second=0.1, max_keys=2, clock=clock)
+        for key in ("a", "b", "c"):
+            limiter.acquire(key)
+        assert limiter.stats()["keys"] == 2
+        # "a" se descartó: vuelve con el balde lleno
+        assert limiter.acquire("a") == 0.0
+
+
+class TestClientIp:
+    trusted = parse_networks(["172.20.0.0/16", "10.0.0.1"])
+
+    @pytest.mark.parametrize(
+        "peer, forwarded_for, expected",
+        [
+            ("203.0.113.7", None, "203.0.113.7"),
+            # Conexión directa: la cabecera la pone el cliente y se ignora
+            ("203.0.113.7", "198.51.100.1", "203.0.113.7"),
+            ("172.20.0.5", "198.51.100.1", "198.51.100.1"),
+            # El cliente no elige su IP anteponiendo entradas
+            ("172.20.0.5", "1.2.3.4, 198.51.100.1", "198.51.100.1"),
+            ("172.20.0.5", "198.51.100.1, 10.0.0.1", "198.51.100.1"),
+            ("172.20.0.5", "no-es-ip, 198.51.100.1", "198.51.100.1"),
+            ("172.20.0.5", "", "172.20.0.5"),
+            (None, "198.51.100.1", None),
+        ],
+    )
+    def test_x_forwarded_for_solo_de_proxies_de_confianza(self, peer, forwarded_for, expected):
+        assert client_ip(peer, forwarded_for, self.trusted) == expected
+
+    def test_sin_proxies_configurados(self):
+        assert client_ip("172.20.0.5", "198.51.100.1", parse_networks([])) == "172.20.0.5"
+
+    def test_red_invalida(self):
+        with pytest.raises(ValueError):
+            parse_networks(["traefik"])
+
+
+class TestCheckLoginRate:
+    def service(self, clock, ip_per_second):
+        service = AuthService()
+        service.ip_limiter = TokenBucketLimiter(1, ip_per_second, clock=clock)
+        service.account_limiter = TokenBucketLimiter(5, 1, clock=clock)
+        return service
+
+    def test_retry_after(self, clock):
+        service = self.service(clock, ip_per_second=0.25)
+        service.check_login_rate("ana@example.com", "198.51.100.1")
+        with pytest.raises(HTTPException) as error:
+            service.check_login_rate("ana@example.com", "198.51.100.1")
+        assert error.value.status_code == 429
+        assert error.value.headers["Retry-After"] == "4"
+
+    def test_tasa_cero_no_falla(self, clock):
+        """Con LOGIN_RATE_*_PER_MINUTE=0 la espera es infinita: 429 con un Retry-After acotado."""
+        service = self.service(clock, ip_per_second=0)
+        service.check_login_rate("ana@example.com", "198.51.100.1")
+        with pytest.raises(HTTPException) as error:
+            service.check_login_rate("ana@example.com", "198.51.100.1")
+        assert error.value.status_code == 429
+        assert error.value.headers["Retry-After"] == str(RETRY_AFTER_MAX_SECONDS)
+
+
+class TestNeedsRehash:
+    manager = PasswordManager(rounds=5)
+
+    def test_costo_configurado(self):
+        assert not self.manager.needs_rehash(self.manager.hash_password("secreto"))
+
+    def test_otro_costo(self):
+        stored = bcrypt.hashpw(b"secreto", bcrypt.gensalt(rounds=4)).decode()
+        assert self.manager.needs_rehash(stored)
+        assert PasswordManager(rounds=4).needs_rehash(self.manager.hash_password("secreto"))
+
+    @pytest.mark.parametrize("stored", ["", "texto-plano", "$2b$xx$abc", None])
+    def test_hash_no_reconocido(self, stored):
+        assert not self.manager.needs_rehash(stored)
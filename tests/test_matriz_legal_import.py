@@ -0,0 +1,70 @@
+"""
+Tests del estado de una importación de la Matriz Legal
+(app/services/matriz_legal_service.py) cuando falla a mitad de los lotes.
+
+La lectura del Excel y el acceso a las normas se sustituyen: solo interesa
+cómo queda el registro de importación tras los lotes ya confirmados.
+"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models.matriz_legal import EstadoImportacion, MatrizLegalImportacion
+from app.services.matriz_legal_service import MatrizLegalService
+
+pytestmark = pytest.mark.unit
+
+
+def _row_data(row):
+    return {"tipo_norma": "ley", "numero_norma": row["numero_norma"], "articulo": ""}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    engine = create_engine("sqlite://")
+    MatrizLegalImportacion.__table__.create(engine)
+    rows = [{"numero_norma": str(i)} for i in range(3)]
+    inserted = []
+
+    monkeypatch.setattr(MatrizLegalService, "IMPORT_BATCH_SIZE", 1)
+    monkeypatch.setattr(MatrizLegalService, "_read_excel_with_header_detection", lambda self, content: rows)
+    monkeypatch.setattr(MatrizLegalService, "_normalize_columns", lambda self, df: df)
+    monkeypatch.setattr(MatrizLegalService, "_normalize_values", lambda self, df: df)
+    monkeypatch.setattr(MatrizLegalService, "_iter_rows", lambda self, df: enumerate(df, start=2))
+    monkeypatch.setattr(MatrizLegalService, "_extract_norma_data", lambda self, row: _row_data(row))
+    monkeypatch.setattr(MatrizLegalService, "_norma_key", staticmethod(lambda tipo, numero, articulo: ("ley", numero, "")))
+    monkeypatch.setattr(MatrizLegalService, "_prefetch_existing_normas", lambda self: {})
+    monkeypatch.setattr(MatrizLegalService, "_ensure_sectores", lambda self, textos: {})
+
+    def insert_batch(self, batch, sector_ids, importacion_id):
+        if len(inserted) == service.fail_after:
+            raise RuntimeError("conexión perdida")
+        inserted.extend(batch)
+        return len(batch)
+
+    monkeypatch.setattr(MatrizLegalService, "_insert_normas_batch", insert_batch)
+    with Session(engine) as db:
+        service = MatrizLegalService(db)
+        yield service
+    engine.dispose()
+
+
+class TestImportFailure:
+    def run(self, service, fail_after):
+        service.fail_after = fail_after
+        with pytest.raises(RuntimeError):
+            service.import_excel(b"", "matriz.xlsx", user_id=1)
+        return service.db.query(MatrizLegalImportacion).one()
+
+    def test_fallo_tras_lotes_confirmados_es_parcial(self, service):
+        importacion = self.run(service, fail_after=2)
+        assert importacion.estado == EstadoImportacion.PARCIAL.value
+        assert importacion.normas_nuevas == 2
+        assert importacion.filas_procesadas == 2
+        assert "2 de 3 filas" in importacion.log_errores
+
+    def test_fallo_sin_lotes_confirmados_es_fallida(self, service):
+        importacion = self.run(service, fail_after=0)
+        assert importacion.estado == EstadoImportacion.FALLIDA.value
+        assert importacion.normas_nuevas == 0
+        assert importacion.log_errores == "conexión perdida"
@@ -0,0 +1,54 @@
+"""
+Tests de la instrumentación de métricas (app/utils/metrics.py): forma de los
+parámetros de las sentencias, que se registra en lugar de sus valores.
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.utils.metrics import PARAMETER_SHAPE_MAX_KEYS, parameter_shape
+
+pytestmark = pytest.mark.unit
+
+
+class TestParameterShape:
+    @pytest.mark.parametrize(
+        "parameters, expected",
+        [
+            (None, "None"),
+            ({}, "{}"),
+            ({"id": 7, "nombre": "Ana"}, "{id: int, nombre: str}"),
+            ((7, "Ana", None), "(int, str, NoneType)"),
+            ({"fecha": date(2026, 1, 1), "valor": Decimal("1.5")}, "{fecha: date, valor: Decimal}"),
+            ({"ids": [1, 2, 3]}, "{ids: list[int] x3}"),
+            ({"ids": (1, "a")}, "{ids: tuple[int|str] x2}"),
+            ({"ids": []}, "{ids: list[?] x0}"),
+            (5, "int"),
+        ],
+    )
+    def test_forma_sin_valores(self, parameters, expected):
+        assert parameter_shape(parameters) == expected
+
+    def test_no_incluye_valores(self):
+        shape = parameter_shape({"email": "ana@example.com", "documento": "1234567890"})
+        assert "ana@example.com" not in shape and "1234567890" not in shape
+
+    def test_distingue_el_tamano_de_un_in(self):
+        assert parameter_shape({"ids": list(range(3))}) != parameter_shape({"ids": list(range(3000))})
+        assert parameter_shape({"ids": list(range(3000))}) == "{ids: list[int] x3000}"
+
+    def test_recorta_las_claves(self):
+        extra = 4
+        parameters = {f"p{i}": i for i in range(PARAMETER_SHAPE_MAX_KEYS + extra)}
+        shape = parameter_shape(parameters)
+        assert shape.endswith(f", +{extra}}}")
+        assert shape.count(": int") == PARAMETER_SHAPE_MAX_KEYS
+        assert parameter_shape(tuple(parameters.values())).endswith(f", +{extra})")
+
+    def test_executemany(self):
+        rows = [{"id": 1, "nombre": "a"}, {"id": 2, "nombre": "b"}]
+        assert parameter_shape(rows, executemany=True) == "2 x {id: int, nombre: str}"
+        assert parameter_shape([], executemany=True) == "0 x None"
+        # Sin executemany, una lista es una sentencia con parámetros posicionales
+        assert parameter_shape([1, 2]) == "(int, int)"
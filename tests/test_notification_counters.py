@@ -0,0 +1,98 @@
+"""
+Tests de los contadores de notificaciones no leídas
+(app/services/notification_delivery.py) sobre SQLite en memoria.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import Session
+
+from app.models.notification import Notification, NotificationType, NotificationUnreadCounter
+from app.services.notification_delivery import adjust_unread, get_unread_count, mark_all_read, set_unread
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Notification.__table__.create(engine)
+    NotificationUnreadCounter.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def add_notifications(db, user_id, unread, read=0):
+    now = datetime.utcnow()
+    db.execute(
+        insert(Notification.__table__),
+        [
+            {
+                "user_id": user_id,
+                "title": "Aviso",
+                "message": "Aviso",
+                "notification_type": NotificationType.IN_APP,
+                "read_at": now if i < read else None,
+                "created_at": now,
+            }
+            for i in range(unread + read)
+        ],
+    )
+
+
+class TestAdjustUnread:
+    def test_suma_y_resta_en_un_lote(self, db):
+        set_unread(db, {1: 3, 2: 1})
+        assert adjust_unread(db, {1: 2, 2: -1, 3: 0}) == {1: 5, 2: 0}
+        assert get_unread_count(db, 3) == 0
+
+    def test_crea_el_contador_al_sumar(self, db):
+        assert adjust_unread(db, {1: 2}) == {1: 2}
+        assert adjust_unread(db, {1: 1}) == {1: 3}
+
+    def test_no_baja_de_cero(self, db):
+        set_unread(db, {1: 1})
+        assert adjust_unread(db, {1: -3}) == {1: 0}
+
+    def test_resta_sin_contador_recalcula(self, db):
+        """Sin fila de contador no se inserta un valor negativo: se cuenta desde notifications."""
+        add_notifications(db, 1, unread=2, read=1)
+        assert adjust_unread(db, {1: -1, 2: -1}) == {1: 2, 2: 0}
+        assert get_unread_count(db, 1) == 2
+        assert get_unread_count(db, 2) == 0
+
+
+class TestMarkAllRead:
+    def test_marca_y_pone_el_contador_en_cero(self, db):
+        add_notifications(db, 1, unread=3, read=1)
+        add_notifications(db, 2, unread=1)
+        set_unread(db, {1: 3, 2: 1})
+        assert mark_all_read(db, 1) == 3
+        assert get_unread_count(db, 1) == 0
+        assert get_unread_count(db, 2) == 1
+
+    def test_bloquea_el_contador_antes_del_update(self, db):
+        """
+        El contador se escribe (y bloquea) antes de marcar: si fuera después,
+        una notificación insertada en paralelo que el UPDATE no ve quedaría
+        sin contar al poner el cero.
+        """
+        add_notifications(db, 1, unread=2)
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", capture)
+        try:
+            mark_all_read(db, 1)
+        finally:
+            event.remove(engine, "before_cursor_execute", capture)
+
+        counter_write = next(i for i, sql in enumerate(statements) if "notification_unread_counters" in sql)
+        mark_update = next(i for i, sql in enumerate(statements) if sql.startswith("UPDATE notifications "))
+        assert counter_write < mark_update
+        assert get_unread_count(db, 1) == 0
@@ -0,0 +1,119 @@
+"""
+Tests de la paginación (app/utils/pagination.py): cursores, keyset y las
+estrategias de conteo. Usan SQLite en memoria; la estimación del planificador
+solo existe en PostgreSQL y se sustituye donde hace falta.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, Date, Integer, String, create_engine, func
+from sqlalchemy.orm import Session, declarative_base
+
+from app.models.worker_vacation import VacationStatus
+from app.utils import pagination
+from app.utils.pagination import CountMode, SortKey, count_rows, decode_cursor, encode_cursor, paginate
+
+pytestmark = pytest.mark.unit
+
+Base = declarative_base()
+
+
+class Row(Base):
+    __tablename__ = "pagination_rows"
+
+    id = Column(Integer, primary_key=True)
+    day = Column(Date, nullable=False)
+    name = Column(String(20), nullable=False)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        # 5 filas por día: la primera clave de orden se repite
+        session.add_all(Row(id=i, day=date(2026, 1, 1 + i // 5), name=f"fila {i}") for i in range(1, 24))
+        session.commit()
+        yield session
+    engine.dispose()
+
+
+SORT = [SortKey(Row.day, descending=True), SortKey(Row.id)]
+
+
+class TestCursor:
+    def test_ida_y_vuelta_conserva_los_tipos(self):
+        values = [datetime(2026, 3, 1, 8, 30), date(2026, 3, 1), Decimal("1.50"), VacationStatus.APPROVED, 7, None]
+        sort = [SortKey(Row.name)] * len(values)
+        decoded = decode_cursor(sort, encode_cursor(sort, values))
+        assert decoded == [values[0], values[1], values[2], VacationStatus.APPROVED.value, 7, None]
+        assert isinstance(decoded[0], datetime) and isinstance(decoded[2], Decimal)
+
+    def test_cursor_sin_relleno_ni_caracteres_reservados(self):
+        cursor = encode_cursor(SORT, [date(2026, 1, 1), 12345])
+        assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+    @pytest.mark.parametrize("cursor", ["", "no-es-base64!", "e30", encode_cursor(SORT, [date(2026, 1, 1)])])
+    def test_cursor_invalido(self, cursor):
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(SORT, cursor)
+        assert error.value.status_code == 400
+
+    def test_cursor_de_otro_orden(self):
+        cursor = encode_cursor([SortKey(Row.day), SortKey(Row.id)], [date(2026, 1, 1), 1])
+        with pytest.raises(HTTPException):
+            decode_cursor(SORT, cursor)
+
+
+class TestPaginate:
+    def expected_ids(self, db):
+        return [row.id for row in db.query(Row).order_by(Row.day.desc(), Row.id)]
+
+    def test_recorrido_por_cursor(self, db):
+        seen, cursor = [], None
+        while True:
+            page = paginate(db.query(Row), sort=SORT, size=4, cursor=cursor, count=CountMode.NONE)
+            seen.extend(row.id for row in page.items)
+            assert page.has_prev == bool(cursor)
+            if not page.has_next:
+                assert page.next_cursor is None
+                break
+            cursor = page.next_cursor
+        assert seen == self.expected_ids(db)
+
+    def test_recorrido_por_cursor_mismo_sentido(self, db):
+        sort = [SortKey(Row.day), SortKey(Row.id)]
+        first = paginate(db.query(Row), sort=sort, size=10, count=CountMode.NONE)
+        second = paginate(db.query(Row), sort=sort, size=10, cursor=first.next_cursor, count=CountMode.NONE)
+        assert [row.id for row in first.items + second.items] == list(range(1, 21))
+
+    def test_offset_y_metadatos(self, db):
+        page = paginate(db.query(Row), sort=SORT, size=10, page=3, count=CountMode.EXACT)
+        assert [row.id for row in page.items] == self.expected_ids(db)[20:]
+        assert page.meta() == {
+            "total": 23, "page": 3, "size": 10, "pages": 3,
+            "has_next": False, "has_prev": True, "next_cursor": None,
+        }
+        assert paginate(db.query(Row), sort=SORT, size=10, offset=10, count=CountMode.NONE).page == 2
+
+
+class TestCountRows:
+    def test_none_no_cuenta(self, db):
+        assert count_rows(db.query(Row), CountMode.NONE) is None
+
+    def test_exact(self, db):
+        assert count_rows(db.query(Row).filter(Row.id > 20), CountMode.EXACT) == 3
+        count_query = db.query(func.count(Row.id)).filter(Row.id > 10)
+        assert count_rows(db.query(Row), CountMode.EXACT, count_query) == 13
+
+    def test_estimated_sin_postgresql_cuenta_exacto(self, db):
+        assert pagination.estimate_count(db.query(Row)) is None
+        assert count_rows(db.query(Row), CountMode.ESTIMATED) == 23
+
+    @pytest.mark.parametrize("estimate, expected", [(50_000, 50_000), (120, 23)])
+    def test_estimated_umbral(self, db, monkeypatch, estimate, expected):
+        """Por debajo de ESTIMATED_COUNT_EXACT_BELOW el conteo exacto es barato y se prefiere."""
+        monkeypatch.setattr(pagination, "estimate_count", lambda query: estimate)
+        assert count_rows(db.query(Row), CountMode.ESTIMATED) == expected
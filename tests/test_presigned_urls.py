@@ -0,0 +1,160 @@
+"""
+Tests de la caché de URLs firmadas (PresignedURLCache en
+app/services/s3_storage.py): aritmética de franjas, validez mínima garantizada
+y las consultas al almacenamiento que ahorra ContaboStorageService.
+"""
+import pytest
+
+from app.config import settings
+from app.services.s3_storage import ContaboStorageService, PresignedURLCache
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestWindows:
+    @pytest.mark.parametrize(
+        "expiration, window, signed",
+        [
+            (3600, 900, 4500),
+            (900, 900, 1800),
+            (300, 300, 600),  # la franja no supera la validez pedida
+            (0, 1, 1),
+        ],
+    )
+    def test_franja_y_expiracion_firmada(self, expiration, window, signed):
+        cache = PresignedURLCache(reuse_seconds=900)
+        assert cache.window(expiration) == window
+        assert cache.signing_expiration(expiration) == signed
+
+    def test_franja_por_tiempo(self, clock):
+        cache = PresignedURLCache(reuse_seconds=900, clock=clock)
+        clock.now = 900 * 10
+        assert cache.bucket(3600) == 10
+        clock.now += 899.9
+        assert cache.bucket(3600) == 10
+        clock.now += 0.1
+        assert cache.bucket(3600) == 11
+
+    @pytest.mark.parametrize("expiration", [60, 900, 3600])
+    def test_siempre_queda_la_validez_pedida(self, clock, expiration):
+        """Una URL servida desde la caché nunca caduca antes de `expiration` segundos."""
+        cache = PresignedURLCache(reuse_seconds=900, clock=clock)
+        window = cache.window(expiration)
+        start = window * 50
+        for signed_offset in (0, window / 3, window - 1):
+            clock.now = start + signed_offset
+            bucket = cache.bucket(expiration)
+            expires_at = clock.now + cache.signing_expiration(expiration)
+            cache.put("k", expiration, bucket, f"url@{signed_offset}")
+            for served_offset in (signed_offset, window / 2, window - 0.001):
+                if served_offset < signed_offset:
+                    continue
+                clock.now = start + served_offset
+                assert cache.get("k", expiration) == f"url@{signed_offset}"
+                assert expires_at - clock.now >= expiration
+            clock.now = start + window
+            assert cache.get("k", expiration) is None
+
+
+class TestCache:
+    def test_aciertos_por_clave_y_expiracion(self, clock):
+        cache = PresignedURLCache(reuse_seconds=900, clock=clock)
+        cache.put("a", 3600, cache.bucket(3600), "url-a")
+        assert cache.get("a", 3600) == "url-a"
+        assert cache.get("a", 600) is None
+        assert cache.get("b", 3600) is None
+        assert cache.stats() == {"urls": 1, "known_keys": 1, "hits": 1, "misses": 2}
+
+    def test_url_firmada_en_la_franja_anterior(self, clock):
+        """`put` usa la franja calculada antes de firmar: si la firma cruza el
+        límite, la URL no se reutiliza en la franja siguiente."""
+        cache = PresignedURLCache(reuse_seconds=900, clock=clock)
+        bucket = cache.bucket(3600)
+        clock.now += 900
+        cache.put("a", 3600, bucket, "url-a")
+        assert cache.get("a", 3600) is None
+
+    def test_limite_de_entradas(self, clock):
+        cache = PresignedURLCache(reuse_seconds=900, max_entries=2, clock=clock)
+        bucket = cache.bucket(3600)
+        for key in ("a", "b", "c"):
+            cache.put(key, 3600, bucket, f"url-{key}")
+        assert cache.get("a", 3600) is None
+        assert not cache.is_known("a")
+        assert cache.get("c", 3600) == "url-c"
+
+    def test_discard(self, clock):
+        cache = PresignedURLCache(reuse_seconds=900, clock=clock)
+        cache.put("a", 3600, cache.bucket(3600), "url-1h")
+        cache.put("a", 600, cache.bucket(600), "url-10m")
+        cache.discard("a")
+        assert not cache.is_known("a")
+        assert cache.get("a", 3600) is None and cache.get("a", 600) is None
+
+
+class FakeS3:
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.heads = []
+        self.signed = []
+
+    def head_object(self, Bucket, Key):
+        self.heads.append(Key)
+        if Key not in self.existing:
+            raise FileNotFoundError(Key)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        self.signed.append((Params["Key"], ExpiresIn))
+        return f"https://storage.test/{Params['Key']}?expires={ExpiresIn}&n={len(self.signed)}"
+
+
+@pytest.fixture
+def contabo(monkeypatch, clock):
+    for name, value in (
+        ("contabo_endpoint_url", "https://storage.test"),
+        ("contabo_access_key_id", "test"),
+        ("contabo_secret_access_key", "test"),
+        ("contabo_bucket_name", "materiales"),
+        ("contabo_region", "eu2"),
+        ("presigned_url_reuse_seconds", 900),
+    ):
+        monkeypatch.setattr(settings, name, value, raising=False)
+    service = ContaboStorageService()
+    service.url_cache._clock = clock
+    service._client = FakeS3({"m/1.pdf", "m/2.pdf"})
+    return service
+
+
+class TestContaboPresignedUrls:
+    def test_una_firma_y_un_head_por_franja(self, contabo, clock):
+        first = contabo.get_presigned_url("m/1.pdf")
+        assert contabo.get_presigned_url("m/1.pdf") == first
+        assert contabo.s3_client.heads == ["m/1.pdf"]
+        assert contabo.s3_client.signed == [("m/1.pdf", 4500)]
+
+        clock.now += 900
+        assert contabo.get_presigned_url("m/1.pdf") != first
+        # La clave ya se conoce: no se repite el HEAD
+        assert contabo.s3_client.heads == ["m/1.pdf"]
+
+    def test_lote_con_claves_inexistentes(self, contabo):
+        contabo.get_presigned_url("m/1.pdf")
+        urls = contabo.get_presigned_urls(["m/1.pdf", "m/2.pdf", "m/falta.pdf", "m/2.pdf", None])
+        assert list(urls) == ["m/1.pdf", "m/2.pdf", "m/falta.pdf"]
+        assert urls["m/falta.pdf"] is None
+        assert urls["m/1.pdf"] and urls["m/2.pdf"]
+        assert sorted(contabo.s3_client.heads) == ["m/1.pdf", "m/2.pdf", "m/falta.pdf"]
+        assert [key for key, _ in contabo.s3_client.signed] == ["m/1.pdf", "m/2.pdf"]
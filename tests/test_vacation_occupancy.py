@@ -0,0 +1,124 @@
+"""
+Tests del índice de ocupación de vacaciones por rangos (app/services/vacation_occupancy.py).
+
+No requieren base de datos: el índice se construye con intervalos en memoria.
+"""
+import pytest
+from datetime import date
+
+from app.models.worker_vacation import VacationStatus
+from app.services.vacation_occupancy import (
+    OccupancyInterval,
+    OccupancyRange,
+    VacationOccupancy,
+    business_days_between,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def interval(vacation_id, start, end, worker_id=None, status=VacationStatus.APPROVED):
+    return OccupancyInterval(
+        vacation_id=vacation_id,
+        worker_id=worker_id or vacation_id,
+        worker_name=f"Trabajador {vacation_id}",
+        start_date=start,
+        end_date=end,
+        status=status,
+    )
+
+
+@pytest.fixture
+def occupancy():
+    # 1: 3-10 mar, 2: 5-7 mar, 3: 11-12 mar (contiguo a 1), 4: 20 mar (pendiente)
+    return VacationOccupancy([
+        interval(1, date(2026, 3, 3), date(2026, 3, 10)),
+        interval(2, date(2026, 3, 5), date(2026, 3, 7)),
+        interval(3, date(2026, 3, 11), date(2026, 3, 12)),
+        interval(4, date(2026, 3, 20), date(2026, 3, 20), status=VacationStatus.PENDING),
+    ])
+
+
+class TestRanges:
+    def test_fusiona_segmentos_con_la_misma_ocupacion(self, occupancy):
+        """Los intervalos contiguos con igual ocupación forman un solo rango."""
+        assert occupancy.ranges(date(2026, 3, 1), date(2026, 3, 31)) == [
+            OccupancyRange(date(2026, 3, 3), date(2026, 3, 4), 1),
+            OccupancyRange(date(2026, 3, 5), date(2026, 3, 7), 2),
+            OccupancyRange(date(2026, 3, 8), date(2026, 3, 12), 1),
+            OccupancyRange(date(2026, 3, 20), date(2026, 3, 20), 1),
+        ]
+
+    def test_recorta_al_rango_consultado(self, occupancy):
+        assert occupancy.ranges(date(2026, 3, 6), date(2026, 3, 9)) == [
+            OccupancyRange(date(2026, 3, 6), date(2026, 3, 7), 2),
+            OccupancyRange(date(2026, 3, 8), date(2026, 3, 9), 1),
+        ]
+
+    def test_rango_vacio_o_invertido(self, occupancy):
+        assert occupancy.ranges(date(2026, 3, 13), date(2026, 3, 19)) == []
+        assert occupancy.ranges(date(2026, 3, 10), date(2026, 3, 1)) == []
+        assert VacationOccupancy([]).ranges(date(2026, 3, 1), date(2026, 3, 31)) == []
+
+    def test_headcount_y_maximo(self, occupancy):
+        assert occupancy.headcount_on(date(2026, 3, 2)) == 0
+        assert occupancy.headcount_on(date(2026, 3, 6)) == 2
+        assert occupancy.headcount_on(date(2026, 3, 13)) == 0
+        assert occupancy.max_headcount(date(2026, 3, 1), date(2026, 3, 31)) == 2
+        assert occupancy.max_headcount(date(2026, 3, 8), date(2026, 3, 31)) == 1
+
+
+class TestOverlapping:
+    def test_intervalos_que_se_solapan(self, occupancy):
+        found = occupancy.overlapping(date(2026, 3, 7), date(2026, 3, 11))
+        assert [i.vacation_id for i in found] == [1, 2, 3]
+
+    def test_filtros_por_estado_y_trabajador(self, occupancy):
+        month = (date(2026, 3, 1), date(2026, 3, 31))
+        assert [i.vacation_id for i in occupancy.overlapping(*month, statuses=[VacationStatus.PENDING])] == [4]
+        assert 1 not in [i.vacation_id for i in occupancy.overlapping(*month, exclude_worker_id=1)]
+
+    def test_coincide_con_la_busqueda_lineal(self):
+        intervals = [
+            interval(i, date(2026, 1, 1 + (i * 7) % 28), date(2026, 1, 1 + (i * 7) % 28 + i % 5))
+            for i in range(1, 40)
+        ]
+        occupancy = VacationOccupancy(intervals)
+        start, end = date(2026, 1, 10), date(2026, 1, 14)
+        expected = {i.vacation_id for i in intervals if i.start_date <= end and i.end_date >= start}
+        assert {i.vacation_id for i in occupancy.overlapping(start, end)} == expected
+
+
+class TestAvailability:
+    def test_capacidad(self, occupancy):
+        assert not occupancy.is_available(date(2026, 3, 6), date(2026, 3, 6))
+        assert not occupancy.is_available(date(2026, 3, 6), date(2026, 3, 6), capacity=2)
+        assert occupancy.is_available(date(2026, 3, 6), date(2026, 3, 6), capacity=3)
+        assert occupancy.is_available(date(2026, 3, 13), date(2026, 3, 19))
+
+    def test_excluye_las_vacaciones_del_propio_trabajador(self, occupancy):
+        assert occupancy.is_available(date(2026, 3, 11), date(2026, 3, 12), exclude_worker_id=3)
+
+
+class TestDayMap:
+    def test_un_caracter_por_dia(self, occupancy):
+        assert occupancy.day_map(date(2026, 3, 2), date(2026, 3, 13)) == "011222111110"
+
+    def test_satura_en_nueve(self):
+        crowded = VacationOccupancy(interval(i, date(2026, 3, 1), date(2026, 3, 1)) for i in range(1, 13))
+        assert crowded.day_map(date(2026, 3, 1), date(2026, 3, 2)) == "90"
+
+
+class TestBusinessDays:
+    @pytest.mark.parametrize(
+        "start, end, expected",
+        [
+            (date(2026, 3, 2), date(2026, 3, 6), 5),    # lunes a viernes
+            (date(2026, 3, 7), date(2026, 3, 8), 0),    # fin de semana
+            (date(2026, 3, 6), date(2026, 3, 9), 2),    # viernes a lunes
+            (date(2026, 3, 1), date(2026, 3, 31), 22),
+            (date(2026, 3, 9), date(2026, 3, 2), 0),
+        ],
+    )
+    def test_cuenta_dias_habiles(self, start, end, expected):
+        assert business_days_between(start, end) == expected